@@ -0,0 +1,305 @@
+"""
+Bulk catalog import for EZM Trade Management.
+Streams supplier catalog and product rows from CSV or JSONL, validates and
+dedupes them in memory, resolves suppliers and categories in bulk and upserts
+each chunk with a handful of queries instead of one save() per row.
+"""
+
+import csv
+import json
+import logging
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Product, ProductCategory, ProductCost, Supplier, SupplierProduct,
+    PRODUCT_TYPE_CHOICES, SETTINGS_CHOICES
+)
+
+logger = logging.getLogger(__name__)
+
+SUPPLIER_PRODUCT_UPDATE_FIELDS = [
+    'product_name', 'description', 'category', 'subcategory', 'unit_price',
+    'currency', 'minimum_order_quantity', 'material', 'availability_status',
+    'estimated_delivery_time', 'stock_quantity', 'is_active', 'updated_date',
+]
+
+# is_active is left out so a re-import does not revive deliberately deactivated products
+PRODUCT_UPDATE_FIELDS = [
+    'category', 'description', 'price', 'material', 'product_type',
+    'minimum_stock_level', 'updated_at',
+]
+
+
+def generate_product_codes(supplier, count):
+    """
+    Unused auto-generated product codes for a supplier, checked with one query.
+    """
+    base_code = f"SP{int(time.time())}"
+    taken = set(
+        SupplierProduct.objects.filter(
+            supplier=supplier,
+            product_code__startswith=base_code
+        ).values_list('product_code', flat=True)
+    )
+    codes = []
+    candidate, counter = base_code, 1
+    while len(codes) < count:
+        if candidate not in taken:
+            codes.append(candidate)
+            taken.add(candidate)
+        candidate = f"{base_code}{counter}"
+        counter += 1
+    return codes
+
+
+def read_rows(stream, file_format):
+    """Yield row dicts from an open CSV or JSONL text stream"""
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+    elif file_format == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported catalog format: {file_format}")
+
+
+def availability_for(stock_quantity):
+    """Availability status for a stock level, as SupplierProductForm sets it"""
+    if stock_quantity == 0:
+        return 'out_of_stock'
+    if stock_quantity <= 10:
+        return 'limited_stock'
+    return 'in_stock'
+
+
+class CatalogImporter:
+    """
+    Chunked upsert of SupplierProduct or Product rows.
+
+    Kinds:
+        supplier_products: upserted on (supplier, product_code)
+        products: matched on (name, variation) and updated or created
+    """
+
+    KINDS = ('supplier_products', 'products')
+
+    def __init__(self, kind, supplier=None, chunk_size=1000, dry_run=False):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        self.kind = kind
+        self.supplier = supplier
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.known_categories = set()
+        self.product_categories = {key.lower(): key for key, _ in SETTINGS_CHOICES}
+        self.product_categories.update({label.lower(): key for key, label in SETTINGS_CHOICES})
+        self.product_types = {key for key, _ in PRODUCT_TYPE_CHOICES}
+        self.stats = {'rows': 0, 'imported': 0, 'duplicates': 0, 'errors': []}
+
+    def run(self, rows):
+        """
+        Import an iterable of row dicts.
+
+        Returns:
+            dict: rows, imported, duplicates, errors, seconds, rows_per_second
+        """
+        started = time.perf_counter()
+        chunk = []
+        for line_number, row in enumerate(rows, start=1):
+            self.stats['rows'] += 1
+            chunk.append((line_number, row))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+
+        if self.kind == 'products' and not self.dry_run:
+            # bulk writes skip Product.save(), so drop the picker cache and catalog snapshot once
+            from .product_picker import product_picker_service
+            from .product_catalog import product_catalog
+            product_picker_service.invalidate()
+            product_catalog.invalidate()
+
+        seconds = time.perf_counter() - started
+        self.stats['seconds'] = round(seconds, 3)
+        self.stats['rows_per_second'] = round(self.stats['rows'] / seconds) if seconds else self.stats['rows']
+        logger.info(
+            f"Catalog import ({self.kind}): {self.stats['imported']} of {self.stats['rows']} rows "
+            f"in {self.stats['seconds']}s"
+        )
+        return self.stats
+
+    def _error(self, line_number, message):
+        self.stats['errors'].append(f"Row {line_number}: {message}")
+
+    def _decimal(self, value):
+        try:
+            value = Decimal(str(value).strip())
+        except (InvalidOperation, TypeError):
+            return None
+        return value if value.is_finite() and value > 0 else None
+
+    def _int(self, value, default=0):
+        if value in (None, ''):
+            return default
+        try:
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            return None
+
+    def _import_chunk(self, chunk):
+        with transaction.atomic():
+            if self.kind == 'supplier_products':
+                self._import_supplier_products(chunk)
+            else:
+                self._import_products(chunk)
+
+    def _resolve_suppliers(self, chunk):
+        """Supplier per name/id in the chunk with one query"""
+        if self.supplier is not None:
+            return {}
+        keys = {str(row.get('supplier') or '').strip() for _, row in chunk} - {''}
+        ids = {int(key) for key in keys if key.isdigit()}
+        suppliers = {}
+        for supplier in Supplier.objects.filter(name__in=keys) | Supplier.objects.filter(pk__in=ids):
+            suppliers[supplier.name] = supplier
+            suppliers[str(supplier.pk)] = supplier
+        return suppliers
+
+    def _ensure_categories(self, names):
+        """Create missing ProductCategory rows for the given names in one insert"""
+        missing = set(names) - self.known_categories
+        if missing and not self.dry_run:
+            ProductCategory.objects.bulk_create(
+                [ProductCategory(name=name, is_active=True) for name in sorted(missing)],
+                ignore_conflicts=True
+            )
+        self.known_categories |= missing
+
+    def _import_supplier_products(self, chunk):
+        suppliers = self._resolve_suppliers(chunk)
+        products = {}
+        needs_code = []
+        for line_number, row in chunk:
+            supplier = self.supplier or suppliers.get(str(row.get('supplier') or '').strip())
+            name = (row.get('product_name') or '').strip()
+            category = (row.get('category') or '').strip()
+            unit_price = self._decimal(row.get('unit_price'))
+            stock_quantity = self._int(row.get('stock_quantity'))
+            minimum_order = self._int(row.get('minimum_order_quantity'), default=1)
+            if supplier is None:
+                self._error(line_number, f"unknown supplier '{row.get('supplier', '')}'")
+                continue
+            if not name or not category:
+                self._error(line_number, "product_name and category are required")
+                continue
+            if unit_price is None or stock_quantity is None or minimum_order is None:
+                self._error(line_number, "unit_price must be greater than 0 and quantities whole numbers")
+                continue
+
+            product = SupplierProduct(
+                supplier=supplier,
+                product_code=(row.get('product_code') or '').strip(),
+                product_name=name,
+                description=(row.get('description') or '').strip(),
+                category=category,
+                subcategory=(row.get('subcategory') or '').strip(),
+                unit_price=unit_price,
+                currency=(row.get('currency') or 'ETB').strip(),
+                minimum_order_quantity=minimum_order or 1,
+                material=(row.get('material') or '').strip(),
+                availability_status=availability_for(stock_quantity),
+                estimated_delivery_time=(row.get('estimated_delivery_time') or '3-5 business days').strip(),
+                stock_quantity=stock_quantity,
+                is_active=True
+            )
+            if not product.product_code:
+                needs_code.append(product)
+                continue
+            key = (supplier.pk, product.product_code)
+            if key in products:
+                self.stats['duplicates'] += 1
+            products[key] = product
+
+        by_supplier = {}
+        for product in needs_code:
+            by_supplier.setdefault(product.supplier, []).append(product)
+        for supplier, pending in by_supplier.items():
+            for product, code in zip(pending, generate_product_codes(supplier, len(pending))):
+                product.product_code = code
+                products[(supplier.pk, code)] = product
+
+        self._ensure_categories(product.category for product in products.values())
+        if not self.dry_run and products:
+            SupplierProduct.objects.bulk_create(
+                products.values(),
+                update_conflicts=True,
+                unique_fields=['supplier', 'product_code'],
+                update_fields=SUPPLIER_PRODUCT_UPDATE_FIELDS
+            )
+        self.stats['imported'] += len(products)
+
+    def _import_products(self, chunk):
+        rows = {}
+        for line_number, row in chunk:
+            name = (row.get('name') or '').strip()
+            category = self.product_categories.get((row.get('category') or '').strip().lower())
+            price = self._decimal(row.get('price'))
+            minimum_stock = self._int(row.get('minimum_stock_level'), default=10)
+            product_type = (row.get('product_type') or 'finished_product').strip()
+            if not name:
+                self._error(line_number, "name is required")
+                continue
+            if category is None:
+                self._error(line_number, f"unknown category '{row.get('category', '')}'")
+                continue
+            if price is None or minimum_stock is None or product_type not in self.product_types:
+                self._error(line_number, "price must be greater than 0 with a valid product_type")
+                continue
+
+            key = (name, (row.get('variation') or '').strip() or None)
+            if key in rows:
+                self.stats['duplicates'] += 1
+            rows[key] = Product(
+                name=name,
+                variation=key[1],
+                category=category,
+                description=(row.get('description') or '').strip(),
+                price=price,
+                material=(row.get('material') or '').strip(),
+                product_type=product_type,
+                supplier_company=(row.get('supplier_company') or '').strip() or None,
+                minimum_stock_level=minimum_stock,
+                is_active=True
+            )
+
+        existing = {}
+        for pk, name, variation in Product.objects.filter(
+            name__in={name for name, _ in rows}
+        ).order_by('pk').values_list('pk', 'name', 'variation'):
+            existing.setdefault((name, variation or None), pk)
+
+        to_update = []
+        to_create = []
+        now = timezone.now()
+        for key, product in rows.items():
+            if key in existing:
+                product.pk = existing[key]
+                product.updated_at = now
+                to_update.append(product)
+            else:
+                to_create.append(product)
+
+        if not self.dry_run:
+            Product.objects.bulk_create(to_create)
+            Product.objects.bulk_update(to_update, PRODUCT_UPDATE_FIELDS)
+            # bulk_update skips Product.save(), so drop landed costs the way product_saved() would
+            ProductCost.objects.filter(product_id__in=[product.pk for product in to_update]).delete()
+        self.stats['imported'] += len(rows)
@@ -0,0 +1,179 @@
+"""
+Landed cost of goods for EZM Trade Management.
+Keeps one ProductCost row per store product (matched to a warehouse product
+by name and priced at its latest delivered purchase) and freezes the
+resulting unit cost onto sale lines at checkout, so profit for any store and
+period is a single SUM((price - cost) * quantity).
+"""
+
+import logging
+from decimal import Decimal
+
+from django.db.models import DecimalField, F, Q, Sum
+
+logger = logging.getLogger(__name__)
+
+# Margins assumed by the original per-line profit calculation
+CAPPED_COST_RATIO = Decimal('0.7')  # landed cost above the sale price: assume a 30% margin
+ESTIMATED_COST_RATIO = Decimal('0.75')  # no warehouse product matches: assume a 25% margin
+
+
+def line_profit():
+    """Aggregate of (price - unit cost) * quantity over Order lines"""
+    return Sum(
+        (F('price_at_time_of_sale') - F('unit_cost')) * F('quantity'),
+        output_field=DecimalField(max_digits=16, decimal_places=4)
+    )
+
+
+class LandedCostService:
+    """
+    Per-product landed cost table and cost-of-goods snapshots on sale lines.
+
+    Rows are derived lazily and dropped when the warehouse price or delivered
+    purchase price behind them changes; frozen sale line costs never change.
+    """
+
+    def derive(self, product):
+        """ProductCost fields for a product, matched by exact then first-word name"""
+        from .models import PurchaseOrderItem, WarehouseProduct
+
+        exact_match = True
+        warehouse_product = WarehouseProduct.objects.filter(product_name__iexact=product.name).first()
+        words = product.name.split()
+        if not warehouse_product and words:
+            exact_match = False
+            warehouse_product = WarehouseProduct.objects.filter(product_name__icontains=words[0]).first()
+
+        if not warehouse_product:
+            return {'warehouse_product': None, 'unit_cost': None, 'source': 'estimated', 'exact_match': False}
+
+        recent_purchase = PurchaseOrderItem.objects.filter(
+            warehouse_product=warehouse_product,
+            purchase_order__status='delivered'
+        ).order_by('-purchase_order__created_date').first()
+        if recent_purchase:
+            unit_cost, source = recent_purchase.unit_price, 'purchase_order'
+        else:
+            unit_cost, source = warehouse_product.unit_price, 'warehouse'
+        return {
+            'warehouse_product': warehouse_product,
+            'unit_cost': unit_cost,
+            'source': source,
+            'exact_match': exact_match,
+        }
+
+    def unit_costs(self, product_ids):
+        """
+        Landed unit cost per product, deriving and storing missing rows.
+
+        Returns:
+            dict: product_id -> unit cost, or None when nothing matched
+        """
+        from .models import Product, ProductCost
+
+        product_ids = set(product_ids)
+        costs = dict(ProductCost.objects.filter(product_id__in=product_ids).values_list('product_id', 'unit_cost'))
+        missing = product_ids - set(costs)
+        if missing:
+            rows = [
+                ProductCost(product=product, **self.derive(product))
+                for product in Product.objects.filter(pk__in=missing)
+            ]
+            ProductCost.objects.bulk_create(rows, ignore_conflicts=True)
+            costs.update({row.product_id: row.unit_cost for row in rows})
+        return costs
+
+    def cost_for_sale(self, landed_cost, sale_price):
+        """Unit cost to freeze on a line sold at sale_price"""
+        sale_price = Decimal(str(sale_price))
+        if landed_cost is None:
+            return sale_price * ESTIMATED_COST_RATIO
+        if landed_cost > sale_price:
+            return sale_price * CAPPED_COST_RATIO
+        return landed_cost
+
+    def line_unit_cost(self, product_id, sale_price):
+        """Unit cost for a new sale line (called from Order.save)"""
+        landed_cost = self.unit_costs([product_id]).get(product_id)
+        return self.cost_for_sale(landed_cost, sale_price)
+
+    def freeze(self, lines):
+        """Set unit_cost on Order instances that have none; returns lines updated"""
+        from transactions.models import Order
+
+        lines = [line for line in lines if line.unit_cost is None and line.product_id]
+        if not lines:
+            return 0
+        costs = self.unit_costs({line.product_id for line in lines})
+        for line in lines:
+            line.unit_cost = self.cost_for_sale(costs.get(line.product_id), line.price_at_time_of_sale)
+        Order.objects.bulk_update(lines, ['unit_cost'], batch_size=500)
+        return len(lines)
+
+    def freeze_pending(self, lines):
+        """Freeze costs on lines of an Order queryset sold before snapshots existed"""
+        return self.freeze(lines.filter(unit_cost__isnull=True, product__isnull=False).only(
+            'id', 'product_id', 'price_at_time_of_sale', 'unit_cost'
+        ))
+
+    def gross_profit(self, lines):
+        """
+        Profit of an Order queryset in one aggregate.
+
+        Lines sold before costs were snapshotted are frozen first; lines
+        without a product carry no cost and are left out, as before.
+        """
+        self.freeze_pending(lines)
+        total = lines.filter(unit_cost__isnull=False).aggregate(total=line_profit())['total']
+        return total or Decimal('0')
+
+    def backfill(self, batch_size=1000):
+        """Freeze costs on every historical sale line in pk-ordered batches"""
+        from transactions.models import Order
+
+        pending = Order.objects.filter(unit_cost__isnull=True, product__isnull=False).only(
+            'id', 'product_id', 'price_at_time_of_sale', 'unit_cost'
+        ).order_by('pk')
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return updated
+            updated += self.freeze(batch)
+            last_pk = batch[-1].pk
+            logger.info(f"Froze unit costs on {updated} sale lines")
+
+    def rebuild(self):
+        """Re-derive the whole landed cost table; returns rows written"""
+        from .models import Product, ProductCost
+
+        ProductCost.objects.all().delete()
+        return len(self.unit_costs(Product.objects.values_list('pk', flat=True)))
+
+    def product_saved(self, product):
+        """A renamed product may match a different warehouse product"""
+        from .models import ProductCost
+        ProductCost.objects.filter(product=product).delete()
+
+    def warehouse_product_saved(self, warehouse_product, adding):
+        """Drop landed costs that no longer reflect this warehouse product"""
+        from .models import ProductCost
+
+        stale = Q(warehouse_product=warehouse_product, source='warehouse') & ~Q(unit_cost=warehouse_product.unit_price)
+        if adding:
+            # A new listing can become the match of loosely matched or unmatched products
+            stale |= Q(product__name__iexact=warehouse_product.product_name) | Q(exact_match=False)
+        ProductCost.objects.filter(stale).delete()
+
+    def purchase_order_delivered(self, purchase_order):
+        """Delivered purchase prices replace the landed cost of their products"""
+        from .models import ProductCost
+        ProductCost.objects.filter(
+            warehouse_product__in=purchase_order.items.values('warehouse_product')
+        ).delete()
+
+
+# Global instance for easy access
+landed_cost_service = LandedCostService()
@@ -66,22 +66,26 @@ def fifo_inventory_view(request):
             elif stock_status_filter == 'out_of_stock':
                 store_stock = store_stock.filter(quantity=0)
         
-        # Get FIFO information for each product
+        # Get FIFO information for all listed products in one query
+        store_stock = list(store_stock)
+        warehouse_by_name = {}
+        for warehouse_product in WarehouseProduct.get_fifo_ordered_products().filter(
+            product_name__in={stock.product.name for stock in store_stock}
+        ):
+            # Oldest active batch first, as FIFO picking would
+            warehouse_by_name.setdefault(warehouse_product.product_name, warehouse_product)
+
         inventory_data = []
         for stock in store_stock:
-            # Get warehouse product info for FIFO data
-            try:
-                warehouse_product = WarehouseProduct.objects.get(
-                    product_name=stock.product.name,
-                    is_active=True
-                )
+            warehouse_product = warehouse_by_name.get(stock.product.name)
+            if warehouse_product:
                 fifo_info = {
                     'arrival_date': warehouse_product.arrival_date,
                     'batch_number': warehouse_product.batch_number,
                     'warehouse_stock': warehouse_product.quantity_in_stock,
                     'warehouse_location': warehouse_product.warehouse_location,
                 }
-            except WarehouseProduct.DoesNotExist:
+            else:
                 fifo_info = {
                     'arrival_date': None,
                     'batch_number': 'N/A',
@@ -121,7 +125,7 @@ def fifo_inventory_view(request):
     
     else:
         # For head managers, show warehouse inventory with FIFO ordering
-        warehouse_products = WarehouseProduct.get_fifo_ordered_products()
+        warehouse_products = WarehouseProduct.get_fifo_ordered_products().select_related('supplier')
         
         # Apply filters
         if search_query:
@@ -188,6 +192,11 @@ def inventory_movement_history(request, product_id):
     total_issued = movements.filter(quantity_change__lt=0).aggregate(
         total=Sum('quantity_change')
     )['total'] or 0
+
+    # Movements past their retention period only survive as monthly summaries
+    archived = InventoryMovement.objects.archived_summaries(warehouse_product=warehouse_product.id)
+    total_received += archived.filter(group__direction='in').aggregate(total=Sum('total'))['total'] or 0
+    total_issued += archived.filter(group__direction='out').aggregate(total=Sum('total'))['total'] or 0
     
     context = {
         'warehouse_product': warehouse_product,
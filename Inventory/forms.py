@@ -784,17 +784,8 @@ class SupplierProductForm(forms.ModelForm):
                     )
             else:
                 # Auto-generate product code if not provided
-                import uuid
-                import time
-                base_code = f"SP{int(time.time())}"
-                counter = 1
-                while SupplierProduct.objects.filter(
-                    supplier=self.supplier,
-                    product_code=base_code
-                ).exists():
-                    base_code = f"SP{int(time.time())}{counter}"
-                    counter += 1
-                cleaned_data['product_code'] = base_code
+                from .catalog_import import generate_product_codes
+                cleaned_data['product_code'] = generate_product_codes(self.supplier, 1)[0]
 
         # Validate stock quantity and set availability status
         stock_quantity = cleaned_data.get('stock_quantity')
@@ -1063,30 +1054,9 @@ class RestockRequestForm(forms.ModelForm):
             # For restock requests, show products available from:
             # 1. Warehouse products
             # 2. Products in other stores
-            # 3. All products in the system (for potential restocking)
-            from .models import Stock, WarehouseProduct
-            from store.models import Store
-            from django.db import models
-
-            # Get products available in warehouse
-            warehouse_product_names = WarehouseProduct.objects.filter(
-                quantity_in_stock__gt=0,
-                is_active=True
-            ).values_list('product_name', flat=True)
+            from .product_picker import product_picker_service
 
-            # Get products available in other stores
-            other_stores_products = Stock.objects.filter(
-                quantity__gt=0
-            ).exclude(store=store).values_list('product', flat=True)
-
-            # Combine all available products for restocking
-            # Include products that match warehouse product names or are in other stores
-            available_products = Product.objects.filter(
-                models.Q(id__in=other_stores_products) |
-                models.Q(name__in=warehouse_product_names)
-            ).distinct()
-
-            self.fields['product'].queryset = available_products
+            self.fields['product'].queryset = product_picker_service.available_queryset('restock', store)
         else:
             self.fields['product'].queryset = Product.objects.none()
 
@@ -1151,16 +1121,11 @@ class StoreStockTransferRequestForm(forms.ModelForm):
             # For transfer requests, show products available in OTHER stores
             # (excluding warehouse and current store)
             # This allows requesting products FROM other stores TO current store
-            from .models import Stock
+            from .product_picker import product_picker_service
             from store.models import Store
 
-            # Get products available in other stores (excluding current store)
-            other_stores_products = Stock.objects.filter(
-                quantity__gt=0
-            ).exclude(store=from_store).values_list('product', flat=True).distinct()
-
-            self.fields['product'].queryset = Product.objects.filter(
-                id__in=other_stores_products
+            self.fields['product'].queryset = product_picker_service.available_queryset(
+                'transfer', from_store
             ).order_by('name')
 
             # Only show other stores (exclude the current store)
@@ -7,6 +7,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from Inventory.models import Supplier
 from Inventory.stock_notification_service import StockNotificationService
+from users.email_service import queued_email_sender
 
 
 class Command(BaseCommand):
@@ -116,6 +117,9 @@ class Command(BaseCommand):
             self.stdout.write('='*50)
             
             result = StockNotificationService.check_and_send_low_stock_alerts(supplier)
+
+            # Emails are delivered by the background sender; wait before exiting
+            queued_email_sender.flush()
             
             if result['success']:
                 self.stdout.write(
@@ -0,0 +1,71 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Inventory.catalog_import import CatalogImporter, read_rows
+from Inventory.models import Supplier
+
+
+class Command(BaseCommand):
+    help = 'Bulk import supplier catalog entries or products from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file to import')
+        parser.add_argument(
+            '--kind',
+            choices=CatalogImporter.KINDS,
+            default='supplier_products',
+            help='What the rows describe (default: supplier_products)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format (default: taken from the file extension)',
+        )
+        parser.add_argument(
+            '--supplier',
+            help='Supplier name or id for every row (otherwise read from the "supplier" column)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per upsert (default: 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate without writing anything')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError(f"Cannot tell the format of {path}; pass --format csv or --format jsonl")
+
+        supplier = None
+        if options['supplier']:
+            lookup = options['supplier']
+            supplier = Supplier.objects.filter(
+                pk=int(lookup) if lookup.isdigit() else None
+            ).first() or Supplier.objects.filter(name=lookup).first()
+            if supplier is None:
+                raise CommandError(f"Supplier '{lookup}' not found")
+
+        importer = CatalogImporter(
+            options['kind'],
+            supplier=supplier,
+            chunk_size=max(options['chunk_size'], 1),
+            dry_run=options['dry_run']
+        )
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                stats = importer.run(read_rows(stream, file_format))
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        except ValueError as e:
+            raise CommandError(f"Invalid catalog file: {e}")
+
+        for error in stats['errors'][:20]:
+            self.stderr.write(error)
+        if len(stats['errors']) > 20:
+            self.stderr.write(f"... and {len(stats['errors']) - 20} more errors")
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {stats['imported']} of {stats['rows']} rows "
+            f"({stats['duplicates']} duplicates, {len(stats['errors'])} errors) "
+            f"in {stats['seconds']}s - {stats['rows_per_second']} rows/s"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0015_merge_20250729_2321'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='reserved_quantity',
+            field=models.PositiveIntegerField(default=0, help_text='Units held for approved outgoing transfers.'),
+        ),
+    ]
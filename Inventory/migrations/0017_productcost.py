@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0016_stock_reserved_quantity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductCost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_cost', models.DecimalField(blank=True, decimal_places=2, help_text='Empty when no warehouse product matches', max_digits=10, null=True)),
+                ('source', models.CharField(choices=[('purchase_order', 'Latest delivered purchase order'), ('warehouse', 'Warehouse unit price'), ('estimated', 'No warehouse match (estimated from sale price)')], max_length=20)),
+                ('exact_match', models.BooleanField(default=True, help_text='Matched on the full product name')),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='landed_cost', to='Inventory.product')),
+                ('warehouse_product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='product_costs', to='Inventory.warehouseproduct')),
+            ],
+        ),
+    ]
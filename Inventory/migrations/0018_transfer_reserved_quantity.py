@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0017_productcost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storestocktransferrequest',
+            name='reserved_quantity',
+            field=models.PositiveIntegerField(default=0, help_text="Units this request holds in the source store's reserved stock"),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.conf import settings
 from store.models import Store
 from transactions.models import Transaction
 from decimal import Decimal
+from users.retention import ArchiveAwareManager
 from django.core.validators import MinValueValidator
 
 SETTINGS_CHOICES = [
@@ -106,6 +107,27 @@ class Product(models.Model):
     def __str__(self):
         return f"{self.name} ({self.variation})" if self.variation else self.name
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        # Names and prices feed the cached product picker and catalog snapshot
+        from .product_picker import product_picker_service
+        from .product_catalog import product_catalog
+        product_picker_service.invalidate()
+        product_catalog.invalidate()
+
+        if not adding:
+            from .costing import landed_cost_service
+            landed_cost_service.product_saved(self)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+
+        from .product_catalog import product_catalog
+        product_catalog.invalidate()
+        return result
+
     def is_expired(self):
         """Check if product is expired"""
         if self.expiry_date:
@@ -131,6 +153,7 @@ class Stock(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_levels')
     store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='stock_items')
     quantity = models.PositiveIntegerField(default=0)
+    reserved_quantity = models.PositiveIntegerField(default=0, help_text="Units held for approved outgoing transfers.")
     last_updated = models.DateTimeField(auto_now=True)
     low_stock_threshold = models.PositiveIntegerField(default=10, help_text="Threshold for low stock alerts.")
     selling_price = models.DecimalField(max_digits=10, decimal_places=2, help_text="Selling price of the product at this store.")
@@ -142,6 +165,18 @@ class Stock(models.Model):
     def __str__(self):
         return f'{self.product.name} at {self.store.name}: {self.quantity}'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        # Which stores hold a product feeds the cached product picker
+        from .product_picker import product_picker_service
+        product_picker_service.invalidate()
+
+    @property
+    def available_quantity(self):
+        """Quantity that can still be sold or reserved"""
+        return max(self.quantity - self.reserved_quantity, 0)
+
 class StockTransferRequest(models.Model):
     """
     Manages the request-and-approval workflow for moving stock between stores.
@@ -865,6 +900,18 @@ class WarehouseProduct(models.Model):
     def __str__(self):
         return f"{self.product_name} ({self.product_id})"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        # Warehouse availability feeds the cached product picker
+        from .product_picker import product_picker_service
+        product_picker_service.invalidate()
+
+        # Unit prices feed landed costs of matching store products
+        from .costing import landed_cost_service
+        landed_cost_service.warehouse_product_saved(self, adding)
+
     @property
     def is_low_stock(self):
         """Check if current stock is below minimum threshold"""
@@ -988,6 +1035,9 @@ class InventoryMovement(models.Model):
         blank=True
     )
 
+    # Live rows; .archived() and .history() also read the retention archives
+    objects = ArchiveAwareManager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -1037,6 +1087,9 @@ class WarehouseStockMovement(models.Model):
         null=True
     )
 
+    # Live rows; .archived() and .history() also read the retention archives
+    objects = ArchiveAwareManager()
+
     class Meta:
         ordering = ['-created_date']
 
@@ -1265,6 +1318,11 @@ class PurchaseOrder(models.Model):
 
         super().save(*args, **kwargs)
 
+        # Delivered purchase prices become the landed cost of their products
+        if self.status == 'delivered':
+            from .costing import landed_cost_service
+            landed_cost_service.purchase_order_delivered(self)
+
 
 class PurchaseOrderItem(models.Model):
     """
@@ -1314,6 +1372,41 @@ class PurchaseOrderItem(models.Model):
         return max(0, self.quantity_ordered - self.quantity_received)
 
 
+class ProductCost(models.Model):
+    """
+    Landed unit cost of a store product, derived from the matching warehouse
+    product and its latest delivered purchase price. Sale lines freeze this
+    cost at checkout (see Inventory.costing).
+    """
+    SOURCE_CHOICES = [
+        ('purchase_order', 'Latest delivered purchase order'),
+        ('warehouse', 'Warehouse unit price'),
+        ('estimated', 'No warehouse match (estimated from sale price)'),
+    ]
+
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='landed_cost')
+    warehouse_product = models.ForeignKey(
+        WarehouseProduct,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='product_costs'
+    )
+    unit_cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Empty when no warehouse product matches"
+    )
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    exact_match = models.BooleanField(default=True, help_text="Matched on the full product name")
+    updated_date = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.product.name}: {self.unit_cost} ({self.source})"
+
+
 class DeliveryConfirmation(models.Model):
     """
     Records delivery confirmations for purchase orders.
@@ -1465,6 +1558,9 @@ class OrderStatusHistory(models.Model):
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True)
 
+    # Live rows; .archived() and .history() also read the retention archives
+    objects = ArchiveAwareManager()
+
     class Meta:
         ordering = ['-changed_at']
         verbose_name_plural = "Order status histories"
@@ -1600,6 +1696,10 @@ class RestockRequest(models.Model):
             self.request_number = f"RR{datetime.now().strftime('%Y%m%d')}{str(uuid.uuid4())[:8].upper()}"
         super().save(*args, **kwargs)
 
+        # Pending counts and statuses feed the cached dashboard KPIs
+        from users.dashboard_service import dashboard_kpi_service
+        dashboard_kpi_service.invalidate()
+
     def __str__(self):
         return f"Restock Request {self.request_number} - {self.product.name} for {self.store.name}"
 
@@ -1836,6 +1936,9 @@ class StoreStockTransferRequest(models.Model):
 
     # Transfer tracking
     approved_quantity = models.PositiveIntegerField(null=True, blank=True, help_text="Quantity approved for transfer")
+    reserved_quantity = models.PositiveIntegerField(
+        default=0, help_text="Units this request holds in the source store's reserved stock"
+    )
     shipped_date = models.DateTimeField(null=True, blank=True)
     received_date = models.DateTimeField(null=True, blank=True)
     actual_quantity_transferred = models.PositiveIntegerField(null=True, blank=True, help_text="Actual quantity transferred")
@@ -1858,6 +1961,10 @@ class StoreStockTransferRequest(models.Model):
             self.request_number = f"TR{datetime.now().strftime('%Y%m%d')}{str(uuid.uuid4())[:8].upper()}"
         super().save(*args, **kwargs)
 
+        # Pending counts and statuses feed the cached dashboard KPIs
+        from users.dashboard_service import dashboard_kpi_service
+        dashboard_kpi_service.invalidate()
+
     def __str__(self):
         return f"Transfer Request {self.request_number} - {self.product.name} from {self.from_store.name} to {self.to_store.name}"
 
@@ -2033,6 +2140,9 @@ class UserNotificationStatus(models.Model):
     is_dismissed = models.BooleanField(default=False)
     dismissed_at = models.DateTimeField(null=True, blank=True)
 
+    # Live rows; .archived() and .history() also read the retention archives
+    objects = ArchiveAwareManager()
+
     class Meta:
         unique_together = ['user', 'notification']
         indexes = [
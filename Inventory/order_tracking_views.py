@@ -92,10 +92,12 @@ def order_tracking_detail(request, order_id):
     """
     order = get_object_or_404(PurchaseOrder, id=order_id)
 
-    # Get order history
-    status_history = OrderStatusHistory.objects.filter(
-        purchase_order=order
-    ).order_by('-changed_at')
+    # Get order history, including changes already moved to the retention archive.
+    # Status changes save the order just before they are recorded, so only the
+    # archive months between order_date and updated_date are read
+    status_history = OrderStatusHistory.objects.history(
+        since=order.order_date, until=order.updated_date + timedelta(days=1), purchase_order=order
+    )
 
     # Get delivery confirmation if exists
     delivery_confirmation = None
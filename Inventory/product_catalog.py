@@ -0,0 +1,142 @@
+"""
+Product catalog snapshot for EZM Trade Management.
+Keeps a compact, process-local copy of every product's id, name, category,
+price and active flag for POS and storefront reads. Product changes bump a
+version counter in the cache; each process rebuilds its snapshot on the
+first read after the counter moves or the snapshot reaches
+settings.PRODUCT_CATALOG_MAX_AGE, so lookups in between cost no queries.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'product_catalog:version'
+
+
+class CatalogProduct:
+    """Read-only product metadata held in the snapshot"""
+
+    __slots__ = ('id', 'name', 'category', 'price', 'is_active')
+
+    def __init__(self, id, name, category, price, is_active):
+        self.id = id
+        self.name = name
+        self.category = category
+        self.price = price
+        self.is_active = is_active
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return self.name
+
+
+class CatalogSnapshot:
+    """Every product at one catalog version, ordered by name"""
+
+    __slots__ = ('version', 'products', 'by_id', 'categories', 'built_at')
+
+    def __init__(self, version, products):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.products = tuple(products)
+        self.by_id = {product.id: product for product in self.products}
+        self.categories = tuple(sorted({product.category for product in self.products if product.category}))
+
+
+class ProductCatalogService:
+    """
+    Versioned product snapshot shared by the threads of one process.
+
+    The version lives in the default cache, so with a per-process backend
+    (LocMem) saves in one process reach the others only once their snapshot
+    is older than max_age.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'PRODUCT_CATALOG_MAX_AGE', 60)
+
+    def _is_current(self, snapshot, version):
+        if snapshot is None or snapshot.version != version:
+            return False
+        return not self.max_age or time.monotonic() - snapshot.built_at < self.max_age
+
+    def _version(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            version = int(time.time() * 1000)
+            cache.add(VERSION_CACHE_KEY, version, None)
+        return version
+
+    def _bump(self):
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, int(time.time() * 1000), None)
+
+    def invalidate(self):
+        """
+        Mark every process's snapshot stale (call after product changes)
+        """
+        self._bump()
+        # A snapshot rebuilt before the change commits would otherwise keep the old rows
+        transaction.on_commit(self._bump)
+
+    def snapshot(self):
+        """Current CatalogSnapshot, rebuilt if the catalog version moved or it is older than max_age"""
+        version = self._version()
+        snapshot = self._snapshot
+        if not self._is_current(snapshot, version):
+            with self._lock:
+                snapshot = self._snapshot
+                if not self._is_current(snapshot, version):
+                    snapshot = self._build(version)
+                    self._snapshot = snapshot
+        return snapshot
+
+    def _build(self, version):
+        from .models import Product
+
+        rows = Product.objects.order_by('name', 'id').values_list('id', 'name', 'category', 'price', 'is_active')
+        snapshot = CatalogSnapshot(version, (CatalogProduct(*row) for row in rows))
+        logger.debug(f"Product catalog snapshot {version} built with {len(snapshot.products)} products")
+        return snapshot
+
+    def products(self, active_only=False):
+        """Snapshot products ordered by name"""
+        products = self.snapshot().products
+        if active_only:
+            return [product for product in products if product.is_active]
+        return products
+
+    def get(self, product_id):
+        """CatalogProduct for an id, or None"""
+        try:
+            return self.snapshot().by_id.get(int(product_id))
+        except (TypeError, ValueError):
+            return None
+
+    def categories(self):
+        """Distinct non-empty product categories, sorted"""
+        return self.snapshot().categories
+
+    def count(self):
+        return len(self.snapshot().products)
+
+
+# Global instance for easy access
+product_catalog = ProductCatalogService()
@@ -0,0 +1,93 @@
+"""
+Product picker service for EZM Trade Management.
+Keeps a cached, per-store index of the products a store manager may pick in
+restock and transfer requests, so the product APIs do not re-query stock
+and warehouse availability on every call.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'product_picker:version'
+
+PICKER_FIELDS = ('id', 'name', 'category', 'price')
+
+
+class ProductPickerService:
+    """
+    Cached product availability per store.
+
+    Kinds:
+        catalog: every product (restock API)
+        restock: products stocked in another store or in the warehouse
+        transfer: products stocked in another store
+    """
+
+    KINDS = ('catalog', 'restock', 'transfer')
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'PRODUCT_PICKER_CACHE_SECONDS', 300)
+
+    def _version(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            version = int(time.time() * 1000)
+            cache.add(VERSION_CACHE_KEY, version, None)
+        return version
+
+    def invalidate(self):
+        """
+        Drop every cached picker index (call after stock or catalog changes)
+        """
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, int(time.time() * 1000), None)
+
+    def available_queryset(self, kind, store=None):
+        """Unevaluated Product queryset behind a picker kind"""
+        from .models import Product, Stock, WarehouseProduct
+
+        if kind == 'catalog':
+            return Product.objects.all()
+
+        in_other_store = Exists(
+            Stock.objects.filter(product=OuterRef('pk'), quantity__gt=0).exclude(store=store)
+        )
+        if kind == 'transfer':
+            return Product.objects.filter(in_other_store)
+
+        in_warehouse = Exists(
+            WarehouseProduct.objects.filter(
+                product_name=OuterRef('name'),
+                quantity_in_stock__gt=0,
+                is_active=True
+            )
+        )
+        return Product.objects.filter(Q(in_other_store) | Q(in_warehouse))
+
+    def get_products(self, kind, store=None):
+        """
+        Ordered picker rows (id, name, category, price) for a store.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown product picker kind: {kind}")
+        store_id = store.pk if store is not None and kind != 'catalog' else 'all'
+        key = f'product_picker:{self._version()}:{kind}:{store_id}'
+        rows = cache.get(key)
+        if rows is None:
+            rows = list(self.available_queryset(kind, store).order_by('name', 'id').values(*PICKER_FIELDS))
+            cache.set(key, rows, self.timeout)
+        return rows
+
+
+
+# Global instance for easy access
+product_picker_service = ProductPickerService()
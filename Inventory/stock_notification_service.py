@@ -4,10 +4,13 @@ Handles low stock alerts and notifications to suppliers
 """
 
 import logging
-from django.core.mail import send_mail
+from collections import defaultdict
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 from .models import SupplierProduct, Supplier
 
@@ -25,8 +28,11 @@ class StockNotificationService:
     @classmethod
     def check_and_send_low_stock_alerts(cls, supplier=None):
         """
-        Check for low stock products and send notifications to suppliers
+        Check for low stock products and send a digest to each affected supplier
         
+        All suppliers' low, critical and out of stock products are loaded in
+        one query and grouped in memory; emails go through the queued sender.
+
         Args:
             supplier: Optional specific supplier to check, if None checks all suppliers
             
@@ -34,17 +40,30 @@ class StockNotificationService:
             dict: Summary of notifications sent
         """
         try:
+            products = SupplierProduct.objects.filter(
+                is_active=True,
+                stock_quantity__lte=cls.LOW_STOCK_THRESHOLD
+            ).select_related('supplier').order_by('supplier_id', 'stock_quantity')
+
             # Get suppliers to check
             if supplier:
-                suppliers = [supplier]
+                products = products.filter(supplier=supplier)
+                suppliers_checked = 1
             else:
-                suppliers = Supplier.objects.filter(is_active=True)
-            
+                products = products.filter(supplier__is_active=True)
+                suppliers_checked = Supplier.objects.filter(is_active=True).count()
+
+            products_by_supplier = defaultdict(list)
+            suppliers = {}
+            for product in products:
+                products_by_supplier[product.supplier_id].append(product)
+                suppliers[product.supplier_id] = product.supplier
+
             notifications_sent = 0
             total_low_stock_products = 0
             
-            for supplier_obj in suppliers:
-                result = cls._send_supplier_low_stock_notification(supplier_obj)
+            for supplier_id, supplier_products in products_by_supplier.items():
+                result = cls._send_supplier_low_stock_notification(suppliers[supplier_id], supplier_products)
                 if result['notification_sent']:
                     notifications_sent += 1
                 total_low_stock_products += result['low_stock_count']
@@ -56,7 +75,7 @@ class StockNotificationService:
                 'success': True,
                 'notifications_sent': notifications_sent,
                 'total_low_stock_products': total_low_stock_products,
-                'suppliers_checked': len(suppliers)
+                'suppliers_checked': suppliers_checked
             }
             
         except Exception as e:
@@ -67,37 +86,32 @@ class StockNotificationService:
             }
     
     @classmethod
-    def _send_supplier_low_stock_notification(cls, supplier):
+    def _send_supplier_low_stock_notification(cls, supplier, products=None):
         """
         Send low stock notification to a specific supplier
         
         Args:
             supplier: Supplier instance
+            products: The supplier's active products at or below the low stock
+                threshold, if already loaded
             
         Returns:
             dict: Result of notification attempt
         """
         try:
-            # Get low stock products for this supplier
-            low_stock_products = SupplierProduct.objects.filter(
-                supplier=supplier,
-                is_active=True,
-                stock_quantity__lte=cls.LOW_STOCK_THRESHOLD,
-                stock_quantity__gt=0
-            ).order_by('stock_quantity')
-            
-            critical_stock_products = low_stock_products.filter(
-                stock_quantity__lte=cls.CRITICAL_STOCK_THRESHOLD
-            )
-            
-            out_of_stock_products = SupplierProduct.objects.filter(
-                supplier=supplier,
-                is_active=True,
-                stock_quantity=0
-            )
+            if products is None:
+                products = list(SupplierProduct.objects.filter(
+                    supplier=supplier,
+                    is_active=True,
+                    stock_quantity__lte=cls.LOW_STOCK_THRESHOLD
+                ).order_by('stock_quantity'))
+
+            low_stock_products = [p for p in products if 0 < p.stock_quantity <= cls.LOW_STOCK_THRESHOLD]
+            critical_stock_products = [p for p in low_stock_products if p.stock_quantity <= cls.CRITICAL_STOCK_THRESHOLD]
+            out_of_stock_products = [p for p in products if p.stock_quantity == 0]
             
             # Only send notification if there are low stock products
-            if not (low_stock_products.exists() or out_of_stock_products.exists()):
+            if not (low_stock_products or out_of_stock_products):
                 return {
                     'notification_sent': False,
                     'low_stock_count': 0,
@@ -112,9 +126,9 @@ class StockNotificationService:
                 'out_of_stock_products': out_of_stock_products,
                 'low_stock_threshold': cls.LOW_STOCK_THRESHOLD,
                 'critical_stock_threshold': cls.CRITICAL_STOCK_THRESHOLD,
-                'total_low_stock': low_stock_products.count(),
-                'total_critical_stock': critical_stock_products.count(),
-                'total_out_of_stock': out_of_stock_products.count(),
+                'total_low_stock': len(low_stock_products),
+                'total_critical_stock': len(critical_stock_products),
+                'total_out_of_stock': len(out_of_stock_products),
                 'notification_date': timezone.now()
             }
             
@@ -145,16 +159,18 @@ class StockNotificationService:
     @classmethod
     def _send_low_stock_email(cls, supplier, notification_data):
         """
-        Send low stock email notification to supplier
+        Queue low stock email notification to supplier
         
         Args:
             supplier: Supplier instance
             notification_data: Dict containing notification details
             
         Returns:
-            bool: True if email sent successfully
+            bool: True if email was queued
         """
         try:
+            from users.email_service import queued_email_sender
+
             if not supplier.email:
                 logger.warning(f"No email address for supplier {supplier.name}")
                 return False
@@ -165,17 +181,16 @@ class StockNotificationService:
             html_content = render_to_string('emails/low_stock_notification.html', notification_data)
             text_content = render_to_string('emails/low_stock_notification.txt', notification_data)
             
-            # Send email
-            send_mail(
+            msg = EmailMultiAlternatives(
                 subject=subject,
-                message=text_content,
+                body=text_content,
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[supplier.email],
-                html_message=html_content,
-                fail_silently=False
+                to=[supplier.email]
             )
+            msg.attach_alternative(html_content, "text/html")
+            queued_email_sender.send(msg)
             
-            logger.info(f"Low stock email sent to {supplier.email}")
+            logger.info(f"Low stock email queued for {supplier.email}")
             return True
             
         except Exception as e:
@@ -208,8 +223,12 @@ class StockNotificationService:
     @classmethod
     def send_stock_update_notification(cls, supplier_product, old_quantity, new_quantity, reason=""):
         """
-        Send notification when stock is updated
+        Queue a low stock alert when a stock update crosses the threshold
         
+        Once the caller's transaction commits, alerts are debounced per product
+        for STOCK_ALERT_DEBOUNCE_SECONDS and the supplier digest is built and
+        sent by the queued sender, so the caller does no notification work itself.
+
         Args:
             supplier_product: SupplierProduct instance
             old_quantity: Previous stock quantity
@@ -221,14 +240,34 @@ class StockNotificationService:
             if (old_quantity > cls.LOW_STOCK_THRESHOLD and 
                 new_quantity <= cls.LOW_STOCK_THRESHOLD):
                 
-                # Stock just went below threshold, send immediate alert
-                cls._send_supplier_low_stock_notification(supplier_product.supplier)
+                # Debounce and queue only once the stock change commits, so a rolled
+                # back update neither sends an alert nor suppresses the next one
+                transaction.on_commit(
+                    lambda: cls._queue_supplier_alert(supplier_product.pk, supplier_product.supplier_id,
+                                                      supplier_product.product_name)
+                )
                 
             logger.info(f"Stock update notification processed for {supplier_product.product_name}: "
                        f"{old_quantity} -> {new_quantity}")
             
         except Exception as e:
             logger.error(f"Error in stock update notification: {str(e)}")
+
+    @classmethod
+    def _queue_supplier_alert(cls, supplier_product_id, supplier_id, product_name):
+        """Debounce a product's low stock alert and queue its supplier digest"""
+        window = getattr(settings, 'STOCK_ALERT_DEBOUNCE_SECONDS', 3600)
+        if cache.add(f'stock_alert:supplier_product:{supplier_product_id}', True, window):
+            from users.email_service import queued_email_sender
+            queued_email_sender.submit(cls._send_queued_supplier_alert, supplier_id)
+        else:
+            logger.debug(f"Low stock alert for {product_name} already sent in this window")
+
+    @classmethod
+    def _send_queued_supplier_alert(cls, supplier_id):
+        """Build and send a supplier's low stock digest from the queued sender"""
+        supplier = Supplier.objects.get(pk=supplier_id)
+        cls._send_supplier_low_stock_notification(supplier)
     
     @classmethod
     def get_low_stock_summary(cls, supplier=None):
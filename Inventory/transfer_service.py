@@ -0,0 +1,305 @@
+"""
+Inter-store transfer engine for EZM Trade Management.
+Reserves source stock when a transfer is approved and moves it between stores
+with locked, conditional F() updates when the transfer completes, so
+concurrent sales and transfers can never oversell a store.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from .models import Stock, StoreStockTransferRequest
+from .product_picker import product_picker_service
+
+logger = logging.getLogger(__name__)
+
+
+class StoreTransferService:
+    """
+    Approve, cancel, complete and bulk-execute stock transfers between stores.
+
+    Every method raises ValueError with a user-facing message when the
+    transfer cannot be carried out; the database is left untouched then.
+    """
+
+    def _delta(self, deltas):
+        """CASE expression adding a per-row delta, keyed by Stock pk"""
+        return Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+
+    def _apply_deltas(self, guards, quantity_deltas, reserved_deltas=None):
+        """
+        Apply quantity/reserved deltas to several Stock rows in one UPDATE.
+
+        Args:
+            guards: Q conditions (one per row) that must still hold, e.g. enough
+                available stock on the source row
+            quantity_deltas: {stock_pk: change in quantity}
+            reserved_deltas: {stock_pk: change in reserved_quantity}
+        """
+        changes = {
+            'quantity': F('quantity') + self._delta(quantity_deltas),
+            'last_updated': timezone.now(),
+        }
+        if reserved_deltas:
+            changes['reserved_quantity'] = F('reserved_quantity') + self._delta(reserved_deltas)
+
+        condition = Q()
+        for guard in guards:
+            condition |= guard
+        updated = Stock.objects.filter(condition).update(**changes)
+        if updated != len(guards):
+            raise ValueError("Stock levels changed while the transfer was being processed. Please try again.")
+
+    def _lock_stock(self, store, product_ids):
+        """Lock the store's Stock rows for the given products in primary key order"""
+        return {
+            stock.product_id: stock
+            for stock in Stock.objects.select_for_update()
+            .filter(store=store, product_id__in=product_ids)
+            .order_by('pk')
+        }
+
+    def _get_or_create_destination(self, to_store, source_stocks):
+        """Destination Stock rows for the given source rows, created at zero if missing"""
+        existing = set(
+            Stock.objects.filter(store=to_store, product_id__in=source_stocks.keys())
+            .order_by()
+            .values_list('product_id', flat=True)
+        )
+        Stock.objects.bulk_create([
+            Stock(
+                store=to_store,
+                product_id=product_id,
+                quantity=0,
+                low_stock_threshold=10,
+                selling_price=source.selling_price
+            )
+            for product_id, source in source_stocks.items()
+            if product_id not in existing
+        ], ignore_conflicts=True)
+        return self._lock_stock(to_store, source_stocks.keys())
+
+    def approve(self, transfer_request, approved_quantity, reviewed_by, review_notes=''):
+        """
+        Approve a pending transfer request and reserve the units at the source store.
+
+        Returns:
+            StoreStockTransferRequest: The approved request
+        """
+        if approved_quantity <= 0:
+            raise ValueError("Approved quantity must be greater than 0.")
+
+        with transaction.atomic():
+            transfer_request = StoreStockTransferRequest.objects.select_for_update().get(
+                pk=transfer_request.pk,
+                status='pending'
+            )
+
+            reserved = Stock.objects.filter(
+                store_id=transfer_request.from_store_id,
+                product_id=transfer_request.product_id,
+                quantity__gte=F('reserved_quantity') + approved_quantity
+            ).update(
+                reserved_quantity=F('reserved_quantity') + approved_quantity,
+                last_updated=timezone.now()
+            )
+            if not reserved:
+                source_stock = Stock.objects.filter(
+                    store_id=transfer_request.from_store_id,
+                    product_id=transfer_request.product_id
+                ).first()
+                available = source_stock.available_quantity if source_stock else 0
+                raise ValueError(f"Insufficient stock. Available: {available}, Requested: {approved_quantity}")
+
+            transfer_request.status = 'approved'
+            transfer_request.approved_quantity = approved_quantity
+            transfer_request.reserved_quantity = approved_quantity
+            transfer_request.reviewed_by = reviewed_by
+            transfer_request.reviewed_date = timezone.now()
+            transfer_request.review_notes = review_notes
+            transfer_request.save()
+
+        logger.info(f"Reserved {approved_quantity} units for transfer {transfer_request.request_number}")
+        return transfer_request
+
+    def release(self, transfer_request, cancelled_by=None, reason=''):
+        """
+        Cancel an approved request that will not be completed and give its
+        reservation back to the source store.
+
+        Returns:
+            StoreStockTransferRequest: The cancelled request
+        """
+        with transaction.atomic():
+            try:
+                transfer_request = StoreStockTransferRequest.objects.select_for_update().get(
+                    pk=transfer_request.pk,
+                    status='approved'
+                )
+            except StoreStockTransferRequest.DoesNotExist:
+                raise ValueError("Only approved transfer requests can be cancelled.")
+
+            # Stock.reserved_quantity also holds ticket reservations, so only
+            # the units recorded on this request go back
+            released = transfer_request.reserved_quantity
+            if released:
+                product_id = transfer_request.product_id
+                source = self._lock_stock(transfer_request.from_store_id, [product_id]).get(product_id)
+                if source is not None:
+                    Stock.objects.filter(pk=source.pk, reserved_quantity__gte=released).update(
+                        reserved_quantity=F('reserved_quantity') - released,
+                        last_updated=timezone.now()
+                    )
+
+            transfer_request.status = 'cancelled'
+            transfer_request.reserved_quantity = 0
+            if cancelled_by is not None:
+                transfer_request.reviewed_by = cancelled_by
+                transfer_request.reviewed_date = timezone.now()
+            if reason:
+                transfer_request.review_notes = reason
+            transfer_request.save()
+
+        logger.info(f"Transfer {transfer_request.request_number} cancelled: {released} reserved units released")
+        return transfer_request
+
+    def complete(self, transfer_request, received_quantity, completion_notes=''):
+        """
+        Move received units from the source to the destination store.
+
+        The whole approved reservation is released; only the received units
+        leave the source store.
+
+        Returns:
+            StoreStockTransferRequest: The completed request
+        """
+        if received_quantity <= 0:
+            raise ValueError("Received quantity must be greater than 0.")
+
+        with transaction.atomic():
+            transfer_request = StoreStockTransferRequest.objects.select_for_update(of=('self',)).select_related(
+                'product', 'from_store', 'to_store'
+            ).get(pk=transfer_request.pk, status='approved')
+
+            approved_quantity = transfer_request.approved_quantity
+            if received_quantity > approved_quantity:
+                raise ValueError(
+                    f"Received quantity ({received_quantity}) cannot exceed approved quantity ({approved_quantity})."
+                )
+
+            product_id = transfer_request.product_id
+            source = self._lock_stock(transfer_request.from_store, [product_id]).get(product_id)
+            if source is None:
+                raise ValueError(
+                    f"Source stock not found for {transfer_request.product.name} in {transfer_request.from_store.name}."
+                )
+            # Release only this request's own reservation; requests approved
+            # before reservations were recorded hold nothing back
+            released = transfer_request.reserved_quantity
+            if source.quantity - source.reserved_quantity + released < received_quantity:
+                raise ValueError(
+                    f"Insufficient stock in {transfer_request.from_store.name}. "
+                    f"Available: {source.quantity}, Required: {received_quantity}."
+                )
+
+            destination = self._get_or_create_destination(transfer_request.to_store, {product_id: source})[product_id]
+            self._apply_deltas(
+                [
+                    Q(
+                        pk=source.pk,
+                        reserved_quantity__gte=released,
+                        quantity__gte=F('reserved_quantity') - released + received_quantity
+                    ),
+                    Q(pk=destination.pk),
+                ],
+                {source.pk: -received_quantity, destination.pk: received_quantity},
+                {source.pk: -released}
+            )
+
+            transfer_request.status = 'completed'
+            transfer_request.reserved_quantity = 0
+            transfer_request.actual_quantity_transferred = received_quantity
+            transfer_request.received_date = timezone.now()
+            transfer_request.review_notes = completion_notes
+            transfer_request.save()
+
+        product_picker_service.invalidate()
+        logger.info(f"Transfer {transfer_request.request_number} completed: {received_quantity} units moved")
+        return transfer_request
+
+    def transfer_products(self, from_store, to_store, quantities):
+        """
+        Move several products between two stores in one locked operation.
+
+        Args:
+            from_store: Source Store
+            to_store: Destination Store
+            quantities: {product_id: quantity} to move
+
+        Returns:
+            dict: {product_id: quantity} moved
+        """
+        if from_store.pk == to_store.pk:
+            raise ValueError("Source and destination stores must be different.")
+        quantities = {int(product_id): int(quantity) for product_id, quantity in quantities.items()}
+        if not quantities or any(quantity <= 0 for quantity in quantities.values()):
+            raise ValueError("Transfer quantities must be greater than 0.")
+
+        with transaction.atomic():
+            sources = self._lock_stock(from_store, quantities.keys())
+            shortages = []
+            for product_id, quantity in quantities.items():
+                source = sources.get(product_id)
+                available = source.available_quantity if source else 0
+                if available < quantity:
+                    shortages.append(f"product {product_id} (available: {available}, requested: {quantity})")
+            if shortages:
+                raise ValueError(f"Insufficient stock in {from_store.name} for " + ', '.join(shortages))
+
+            destinations = self._get_or_create_destination(to_store, sources)
+
+            guards = []
+            deltas = {}
+            for product_id, quantity in quantities.items():
+                source = sources[product_id]
+                destination = destinations[product_id]
+                guards.append(Q(pk=source.pk, quantity__gte=F('reserved_quantity') + quantity))
+                guards.append(Q(pk=destination.pk))
+                deltas[source.pk] = -quantity
+                deltas[destination.pk] = quantity
+            self._apply_deltas(guards, deltas)
+
+        product_picker_service.invalidate()
+        logger.info(f"Transferred {len(quantities)} products from {from_store.name} to {to_store.name}")
+        return quantities
+
+    def deduct_for_sale(self, stock, quantity):
+        """
+        Take sold units out of a Stock row without touching reserved units.
+
+        Updates the instance in place.
+        """
+        updated = Stock.objects.filter(
+            pk=stock.pk,
+            quantity__gte=F('reserved_quantity') + quantity
+        ).update(quantity=F('quantity') - quantity, last_updated=timezone.now())
+        if not updated:
+            stock.refresh_from_db(fields=['quantity', 'reserved_quantity'])
+            raise ValueError(
+                f"Insufficient stock for {stock.product.name}. "
+                f"Available: {stock.available_quantity}, Requested: {quantity}"
+            )
+        stock.quantity -= quantity
+        if stock.quantity == 0:
+            product_picker_service.invalidate()
+
+
+# Global instance for easy access
+store_transfer_service = StoreTransferService()
@@ -72,7 +72,8 @@ class PurchaseOrderAccessMixin(UserPassesTestMixin):
             try:
                 # Check if the supplier user's email matches the order's supplier
                 from Inventory.models import Supplier
-                supplier = Supplier.objects.get(email=user.email)
+                from users.supplier_context import get_supplier
+                supplier = get_supplier(self.request)
                 return obj.supplier == supplier
             except Supplier.DoesNotExist:
                 return False
@@ -88,7 +89,7 @@ class ProductListView(LoginRequiredMixin, ListView):
     paginate_by = 24  # Show 24 products per page instead of 12
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('supplier')
 
         # Search functionality
         search_query = self.request.GET.get('search')
@@ -812,8 +813,9 @@ class PurchaseOrderListView(LoginRequiredMixin, StoreOwnerMixin, ListView):
         if self.request.user.role == 'supplier':
             # Get the supplier object based on the user's email
             from Inventory.models import Supplier
+            from users.supplier_context import get_supplier
             try:
-                supplier = Supplier.objects.get(email=self.request.user.email)
+                supplier = get_supplier(self.request)
                 queryset = queryset.filter(supplier=supplier)
             except Supplier.DoesNotExist:
                 # If the supplier doesn't exist, return an empty queryset
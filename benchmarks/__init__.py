@@ -0,0 +1,5 @@
+"""
+Throughput benchmarks for EZM Trade Management.
+
+Run with ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,78 @@
+"""
+Run the benchmark suite against a throwaway test database.
+
+    python -m benchmarks --scale small --iterations 30 --output bench.json
+    python -m benchmarks --compare bench.json
+
+Concurrent checkouts (--concurrency) run against whichever backend is
+configured, so run once as-is and once with DATABASE_URL set to compare
+SQLite against PostgreSQL:
+
+    python -m benchmarks --concurrency 8 --checkouts 200
+    DATABASE_URL=postgresql://... python -m benchmarks --concurrency 8 --checkouts 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    from .concurrency import run_concurrent_checkouts
+    from .data import SCALES, generate
+    from .runner import compare, format_report, load_report, run_benchmarks, save_report
+    from .scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Time core EZM workflows')
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--iterations', type=int, default=20, help='Requests per scenario')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Run only this scenario (repeatable)')
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--compare', help='Baseline JSON report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p95 slowdown (default: 0.25)')
+    parser.add_argument('--concurrency', type=int, default=0, help='Also run checkouts from this many threads at once')
+    parser.add_argument('--checkouts', type=int, default=100, help='Total concurrent checkouts (default: 100)')
+    args = parser.parse_args(argv)
+
+    if args.concurrency and connection.vendor == 'sqlite':
+        # An in-memory test database is private to one connection; threads need a real file and its locks
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmarks.sqlite3')
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        data = generate(args.scale)
+        print(f"Generated {args.scale} data set: {data['sales']} sales rows")
+        report = run_benchmarks(data, iterations=max(args.iterations, 1), names=args.scenario)
+        if args.concurrency:
+            report['concurrent_checkout'] = run_concurrent_checkouts(
+                data, workers=args.concurrency, checkouts=max(args.checkouts, 1)
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(format_report(report))
+    if args.output:
+        save_report(report, args.output)
+        print(f"Saved report to {args.output}")
+    if args.compare:
+        regressions = compare(report, load_report(args.compare), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Concurrent checkout benchmark.
+Runs POS checkouts from several cashier threads at once, each with its own
+database connection, to compare write throughput across backends: SQLite
+serializes every writer on one database lock, PostgreSQL only locks rows.
+"""
+
+import contextlib
+import io
+import logging
+import threading
+import time
+
+from django.db import connections
+from django.test.utils import override_settings
+
+from users.profiling import percentile
+from .scenarios import CompleteOrderScenario, login
+
+logger = logging.getLogger(__name__)
+
+
+class CashierCheckoutScenario(CompleteOrderScenario):
+    """POS checkout by a given cashier"""
+
+    def __init__(self, data, iterations, cashier):
+        super().__init__(data, iterations)
+        self.cashier = cashier
+
+    def setup(self):
+        self.client = login(self.cashier)
+        self.products = self.data['products']
+
+
+def run_concurrent_checkouts(data, workers=4, checkouts=40):
+    """
+    Split checkouts across worker threads and time them together.
+
+    Returns:
+        dict: workers, checkouts, completed, errors, seconds,
+        checkouts_per_second, p50_ms, p95_ms
+    """
+    cashiers = data['cashiers']
+    scenarios = []
+    for number in range(workers):
+        scenario = CashierCheckoutScenario(data, checkouts, cashiers[number % len(cashiers)])
+        scenario.setup()
+        scenarios.append(scenario)
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(number):
+        try:
+            for index in range(number, checkouts, workers):
+                started = time.perf_counter()
+                try:
+                    failed = scenarios[number].request(index).status_code >= 400
+                except Exception as e:
+                    logger.warning(f"Concurrent checkout {index} failed: {e}")
+                    failed = True
+                with lock:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if failed:
+                        errors.append(index)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(workers)]
+    # views print debugging output; keep it out of the report
+    email = override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    with email, contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+
+    completed = len(latencies) - len(errors)
+    return {
+        'workers': workers,
+        'checkouts': checkouts,
+        'completed': completed,
+        'errors': len(errors),
+        'seconds': round(seconds, 3),
+        'checkouts_per_second': round(completed / seconds, 1) if seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+    }
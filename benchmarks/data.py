@@ -0,0 +1,204 @@
+"""
+Synthetic data for the benchmark suite.
+Builds stores with staff, a product catalog with store and warehouse stock,
+and months of sales history at a chosen scale using bulk inserts.
+"""
+
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from Inventory.costing import landed_cost_service
+from Inventory.models import Product, Stock, Supplier, Warehouse, WarehouseProduct, SETTINGS_CHOICES
+from store.models import Store
+from transactions.models import FinancialRecord, Order, Receipt, Transaction
+from users.models import CustomUser
+from webfront.models import CustomerTicket, CustomerTicketItem
+
+PASSWORD = 'benchmark-pass-123'
+
+SCALES = {
+    'tiny': {'stores': 2, 'products': 20, 'months': 1, 'sales_per_day': 2, 'lines_per_sale': 2},
+    'small': {'stores': 3, 'products': 100, 'months': 3, 'sales_per_day': 10, 'lines_per_sale': 3},
+    'medium': {'stores': 5, 'products': 500, 'months': 6, 'sales_per_day': 40, 'lines_per_sale': 3},
+    'large': {'stores': 10, 'products': 2000, 'months': 12, 'sales_per_day': 120, 'lines_per_sale': 4},
+}
+
+
+def create_user(username, role, store=None):
+    return CustomUser.objects.create_user(
+        username=username,
+        email=f'{username}@benchmark.local',
+        password=PASSWORD,
+        role=role,
+        store=store,
+        is_first_login=False
+    )
+
+
+def generate(scale='small', seed=1):
+    """
+    Populate the current database for a scale.
+
+    Returns:
+        dict: stores, cashiers, managers, head_manager, supplier, products and counts
+    """
+    config = SCALES[scale]
+    rng = random.Random(seed)
+
+    head_manager = create_user('bench_head', 'head_manager')
+    supplier = Supplier.objects.create(name='Benchmark Supplier', email='supplier@benchmark.local')
+    warehouse = Warehouse.objects.create(name='Benchmark Warehouse', address='Benchmark', capacity=10 ** 9)
+
+    stores, cashiers, managers = [], [], []
+    for s in range(config['stores']):
+        manager = create_user(f'bench_manager_{s}', 'store_manager')
+        store = Store.objects.create(name=f'Benchmark Store {s}', address=f'Street {s}', store_manager=manager)
+        manager.store = store
+        manager.save(update_fields=['store'])
+        stores.append(store)
+        managers.append(manager)
+        cashiers.append(create_user(f'bench_cashier_{s}', 'cashier', store=store))
+
+    products = _create_catalog(config, rng, stores, supplier, warehouse)
+
+    sales = _generate_sales(config, rng, stores, cashiers, products)
+    return {
+        'scale': scale,
+        'config': config,
+        'stores': stores,
+        'cashiers': cashiers,
+        'managers': managers,
+        'head_manager': head_manager,
+        'supplier': supplier,
+        'warehouse': warehouse,
+        'products': products,
+        'sales': sales,
+    }
+
+
+def grow(data, seed=2):
+    """
+    Add another scale's worth of products, sales history and pending tickets
+    to generated data, so per-request query counts can be compared at two
+    row counts.
+    """
+    config = data['config']
+    rng = random.Random(seed)
+    products = _create_catalog(
+        config, rng, data['stores'], data['supplier'], data['warehouse'], offset=len(data['products'])
+    )
+    data['products'] = data['products'] + products
+    data['sales'] += _generate_sales(config, rng, data['stores'], data['cashiers'], data['products'])
+    add_tickets(data, seed)
+    return data
+
+
+def add_tickets(data, seed=1):
+    """Pending webfront tickets, sales_per_day per store"""
+    config = data['config']
+    rng = random.Random(seed)
+    products = data['products']
+    tickets = CustomerTicket.objects.bulk_create([
+        CustomerTicket(store=store, customer_phone=f'09{rng.randint(0, 10 ** 8 - 1):08d}')
+        for store in data['stores'] for _ in range(config['sales_per_day'])
+    ])
+    items = []
+    for ticket in tickets:
+        for product in rng.sample(products, config['lines_per_sale']):
+            items.append(CustomerTicketItem(
+                ticket=ticket, product=product, quantity=1, unit_price=product.price, total_price=product.price
+            ))
+    CustomerTicketItem.objects.bulk_create(items)
+
+
+def _create_catalog(config, rng, stores, supplier, warehouse, offset=0):
+    """Products with stock in every store and a warehouse listing"""
+    categories = [key for key, _ in SETTINGS_CHOICES]
+    products = Product.objects.bulk_create([
+        Product(
+            name=f'Benchmark Product {p:05d}',
+            category=categories[p % len(categories)],
+            description='Synthetic benchmark product',
+            price=Decimal(rng.randint(100, 50000)) / 100,
+            material='Steel'
+        )
+        for p in range(offset, offset + config['products'])
+    ])
+    Stock.objects.bulk_create([
+        Stock(
+            product=product,
+            store=store,
+            quantity=10 ** 6,
+            selling_price=product.price * Decimal('1.25')
+        )
+        for store in stores for product in products
+    ])
+    WarehouseProduct.objects.bulk_create([
+        WarehouseProduct(
+            product_id=f'BENCH-{product.pk}',
+            sku=f'BENCH-SKU-{product.pk}',
+            product_name=product.name,
+            category=product.category,
+            quantity_in_stock=10 ** 6,
+            unit_price=product.price,
+            supplier=supplier,
+            warehouse=warehouse
+        )
+        for product in products
+    ])
+    return products
+
+
+def _generate_sales(config, rng, stores, cashiers, products):
+    """Daily sales with receipts, order lines and revenue records; returns rows written"""
+    today = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    days = config['months'] * 30
+    rows = 0
+    # Checkout freezes the landed cost on every line; bulk_create bypasses Order.save
+    landed_costs = landed_cost_service.unit_costs([product.pk for product in products])
+    for day in range(days, 0, -1):
+        sold_at = today - timedelta(days=day)
+        for store_index, store in enumerate(stores):
+            transactions = Transaction.objects.bulk_create([
+                Transaction(transaction_type='sale', quantity=0, store=store, payment_type='cash')
+                for _ in range(config['sales_per_day'])
+            ])
+            receipts = []
+            orders = []
+            records = []
+            for transaction in transactions:
+                lines = rng.sample(products, config['lines_per_sale'])
+                total = Decimal('0')
+                for product in lines:
+                    quantity = rng.randint(1, 5)
+                    total += product.price * quantity
+                    orders.append((transaction, product, quantity))
+                transaction.quantity = sum(quantity for _, _, quantity in orders[-len(lines):])
+                transaction.total_amount = total
+                transaction.timestamp = sold_at
+                receipts.append(Receipt(transaction=transaction, total_amount=total, subtotal=total))
+                records.append(FinancialRecord(
+                    store=store, cashier=cashiers[store_index], amount=total, record_type='revenue'
+                ))
+            Transaction.objects.bulk_update(transactions, ['quantity', 'total_amount', 'timestamp'])
+            receipts = Receipt.objects.bulk_create(receipts)
+            receipt_for = {receipt.transaction_id: receipt for receipt in receipts}
+            Receipt.objects.filter(pk__in=[receipt.pk for receipt in receipts]).update(timestamp=sold_at)
+            Order.objects.bulk_create([
+                Order(
+                    receipt=receipt_for[transaction.pk],
+                    transaction=transaction,
+                    product=product,
+                    quantity=quantity,
+                    price_at_time_of_sale=product.price,
+                    unit_cost=landed_cost_service.cost_for_sale(landed_costs.get(product.pk), product.price)
+                )
+                for transaction, product, quantity in orders
+            ])
+            records = FinancialRecord.objects.bulk_create(records)
+            FinancialRecord.objects.filter(pk__in=[record.pk for record in records]).update(timestamp=sold_at)
+            rows += len(transactions) * 3 + len(orders)
+    return rows
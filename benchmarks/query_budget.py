@@ -0,0 +1,102 @@
+"""
+Query budgets for the test suite.
+Pins the major endpoints to a maximum query count (query_budgets.json) and
+guards against counts that grow with row count, the signature of an N+1 loop.
+"""
+
+import contextlib
+import io
+import json
+import os
+
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .data import PASSWORD
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), 'query_budgets.json')
+
+
+def load_budgets(path=BUDGET_FILE):
+    """
+    Endpoint budgets keyed by URL name.
+
+    Each entry has role (or null for anonymous), optional params, url (when
+    the key is not the URL name itself) and max_queries. Entries with a
+    "scales" note are known to grow with row count and are only checked to
+    still do so.
+    """
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def count_queries(func, using='default'):
+    """Number of queries func() runs"""
+    # views print debugging output; keep it out of the test log
+    with contextlib.redirect_stdout(io.StringIO()), CaptureQueriesContext(connections[using]) as captured:
+        func()
+    return len(captured.captured_queries)
+
+
+def role_clients(data):
+    """Logged-in test clients per role for generated benchmark data"""
+    users = {
+        'head_manager': data['head_manager'],
+        'store_manager': data['managers'][0],
+        'cashier': data['cashiers'][0],
+    }
+    clients = {None: Client()}
+    for role, user in users.items():
+        clients[role] = Client()
+        clients[role].login(username=user.username, password=PASSWORD)
+    return clients
+
+
+class QueryBudgetMixin:
+    """
+    TestCase assertions for query budgets.
+
+    assertMaxQueries caps one call; assertQueriesDoNotGrow runs a call before
+    and after adding rows; assertEndpointBudgets does both for every entry of
+    the budget file.
+    """
+
+    def assertMaxQueries(self, budget, func, msg=None):
+        count = count_queries(func)
+        self.assertLessEqual(count, budget, msg or f'{count} queries, budget is {budget}')
+        return count
+
+    def assertQueriesDoNotGrow(self, func, grow, msg=None):
+        before = count_queries(func)
+        grow()
+        after = count_queries(func)
+        self.assertLessEqual(after, before, msg or f'query count grew with row count: {before} -> {after}')
+        return before, after
+
+    def assertEndpointBudgets(self, clients, grow, budgets=None):
+        """
+        Request every budgeted endpoint before and after grow() and check
+        its status, its budget and that its query count stayed flat.
+        """
+        budgets = budgets if budgets is not None else load_budgets()
+
+        def fetch(name, budget):
+            response = clients[budget['role']].get(reverse(budget.get('url', name)), budget.get('params', {}))
+            self.assertEqual(response.status_code, budget.get('status', 200), name)
+
+        counts = {}
+        for name, budget in budgets.items():
+            counts[name] = count_queries(lambda: fetch(name, budget))
+        grow()
+        for name, budget in budgets.items():
+            before = counts[name]
+            after = count_queries(lambda: fetch(name, budget))
+            with self.subTest(endpoint=name, before=before, after=after):
+                if budget.get('scales'):
+                    self.assertGreater(after, before, f"{name} no longer scales with rows; pin a budget for it")
+                    continue
+                self.assertLessEqual(after, before, f'{name} query count grew with row count')
+                self.assertLessEqual(after, budget['max_queries'], f"{name} is over its budget")
+        return counts
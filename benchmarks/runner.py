@@ -0,0 +1,141 @@
+"""
+Benchmark runner: times scenarios, counts queries and compares against a
+saved JSON baseline.
+"""
+
+import contextlib
+import io
+import json
+import logging
+import platform
+import time
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from users.profiling import percentile
+from .scenarios import SCENARIOS
+
+logger = logging.getLogger(__name__)
+
+
+def run_scenario(scenario_class, data, iterations):
+    """
+    Run one scenario and summarize it.
+
+    Returns:
+        dict: requests, errors, p50_ms, p95_ms, max_ms, queries_per_request,
+        max_queries, requests_per_second, rows_per_second
+    """
+    scenario = scenario_class(data, iterations)
+    scenario.setup()
+
+    latencies, queries, errors = [], [], 0
+    for index in range(iterations):
+        # views print debugging output; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()), CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = scenario.request(index)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        if response.status_code >= 400:
+            errors += 1
+
+    total_seconds = sum(latencies) / 1000
+    return {
+        'requests': iterations,
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'max_ms': round(max(latencies), 2) if latencies else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 1) if queries else 0.0,
+        'max_queries': max(queries) if queries else 0,
+        'requests_per_second': round(iterations / total_seconds, 1) if total_seconds else 0.0,
+        'rows_per_second': round(iterations * scenario.rows_per_request / total_seconds, 1) if total_seconds else 0.0,
+    }
+
+
+def run_benchmarks(data, iterations=20, names=None):
+    """
+    Run the selected scenarios (all by default) against generated data.
+
+    Returns:
+        dict: Report with environment metadata and per-scenario results
+    """
+    names = names or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark scenarios: {', '.join(sorted(unknown))}")
+
+    report = {
+        'created_at': timezone.now().isoformat(),
+        'scale': data['scale'],
+        'config': data['config'],
+        'iterations': iterations,
+        'database': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'scenarios': {},
+    }
+    with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+        for name in names:
+            logger.info(f"Running benchmark scenario {name}")
+            report['scenarios'][name] = run_scenario(SCENARIOS[name], data, iterations)
+    return report
+
+
+def compare(report, baseline, tolerance=0.25):
+    """
+    Regressions of a report against a baseline.
+
+    A scenario regresses when its p95 latency grows by more than the
+    tolerance, it issues more queries per request, or it starts failing.
+
+    Returns:
+        list: Human readable regression descriptions
+    """
+    regressions = []
+    for name, result in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and result['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result['queries_per_request'] > previous['queries_per_request']:
+            regressions.append(
+                f"{name}: queries/request {previous['queries_per_request']} -> {result['queries_per_request']}"
+            )
+        if result['errors'] > previous['errors']:
+            regressions.append(f"{name}: errors {previous['errors']} -> {result['errors']}")
+    return regressions
+
+
+def format_report(report):
+    """Plain text table of a report"""
+    header = f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'queries':>10}{'req/s':>10}{'rows/s':>10}{'errors':>8}"
+    lines = [f"Scale {report['scale']} on {report['database']}, {report['iterations']} iterations", header]
+    for name, result in report['scenarios'].items():
+        lines.append(
+            f"{name:<24}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['queries_per_request']:>10}"
+            f"{result['requests_per_second']:>10}{result['rows_per_second']:>10}{result['errors']:>8}"
+        )
+    concurrent = report.get('concurrent_checkout')
+    if concurrent:
+        lines.append(
+            f"Concurrent checkout: {concurrent['workers']} workers, {concurrent['completed']}/{concurrent['checkouts']} "
+            f"completed, {concurrent['checkouts_per_second']} checkouts/s, p95 {concurrent['p95_ms']} ms, "
+            f"{concurrent['errors']} errors"
+        )
+    return '\n'.join(lines)
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump(report, stream, indent=2, sort_keys=True)
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
@@ -0,0 +1,243 @@
+"""
+Timed benchmark scenarios.
+Each scenario prepares its own fixtures (untimed) and then issues one request
+per iteration through Django's test client.
+"""
+
+import hashlib
+import hmac
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+
+from Inventory.models import RestockRequest
+from payments.models import ChapaTransaction
+
+from .data import PASSWORD
+
+
+def login(user):
+    client = Client()
+    client.login(username=user.username, password=PASSWORD)
+    return client
+
+
+class Scenario:
+    """
+    Base scenario.
+
+    Subclasses set name and rows_per_request and implement request(); setup()
+    runs once before timing.
+    """
+
+    name = ''
+    rows_per_request = 1
+
+    def __init__(self, data, iterations):
+        self.data = data
+        self.iterations = iterations
+
+    def setup(self):
+        pass
+
+    def request(self, index):
+        raise NotImplementedError
+
+
+class CompleteOrderScenario(Scenario):
+    """POS checkout of a three-line cart"""
+
+    name = 'pos_complete_order'
+    rows_per_request = 3
+
+    def setup(self):
+        self.client = login(self.data['cashiers'][0])
+        self.products = self.data['products']
+
+    def request(self, index):
+        items = []
+        for offset in range(self.rows_per_request):
+            product = self.products[(index * self.rows_per_request + offset) % len(self.products)]
+            items.append({
+                'product_id': product.pk,
+                'product_name': product.name,
+                'quantity': 1,
+                'price': float(product.price),
+                'subtotal': float(product.price),
+            })
+        session = self.client.session
+        session['cart'] = {'items': items}
+        session.save()
+        return self.client.post(
+            reverse('complete_order'),
+            data=json.dumps({'payment_type': 'cash', 'customer_name': 'Benchmark'}),
+            content_type='application/json'
+        )
+
+
+class CreateTicketScenario(Scenario):
+    """Webfront ticket with three lines, reserving stock"""
+
+    name = 'webfront_create_ticket'
+    rows_per_request = 3
+
+    def setup(self):
+        self.client = Client()
+        self.store = self.data['stores'][0]
+        self.products = self.data['products']
+
+    def request(self, index):
+        items = [
+            {'product_id': self.products[(index * 3 + offset) % len(self.products)].pk, 'quantity': 1}
+            for offset in range(self.rows_per_request)
+        ]
+        return self.client.post(
+            reverse('webfront:create_ticket'),
+            data=json.dumps({
+                'cart_data': {'items': items},
+                'store_id': self.store.pk,
+                'phone_number': f'09{index:08d}',
+            }),
+            content_type='application/json'
+        )
+
+
+class RestockApproveScenario(Scenario):
+    """Head manager approving pending restock requests"""
+
+    name = 'restock_approve'
+
+    def _create_requests(self, store_index=0):
+        store = self.data['stores'][store_index]
+        manager = self.data['managers'][store_index]
+        products = self.data['products']
+        return [
+            RestockRequest.objects.create(
+                store=store,
+                product=products[index % len(products)],
+                requested_quantity=5,
+                current_stock=0,
+                requested_by=manager
+            )
+            for index in range(self.iterations)
+        ]
+
+    def setup(self):
+        self.client = login(self.data['head_manager'])
+        self.requests = self._create_requests()
+
+    def request(self, index):
+        return self.client.post(
+            reverse('approve_restock_request', args=[self.requests[index].pk]),
+            data={'approved_quantity': 5}
+        )
+
+
+class RestockReceiveScenario(RestockApproveScenario):
+    """Store manager receiving approved restock shipments"""
+
+    name = 'restock_receive'
+
+    def setup(self):
+        self.client = login(self.data['managers'][0])
+        self.requests = self._create_requests()
+        for restock_request in self.requests:
+            restock_request.approve(approved_by=self.data['head_manager'], approved_quantity=5)
+
+    def request(self, index):
+        return self.client.post(
+            reverse('mark_restock_received'),
+            data={'request_id': self.requests[index].pk, 'received_quantity': 5}
+        )
+
+
+class WebhookScenario(Scenario):
+    """Signed Chapa webhooks confirming pending payments"""
+
+    name = 'chapa_webhook'
+
+    def setup(self):
+        self.client = Client()
+        user = self.data['head_manager']
+        self.transactions = ChapaTransaction.objects.bulk_create([
+            ChapaTransaction(
+                chapa_tx_ref=f'BENCH-{index:06d}',
+                amount=Decimal('100.00'),
+                description='Benchmark payment',
+                user=user,
+                supplier=self.data['supplier'],
+                customer_email=user.email,
+                customer_first_name='Bench',
+                customer_last_name='Mark'
+            )
+            for index in range(self.iterations)
+        ])
+
+    def request(self, index):
+        payload = json.dumps({'tx_ref': self.transactions[index].chapa_tx_ref, 'status': 'success'})
+        secret = getattr(settings, 'CHAPA_WEBHOOK_SECRET', '') or ''
+        signature = hmac.new(secret.encode('utf-8'), payload.encode('utf-8'), hashlib.sha256).hexdigest()
+        return self.client.post(
+            reverse('chapa_webhook'),
+            data=payload,
+            content_type='application/json',
+            HTTP_CHAPA_SIGNATURE=signature
+        )
+
+
+class PageScenario(Scenario):
+    """GET of a read-only page as a given role"""
+
+    url_name = ''
+    role = 'head_manager'
+    params = {}
+
+    def setup(self):
+        user = self.data['head_manager'] if self.role == 'head_manager' else self.data['managers'][0]
+        self.client = login(user)
+        self.url = reverse(self.url_name)
+
+    def request(self, index):
+        return self.client.get(self.url, self.params)
+
+
+class AnalyticsDashboardScenario(PageScenario):
+    name = 'analytics_dashboard'
+    url_name = 'analytics_dashboard'
+
+
+class AnalyticsApiScenario(PageScenario):
+    name = 'analytics_api'
+    url_name = 'analytics_api'
+    params = {'type': 'sales_trend', 'period': '90'}
+
+
+class FinancialReportsScenario(PageScenario):
+    name = 'financial_reports'
+    url_name = 'financial_reports'
+
+
+class StoreReportExportScenario(PageScenario):
+    name = 'store_report_export'
+    url_name = 'export_store_report'
+    role = 'store_manager'
+    params = {'period': '90'}
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        CompleteOrderScenario,
+        CreateTicketScenario,
+        RestockApproveScenario,
+        RestockReceiveScenario,
+        WebhookScenario,
+        AnalyticsDashboardScenario,
+        AnalyticsApiScenario,
+        FinancialReportsScenario,
+        StoreReportExportScenario,
+    )
+}
@@ -40,36 +40,12 @@ class ChapaClient:
         - Chapa-compatible format validation
         """
         import time
-        import random
-        import string
-        import hashlib
         from .models import ChapaTransaction
 
         max_attempts = 10
 
         for attempt in range(max_attempts):
-            # Layer 1: Nanosecond precision timestamp
-            timestamp_ns = str(int(time.time() * 1000000000))  # Nanoseconds since epoch
-
-            # Layer 2: High-entropy random component
-            random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-
-            # Layer 3: Process ID and attempt counter for additional uniqueness
-            import os
-            process_component = f"{os.getpid()}{attempt}"
-
-            # Layer 4: Hash-based component for extra entropy
-            hash_input = f"{timestamp_ns}{random_chars}{process_component}{random.random()}"
-            hash_component = hashlib.md5(hash_input.encode()).hexdigest()[:6].upper()
-
-            # Create reference: EZM-{timestamp_last_10}-{random_8}-{hash_6}
-            # Total length: 3 + 1 + 10 + 1 + 8 + 1 + 6 = 30 characters (well within limits)
-            tx_ref = f"EZM-{timestamp_ns[-10:]}-{random_chars}-{hash_component}"
-
-            # Validate format (Chapa requirements)
-            if len(tx_ref) > 50:  # Chapa limit check
-                # Fallback to shorter format if needed
-                tx_ref = f"EZM-{timestamp_ns[-8:]}-{random_chars[:6]}"
+            tx_ref = self._build_tx_ref(attempt)
 
             # Database collision check
             if not ChapaTransaction.objects.filter(chapa_tx_ref=tx_ref).exists():
@@ -86,6 +62,74 @@ class ChapaClient:
         logger.error(f"All reference generation attempts failed, using UUID fallback: {fallback_ref}")
         return fallback_ref
 
+    def generate_tx_refs(self, count):
+        """
+        Generate several unique transaction references at once
+
+        Same format as generate_tx_ref, but the database collision check for
+        the whole batch is a single query per attempt.
+
+        Args:
+            count (int): Number of references needed
+
+        Returns:
+            list: Unique transaction references
+        """
+        from .models import ChapaTransaction
+
+        refs = []
+        max_attempts = 10
+
+        for attempt in range(max_attempts):
+            missing = count - len(refs)
+            if missing <= 0:
+                break
+            candidates = {self._build_tx_ref(attempt) for _ in range(missing)} - set(refs)
+            taken = set(
+                ChapaTransaction.objects.filter(chapa_tx_ref__in=candidates)
+                .values_list('chapa_tx_ref', flat=True)
+            )
+            if taken:
+                logger.warning(f"Collision detected for {len(taken)} references, retrying... (attempt {attempt + 1})")
+            refs.extend(sorted(candidates - taken))
+
+        # Fallback: UUID references for anything still missing
+        while len(refs) < count:
+            refs.append(f"EZM-{uuid.uuid4().hex[:12].upper()}")
+
+        return refs[:count]
+
+    def _build_tx_ref(self, attempt=0):
+        """Build one candidate transaction reference (no collision check)"""
+        import time
+        import random
+        import string
+        import os
+
+        # Layer 1: Nanosecond precision timestamp
+        timestamp_ns = str(int(time.time() * 1000000000))  # Nanoseconds since epoch
+
+        # Layer 2: High-entropy random component
+        random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+
+        # Layer 3: Process ID and attempt counter for additional uniqueness
+        process_component = f"{os.getpid()}{attempt}"
+
+        # Layer 4: Hash-based component for extra entropy
+        hash_input = f"{timestamp_ns}{random_chars}{process_component}{random.random()}"
+        hash_component = hashlib.md5(hash_input.encode()).hexdigest()[:6].upper()
+
+        # Create reference: EZM-{timestamp_last_10}-{random_8}-{hash_6}
+        # Total length: 3 + 1 + 10 + 1 + 8 + 1 + 6 = 30 characters (well within limits)
+        tx_ref = f"EZM-{timestamp_ns[-10:]}-{random_chars}-{hash_component}"
+
+        # Validate format (Chapa requirements)
+        if len(tx_ref) > 50:  # Chapa limit check
+            # Fallback to shorter format if needed
+            tx_ref = f"EZM-{timestamp_ns[-8:]}-{random_chars[:6]}"
+
+        return tx_ref
+
     def _create_safe_title(self, title):
         """
         Ensure title meets Chapa's 16-character limit
@@ -103,7 +147,7 @@ class ChapaClient:
     
     def initialize_payment(self, amount, email, first_name, last_name, phone=None,
                           callback_url=None, return_url=None, description=None, tx_ref=None,
-                          customization=None, meta=None):
+                          customization=None, meta=None, timeout=None):
         """
         Initialize a payment with Chapa with comprehensive payment method support
 
@@ -119,12 +163,16 @@ class ChapaClient:
             tx_ref (str, optional): Transaction reference (auto-generated if not provided)
             customization (dict, optional): Checkout page customization
             meta (dict, optional): Additional metadata
+            timeout (float, optional): Per-request timeout in seconds
+                (defaults to CHAPA_REQUEST_TIMEOUT)
 
         Returns:
             dict: Chapa API response with checkout URL for all payment methods
         """
         if not tx_ref:
             tx_ref = self.generate_tx_ref()
+        if timeout is None:
+            timeout = getattr(settings, 'CHAPA_REQUEST_TIMEOUT', 30)
 
         # Base payload with required fields
         payload = {
@@ -174,7 +222,7 @@ class ChapaClient:
                     f"{self.base_url}/transaction/initialize",
                     headers=self._get_headers(),
                     json=payload,
-                    timeout=30
+                    timeout=timeout
                 )
 
                 response_data = response.json()
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.webhook_utils import WebhookProcessor
+
+
+class Command(BaseCommand):
+    help = 'Reprocess failed Chapa webhooks, oldest first, on a bounded pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100, help='Maximum number of webhooks to reprocess')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Parallel workers (default: settings.WEBHOOK_REPROCESS_WORKERS)'
+        )
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1:
+            raise CommandError('--limit must be at least 1')
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+
+        results = WebhookProcessor().reprocess_failed_webhooks(limit=options['limit'], workers=options['workers'])
+
+        for error in results['errors']:
+            self.stdout.write(self.style.WARNING(error))
+        self.stdout.write(self.style.SUCCESS(
+            f"Reprocessed {results['processed']} webhooks, {results['failed']} still failing"
+        ))
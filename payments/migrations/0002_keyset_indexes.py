@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0017_productcost'),
+        ('payments', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chapatransaction',
+            index=models.Index(fields=['created_at', 'id'], name='payments_ch_created_854189_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chapatransaction',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='payments_ch_status_50228c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chapatransaction',
+            index=models.Index(fields=['supplier', 'created_at', 'id'], name='payments_ch_supplie_31839a_idx'),
+        ),
+    ]
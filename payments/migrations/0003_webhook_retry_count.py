@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentwebhooklog',
+            name='retry_count',
+            field=models.PositiveIntegerField(default=0, help_text='Times this webhook was reprocessed'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from Inventory.models import Supplier
+from users.retention import ArchiveAwareManager
 import uuid
 
 User = get_user_model()
@@ -56,10 +57,21 @@ class ChapaTransaction(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['user', 'status']),
             models.Index(fields=['supplier', 'status']),
+            # Payment history cursor ordering, alone and behind its filters
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['status', 'created_at', 'id']),
+            models.Index(fields=['supplier', 'created_at', 'id']),
         ]
     
     def __str__(self):
         return f"Transaction {self.chapa_tx_ref} - {self.amount} ETB - {self.status}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        # Payment totals feed the cached dashboard KPIs
+        from users.dashboard_service import dashboard_kpi_service
+        dashboard_kpi_service.invalidate()
     
     @property
     def is_successful(self):
@@ -168,6 +180,11 @@ class PurchaseOrderPayment(models.Model):
 
         self.save()
 
+        # Receipt and invoice can no longer change, render them ahead of download
+        if self.chapa_transaction.is_successful:
+            from .receipt_service import receipt_service
+            receipt_service.schedule_prerender(self.chapa_transaction_id)
+
     def process_stock_deduction(self):
         """
         Process stock deduction for all items in the order.
@@ -348,6 +365,7 @@ class PaymentWebhookLog(models.Model):
     # Processing status
     processed = models.BooleanField(default=False)
     processing_error = models.TextField(blank=True, null=True)
+    retry_count = models.PositiveIntegerField(default=0, help_text="Times this webhook was reprocessed")
     
     # Related transaction (if found)
     transaction = models.ForeignKey(
@@ -362,6 +380,9 @@ class PaymentWebhookLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     processed_at = models.DateTimeField(blank=True, null=True)
     
+    # Live rows; .archived() and .history() also read the retention archives
+    objects = ArchiveAwareManager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
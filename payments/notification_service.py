@@ -3,8 +3,12 @@ Supplier notification service for payment-related events
 """
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
+from django.db.models import QuerySet
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
@@ -33,47 +37,7 @@ class SupplierNotificationService:
         """
         try:
             supplier = transaction.supplier
-            user = transaction.user
-            
-            # Prepare context for email template
-            context = {
-                'supplier': supplier,
-                'customer': user,
-                'transaction': transaction,
-                'order_payment': order_payment,
-                'company_name': self.company_name,
-                'payment_amount': transaction.amount,
-                'currency': transaction.currency,
-                'transaction_ref': transaction.chapa_tx_ref,
-                'payment_date': transaction.paid_at or transaction.created_at,
-                'order_items': order_payment.order_items if order_payment else [],
-                'estimated_delivery': self._calculate_estimated_delivery(),
-            }
-            
-            # Render email templates
-            subject = f"Payment Confirmed - Order from {user.get_full_name() or user.username}"
-            
-            # HTML email
-            html_content = render_to_string(
-                'payments/emails/supplier_payment_confirmation.html',
-                context
-            )
-            
-            # Plain text email
-            text_content = render_to_string(
-                'payments/emails/supplier_payment_confirmation.txt',
-                context
-            )
-            
-            # Send email
-            msg = EmailMultiAlternatives(
-                subject=subject,
-                body=text_content,
-                from_email=self.from_email,
-                to=[supplier.email],
-                cc=[user.email] if user.email else []
-            )
-            msg.attach_alternative(html_content, "text/html")
+            msg = self._build_payment_confirmation_message(transaction, order_payment)
             msg.send()
             
             logger.info(f"Payment confirmation email sent to supplier {supplier.name} ({supplier.email})")
@@ -82,6 +46,58 @@ class SupplierNotificationService:
         except Exception as e:
             logger.error(f"Failed to send payment confirmation email to supplier {supplier.name}: {str(e)}")
             return False
+
+    def _build_payment_confirmation_message(self, transaction, order_payment=None, connection=None):
+        """
+        Render the payment confirmation email without sending it.
+
+        Only touches attributes of the transaction, its user/supplier and the
+        order payment, so it is safe to call from worker threads once those
+        relations have been loaded.
+        """
+        supplier = transaction.supplier
+        user = transaction.user
+
+        # Prepare context for email template
+        context = {
+            'supplier': supplier,
+            'customer': user,
+            'transaction': transaction,
+            'order_payment': order_payment,
+            'company_name': self.company_name,
+            'payment_amount': transaction.amount,
+            'currency': transaction.currency,
+            'transaction_ref': transaction.chapa_tx_ref,
+            'payment_date': transaction.paid_at or transaction.created_at,
+            'order_items': order_payment.order_items if order_payment else [],
+            'estimated_delivery': self._calculate_estimated_delivery(),
+        }
+
+        # Render email templates
+        subject = f"Payment Confirmed - Order from {user.get_full_name() or user.username}"
+
+        # HTML email
+        html_content = render_to_string(
+            'payments/emails/supplier_payment_confirmation.html',
+            context
+        )
+
+        # Plain text email
+        text_content = render_to_string(
+            'payments/emails/supplier_payment_confirmation.txt',
+            context
+        )
+
+        msg = EmailMultiAlternatives(
+            subject=subject,
+            body=text_content,
+            from_email=self.from_email,
+            to=[supplier.email],
+            cc=[user.email] if user.email else [],
+            connection=connection
+        )
+        msg.attach_alternative(html_content, "text/html")
+        return msg
     
     def send_purchase_order_notification(self, purchase_order):
         """
@@ -228,39 +244,149 @@ class SupplierNotificationService:
         # For now, return empty list - this should be customized based on your model structure
         return []
     
-    def send_bulk_notification(self, transactions, notification_type='payment_confirmation'):
+    def send_bulk_notification(self, transactions, notification_type='payment_confirmation', max_workers=None):
         """
         Send bulk notifications for multiple transactions
         
+        Related users, suppliers and order payments are loaded in a single
+        query, messages are rendered in a thread pool and all of them are
+        delivered over one email backend connection.
+
         Args:
-            transactions: List of ChapaTransaction instances
+            transactions: ChapaTransaction instances, a queryset or their ids
             notification_type: Type of notification to send
+            max_workers: Size of the rendering thread pool (defaults to
+                PAYMENT_NOTIFICATION_BULK_WORKERS setting)
+
+        Returns:
+            dict with 'sent'/'failed'/'skipped' counts, 'errors', per-item
+            'results' in input order, 'elapsed_seconds' and 'per_second' throughput
         """
+        started = time.monotonic()
         results = {
             'sent': 0,
             'failed': 0,
-            'errors': []
+            'skipped': 0,
+            'errors': [],
+            'results': [],
+            'elapsed_seconds': 0.0,
+            'per_second': 0.0,
         }
-        
-        for transaction in transactions:
-            try:
-                if notification_type == 'payment_confirmation':
-                    success = self.send_payment_confirmation_notification(transaction)
-                elif notification_type == 'status_change':
+
+        transactions = self._prefetch_bulk_transactions(transactions)
+        # One slot per transaction, so per-item results keep the caller's order
+        results['results'] = [None] * len(transactions)
+
+        if notification_type != 'payment_confirmation':
+            for index, transaction in enumerate(transactions):
+                if notification_type == 'status_change':
                     # This would need additional parameters for status change
-                    success = True  # Placeholder
+                    results['skipped'] += 1
+                    results['results'][index] = {'transaction_ref': transaction.chapa_tx_ref, 'status': 'skipped'}
                 else:
-                    success = False
-                
-                if success:
+                    self._record_bulk_failure(
+                        results, index, transaction, f"Unknown notification type: {notification_type}"
+                    )
+            return self._finish_bulk_results(results, started)
+
+        if not transactions:
+            return self._finish_bulk_results(results, started)
+
+        if max_workers is None:
+            max_workers = getattr(settings, 'PAYMENT_NOTIFICATION_BULK_WORKERS', 4)
+
+        def render(transaction):
+            return self._build_payment_confirmation_message(
+                transaction, self._get_order_payment(transaction)
+            )
+
+        # Render concurrently, collecting futures in input order
+        rendered = []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(transactions)))) as executor:
+            futures = [executor.submit(render, transaction) for transaction in transactions]
+            for index, (transaction, future) in enumerate(zip(transactions, futures)):
+                try:
+                    rendered.append((index, transaction, future.result()))
+                except Exception as e:
+                    rendered.append((index, transaction, None))
+                    self._record_bulk_failure(results, index, transaction, f"Render failed: {str(e)}")
+
+        # Deliver everything over a single backend connection
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for index, transaction, msg in rendered:
+                if msg is None:
+                    continue
+                try:
+                    msg.connection = connection
+                    connection.send_messages([msg])
                     results['sent'] += 1
-                else:
-                    results['failed'] += 1
-                    
-            except Exception as e:
-                results['failed'] += 1
-                results['errors'].append(f"Transaction {transaction.chapa_tx_ref}: {str(e)}")
-        
+                    results['results'][index] = {'transaction_ref': transaction.chapa_tx_ref, 'status': 'sent'}
+                except Exception as e:
+                    self._record_bulk_failure(results, index, transaction, str(e))
+        except Exception as e:
+            logger.error(f"Failed to open email connection for bulk notification: {str(e)}")
+            for index, transaction, msg in rendered:
+                if msg is not None and results['results'][index] is None:
+                    self._record_bulk_failure(results, index, transaction, f"Connection failed: {str(e)}")
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+        results = self._finish_bulk_results(results, started)
+        logger.info(
+            f"Bulk payment confirmation: {results['sent']} sent, {results['failed']} failed "
+            f"in {results['elapsed_seconds']:.2f}s ({results['per_second']:.1f}/s)"
+        )
+        return results
+
+    def _prefetch_bulk_transactions(self, transactions):
+        """
+        Reload transactions with user, supplier and order payment in one query,
+        preserving the caller's order
+        """
+        from .models import ChapaTransaction
+
+        if isinstance(transactions, QuerySet):
+            queryset = transactions
+        else:
+            transactions = list(transactions)
+            if not transactions:
+                return []
+            ids = [getattr(transaction, 'pk', transaction) for transaction in transactions]
+            queryset = ChapaTransaction.objects.filter(pk__in=ids)
+
+        loaded = list(queryset.select_related('user', 'supplier', 'purchase_order_payment'))
+        if isinstance(transactions, QuerySet):
+            return loaded
+
+        by_id = {transaction.pk: transaction for transaction in loaded}
+        return [by_id[pk] for pk in ids if pk in by_id]
+
+    def _get_order_payment(self, transaction):
+        """Return the prefetched PurchaseOrderPayment for a transaction, if any"""
+        try:
+            return transaction.purchase_order_payment
+        except ObjectDoesNotExist:
+            return None
+
+    def _record_bulk_failure(self, results, index, transaction, error):
+        results['failed'] += 1
+        results['errors'].append(f"Transaction {transaction.chapa_tx_ref}: {error}")
+        results['results'][index] = {
+            'transaction_ref': transaction.chapa_tx_ref,
+            'status': 'failed',
+            'error': error,
+        }
+
+    def _finish_bulk_results(self, results, started):
+        elapsed = time.monotonic() - started
+        results['elapsed_seconds'] = elapsed
+        processed = results['sent'] + results['failed']
+        results['per_second'] = processed / elapsed if elapsed > 0 else float(processed)
         return results
 
     def send_delivery_confirmation_notification(self, delivery_confirmation):
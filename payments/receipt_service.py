@@ -4,8 +4,12 @@ Payment receipt generation service for suppliers
 
 import io
 import logging
+import os
+import tempfile
+import threading
 from datetime import datetime
-from django.http import HttpResponse
+from functools import lru_cache
+from django.http import HttpResponse, FileResponse
 from django.template.loader import render_to_string
 from django.conf import settings
 from reportlab.lib.pagesizes import letter, A4
@@ -17,6 +21,119 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 
 logger = logging.getLogger(__name__)
 
+# Statuses whose documents can no longer change and are therefore cached
+FINAL_TRANSACTION_STATUSES = ('success',)
+FINAL_ORDER_PAYMENT_STATUSES = ('payment_confirmed', 'in_transit', 'delivered')
+
+
+@lru_cache(maxsize=1)
+def get_receipt_styles():
+    """
+    Build the ReportLab paragraph and table styles once per process
+    """
+    styles = getSampleStyleSheet()
+    info_table_commands = [
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ]
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#0B0C10')
+        ),
+        'header': ParagraphStyle(
+            'CustomHeader',
+            parent=styles['Heading2'],
+            fontSize=16,
+            spaceAfter=12,
+            textColor=colors.HexColor('#1F2833')
+        ),
+        'total': ParagraphStyle(
+            'TotalStyle',
+            parent=styles['Normal'],
+            fontSize=18,
+            alignment=TA_RIGHT,
+            textColor=colors.HexColor('#45A29E'),
+            fontName='Helvetica-Bold'
+        ),
+        'footer': ParagraphStyle(
+            'FooterStyle',
+            parent=styles['Normal'],
+            fontSize=10,
+            alignment=TA_CENTER,
+            textColor=colors.grey
+        ),
+        'info_table': TableStyle(info_table_commands),
+        'payment_table': TableStyle(info_table_commands + [
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f8f9fa')),
+        ]),
+        'items_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f8f9fa')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+    }
+
+
+class ReceiptArtifactStore:
+    """
+    Immutable on-disk store for generated receipt and invoice PDFs
+
+    Artifacts are keyed by document kind, object id and status, so a document
+    is rendered at most once per status and never rewritten afterwards.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        return str(self._root or getattr(
+            settings, 'RECEIPT_ARTIFACT_DIR', os.path.join(settings.BASE_DIR, 'media', 'receipts')
+        ))
+
+    def path_for(self, kind, object_id, status):
+        return os.path.join(self.root, kind, f"{object_id}_{status}.pdf")
+
+    def get(self, kind, object_id, status):
+        """Return the artifact path if it has already been generated"""
+        path = self.path_for(kind, object_id, status)
+        return path if os.path.exists(path) else None
+
+    def put(self, kind, object_id, status, content):
+        """Atomically write an artifact and return its path"""
+        path = self.path_for(kind, object_id, status)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def get_or_create(self, kind, object_id, status, render):
+        """Return the artifact path, rendering it with render() on a miss"""
+        path = self.get(kind, object_id, status)
+        if path:
+            return path
+        return self.put(kind, object_id, status, render())
+
 
 class PaymentReceiptService:
     """
@@ -28,11 +145,15 @@ class PaymentReceiptService:
         self.company_address = "Addis Ababa, Ethiopia"
         self.company_phone = "+251-11-XXX-XXXX"
         self.company_email = "info@ezmtrade.com"
+        self.artifact_store = ReceiptArtifactStore()
     
     def generate_payment_receipt_pdf(self, transaction):
         """
         Generate a PDF receipt for a Chapa transaction
         
+        Receipts for completed payments are served from the artifact store
+        and only rendered on the first download.
+
         Args:
             transaction: ChapaTransaction instance
             
@@ -40,182 +161,141 @@ class PaymentReceiptService:
             HttpResponse with PDF content
         """
         try:
-            # Create PDF buffer
-            buffer = io.BytesIO()
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=18
-            )
-            
-            # Build PDF content
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                spaceAfter=30,
-                alignment=TA_CENTER,
-                textColor=colors.HexColor('#0B0C10')
-            )
-            
-            header_style = ParagraphStyle(
-                'CustomHeader',
-                parent=styles['Heading2'],
-                fontSize=16,
-                spaceAfter=12,
-                textColor=colors.HexColor('#1F2833')
-            )
-            
-            # Company header
-            story.append(Paragraph(self.company_name, title_style))
-            story.append(Paragraph("Payment Receipt", header_style))
-            story.append(Spacer(1, 20))
-            
-            # Receipt information
-            receipt_data = [
-                ['Receipt Number:', transaction.chapa_tx_ref],
-                ['Date:', transaction.paid_at.strftime('%B %d, %Y %H:%M') if transaction.paid_at else transaction.created_at.strftime('%B %d, %Y %H:%M')],
-                ['Status:', transaction.get_status_display()],
-                ['Payment Method:', 'Chapa Payment Gateway'],
-            ]
-            
-            receipt_table = Table(receipt_data, colWidths=[2*inch, 3*inch])
-            receipt_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ]))
-            
-            story.append(receipt_table)
-            story.append(Spacer(1, 20))
-            
-            # Customer information
-            story.append(Paragraph("Customer Information", header_style))
-            
-            customer_data = [
-                ['Name:', f"{transaction.customer_first_name} {transaction.customer_last_name}"],
-                ['Email:', transaction.customer_email],
-                ['Phone:', transaction.customer_phone or 'N/A'],
-                ['Role:', 'Head Manager'],
-            ]
-            
-            customer_table = Table(customer_data, colWidths=[2*inch, 3*inch])
-            customer_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ]))
-            
-            story.append(customer_table)
-            story.append(Spacer(1, 20))
-            
-            # Supplier information
-            story.append(Paragraph("Supplier Information", header_style))
-            
-            supplier_data = [
-                ['Supplier:', transaction.supplier.name],
-                ['Contact Person:', transaction.supplier.contact_person or 'N/A'],
-                ['Email:', transaction.supplier.email],
-                ['Phone:', transaction.supplier.phone or 'N/A'],
-            ]
-            
-            supplier_table = Table(supplier_data, colWidths=[2*inch, 3*inch])
-            supplier_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ]))
-            
-            story.append(supplier_table)
-            story.append(Spacer(1, 20))
-            
-            # Payment details
-            story.append(Paragraph("Payment Details", header_style))
-            
-            payment_data = [
-                ['Description:', transaction.description],
-                ['Amount:', f"ETB {transaction.amount:,.2f}"],
-                ['Currency:', transaction.currency],
-                ['Payment Gateway:', 'Chapa'],
-            ]
-            
-            payment_table = Table(payment_data, colWidths=[2*inch, 3*inch])
-            payment_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#f8f9fa')),
-            ]))
-            
-            story.append(payment_table)
-            story.append(Spacer(1, 30))
-            
-            # Total amount (highlighted)
-            total_style = ParagraphStyle(
-                'TotalStyle',
-                parent=styles['Normal'],
-                fontSize=18,
-                alignment=TA_RIGHT,
-                textColor=colors.HexColor('#45A29E'),
-                fontName='Helvetica-Bold'
-            )
-            
-            story.append(Paragraph(f"Total Amount: ETB {transaction.amount:,.2f}", total_style))
-            story.append(Spacer(1, 30))
-            
-            # Footer
-            footer_style = ParagraphStyle(
-                'FooterStyle',
-                parent=styles['Normal'],
-                fontSize=10,
-                alignment=TA_CENTER,
-                textColor=colors.grey
-            )
-            
-            story.append(Paragraph("Thank you for your business!", footer_style))
-            story.append(Spacer(1, 10))
-            story.append(Paragraph(f"{self.company_name} | {self.company_address}", footer_style))
-            story.append(Paragraph(f"Phone: {self.company_phone} | Email: {self.company_email}", footer_style))
-            
-            # Build PDF
-            doc.build(story)
-            
-            # Get PDF content
-            pdf_content = buffer.getvalue()
-            buffer.close()
-            
+            filename = f"receipt_{transaction.chapa_tx_ref}.pdf"
+
+            if transaction.status in FINAL_TRANSACTION_STATUSES:
+                path = self.artifact_store.get_or_create(
+                    'receipts', transaction.id, transaction.status,
+                    lambda: self.render_payment_receipt(transaction)
+                )
+                return FileResponse(open(path, 'rb'), as_attachment=True,
+                                    filename=filename, content_type='application/pdf')
+
             # Create HTTP response
             response = HttpResponse(content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="receipt_{transaction.chapa_tx_ref}.pdf"'
-            response.write(pdf_content)
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            response.write(self.render_payment_receipt(transaction))
             
             return response
             
         except Exception as e:
             logger.error(f"Failed to generate PDF receipt for transaction {transaction.chapa_tx_ref}: {str(e)}")
             raise
+
+    def render_payment_receipt(self, transaction):
+        """
+        Render the PDF receipt for a Chapa transaction
+
+        Returns:
+            PDF content as bytes
+        """
+        # Create PDF buffer
+        buffer = io.BytesIO()
+
+        # Create PDF document
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18
+        )
+
+        # Build PDF content
+        story = []
+        styles = get_receipt_styles()
+        header_style = styles['header']
+
+        # Company header
+        story.append(Paragraph(self.company_name, styles['title']))
+        story.append(Paragraph("Payment Receipt", header_style))
+        story.append(Spacer(1, 20))
+
+        # Receipt information
+        receipt_data = [
+            ['Receipt Number:', transaction.chapa_tx_ref],
+            ['Date:', transaction.paid_at.strftime('%B %d, %Y %H:%M') if transaction.paid_at else transaction.created_at.strftime('%B %d, %Y %H:%M')],
+            ['Status:', transaction.get_status_display()],
+            ['Payment Method:', 'Chapa Payment Gateway'],
+        ]
+
+        receipt_table = Table(receipt_data, colWidths=[2*inch, 3*inch])
+        receipt_table.setStyle(styles['info_table'])
+
+        story.append(receipt_table)
+        story.append(Spacer(1, 20))
+
+        # Customer information
+        story.append(Paragraph("Customer Information", header_style))
+
+        customer_data = [
+            ['Name:', f"{transaction.customer_first_name} {transaction.customer_last_name}"],
+            ['Email:', transaction.customer_email],
+            ['Phone:', transaction.customer_phone or 'N/A'],
+            ['Role:', 'Head Manager'],
+        ]
+
+        customer_table = Table(customer_data, colWidths=[2*inch, 3*inch])
+        customer_table.setStyle(styles['info_table'])
+
+        story.append(customer_table)
+        story.append(Spacer(1, 20))
+
+        # Supplier information
+        story.append(Paragraph("Supplier Information", header_style))
+
+        supplier_data = [
+            ['Supplier:', transaction.supplier.name],
+            ['Contact Person:', transaction.supplier.contact_person or 'N/A'],
+            ['Email:', transaction.supplier.email],
+            ['Phone:', transaction.supplier.phone or 'N/A'],
+        ]
+
+        supplier_table = Table(supplier_data, colWidths=[2*inch, 3*inch])
+        supplier_table.setStyle(styles['info_table'])
+
+        story.append(supplier_table)
+        story.append(Spacer(1, 20))
+
+        # Payment details
+        story.append(Paragraph("Payment Details", header_style))
+
+        payment_data = [
+            ['Description:', transaction.description],
+            ['Amount:', f"ETB {transaction.amount:,.2f}"],
+            ['Currency:', transaction.currency],
+            ['Payment Gateway:', 'Chapa'],
+        ]
+
+        payment_table = Table(payment_data, colWidths=[2*inch, 3*inch])
+        payment_table.setStyle(styles['payment_table'])
+
+        story.append(payment_table)
+        story.append(Spacer(1, 30))
+
+        # Total amount (highlighted)
+        story.append(Paragraph(f"Total Amount: ETB {transaction.amount:,.2f}", styles['total']))
+        story.append(Spacer(1, 30))
+
+        # Footer
+        self._append_footer(story, styles)
+
+        # Build PDF
+        doc.build(story)
+
+        # Get PDF content
+        pdf_content = buffer.getvalue()
+        buffer.close()
+        return pdf_content
     
     def generate_purchase_order_invoice_pdf(self, order_payment):
         """
         Generate a PDF invoice for a purchase order payment
         
+        Invoices for confirmed orders are served from the artifact store and
+        only rendered once per order status.
+
         Args:
             order_payment: PurchaseOrderPayment instance
             
@@ -223,134 +303,20 @@ class PaymentReceiptService:
             HttpResponse with PDF content
         """
         try:
-            # Create PDF buffer
-            buffer = io.BytesIO()
-            
-            # Create PDF document
-            doc = SimpleDocTemplate(
-                buffer,
-                pagesize=A4,
-                rightMargin=72,
-                leftMargin=72,
-                topMargin=72,
-                bottomMargin=18
-            )
-            
-            # Build PDF content
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                spaceAfter=30,
-                alignment=TA_CENTER,
-                textColor=colors.HexColor('#0B0C10')
-            )
-            
-            header_style = ParagraphStyle(
-                'CustomHeader',
-                parent=styles['Heading2'],
-                fontSize=16,
-                spaceAfter=12,
-                textColor=colors.HexColor('#1F2833')
-            )
-            
-            # Company header
-            story.append(Paragraph(self.company_name, title_style))
-            story.append(Paragraph("Purchase Order Invoice", header_style))
-            story.append(Spacer(1, 20))
-            
-            # Invoice information
-            invoice_data = [
-                ['Invoice Number:', str(order_payment.id)[:8]],
-                ['Order Date:', order_payment.created_at.strftime('%B %d, %Y')],
-                ['Payment Confirmed:', order_payment.payment_confirmed_at.strftime('%B %d, %Y %H:%M') if order_payment.payment_confirmed_at else 'Pending'],
-                ['Status:', order_payment.get_status_display()],
-            ]
-            
-            invoice_table = Table(invoice_data, colWidths=[2*inch, 3*inch])
-            invoice_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ]))
-            
-            story.append(invoice_table)
-            story.append(Spacer(1, 20))
-            
-            # Order items
-            if order_payment.order_items:
-                story.append(Paragraph("Order Items", header_style))
-                
-                # Create items table
-                items_data = [['Item', 'Quantity', 'Unit Price', 'Total']]
-                
-                for item in order_payment.order_items:
-                    items_data.append([
-                        item.get('product_name', 'N/A'),
-                        str(item.get('quantity', 0)),
-                        f"ETB {item.get('price', 0):,.2f}",
-                        f"ETB {item.get('total_price', 0):,.2f}"
-                    ])
-                
-                items_table = Table(items_data, colWidths=[2.5*inch, 1*inch, 1.5*inch, 1.5*inch])
-                items_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f8f9fa')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                story.append(items_table)
-                story.append(Spacer(1, 20))
-            
-            # Total amount
-            total_style = ParagraphStyle(
-                'TotalStyle',
-                parent=styles['Normal'],
-                fontSize=18,
-                alignment=TA_RIGHT,
-                textColor=colors.HexColor('#45A29E'),
-                fontName='Helvetica-Bold'
-            )
-            
-            story.append(Paragraph(f"Total Amount: ETB {order_payment.total_amount:,.2f}", total_style))
-            story.append(Spacer(1, 30))
-            
-            # Footer
-            footer_style = ParagraphStyle(
-                'FooterStyle',
-                parent=styles['Normal'],
-                fontSize=10,
-                alignment=TA_CENTER,
-                textColor=colors.grey
-            )
-            
-            story.append(Paragraph("Thank you for your business!", footer_style))
-            story.append(Spacer(1, 10))
-            story.append(Paragraph(f"{self.company_name} | {self.company_address}", footer_style))
-            story.append(Paragraph(f"Phone: {self.company_phone} | Email: {self.company_email}", footer_style))
-            
-            # Build PDF
-            doc.build(story)
-            
-            # Get PDF content
-            pdf_content = buffer.getvalue()
-            buffer.close()
-            
+            filename = f"invoice_{order_payment.id}.pdf"
+
+            if order_payment.status in FINAL_ORDER_PAYMENT_STATUSES:
+                path = self.artifact_store.get_or_create(
+                    'invoices', order_payment.id, order_payment.status,
+                    lambda: self.render_purchase_order_invoice(order_payment)
+                )
+                return FileResponse(open(path, 'rb'), as_attachment=True,
+                                    filename=filename, content_type='application/pdf')
+
             # Create HTTP response
             response = HttpResponse(content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="invoice_{order_payment.id}.pdf"'
-            response.write(pdf_content)
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            response.write(self.render_purchase_order_invoice(order_payment))
             
             return response
             
@@ -358,6 +324,137 @@ class PaymentReceiptService:
             logger.error(f"Failed to generate PDF invoice for order payment {order_payment.id}: {str(e)}")
             raise
 
+    def render_purchase_order_invoice(self, order_payment):
+        """
+        Render the PDF invoice for a purchase order payment
+
+        Returns:
+            PDF content as bytes
+        """
+        # Create PDF buffer
+        buffer = io.BytesIO()
+
+        # Create PDF document
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=72,
+            leftMargin=72,
+            topMargin=72,
+            bottomMargin=18
+        )
+
+        # Build PDF content
+        story = []
+        styles = get_receipt_styles()
+        header_style = styles['header']
+
+        # Company header
+        story.append(Paragraph(self.company_name, styles['title']))
+        story.append(Paragraph("Purchase Order Invoice", header_style))
+        story.append(Spacer(1, 20))
+
+        # Invoice information
+        invoice_data = [
+            ['Invoice Number:', str(order_payment.id)[:8]],
+            ['Order Date:', order_payment.created_at.strftime('%B %d, %Y')],
+            ['Payment Confirmed:', order_payment.payment_confirmed_at.strftime('%B %d, %Y %H:%M') if order_payment.payment_confirmed_at else 'Pending'],
+            ['Status:', order_payment.get_status_display()],
+        ]
+
+        invoice_table = Table(invoice_data, colWidths=[2*inch, 3*inch])
+        invoice_table.setStyle(styles['info_table'])
+
+        story.append(invoice_table)
+        story.append(Spacer(1, 20))
+
+        # Order items
+        if order_payment.order_items:
+            story.append(Paragraph("Order Items", header_style))
+
+            # Create items table
+            items_data = [['Item', 'Quantity', 'Unit Price', 'Total']]
+
+            for item in order_payment.order_items:
+                items_data.append([
+                    item.get('product_name', 'N/A'),
+                    str(item.get('quantity', 0)),
+                    f"ETB {item.get('price', 0):,.2f}",
+                    f"ETB {item.get('total_price', 0):,.2f}"
+                ])
+
+            items_table = Table(items_data, colWidths=[2.5*inch, 1*inch, 1.5*inch, 1.5*inch])
+            items_table.setStyle(styles['items_table'])
+
+            story.append(items_table)
+            story.append(Spacer(1, 20))
+
+        # Total amount
+        story.append(Paragraph(f"Total Amount: ETB {order_payment.total_amount:,.2f}", styles['total']))
+        story.append(Spacer(1, 30))
+
+        # Footer
+        self._append_footer(story, styles)
+
+        # Build PDF
+        doc.build(story)
+
+        # Get PDF content
+        pdf_content = buffer.getvalue()
+        buffer.close()
+        return pdf_content
+
+    def _append_footer(self, story, styles):
+        footer_style = styles['footer']
+        story.append(Paragraph("Thank you for your business!", footer_style))
+        story.append(Spacer(1, 10))
+        story.append(Paragraph(f"{self.company_name} | {self.company_address}", footer_style))
+        story.append(Paragraph(f"Phone: {self.company_phone} | Email: {self.company_email}", footer_style))
+
+    def prerender_payment_artifacts(self, transaction_id):
+        """
+        Render and store the receipt and invoice for a completed payment
+        """
+        from .models import ChapaTransaction
+
+        transaction = ChapaTransaction.objects.select_related(
+            'supplier', 'purchase_order_payment'
+        ).get(pk=transaction_id)
+
+        if transaction.status in FINAL_TRANSACTION_STATUSES:
+            self.artifact_store.get_or_create(
+                'receipts', transaction.id, transaction.status,
+                lambda: self.render_payment_receipt(transaction)
+            )
+
+        order_payment = getattr(transaction, 'purchase_order_payment', None)
+        if order_payment and order_payment.status in FINAL_ORDER_PAYMENT_STATUSES:
+            self.artifact_store.get_or_create(
+                'invoices', order_payment.id, order_payment.status,
+                lambda: self.render_purchase_order_invoice(order_payment)
+            )
+
+    def schedule_prerender(self, transaction_id):
+        """
+        Pre-render payment artifacts in a background thread once the current
+        database transaction commits
+        """
+        from django.db import transaction as db_transaction
+
+        def run():
+            from django.db import connection
+            try:
+                self.prerender_payment_artifacts(transaction_id)
+            except Exception as e:
+                logger.error(f"Failed to pre-render receipt artifacts for transaction {transaction_id}: {str(e)}")
+            finally:
+                # close_old_connections() keeps the connection open while CONN_MAX_AGE > 0
+                connection.close()
+
+        db_transaction.on_commit(
+            lambda: threading.Thread(target=run, name='receipt-prerender', daemon=True).start()
+        )
+
 
 # Global instance for easy access
 receipt_service = PaymentReceiptService()
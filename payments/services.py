@@ -1,5 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor, wait
 from decimal import Decimal
 from django.conf import settings
+from django.db import OperationalError, ProgrammingError, transaction as db_transaction
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.urls import reverse
@@ -61,233 +63,323 @@ class ChapaPaymentService:
             dict: Payment creation result
         """
         try:
-            # Calculate total amount for this supplier
-            total_amount = sum(
-                Decimal(str(item['price'])) * item['quantity'] 
-                for item in cart_items
+            prepared = self._prepare_supplier_payment(
+                user, supplier, cart_items, self.client.generate_tx_ref(), request
             )
-            
-            # Generate transaction reference
-            tx_ref = self.client.generate_tx_ref()
-            
-            # Prepare callback URLs with proper parameter templates
-            if request:
-                callback_url = request.build_absolute_uri(
-                    reverse('chapa_webhook')
-                )
-                # CRITICAL FIX: Include tx_ref parameter in return URL
-                # Use the actual tx_ref we generated (not a template)
-                base_return_url = request.build_absolute_uri(
-                    reverse('payment_success')
-                )
-                return_url = f"{base_return_url}?tx_ref={tx_ref}"
-
-                logger.info(f"Payment URLs configured:")
-                logger.info(f"  Callback URL: {callback_url}")
-                logger.info(f"  Return URL: {return_url}")
-            else:
-                callback_url = None
-                return_url = None
-            
-            # Create description
-            item_count = len(cart_items)
-            description = f"Payment for {item_count} item{'s' if item_count > 1 else ''} from {supplier.name}"
-            
-            # Enhanced payment initialization with comprehensive payment method support
-            # Use a simple, short title that's guaranteed to be under 16 characters
-            customization = {
-                "title": "EZM Payment",  # 11 characters - well under 16 limit
-                "description": f"Payment for {item_count} item{'s' if item_count > 1 else ''} from {supplier.name}"
+            payment_result = self.client.initialize_payment(**prepared['init_kwargs'])
+            return self._record_supplier_payments(user, [(prepared, payment_result)])[0]
+                
+        except Exception as e:
+            logger.error(f"Error creating payment for supplier {supplier.id}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'message': 'An error occurred while creating the payment'
             }
 
-            meta = {
-                "supplier_id": supplier.id,
-                "supplier_name": supplier.name,
-                "item_count": item_count,
-                "order_type": "purchase_order"
-            }
+    def _prepare_supplier_payment(self, user, supplier, cart_items, tx_ref, request=None):
+        """
+        Build the Chapa initialization arguments for one supplier's items
 
-            payment_result = self.client.initialize_payment(
-                amount=total_amount,
-                email=user.email,
-                first_name=user.first_name or user.username,
-                last_name=user.last_name or '',
-                phone=getattr(user, 'phone', None),
-                callback_url=callback_url,
-                return_url=return_url,
-                description=description,
-                tx_ref=tx_ref,
-                customization=customization,
-                meta=meta
+        Returns:
+            dict with the supplier, cart items, total amount, description and
+            the keyword arguments for ChapaClient.initialize_payment
+        """
+        # Calculate total amount for this supplier
+        total_amount = sum(
+            Decimal(str(item['price'])) * item['quantity'] 
+            for item in cart_items
+        )
+
+        # Prepare callback URLs with proper parameter templates
+        if request:
+            callback_url = request.build_absolute_uri(
+                reverse('chapa_webhook')
             )
-            
-            if payment_result['success']:
-                try:
-                    # Use the actual tx_ref returned from Chapa (in case it was regenerated)
-                    actual_tx_ref = payment_result.get('tx_ref', tx_ref)
+            # CRITICAL FIX: Include tx_ref parameter in return URL
+            # Use the actual tx_ref we generated (not a template)
+            base_return_url = request.build_absolute_uri(
+                reverse('payment_success')
+            )
+            return_url = f"{base_return_url}?tx_ref={tx_ref}"
+
+            logger.info(f"Payment URLs configured:")
+            logger.info(f"  Callback URL: {callback_url}")
+            logger.info(f"  Return URL: {return_url}")
+        else:
+            callback_url = None
+            return_url = None
+
+        # Create description
+        item_count = len(cart_items)
+        description = f"Payment for {item_count} item{'s' if item_count > 1 else ''} from {supplier.name}"
+
+        # Enhanced payment initialization with comprehensive payment method support
+        # Use a simple, short title that's guaranteed to be under 16 characters
+        customization = {
+            "title": "EZM Payment",  # 11 characters - well under 16 limit
+            "description": f"Payment for {item_count} item{'s' if item_count > 1 else ''} from {supplier.name}"
+        }
+
+        meta = {
+            "supplier_id": supplier.id,
+            "supplier_name": supplier.name,
+            "item_count": item_count,
+            "order_type": "purchase_order"
+        }
+
+        return {
+            'supplier': supplier,
+            'cart_items': cart_items,
+            'total_amount': total_amount,
+            'description': description,
+            'tx_ref': tx_ref,
+            'init_kwargs': {
+                'amount': total_amount,
+                'email': user.email,
+                'first_name': user.first_name or user.username,
+                'last_name': user.last_name or '',
+                'phone': getattr(user, 'phone', None),
+                'callback_url': callback_url,
+                'return_url': return_url,
+                'description': description,
+                'tx_ref': tx_ref,
+                'customization': customization,
+                'meta': meta,
+            },
+        }
+
+    def _serialize_cart_items(self, cart_items):
+        """Convert cart items to a JSON-safe format for PurchaseOrderPayment.order_items"""
+        serializable_cart_items = []
+        for item in cart_items:
+            serializable_item = {}
+            for key, value in item.items():
+                if isinstance(value, Decimal):
+                    serializable_item[key] = str(value)
+                elif hasattr(value, 'id'):  # Handle model objects like SupplierProduct
+                    if key == 'product':
+                        # Convert SupplierProduct to serializable dict
+                        serializable_item['product_id'] = value.id
+                        serializable_item['product_name'] = value.product_name
+                        serializable_item['product_code'] = getattr(value, 'product_code', '')
+                        serializable_item['supplier_id'] = value.supplier.id
+                        serializable_item['supplier_name'] = value.supplier.name
+                    else:
+                        serializable_item[key] = str(value)
+                else:
+                    serializable_item[key] = value
+            serializable_cart_items.append(serializable_item)
+        return serializable_cart_items
+
+    def _record_supplier_payments(self, user, initialized):
+        """
+        Persist initialized payments, batching the database writes
 
-                    # Check if transaction already exists (prevent duplicates)
-                    existing_transaction = ChapaTransaction.objects.filter(
-                        chapa_tx_ref=actual_tx_ref
-                    ).first()
+        Checkouts whose initialize call timed out in flight are recorded as
+        pending without a checkout URL, so a later webhook or verification
+        can still match them, but are reported as failed.
 
-                    if existing_transaction:
+        Args:
+            user: The user making the payments
+            initialized: List of (prepared payment, Chapa initialize result) pairs
+
+        Returns:
+            list: One payment creation result per pair, in the same order
+        """
+        results = [None] * len(initialized)
+        successful = []
+
+        for index, (prepared, payment_result) in enumerate(initialized):
+            if payment_result['success'] or payment_result.get('timed_out'):
+                successful.append((index, prepared, payment_result))
+                continue
+
+            error_msg = payment_result.get('error', 'Payment initialization failed')
+            retry_count = payment_result.get('retry_count', 0)
+            suggestion = payment_result.get('suggestion', '')
+
+            logger.error(f"Failed to initialize payment after {retry_count} retries: {error_msg}")
+
+            # Provide user-friendly error messages
+            user_error = error_msg
+            if 'reference' in error_msg.lower() and 'invalid' in error_msg.lower():
+                user_error = "Payment reference error. Please try again."
+            elif retry_count >= 3:
+                user_error = "Payment service temporarily unavailable. Please try again in a few minutes."
+
+            results[index] = {
+                'success': False,
+                'error': user_error,
+                'technical_error': error_msg,
+                'retry_count': retry_count,
+                'suggestion': suggestion,
+                'message': 'Failed to initialize payment with Chapa'
+            }
+
+        if not successful:
+            return results
+
+        try:
+            with db_transaction.atomic():
+                # Use the actual tx_ref returned from Chapa (in case it was regenerated)
+                actual_refs = [payment_result.get('tx_ref', prepared['tx_ref'])
+                               for _, prepared, payment_result in successful]
+
+                # Check if transactions already exist (prevent duplicates)
+                existing = ChapaTransaction.objects.in_bulk(actual_refs, field_name='chapa_tx_ref')
+
+                new_transactions = []
+                order_payments = []
+                for (index, prepared, payment_result), actual_tx_ref in zip(successful, actual_refs):
+                    supplier = prepared['supplier']
+                    transaction = existing.get(actual_tx_ref)
+                    if transaction:
                         logger.warning(f"Transaction {actual_tx_ref} already exists, using existing record")
-                        transaction = existing_transaction
                     else:
                         # Create new transaction record
-                        transaction = ChapaTransaction.objects.create(
+                        transaction = ChapaTransaction(
                             chapa_tx_ref=actual_tx_ref,
                             chapa_checkout_url=payment_result.get('checkout_url'),
-                            amount=total_amount,
+                            amount=prepared['total_amount'],
                             currency='ETB',
-                            description=description,
+                            description=prepared['description'],
                             user=user,
                             supplier=supplier,
                             status='pending',
-                            chapa_response=payment_result.get('data'),
+                            chapa_response=payment_result.get('data') or (
+                                {'initialize_timed_out': True} if payment_result.get('timed_out') else None
+                            ),
                             customer_email=user.email,
                             customer_first_name=user.first_name or user.username,
                             customer_last_name=user.last_name or '',
                             customer_phone=getattr(user, 'phone', None)
                         )
+                        new_transactions.append(transaction)
 
                     # Create purchase order payment record
-                    # Convert all non-serializable objects to JSON-safe format
-                    serializable_cart_items = []
-                    for item in cart_items:
-                        serializable_item = {}
-                        for key, value in item.items():
-                            if isinstance(value, Decimal):
-                                serializable_item[key] = str(value)
-                            elif hasattr(value, 'id'):  # Handle model objects like SupplierProduct
-                                if key == 'product':
-                                    # Convert SupplierProduct to serializable dict
-                                    serializable_item['product_id'] = value.id
-                                    serializable_item['product_name'] = value.product_name
-                                    serializable_item['product_code'] = getattr(value, 'product_code', '')
-                                    serializable_item['supplier_id'] = value.supplier.id
-                                    serializable_item['supplier_name'] = value.supplier.name
-                                else:
-                                    serializable_item[key] = str(value)
-                            else:
-                                serializable_item[key] = value
-                        serializable_cart_items.append(serializable_item)
-
-                    order_payment = PurchaseOrderPayment.objects.create(
+                    order_payments.append(PurchaseOrderPayment(
                         chapa_transaction=transaction,
                         supplier=supplier,
                         user=user,
                         status='initial',
-                        order_items=serializable_cart_items,
-                        subtotal=total_amount,
-                        total_amount=total_amount
-                    )
-
-                    logger.info(f"Payment created successfully: {tx_ref} for {total_amount} ETB")
-
-                    return {
+                        order_items=self._serialize_cart_items(prepared['cart_items']),
+                        subtotal=prepared['total_amount'],
+                        total_amount=prepared['total_amount']
+                    ))
+                    if payment_result.get('timed_out'):
+                        logger.warning(f"Initialize for {actual_tx_ref} timed out, recorded as pending")
+                        results[index] = {
+                            'success': False,
+                            'error': "Payment service took too long to respond. Please check your payment "
+                                     "history before trying again.",
+                            'technical_error': payment_result['error'],
+                            'tx_ref': actual_tx_ref,
+                            'message': 'Payment initialization timed out'
+                        }
+                        continue
+                    results[index] = {
                         'success': True,
                         'transaction': transaction,
-                        'order_payment': order_payment,
+                        'order_payment': order_payments[-1],
                         'checkout_url': payment_result.get('checkout_url'),
-                        'tx_ref': tx_ref,
+                        'tx_ref': prepared['tx_ref'],
                         'message': 'Payment initialized successfully'
                     }
 
-                except Exception as db_error:
-                    # If database tables don't exist, create mock transaction
-                    logger.warning(f"Database not available, using mock payment: {db_error}")
-
-                    mock_transaction = {
-                        'chapa_tx_ref': tx_ref,
-                        'chapa_checkout_url': payment_result.get('checkout_url'),
-                        'amount': total_amount,
-                        'currency': 'ETB',
-                        'description': description,
-                        'user': user,
-                        'supplier': supplier,
-                        'status': 'pending',
-                        'customer_email': user.email,
-                        'customer_first_name': user.first_name or user.username,
-                        'customer_last_name': user.last_name or '',
-                        'customer_phone': getattr(user, 'phone', None)
-                    }
+                ChapaTransaction.objects.bulk_create(new_transactions)
+                PurchaseOrderPayment.objects.bulk_create(order_payments)
 
-                    # Convert cart items for mock payment too
-                    mock_serializable_items = []
-                    for item in cart_items:
-                        mock_item = {}
-                        for key, value in item.items():
-                            if isinstance(value, Decimal):
-                                mock_item[key] = str(value)
-                            elif hasattr(value, 'id'):  # Handle model objects
-                                if key == 'product':
-                                    mock_item['product_id'] = value.id
-                                    mock_item['product_name'] = value.product_name
-                                    mock_item['product_code'] = getattr(value, 'product_code', '')
-                                    mock_item['supplier_id'] = value.supplier.id
-                                    mock_item['supplier_name'] = value.supplier.name
-                                else:
-                                    mock_item[key] = str(value)
-                            else:
-                                mock_item[key] = value
-                        mock_serializable_items.append(mock_item)
-
-                    mock_order_payment = {
-                        'supplier': supplier,
-                        'user': user,
-                        'status': 'initial',
-                        'order_items': mock_serializable_items,
-                        'subtotal': total_amount,
-                        'total_amount': total_amount
-                    }
+            # bulk_create skips ChapaTransaction.save(), so refresh dashboards here
+            from users.dashboard_service import dashboard_kpi_service
+            dashboard_kpi_service.invalidate()
 
-                    return {
-                        'success': True,
-                        'transaction': mock_transaction,
-                        'order_payment': mock_order_payment,
-                        'checkout_url': payment_result.get('checkout_url'),
-                        'tx_ref': payment_result.get('tx_ref', tx_ref),  # Use actual tx_ref from Chapa
-                        'amount': total_amount,
-                        'supplier': supplier,
-                        'message': 'Payment initialized successfully (mock mode)'
+            for _, prepared, payment_result in successful:
+                if payment_result['success']:
+                    logger.info(f"Payment created successfully: {prepared['tx_ref']} for {prepared['total_amount']} ETB")
+
+        except Exception as db_error:
+            if not self._payment_tables_missing(db_error):
+                # The batch was rolled back: no supplier has a transaction to match its webhook
+                logger.error(f"Failed to record payments for {len(successful)} suppliers: {db_error}")
+                for index, prepared, payment_result in successful:
+                    results[index] = {
+                        'success': False,
+                        'error': "Payment could not be recorded. Please try again.",
+                        'technical_error': str(db_error),
+                        'message': 'Failed to record payment'
                     }
-            else:
-                error_msg = payment_result.get('error', 'Payment initialization failed')
-                retry_count = payment_result.get('retry_count', 0)
-                suggestion = payment_result.get('suggestion', '')
+                return results
+
+            # If database tables don't exist, create mock transactions
+            logger.warning(f"Database not available, using mock payment: {db_error}")
 
-                logger.error(f"Failed to initialize payment after {retry_count} retries: {error_msg}")
+            for index, prepared, payment_result in successful:
+                if payment_result.get('timed_out'):
+                    results[index] = {
+                        'success': False,
+                        'error': payment_result['error'],
+                        'message': 'Payment initialization timed out'
+                    }
+                    continue
+                supplier = prepared['supplier']
+                total_amount = prepared['total_amount']
+                tx_ref = prepared['tx_ref']
+
+                mock_transaction = {
+                    'chapa_tx_ref': tx_ref,
+                    'chapa_checkout_url': payment_result.get('checkout_url'),
+                    'amount': total_amount,
+                    'currency': 'ETB',
+                    'description': prepared['description'],
+                    'user': user,
+                    'supplier': supplier,
+                    'status': 'pending',
+                    'customer_email': user.email,
+                    'customer_first_name': user.first_name or user.username,
+                    'customer_last_name': user.last_name or '',
+                    'customer_phone': getattr(user, 'phone', None)
+                }
 
-                # Provide user-friendly error messages
-                user_error = error_msg
-                if 'reference' in error_msg.lower() and 'invalid' in error_msg.lower():
-                    user_error = "Payment reference error. Please try again."
-                elif retry_count >= 3:
-                    user_error = "Payment service temporarily unavailable. Please try again in a few minutes."
+                mock_order_payment = {
+                    'supplier': supplier,
+                    'user': user,
+                    'status': 'initial',
+                    'order_items': self._serialize_cart_items(prepared['cart_items']),
+                    'subtotal': total_amount,
+                    'total_amount': total_amount
+                }
 
-                return {
-                    'success': False,
-                    'error': user_error,
-                    'technical_error': error_msg,
-                    'retry_count': retry_count,
-                    'suggestion': suggestion,
-                    'message': 'Failed to initialize payment with Chapa'
+                results[index] = {
+                    'success': True,
+                    'transaction': mock_transaction,
+                    'order_payment': mock_order_payment,
+                    'checkout_url': payment_result.get('checkout_url'),
+                    'tx_ref': payment_result.get('tx_ref', tx_ref),  # Use actual tx_ref from Chapa
+                    'amount': total_amount,
+                    'supplier': supplier,
+                    'message': 'Payment initialized successfully (mock mode)'
                 }
-                
-        except Exception as e:
-            logger.error(f"Error creating payment for supplier {supplier.id}: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e),
-                'message': 'An error occurred while creating the payment'
-            }
+
+        return results
     
+    @staticmethod
+    def _payment_tables_missing(error):
+        """Whether a database error means the payment tables are not created yet"""
+        message = str(error).lower()
+        return isinstance(error, (OperationalError, ProgrammingError)) and (
+            'no such table' in message or 'does not exist' in message
+        )
+
     def create_payments_for_cart(self, user, suppliers_cart, request=None):
         """
         Create separate payment transactions for each supplier in the cart
         
+        Suppliers are loaded in one query, the Chapa initialize calls run
+        concurrently (each bounded by CHAPA_REQUEST_TIMEOUT) and the database
+        writes are batched, so checkout latency follows the slowest supplier
+        rather than the sum of all of them.
+
         Args:
             user: The user making the payments
             suppliers_cart: Dictionary of suppliers and their cart items
@@ -302,46 +394,14 @@ class ChapaPaymentService:
             'errors': [],
             'total_amount': Decimal('0.00')
         }
-        
+
+        suppliers = Supplier.objects.in_bulk(list(suppliers_cart.keys()))
+        tx_refs = iter(self.client.generate_tx_refs(len(suppliers_cart)))
+
+        prepared_payments = []
         for supplier_id, supplier_data in suppliers_cart.items():
-            try:
-                supplier = Supplier.objects.get(id=supplier_id)
-                cart_items = supplier_data['items']
-                
-                payment_result = self.create_payment_for_supplier(
-                    user=user,
-                    supplier=supplier,
-                    cart_items=cart_items,
-                    request=request
-                )
-                
-                if payment_result['success']:
-                    # Handle both model objects and dictionaries
-                    transaction = payment_result['transaction']
-                    if hasattr(transaction, 'amount'):  # Model object
-                        amount = transaction.amount
-                        tx_ref = transaction.chapa_tx_ref
-                    else:  # Dictionary (mock)
-                        amount = transaction.get('amount', Decimal('0.00'))
-                        tx_ref = transaction.get('chapa_tx_ref', payment_result.get('tx_ref'))
-
-                    results['payments'].append({
-                        'supplier': supplier,
-                        'transaction': payment_result['transaction'],
-                        'order_payment': payment_result['order_payment'],
-                        'checkout_url': payment_result['checkout_url'],
-                        'tx_ref': payment_result.get('tx_ref', tx_ref),
-                        'amount': amount
-                    })
-                    results['total_amount'] += amount
-                else:
-                    results['errors'].append({
-                        'supplier': supplier,
-                        'error': payment_result['error']
-                    })
-                    results['success'] = False
-                    
-            except Supplier.DoesNotExist:
+            supplier = suppliers.get(supplier_id)
+            if supplier is None:
                 error_msg = f"Supplier with ID {supplier_id} not found"
                 logger.error(error_msg)
                 results['errors'].append({
@@ -349,6 +409,11 @@ class ChapaPaymentService:
                     'error': error_msg
                 })
                 results['success'] = False
+                continue
+            try:
+                prepared_payments.append(self._prepare_supplier_payment(
+                    user, supplier, supplier_data['items'], next(tx_refs), request
+                ))
             except Exception as e:
                 error_msg = f"Error processing payment for supplier {supplier_id}: {str(e)}"
                 logger.error(error_msg)
@@ -357,8 +422,101 @@ class ChapaPaymentService:
                     'error': error_msg
                 })
                 results['success'] = False
+
+        initialized = self._initialize_payments_concurrently(prepared_payments)
+
+        for prepared, payment_result in zip(prepared_payments, self._record_supplier_payments(user, initialized)):
+            supplier = prepared['supplier']
+            if payment_result['success']:
+                # Handle both model objects and dictionaries
+                transaction = payment_result['transaction']
+                if hasattr(transaction, 'amount'):  # Model object
+                    amount = transaction.amount
+                    tx_ref = transaction.chapa_tx_ref
+                else:  # Dictionary (mock)
+                    amount = transaction.get('amount', Decimal('0.00'))
+                    tx_ref = transaction.get('chapa_tx_ref', payment_result.get('tx_ref'))
+
+                results['payments'].append({
+                    'supplier': supplier,
+                    'transaction': payment_result['transaction'],
+                    'order_payment': payment_result['order_payment'],
+                    'checkout_url': payment_result['checkout_url'],
+                    'tx_ref': payment_result.get('tx_ref', tx_ref),
+                    'amount': amount
+                })
+                results['total_amount'] += amount
+            else:
+                results['errors'].append({
+                    'supplier': supplier,
+                    'error': payment_result['error']
+                })
+                results['success'] = False
         
         return results
+
+    def _initialize_payments_concurrently(self, prepared_payments):
+        """
+        Run the Chapa initialize calls for several suppliers in parallel
+
+        Returns:
+            list: (prepared payment, initialize result) pairs in input order
+        """
+        if not prepared_payments:
+            return []
+
+        timeout = getattr(settings, 'CHAPA_REQUEST_TIMEOUT', 30)
+        max_workers = min(len(prepared_payments), getattr(settings, 'CHAPA_MAX_CONCURRENT_REQUESTS', 8))
+
+        def initialize(prepared):
+            from django.db import connection
+            try:
+                return self.client.initialize_payment(timeout=timeout, **prepared['init_kwargs'])
+            finally:
+                # Reference retries may have opened a connection in this thread; close it
+                # even when CONN_MAX_AGE keeps connections open
+                connection.close()
+
+        # One deadline for the whole batch, covering the client's own reference retries
+        deadline = timeout * 3
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(initialize, prepared) for prepared in prepared_payments]
+            wait(futures, timeout=deadline)
+            initialized = []
+            for prepared, future in zip(prepared_payments, futures):
+                if future.cancel():
+                    # Still queued, so Chapa never saw this checkout
+                    payment_result = {
+                        'success': False,
+                        'error': f"Payment initialization did not start within {deadline} seconds",
+                        'data': None
+                    }
+                    initialized.append((prepared, payment_result))
+                    continue
+                if not future.done():
+                    # The request is in flight and may still create the checkout at Chapa
+                    payment_result = {
+                        'success': False,
+                        'timed_out': True,
+                        'error': f"Payment initialization timed out after {deadline} seconds",
+                        'data': None
+                    }
+                    initialized.append((prepared, payment_result))
+                    continue
+                try:
+                    payment_result = future.result()
+                except Exception as e:
+                    payment_result = {
+                        'success': False,
+                        'error': f'Unexpected error: {str(e)}',
+                        'data': None
+                    }
+                initialized.append((prepared, payment_result))
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return initialized
     
     def verify_payment(self, tx_ref):
         """
@@ -401,8 +559,10 @@ class ChapaPaymentService:
             # Validation 2: Check if transaction exists in our database
             transaction = ChapaTransaction.objects.get(chapa_tx_ref=tx_ref)
 
-            # Validation 3: Check if payment was properly initialized
-            if not transaction.chapa_checkout_url:
+            # Validation 3: Check if payment was properly initialized; checkouts whose
+            # initialize call timed out have no URL but may still exist at Chapa
+            timed_out = (transaction.chapa_response or {}).get('initialize_timed_out')
+            if not transaction.chapa_checkout_url and not timed_out:
                 logger.warning(f"Transaction {tx_ref} was not properly initialized (no checkout URL)")
                 return {
                     'success': False,
@@ -134,6 +134,18 @@ class PaymentTransactionService:
         if created:
             logger.info(f"Created supplier account for {chapa_transaction.supplier.name}")
         
+        # Record the order as a purchase so the prepaid payment below nets it off
+        SupplierTransaction.objects.create(
+            transaction_number=f"ST-PO-{chapa_transaction.chapa_tx_ref}",
+            supplier_account=supplier_account,
+            transaction_type='purchase',
+            amount=chapa_transaction.amount,
+            status='completed',
+            description=f"Purchase order - Chapa Ref: {chapa_transaction.chapa_tx_ref}",
+            reference_number=chapa_transaction.chapa_tx_ref,
+            created_by=chapa_transaction.user
+        )
+
         # Create supplier transaction
         supplier_transaction = SupplierTransaction.objects.create(
             transaction_number=f"ST-{chapa_transaction.chapa_tx_ref}",
@@ -145,11 +157,9 @@ class PaymentTransactionService:
             reference_number=chapa_transaction.chapa_tx_ref,
             created_by=chapa_transaction.user
         )
-        
-        # Update supplier account balance
-        supplier_account.current_balance += chapa_transaction.amount
-        supplier_account.save()
-        
+
+        # SupplierTransaction.save() updates the account balance and ledger snapshot,
+        # so a paid order leaves the balance where it was
         return supplier_transaction
 
     @staticmethod
@@ -19,6 +19,7 @@ urlpatterns = [
     
     # Webhook endpoint
     path('webhook/', views.chapa_webhook, name='chapa_webhook'),
+    path('webhook/metrics/', views.webhook_metrics, name='webhook_metrics'),
     
     # Payment methods information
     path('methods/', views.payment_methods_info, name='payment_methods_info'),
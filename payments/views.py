@@ -12,7 +12,7 @@ from django.utils import timezone
 from django.views import View
 from utils.cart import Cart
 from .services import ChapaPaymentService
-from .models import ChapaTransaction, PaymentWebhookLog
+from .models import ChapaTransaction, PaymentWebhookLog, PurchaseOrderPayment
 import hmac
 import hashlib
 
@@ -611,6 +611,29 @@ def chapa_webhook(request):
         return HttpResponseBadRequest("Webhook processing error")
 
 
+@login_required
+@require_GET
+def webhook_metrics(request):
+    """
+    Webhook processing counters, ingest rate, latency percentiles, retries
+    and backlog depth as JSON for monitoring
+    """
+    if request.user.role not in ['head_manager', 'admin']:
+        return JsonResponse({'error': 'Access denied'}, status=403)
+
+    from .webhook_utils import get_webhook_metrics, get_webhook_stats
+
+    try:
+        window_minutes = int(request.GET.get('window', 0)) or None
+    except ValueError:
+        return JsonResponse({'error': 'window must be a number of minutes'}, status=400)
+
+    return JsonResponse({
+        'stats': get_webhook_stats(),
+        'metrics': get_webhook_metrics(window_minutes),
+    })
+
+
 @login_required
 @user_passes_test(is_head_manager)
 def payment_history(request):
@@ -618,9 +641,10 @@ def payment_history(request):
     Show comprehensive payment history for Head Managers with filtering and pagination
     """
     try:
-        from django.core.paginator import Paginator
-        from django.utils import timezone
-        from datetime import datetime
+        from datetime import datetime, timedelta
+        from django.db.models import Count, Q, Sum
+        from users.date_buckets import start_of_day
+        from users.keyset_pagination import paginate_keyset
 
         # Get filter parameters
         status_filter = request.GET.get('status', '')
@@ -631,29 +655,29 @@ def payment_history(request):
         payment_method_filter = request.GET.get('payment_method', '')
 
         # Head Managers can see ALL transactions across the system
-        transactions = ChapaTransaction.objects.select_related('user', 'supplier').all()
+        transactions = ChapaTransaction.objects.all()
 
         # Apply filters
         if status_filter:
             transactions = transactions.filter(status=status_filter)
 
+        # Whole local days as created_at ranges, so the (..., created_at, id) indexes apply
         if date_from:
             try:
                 date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-                transactions = transactions.filter(created_at__date__gte=date_from_obj)
+                transactions = transactions.filter(created_at__gte=start_of_day(date_from_obj))
             except ValueError:
                 pass
 
         if date_to:
             try:
                 date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-                transactions = transactions.filter(created_at__date__lte=date_to_obj)
+                transactions = transactions.filter(created_at__lt=start_of_day(date_to_obj + timedelta(days=1)))
             except ValueError:
                 pass
 
         # Search functionality
         if search_query:
-            from django.db.models import Q
             transactions = transactions.filter(
                 Q(chapa_tx_ref__icontains=search_query) |
                 Q(customer_email__icontains=search_query) |
@@ -673,20 +697,14 @@ def payment_history(request):
                 webhook_data__payment_method__icontains=payment_method_filter
             )
 
-        # Order by most recent first
-        transactions = transactions.order_by('-created_at')
-
-        # Get statistics for dashboard
-        total_transactions = transactions.count()
-        successful_transactions = transactions.filter(status='success').count()
-        pending_transactions = transactions.filter(status='pending').count()
-        failed_transactions = transactions.filter(status='failed').count()
-
-        # Calculate total amounts
-        from django.db.models import Sum
-        total_amount = transactions.filter(status='success').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        # Get statistics for dashboard in one pass
+        stats = transactions.aggregate(
+            total=Count('id'),
+            successful=Count('id', filter=Q(status='success')),
+            pending=Count('id', filter=Q(status='pending')),
+            failed=Count('id', filter=Q(status='failed')),
+            amount=Sum('amount', filter=Q(status='success')),
+        )
 
         # Get suppliers for filter dropdown
         from Inventory.models import Supplier
@@ -694,22 +712,18 @@ def payment_history(request):
             chapa_transactions__isnull=False
         ).distinct().order_by('name')
 
-        # Get unique payment methods from webhook data
-        payment_methods = []
-        webhook_methods = transactions.exclude(
-            webhook_data__isnull=True
-        ).values_list('webhook_data', flat=True)
-
-        for webhook_data in webhook_methods:
-            if webhook_data and 'payment_method' in webhook_data:
-                method = webhook_data['payment_method']
-                if method and method not in payment_methods:
-                    payment_methods.append(method)
-
-        # Pagination
-        paginator = Paginator(transactions, 15)  # Show 15 transactions per page
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        # Get unique payment methods from webhook data (distinct in the database)
+        payment_methods = sorted({
+            method for method in transactions.exclude(webhook_data__isnull=True)
+            .order_by().values_list('webhook_data__payment_method', flat=True).distinct()
+            if method
+        })
+
+        # Cursor pagination, most recent first: 15 transactions per page
+        page_obj = paginate_keyset(
+            transactions.select_related('user', 'supplier'), ['-created_at', '-id'],
+            cursor=request.GET.get('cursor'), per_page=15
+        )
 
         context = {
             'transactions': page_obj,
@@ -724,11 +738,11 @@ def payment_history(request):
             'is_success_selected': status_filter == 'success',
             'is_pending_selected': status_filter == 'pending',
             'is_failed_selected': status_filter == 'failed',
-            'total_transactions': total_transactions,
-            'successful_transactions': successful_transactions,
-            'pending_transactions': pending_transactions,
-            'failed_transactions': failed_transactions,
-            'total_amount': total_amount,
+            'total_transactions': stats['total'],
+            'successful_transactions': stats['successful'],
+            'pending_transactions': stats['pending'],
+            'failed_transactions': stats['failed'],
+            'total_amount': stats['amount'] or 0,
         }
 
         return render(request, 'payments/payment_history.html', context)
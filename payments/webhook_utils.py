@@ -1,11 +1,24 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, F, Min, Q, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from users.db_retry import retry_on_busy
+from users.profiling import percentile
 from .models import ChapaTransaction, PaymentWebhookLog
 from .services import ChapaPaymentService
 from .notification_service import supplier_notification_service
 
 logger = logging.getLogger(__name__)
 
+STATS_CACHE_KEY = 'payments:webhook_stats'
+METRICS_CACHE_KEY = 'payments:webhook_metrics'
+
 
 class WebhookProcessor:
     """
@@ -134,54 +147,80 @@ class WebhookProcessor:
                 'error': str(e)
             }
     
-    def reprocess_failed_webhooks(self, limit=100):
+    def reprocess_failed_webhooks(self, limit=100, workers=None):
         """
-        Reprocess failed webhook logs
+        Reprocess failed webhook logs, oldest first, on a bounded thread pool
         
         Args:
             limit (int): Maximum number of webhooks to reprocess
+            workers (int): Parallel workers (default: settings.WEBHOOK_REPROCESS_WORKERS)
         
         Returns:
             dict: Reprocessing results
         """
-        failed_webhooks = PaymentWebhookLog.objects.filter(
+        workers = workers or getattr(settings, 'WEBHOOK_REPROCESS_WORKERS', 4)
+        failed_webhooks = list(PaymentWebhookLog.objects.filter(
             processed=False,
             processing_error__isnull=False
-        ).order_by('created_at')[:limit]
+        ).order_by('created_at').values_list('id', 'webhook_data')[:limit])
         
-        results = {
-            'processed': 0,
-            'failed': 0,
-            'errors': []
+        # Webhooks for the same transaction run in order on one worker, so
+        # duplicates can't both see the old status and notify twice
+        batches = {}
+        for webhook_id, webhook_data in failed_webhooks:
+            tx_ref = webhook_data.get('tx_ref') if isinstance(webhook_data, dict) else None
+            batches.setdefault(tx_ref or f'webhook-{webhook_id}', []).append((webhook_id, webhook_data))
+        
+        if workers <= 1 or len(batches) <= 1:
+            errors = [self._reprocess_webhook(*webhook) for webhook in failed_webhooks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+                errors = [
+                    error
+                    for batch_errors in executor.map(self._reprocess_batch_in_thread, batches.values())
+                    for error in batch_errors
+                ]
+        
+        errors = [error for error in errors if error]
+        return {
+            'processed': len(failed_webhooks) - len(errors),
+            'failed': len(errors),
+            'errors': errors
         }
+    
+    def _reprocess_batch_in_thread(self, webhooks):
+        try:
+            return [self._reprocess_webhook(*webhook) for webhook in webhooks]
+        finally:
+            # Worker threads open their own connection; don't leave it to the garbage collector
+            connection.close()
+    
+    def _reprocess_webhook(self, webhook_id, webhook_data):
+        """
+        Reprocess one webhook log and record the attempt
         
-        for webhook_log in failed_webhooks:
-            try:
-                # Attempt to reprocess
-                result = self.process_webhook_data(webhook_log.webhook_data)
-                
-                if result['success']:
-                    webhook_log.processed = True
-                    webhook_log.processed_at = timezone.now()
-                    webhook_log.processing_error = None
-                    webhook_log.save()
-                    results['processed'] += 1
-                    logger.info(f"Reprocessed webhook {webhook_log.id} successfully")
-                else:
-                    webhook_log.processing_error = result['error']
-                    webhook_log.save()
-                    results['failed'] += 1
-                    results['errors'].append(f"Webhook {webhook_log.id}: {result['error']}")
-                    
-            except Exception as e:
-                error_msg = f"Error reprocessing webhook {webhook_log.id}: {str(e)}"
-                webhook_log.processing_error = error_msg
-                webhook_log.save()
-                results['failed'] += 1
-                results['errors'].append(error_msg)
-                logger.error(error_msg)
+        Returns:
+            str: Error message, or None if the webhook was processed
+        """
+        try:
+            result = self.process_webhook_data(webhook_data)
+            error = None if result['success'] else f"Webhook {webhook_id}: {result['error']}"
+            stored_error = None if result['success'] else result['error']
+        except Exception as e:
+            error = stored_error = f"Error reprocessing webhook {webhook_id}: {str(e)}"
+            logger.error(error)
         
-        return results
+        self._record_attempt(webhook_id, stored_error)
+        if error is None:
+            logger.info(f"Reprocessed webhook {webhook_id} successfully")
+        return error
+    
+    @retry_on_busy()
+    def _record_attempt(self, webhook_id, processing_error):
+        update = {'retry_count': F('retry_count') + 1, 'processing_error': processing_error}
+        if processing_error is None:
+            update.update(processed=True, processed_at=timezone.now())
+        PaymentWebhookLog.objects.filter(pk=webhook_id).update(**update)
     
     def verify_transaction_status(self, tx_ref):
         """
@@ -262,28 +301,82 @@ def create_webhook_log(webhook_data, signature=None, transaction=None):
     )
 
 
-def get_webhook_stats():
+def get_webhook_stats(use_cache=True):
     """
-    Get webhook processing statistics
+    Get webhook processing statistics (one conditional aggregate, cached for
+    settings.WEBHOOK_STATS_CACHE_SECONDS)
     
     Returns:
         dict: Webhook statistics
     """
-    total_webhooks = PaymentWebhookLog.objects.count()
-    processed_webhooks = PaymentWebhookLog.objects.filter(processed=True).count()
-    failed_webhooks = PaymentWebhookLog.objects.filter(
-        processed=False, 
-        processing_error__isnull=False
-    ).count()
-    pending_webhooks = PaymentWebhookLog.objects.filter(
-        processed=False, 
-        processing_error__isnull=True
-    ).count()
+    stats = cache.get(STATS_CACHE_KEY) if use_cache else None
+    if stats is None:
+        counts = PaymentWebhookLog.objects.aggregate(
+            total_webhooks=Count('id'),
+            processed_webhooks=Count('id', filter=Q(processed=True)),
+            failed_webhooks=Count('id', filter=Q(processed=False, processing_error__isnull=False)),
+            pending_webhooks=Count('id', filter=Q(processed=False, processing_error__isnull=True)),
+        )
+        total_webhooks = counts['total_webhooks']
+        processed_webhooks = counts['processed_webhooks']
+        stats = {
+            'total': total_webhooks,
+            'processed': processed_webhooks,
+            'failed': counts['failed_webhooks'],
+            'pending': counts['pending_webhooks'],
+            'success_rate': (processed_webhooks / total_webhooks * 100) if total_webhooks > 0 else 0
+        }
+        cache.set(STATS_CACHE_KEY, stats, getattr(settings, 'WEBHOOK_STATS_CACHE_SECONDS', 30))
+    return stats
+
+
+def get_webhook_metrics(window_minutes=None, use_cache=True):
+    """
+    Webhook ingest rate, processing latency, retries and backlog depth
+    
+    Args:
+        window_minutes (int): Window for ingest rate and latency
+            (default: settings.WEBHOOK_METRICS_WINDOW_MINUTES)
+    
+    Returns:
+        dict: window_minutes, received, ingest_per_minute, latency_ms
+        (p50/p90/p99/max of webhooks processed in the window, from receipt to
+        processing), retried_webhooks, retries, backlog, oldest_backlog_seconds
+    """
+    window_minutes = window_minutes or getattr(settings, 'WEBHOOK_METRICS_WINDOW_MINUTES', 60)
+    key = f'{METRICS_CACHE_KEY}:{window_minutes}'
+    metrics = cache.get(key) if use_cache else None
+    if metrics is not None:
+        return metrics
+    
+    now = timezone.now()
+    since = now - timedelta(minutes=window_minutes)
+    counters = PaymentWebhookLog.objects.aggregate(
+        received=Count('id', filter=Q(created_at__gte=since)),
+        retried_webhooks=Count('id', filter=Q(retry_count__gt=0)),
+        retries=Coalesce(Sum('retry_count'), 0),
+        backlog=Count('id', filter=Q(processed=False)),
+        oldest_backlog=Min('created_at', filter=Q(processed=False)),
+    )
+    latencies = [
+        (processed_at - created_at).total_seconds() * 1000
+        for created_at, processed_at in PaymentWebhookLog.objects.filter(
+            processed=True, processed_at__gte=since
+        ).values_list('created_at', 'processed_at')
+    ]
     
-    return {
-        'total': total_webhooks,
-        'processed': processed_webhooks,
-        'failed': failed_webhooks,
-        'pending': pending_webhooks,
-        'success_rate': (processed_webhooks / total_webhooks * 100) if total_webhooks > 0 else 0
+    oldest_backlog = counters.pop('oldest_backlog')
+    metrics = {
+        'window_minutes': window_minutes,
+        **counters,
+        'ingest_per_minute': round(counters['received'] / window_minutes, 2),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 1),
+            'p90': round(percentile(latencies, 0.90), 1),
+            'p99': round(percentile(latencies, 0.99), 1),
+            'max': round(max(latencies, default=0.0), 1),
+        },
+        'oldest_backlog_seconds': int((now - oldest_backlog).total_seconds()) if oldest_backlog else 0,
     }
+    cache.set(key, metrics, getattr(settings, 'WEBHOOK_STATS_CACHE_SECONDS', 30))
+    return metrics
@@ -1,9 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db import transaction
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_http_methods
-from Inventory.models import Product, Stock
+from Inventory.models import Stock
+from Inventory.product_catalog import product_catalog
+from Inventory.transfer_service import store_transfer_service
 from transactions.models import Transaction, Receipt, Order as TransactionOrder, FinancialRecord
 from .models import Order, Store, StoreCashier
 from users.models import CustomUser
@@ -22,13 +24,16 @@ from decimal import Decimal
 from django.db import models
 import json
 from webfront.models import CustomerTicket, CustomerTicketItem
+from webfront.reservations import stock_reservation_service
+from users.db_retry import retry_on_busy
 
 @login_required
 def process_sale(request):
     if request.user.role != 'cashier':
         return HttpResponse("Unauthorized", status=403)
     
-    products = Product.objects.all()
+    # The product listing comes from the in-process catalog snapshot
+    products = product_catalog.products()
     
     if request.method == 'POST':
         product_ids = request.POST.getlist('product')
@@ -44,14 +49,18 @@ def process_sale(request):
             with transaction.atomic():
                 # Loop through selected products
                 for pid, qty in zip(product_ids, quantities):
-                    product = get_object_or_404(Product, pk=pid)
+                    # Price and existence come from the locked stock row; the
+                    # snapshot can trail a price change by PRODUCT_CATALOG_MAX_AGE
+                    stock = get_object_or_404(
+                        Stock.objects.select_for_update().select_related('product'),
+                        product_id=pid, store=request.user.store
+                    )
+                    product = stock.product
                     qty = int(qty)
 
-                    stock = Stock.objects.get(product=product, store=request.user.store)
-                    if stock.quantity < qty:
+                    if stock.available_quantity < qty:
                         raise ValueError(f"Not enough {product.name} in stock.")
-                    stock.quantity -= qty
-                    stock.save()
+                    store_transfer_service.deduct_for_sale(stock, qty)
 
                     item_total = product.price * qty
                     order_items.append((product, qty, item_total))
@@ -117,7 +126,9 @@ def process_sale(request):
 
 
 def get_product_price(request, product_id):
-    product = get_object_or_404(Product, pk=product_id)
+    product = product_catalog.get(product_id)
+    if product is None:
+        raise Http404("No Product matches the given query.")
     return JsonResponse({'price': product.price})
 
 from django.shortcuts import render
@@ -440,8 +451,8 @@ def process_single_sale(request):
             return JsonResponse({'success': False, 'error': 'Product not found in store'})
 
         # Check stock availability
-        if stock.quantity < quantity:
-            return JsonResponse({'success': False, 'error': f'Only {stock.quantity} items available'})
+        if stock.available_quantity < quantity:
+            return JsonResponse({'success': False, 'error': f'Only {stock.available_quantity} items available'})
 
         # Check if product is expired
         if stock.product.expiry_date:
@@ -480,8 +491,7 @@ def process_single_sale(request):
             )
 
             # Update stock
-            stock.quantity -= quantity
-            stock.save()
+            store_transfer_service.deduct_for_sale(stock, quantity)
 
             # Create Financial Record
             FinancialRecord.objects.create(
@@ -736,16 +746,16 @@ def process_ticket(request, ticket_id):
         cart_items = []
         cart_total = 0
 
+        ticket_stock = stock_reservation_service.ticket_stock(ticket, request.user.store)
         for ticket_item in ticket.items.all():
             # Get current stock for this product
             try:
-                stock = Stock.objects.get(
-                    product=ticket_item.product,
-                    store=request.user.store
-                )
+                stock = ticket_stock.get(ticket_item.product_id)
+                if stock is None:
+                    raise Stock.DoesNotExist
 
-                # Check if we have enough stock
-                if stock.quantity >= ticket_item.quantity:
+                # Check if we have enough stock (including the units this ticket holds)
+                if stock.available_for_ticket >= ticket_item.quantity:
                     cart_item = {
                         'product_id': ticket_item.product.id,
                         'product_name': ticket_item.product.name,
@@ -757,7 +767,7 @@ def process_ticket(request, ticket_id):
                     cart_items.append(cart_item)
                     cart_total += float(ticket_item.total_price)
                 else:
-                    messages.warning(request, f'Insufficient stock for {ticket_item.product.name}. Available: {stock.quantity}, Required: {ticket_item.quantity}')
+                    messages.warning(request, f'Insufficient stock for {ticket_item.product.name}. Available: {stock.available_for_ticket}, Required: {ticket_item.quantity}')
             except Stock.DoesNotExist:
                 messages.warning(request, f'Product {ticket_item.product.name} is not available in this store.')
 
@@ -931,232 +941,266 @@ def remove_from_cart(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-@login_required
-def complete_order(request):
+@retry_on_busy()
+def _save_sale(user, cart, ticket_info, payment_type, customer_name, customer_phone,
+               subtotal, discount_amount, discount_percent, tax_amount, total_amount):
     """
-    Complete the order - create transaction, receipt, and clear cart
+    Write the sale, receipt, order lines and revenue record in one transaction;
+    rerun from the start if the database is locked
+
+    Returns:
+        tuple: (Transaction, Receipt, order item dicts for the receipt)
     """
-    if request.method != 'POST':
-        return JsonResponse({'error': 'POST method required'}, status=405)
+    with transaction.atomic():
+        # Create main transaction
+        transaction_obj = Transaction.objects.create(
+            transaction_type='sale',
+            quantity=sum(item['quantity'] for item in cart['items']),
+            total_amount=total_amount,
+            store=user.store,
+            payment_type=payment_type
+        )
 
-    if request.user.role != 'cashier':
-        return JsonResponse({'error': 'Unauthorized'}, status=403)
+        # Create receipt
+        receipt = Receipt.objects.create(
+            transaction=transaction_obj,
+            total_amount=total_amount,
+            customer_name=customer_name,
+            customer_phone=customer_phone,
+            subtotal=subtotal,
+            discount_amount=discount_amount,
+            discount_percent=Decimal(str(discount_percent)),
+            tax_amount=tax_amount
+        )
 
-    try:
-        data = json.loads(request.body)
-        payment_type = data.get('payment_type', 'cash')
-        discount_percent = 0  # No discount allowed
-        is_taxable = True  # Always apply tax (15%)
-        customer_name = data.get('customer_name', 'Walk-in Customer')
-        customer_phone = data.get('customer_phone', '')
+        # Units held for the ticket being checked out are sold now, not reserved
+        if ticket_info.get('from_ticket') and ticket_info.get('ticket_number'):
+            held_ticket = CustomerTicket.objects.filter(
+                ticket_number=ticket_info['ticket_number'],
+                store=user.store
+            ).first()
+            if held_ticket:
+                stock_reservation_service.release_ticket(held_ticket)
 
-        cart = request.session.get('cart')
-        print(f"DEBUG - Cart data from session: {cart}")  # Debug log
-        print(f"DEBUG - Session keys: {list(request.session.keys())}")  # Debug log
+        # Create order entries and update stock
+        order_items = []
+        for i, item in enumerate(cart['items']):
+            try:
+                print(f"DEBUG - Processing item {i}: {item}")  # Debug log
+
+                # Validate required fields
+                product_id = item.get('product_id')
+                quantity = int(item.get('quantity', 0))
 
-        if not cart:
-            print("DEBUG - No cart found in session")
-            return JsonResponse({'error': 'Cart not found in session'}, status=400)
+                if not product_id or quantity <= 0:
+                    raise ValueError(f"Invalid product_id or quantity for item {i}")
 
-        if not cart.get('items'):
-            print("DEBUG - Cart has no items")
-            return JsonResponse({'error': 'Cart is empty'}, status=400)
+                # Get stock and update quantity
+                stock = Stock.objects.select_for_update().get(
+                    product_id=product_id,
+                    store=user.store
+                )
 
-        print(f"DEBUG - Cart has {len(cart['items'])} items")
+                if stock.available_quantity < quantity:
+                    product_name = item.get('product_name', stock.product.name)
+                    raise ValueError(f"Insufficient stock for {product_name}. Available: {stock.available_quantity}, Requested: {quantity}")
 
-        # Validate cart items structure
-        for i, item in enumerate(cart['items']):
-            print(f"DEBUG - Item {i}: {item}")  # Debug log
-            if not all(key in item for key in ['product_id', 'quantity']):
-                return JsonResponse({'error': f'Invalid cart item structure at index {i}'}, status=400)
+                store_transfer_service.deduct_for_sale(stock, quantity)
 
-        with transaction.atomic():
-            # Calculate totals - convert all to Decimal for consistency
+                # Handle different price field names
+                item_price = float(item.get('price', 0) or item.get('unit_price', 0))
+                if item_price <= 0:
+                    # Fallback to product price if not in cart
+                    item_price = float(stock.product.price)
+
+                item_subtotal = item.get('subtotal') or item.get('total_price') or (item_price * quantity)
+
+                # Create transaction order
+                order = TransactionOrder.objects.create(
+                    receipt=receipt,
+                    transaction=transaction_obj,
+                    product_id=product_id,
+                    quantity=quantity,
+                    price_at_time_of_sale=Decimal(str(item_price))
+                )
+
+                order_items.append({
+                    'product_name': item.get('product_name', stock.product.name),
+                    'quantity': quantity,
+                    'price': item_price,
+                    'subtotal': float(item_subtotal)
+                })
+
+                print(f"DEBUG - Successfully processed item {i}")  # Debug log
+
+            except Exception as item_error:
+                print(f"DEBUG - Error processing item {i}: {item_error}")  # Debug log
+                print(f"DEBUG - Item data: {item}")  # Debug log
+                raise ValueError(f"Error processing item {i}: {str(item_error)}")
+
+        # Create financial record
+        FinancialRecord.objects.create(
+            store=user.store,
+            cashier=user,
+            amount=total_amount,
+            record_type='revenue'
+        )
+
+        # Update ticket status if this order was from a ticket
+        if ticket_info.get('from_ticket') and ticket_info.get('ticket_number'):
             try:
-                # Handle different cart item structures (subtotal vs total_price)
-                cart_subtotal = 0
-                for item in cart['items']:
-                    # Try different field combinations
-                    if 'subtotal' in item:
-                        item_total = float(item['subtotal'])
-                    elif 'total_price' in item:
-                        item_total = float(item['total_price'])
-                    else:
-                        # Calculate from price and quantity
-                        price = float(item.get('price', 0) or item.get('unit_price', 0))
-                        quantity = int(item.get('quantity', 0))
-                        item_total = price * quantity
-
-                    cart_subtotal += item_total
-                    print(f"DEBUG - Item total: {item_total}, Running subtotal: {cart_subtotal}")  # Debug log
-
-                subtotal = Decimal(str(cart_subtotal))
-                discount_amount = subtotal * (Decimal(str(discount_percent)) / Decimal('100'))
-                taxable_amount = subtotal - discount_amount
-                tax_amount = taxable_amount * Decimal('0.15') if is_taxable else Decimal('0')
-                total_amount = taxable_amount + tax_amount
-
-                print(f"DEBUG - Final calculations: subtotal={subtotal}, total={total_amount}")  # Debug log
-            except (ValueError, TypeError, KeyError) as calc_error:
-                print(f"DEBUG - Calculation error details: {calc_error}")  # Debug log
-                print(f"DEBUG - Cart items causing error: {cart['items']}")  # Debug log
-                return JsonResponse({'error': f'Calculation error: {str(calc_error)}'}, status=400)
-
-            # Create main transaction
-            transaction_obj = Transaction.objects.create(
-                transaction_type='sale',
-                quantity=sum(item['quantity'] for item in cart['items']),
-                total_amount=total_amount,
-                store=request.user.store,
-                payment_type=payment_type
-            )
+                ticket = CustomerTicket.objects.get(
+                    ticket_number=ticket_info['ticket_number'],
+                    store=user.store
+                )
+                ticket.status = 'completed'
+                ticket.completed_at = timezone.now()
+                ticket.confirmed_by = user
+                ticket.save()
+            except CustomerTicket.DoesNotExist:
+                pass  # Ticket not found, continue without error
 
-            # Create receipt
-            receipt = Receipt.objects.create(
-                transaction=transaction_obj,
-                total_amount=total_amount,
-                customer_name=customer_name,
-                customer_phone=customer_phone,
-                subtotal=subtotal,
-                discount_amount=discount_amount,
-                discount_percent=Decimal(str(discount_percent)),
-                tax_amount=tax_amount
-            )
+    return transaction_obj, receipt, order_items
 
-            # Create order entries and update stock
-            order_items = []
-            for i, item in enumerate(cart['items']):
-                try:
-                    print(f"DEBUG - Processing item {i}: {item}")  # Debug log
 
-                    # Validate required fields
-                    product_id = item.get('product_id')
-                    quantity = int(item.get('quantity', 0))
+def record_order(request):
+    """
+    Create the sale, receipt, order lines and revenue record for the cart in
+    one transaction, then clear the cart from the session once it has committed
+    """
+    data = json.loads(request.body)
+    payment_type = data.get('payment_type', 'cash')
+    discount_percent = 0  # No discount allowed
+    is_taxable = True  # Always apply tax (15%)
+    customer_name = data.get('customer_name', 'Walk-in Customer')
+    customer_phone = data.get('customer_phone', '')
 
-                    if not product_id or quantity <= 0:
-                        raise ValueError(f"Invalid product_id or quantity for item {i}")
+    cart = request.session.get('cart')
+    print(f"DEBUG - Cart data from session: {cart}")  # Debug log
+    print(f"DEBUG - Session keys: {list(request.session.keys())}")  # Debug log
 
-                    # Get stock and update quantity
-                    stock = Stock.objects.select_for_update().get(
-                        product_id=product_id,
-                        store=request.user.store
-                    )
+    if not cart:
+        print("DEBUG - No cart found in session")
+        return JsonResponse({'error': 'Cart not found in session'}, status=400)
 
-                    if stock.quantity < quantity:
-                        product_name = item.get('product_name', stock.product.name)
-                        raise ValueError(f"Insufficient stock for {product_name}. Available: {stock.quantity}, Requested: {quantity}")
+    if not cart.get('items'):
+        print("DEBUG - Cart has no items")
+        return JsonResponse({'error': 'Cart is empty'}, status=400)
 
-                    stock.quantity -= quantity
-                    stock.save()
+    print(f"DEBUG - Cart has {len(cart['items'])} items")
 
-                    # Handle different price field names
-                    item_price = float(item.get('price', 0) or item.get('unit_price', 0))
-                    if item_price <= 0:
-                        # Fallback to product price if not in cart
-                        item_price = float(stock.product.price)
+    # Validate cart items structure
+    for i, item in enumerate(cart['items']):
+        print(f"DEBUG - Item {i}: {item}")  # Debug log
+        if not all(key in item for key in ['product_id', 'quantity']):
+            return JsonResponse({'error': f'Invalid cart item structure at index {i}'}, status=400)
 
-                    item_subtotal = item.get('subtotal') or item.get('total_price') or (item_price * quantity)
+    # Calculate totals - convert all to Decimal for consistency
+    try:
+        # Handle different cart item structures (subtotal vs total_price)
+        cart_subtotal = 0
+        for item in cart['items']:
+            # Try different field combinations
+            if 'subtotal' in item:
+                item_total = float(item['subtotal'])
+            elif 'total_price' in item:
+                item_total = float(item['total_price'])
+            else:
+                # Calculate from price and quantity
+                price = float(item.get('price', 0) or item.get('unit_price', 0))
+                quantity = int(item.get('quantity', 0))
+                item_total = price * quantity
+
+            cart_subtotal += item_total
+            print(f"DEBUG - Item total: {item_total}, Running subtotal: {cart_subtotal}")  # Debug log
+
+        subtotal = Decimal(str(cart_subtotal))
+        discount_amount = subtotal * (Decimal(str(discount_percent)) / Decimal('100'))
+        taxable_amount = subtotal - discount_amount
+        tax_amount = taxable_amount * Decimal('0.15') if is_taxable else Decimal('0')
+        total_amount = taxable_amount + tax_amount
+
+        print(f"DEBUG - Final calculations: subtotal={subtotal}, total={total_amount}")  # Debug log
+    except (ValueError, TypeError, KeyError) as calc_error:
+        print(f"DEBUG - Calculation error details: {calc_error}")  # Debug log
+        print(f"DEBUG - Cart items causing error: {cart['items']}")  # Debug log
+        return JsonResponse({'error': f'Calculation error: {str(calc_error)}'}, status=400)
 
-                    # Create transaction order
-                    order = TransactionOrder.objects.create(
-                        receipt=receipt,
-                        transaction=transaction_obj,
-                        product_id=product_id,
-                        quantity=quantity,
-                        price_at_time_of_sale=Decimal(str(item_price))
-                    )
+    ticket_info = request.session.get('ticket_info', {})
+    transaction_obj, receipt, order_items = _save_sale(
+        request.user, cart, ticket_info, payment_type, customer_name, customer_phone,
+        subtotal, discount_amount, discount_percent, tax_amount, total_amount
+    )
 
-                    order_items.append({
-                        'product_name': item.get('product_name', stock.product.name),
-                        'quantity': quantity,
-                        'price': item_price,
-                        'subtotal': float(item_subtotal)
-                    })
+    # Clear cart and ticket info only after the sale has committed, so a retried
+    # or failed transaction leaves the cart in place
+    if 'cart' in request.session:
+        del request.session['cart']
+        request.session.modified = True
+    if 'ticket_info' in request.session:
+        del request.session['ticket_info']
+        request.session.modified = True
 
-                    print(f"DEBUG - Successfully processed item {i}")  # Debug log
+    # Prepare receipt data for frontend
+    receipt_data = {
+        'id': receipt.id,
+        'receipt_number': f"R{receipt.id:06d}",
+        'created_at': receipt.timestamp.isoformat(),
+        'customer_name': customer_name,
+        'customer_phone': customer_phone,
+        'cashier_name': request.user.get_full_name() or request.user.username,
+        'store_name': request.user.store.name,
+        'total_amount': float(total_amount),
+        'subtotal': float(subtotal),
+        'discount_amount': float(discount_amount),
+        'discount_percent': discount_percent,
+        'tax_amount': float(tax_amount),
+        'payment_type': payment_type,
+        'items': []
+    }
 
-                except Exception as item_error:
-                    print(f"DEBUG - Error processing item {i}: {item_error}")  # Debug log
-                    print(f"DEBUG - Item data: {item}")  # Debug log
-                    raise ValueError(f"Error processing item {i}: {str(item_error)}")
+    # Add items to receipt data
+    for item in order_items:
+        receipt_data['items'].append({
+            'product_name': item['product_name'],
+            'quantity': item['quantity'],
+            'unit_price': float(item['price']),
+            'total_price': float(item['subtotal'])
+        })
 
-            # Create financial record
-            FinancialRecord.objects.create(
-                store=request.user.store,
-                cashier=request.user,
-                amount=total_amount,
-                record_type='revenue'
-            )
+    return JsonResponse({
+        'success': True,
+        'transaction_id': transaction_obj.id,
+        'receipt_id': receipt.id,
+        'total_amount': float(total_amount),
+        'receipt': receipt_data,
+        'order_items': order_items,
+        'customer_name': customer_name,
+        'customer_phone': customer_phone,
+        'payment_type': payment_type,
+        'discount_amount': float(discount_amount),
+        'discount_percent': discount_percent,
+        'tax_amount': float(tax_amount),
+        'subtotal': float(subtotal),
+        'message': 'Order completed successfully',
+        'receipt_url': f'/stores/receipt/{receipt.id}/',
+        'receipt_pdf_url': f'/stores/receipt/{receipt.id}/pdf/',
+    })
 
-            # Update ticket status if this order was from a ticket
-            ticket_info = request.session.get('ticket_info', {})
-            if ticket_info.get('from_ticket') and ticket_info.get('ticket_number'):
-                try:
-                    ticket = CustomerTicket.objects.get(
-                        ticket_number=ticket_info['ticket_number'],
-                        store=request.user.store
-                    )
-                    ticket.status = 'completed'
-                    ticket.completed_at = timezone.now()
-                    ticket.confirmed_by = request.user
-                    ticket.save()
-                except CustomerTicket.DoesNotExist:
-                    pass  # Ticket not found, continue without error
-
-            # Clear cart and ticket info
-            if 'cart' in request.session:
-                del request.session['cart']
-                request.session.modified = True
-            if 'ticket_info' in request.session:
-                del request.session['ticket_info']
-                request.session.modified = True
-
-            # Prepare receipt data for frontend
-            receipt_data = {
-                'id': receipt.id,
-                'receipt_number': f"R{receipt.id:06d}",
-                'created_at': receipt.timestamp.isoformat(),
-                'customer_name': customer_name,
-                'customer_phone': customer_phone,
-                'cashier_name': request.user.get_full_name() or request.user.username,
-                'store_name': request.user.store.name,
-                'total_amount': float(total_amount),
-                'subtotal': float(subtotal),
-                'discount_amount': float(discount_amount),
-                'discount_percent': discount_percent,
-                'tax_amount': float(tax_amount),
-                'payment_type': payment_type,
-                'items': []
-            }
 
-            # Add items to receipt data
-            for item in order_items:
-                receipt_data['items'].append({
-                    'product_name': item['product_name'],
-                    'quantity': item['quantity'],
-                    'unit_price': float(item['price']),
-                    'total_price': float(item['subtotal'])
-                })
+@login_required
+def complete_order(request):
+    """
+    Complete the order - create transaction, receipt, and clear cart
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST method required'}, status=405)
 
-            return JsonResponse({
-                'success': True,
-                'transaction_id': transaction_obj.id,
-                'receipt_id': receipt.id,
-                'total_amount': float(total_amount),
-                'receipt': receipt_data,
-                'order_items': order_items,
-                'customer_name': customer_name,
-                'customer_phone': customer_phone,
-                'payment_type': payment_type,
-                'discount_amount': float(discount_amount),
-                'discount_percent': discount_percent,
-                'tax_amount': float(tax_amount),
-                'subtotal': float(subtotal),
-                'message': 'Order completed successfully',
-                'receipt_url': f'/stores/receipt/{receipt.id}/',
-                'receipt_pdf_url': f'/stores/receipt/{receipt.id}/pdf/',
-            })
+    if request.user.role != 'cashier':
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
 
+    try:
+        return record_order(request)
     except ValueError as e:
         print(f"Order completion validation error: {str(e)}")
         return JsonResponse({'error': str(e)}, status=400)
@@ -1563,8 +1607,7 @@ def approve_store_transfer_request(request, request_id):
         return redirect('store_manager_transfer_requests')
 
     if request.method == 'POST':
-        from Inventory.models import StoreStockTransferRequest, Stock
-        from django.utils import timezone
+        from Inventory.models import StoreStockTransferRequest
         import json
 
         try:
@@ -1592,27 +1635,21 @@ def approve_store_transfer_request(request, request_id):
                 messages.error(request, error_msg)
                 return redirect('store_manager_transfer_requests')
 
-            # Check if source store has sufficient stock
-            source_stock = Stock.objects.filter(
-                store=store,  # This store (source)
-                product=transfer_request.product
-            ).first()
-
-            if not source_stock or source_stock.quantity < approved_quantity:
-                error_msg = f"Insufficient stock. Available: {source_stock.quantity if source_stock else 0}, Requested: {approved_quantity}"
+            # Reserve the units at this store so concurrent sales cannot oversell them
+            try:
+                transfer_request = store_transfer_service.approve(
+                    transfer_request,
+                    approved_quantity,
+                    reviewed_by=request.user,
+                    review_notes=review_notes
+                )
+            except ValueError as e:
+                error_msg = str(e)
                 if request.content_type == 'application/json':
                     return JsonResponse({'success': False, 'error': error_msg})
                 messages.error(request, error_msg)
                 return redirect('store_manager_transfer_requests')
 
-            # Update transfer request (approve but don't transfer stock yet)
-            transfer_request.status = 'approved'
-            transfer_request.approved_quantity = approved_quantity
-            transfer_request.reviewed_by = request.user
-            transfer_request.reviewed_date = timezone.now()
-            transfer_request.review_notes = review_notes
-            transfer_request.save()
-
             # Note: Stock transfer will happen when the receiving store marks it as completed
             # This ensures the receiving store actually receives the items before stock is updated
 
@@ -1646,6 +1683,9 @@ def approve_store_transfer_request(request, request_id):
 def decline_store_transfer_request(request, request_id):
     """
     Handle transfer request decline by store manager for incoming requests.
+
+    Pending requests are declined by the source store. Approved requests can
+    be cancelled by either store; their reserved units go back on sale.
     """
     if request.user.role != 'store_manager':
         messages.error(request, "Access denied. Store Manager role required.")
@@ -1663,11 +1703,12 @@ def decline_store_transfer_request(request, request_id):
         import json
 
         try:
-            # Get the transfer request - must be FROM this store (source)
+            # Pending requests must be FROM this store (source); approved ones may involve either store
             transfer_request = StoreStockTransferRequest.objects.get(
-                id=request_id,
-                from_store=store,  # This store is the source
-                status='pending'
+                models.Q(from_store=store, status='pending') |
+                models.Q(from_store=store, status='approved') |
+                models.Q(to_store=store, status='approved'),
+                id=request_id
             )
 
             # Parse data
@@ -1685,14 +1726,31 @@ def decline_store_transfer_request(request, request_id):
                 messages.error(request, error_msg)
                 return redirect('store_manager_transfer_requests')
 
-            # Update transfer request
-            transfer_request.status = 'rejected'
-            transfer_request.reviewed_by = request.user
-            transfer_request.reviewed_date = timezone.now()
-            transfer_request.review_notes = review_notes
-            transfer_request.save()
+            if transfer_request.status == 'approved':
+                # Give the reserved units back to the source store under the request lock
+                try:
+                    transfer_request = store_transfer_service.release(
+                        transfer_request,
+                        cancelled_by=request.user,
+                        reason=review_notes
+                    )
+                except ValueError as e:
+                    error_msg = str(e)
+                    if request.content_type == 'application/json':
+                        return JsonResponse({'success': False, 'error': error_msg})
+                    messages.error(request, error_msg)
+                    return redirect('store_manager_transfer_requests')
+
+                success_msg = f"Transfer request #{transfer_request.request_number} cancelled. Reserved stock released."
+            else:
+                # Update transfer request
+                transfer_request.status = 'rejected'
+                transfer_request.reviewed_by = request.user
+                transfer_request.reviewed_date = timezone.now()
+                transfer_request.review_notes = review_notes
+                transfer_request.save()
 
-            success_msg = f"Transfer request #{transfer_request.request_number} declined."
+                success_msg = f"Transfer request #{transfer_request.request_number} declined."
 
             if request.content_type == 'application/json':
                 return JsonResponse({'success': True, 'message': success_msg})
@@ -1751,74 +1809,20 @@ def complete_store_transfer_request(request, request_id):
                 completion_notes = request.POST.get('completion_notes', '').strip()
                 received_quantity = int(request.POST.get('received_quantity', transfer_request.approved_quantity))
 
-            # Validate received quantity
-            if received_quantity <= 0:
-                error_msg = "Received quantity must be greater than 0."
-                if request.content_type == 'application/json':
-                    return JsonResponse({'success': False, 'error': error_msg})
-                messages.error(request, error_msg)
-                return redirect('store_manager_transfer_requests')
-
-            if received_quantity > transfer_request.approved_quantity:
-                error_msg = f"Received quantity ({received_quantity}) cannot exceed approved quantity ({transfer_request.approved_quantity})."
-                if request.content_type == 'application/json':
-                    return JsonResponse({'success': False, 'error': error_msg})
-                messages.error(request, error_msg)
-                return redirect('store_manager_transfer_requests')
-
-            # Now perform the actual stock transfer
-            from Inventory.models import Stock
-            from django.utils import timezone
-
-            # Get source stock (from the sending store)
+            # Move the stock: releases the reservation and updates both stores atomically
             try:
-                source_stock = Stock.objects.get(
-                    store=transfer_request.from_store,
-                    product=transfer_request.product
+                transfer_request = store_transfer_service.complete(
+                    transfer_request,
+                    received_quantity,
+                    completion_notes=completion_notes or f"Transfer completed by {request.user.get_full_name() or request.user.username}. Received {received_quantity} units."
                 )
-            except Stock.DoesNotExist:
-                error_msg = f"Source stock not found for {transfer_request.product.name} in {transfer_request.from_store.name}."
-                if request.content_type == 'application/json':
-                    return JsonResponse({'success': False, 'error': error_msg})
-                messages.error(request, error_msg)
-                return redirect('store_manager_transfer_requests')
-
-            # Check if source store still has enough stock
-            if source_stock.quantity < received_quantity:
-                error_msg = f"Insufficient stock in {transfer_request.from_store.name}. Available: {source_stock.quantity}, Required: {received_quantity}."
+            except ValueError as e:
+                error_msg = str(e)
                 if request.content_type == 'application/json':
                     return JsonResponse({'success': False, 'error': error_msg})
                 messages.error(request, error_msg)
                 return redirect('store_manager_transfer_requests')
 
-            # Perform stock transfer
-            # Reduce stock from source store
-            source_stock.quantity -= received_quantity
-            source_stock.last_updated = timezone.now()
-            source_stock.save()
-
-            # Add stock to destination store (this store)
-            dest_stock, created = Stock.objects.get_or_create(
-                store=store,
-                product=transfer_request.product,
-                defaults={
-                    'quantity': 0,
-                    'low_stock_threshold': 10,
-                    'selling_price': source_stock.selling_price,
-                    'last_updated': timezone.now()
-                }
-            )
-            dest_stock.quantity += received_quantity
-            dest_stock.last_updated = timezone.now()
-            dest_stock.save()
-
-            # Update request status to completed
-            transfer_request.status = 'completed'
-            transfer_request.actual_quantity_transferred = received_quantity
-            transfer_request.received_date = timezone.now()
-            transfer_request.review_notes = completion_notes or f"Transfer completed by {request.user.get_full_name() or request.user.username}. Received {received_quantity} units."
-            transfer_request.save()
-
             # Success response
             success_msg = f"Transfer request {transfer_request.request_number} completed successfully. {received_quantity} units added to your store inventory."
 
@@ -2769,7 +2773,9 @@ def api_tickets_list(request):
             }, status=400)
 
         # Start with all tickets for this store
-        tickets = CustomerTicket.objects.filter(store=store).select_related('store').prefetch_related('items__product')
+        tickets = CustomerTicket.objects.filter(store=store).select_related(
+            'store', 'confirmed_by'
+        ).prefetch_related('items__product')
         print(f"Found {tickets.count()} tickets for store {store.name}")
 
         # Apply search filters
@@ -2821,7 +2827,7 @@ def api_tickets_list(request):
         for ticket in tickets:
             # Get ticket items with product details
             items_data = []
-            for item in ticket.items.select_related('product').all():
+            for item in ticket.items.all():
                 items_data.append({
                     'id': item.id,
                     'product_id': item.product.id,
@@ -2995,6 +3001,10 @@ def api_ticket_update_status(request, ticket_number):
         old_status = ticket.status
         ticket.status = new_status
 
+        # Closed tickets no longer hold stock
+        if new_status in ['completed', 'cancelled'] and old_status not in ['completed', 'cancelled']:
+            stock_reservation_service.release_ticket(ticket)
+
         # Set timestamps based on status
         if new_status == 'confirmed' and old_status == 'pending':
             ticket.confirmed_at = timezone.now()
@@ -3054,6 +3064,9 @@ def api_ticket_process(request, ticket_number):
             return JsonResponse({'success': False, 'error': 'Ticket cannot be processed in current status'}, status=400)
 
         with transaction.atomic():
+            # The ticket's own reservation turns into the sale below
+            stock_reservation_service.release_ticket(ticket)
+
             # Create order
             order = Order.objects.create(
                 cashier=request.user,
@@ -3071,15 +3084,15 @@ def api_ticket_process(request, ticket_number):
                     stock = Stock.objects.get(product=ticket_item.product, store=store)
 
                     # Check if enough stock is available
-                    if stock.quantity < ticket_item.quantity:
+                    if stock.available_quantity < ticket_item.quantity:
+                        transaction.set_rollback(True)
                         return JsonResponse({
                             'success': False,
-                            'error': f'Insufficient stock for {ticket_item.product.name}. Available: {stock.quantity}, Required: {ticket_item.quantity}'
+                            'error': f'Insufficient stock for {ticket_item.product.name}. Available: {stock.available_quantity}, Required: {ticket_item.quantity}'
                         }, status=400)
 
                     # Update stock
-                    stock.quantity -= ticket_item.quantity
-                    stock.save()
+                    store_transfer_service.deduct_for_sale(stock, ticket_item.quantity)
 
                     # Create transaction record
                     Transaction.objects.create(
@@ -3094,6 +3107,7 @@ def api_ticket_process(request, ticket_number):
                     )
 
                 except Stock.DoesNotExist:
+                    transaction.set_rollback(True)
                     return JsonResponse({
                         'success': False,
                         'error': f'Product {ticket_item.product.name} not available in store stock'
@@ -3165,21 +3179,24 @@ def process_ticket_to_order(request, ticket_number):
 
         # Build cart data from ticket
         cart_items = []
+        ticket_stock = stock_reservation_service.ticket_stock(ticket, store)
         for item in ticket.items.all():
             # Check if product exists in current store stock
             try:
-                stock = Stock.objects.get(product=item.product, store=store)
-                if stock.quantity >= item.quantity:
+                stock = ticket_stock.get(item.product_id)
+                if stock is None:
+                    raise Stock.DoesNotExist
+                if stock.available_for_ticket >= item.quantity:
                     cart_items.append({
                         'product_id': item.product.id,
                         'product_name': item.product.name,
                         'price': float(item.unit_price),
                         'quantity': item.quantity,
                         'subtotal': float(item.total_price),
-                        'stock_available': stock.quantity
+                        'stock_available': stock.available_for_ticket
                     })
                 else:
-                    messages.warning(request, f'Insufficient stock for {item.product.name}. Available: {stock.quantity}, Required: {item.quantity}')
+                    messages.warning(request, f'Insufficient stock for {item.product.name}. Available: {stock.available_for_ticket}, Required: {item.quantity}')
             except Stock.DoesNotExist:
                 messages.warning(request, f'Product {item.product.name} not available in current store.')
 
@@ -0,0 +1,72 @@
+"""
+Test cases for the benchmark suite.
+
+This module tests:
+1. The data generator builds a consistent store, catalog and sales history
+2. Every scenario runs without errors and performs its workflow
+3. Reports are compared against a baseline for regressions
+4. Concurrent checkouts each either complete or count as an error
+"""
+
+from django.test import TestCase, TransactionTestCase
+
+from benchmarks.concurrency import run_concurrent_checkouts
+from benchmarks.data import generate
+from benchmarks.runner import compare, percentile, run_benchmarks
+from Inventory.models import RestockRequest
+from payments.models import ChapaTransaction
+from transactions.models import Receipt, Transaction
+from webfront.models import CustomerTicket
+
+
+class BenchmarkSuiteTest(TestCase):
+    """Tests for benchmarks.data and benchmarks.runner."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = generate('tiny')
+
+    def test_generator_builds_sales_history(self):
+        config = self.data['config']
+        expected_sales = config['stores'] * config['months'] * 30 * config['sales_per_day']
+
+        self.assertEqual(Transaction.objects.count(), expected_sales)
+        self.assertEqual(Receipt.objects.count(), expected_sales)
+        self.assertEqual(Transaction.objects.dates('timestamp', 'day').count(), config['months'] * 30)
+
+    def test_all_scenarios_run_cleanly(self):
+        report = run_benchmarks(self.data, iterations=2)
+
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertGreater(result['queries_per_request'], 0, name)
+        self.assertEqual(Transaction.objects.filter(receipt__customer_name='Benchmark').count(), 2)
+        self.assertEqual(CustomerTicket.objects.count(), 2)
+        self.assertEqual(RestockRequest.objects.filter(status='fulfilled').count(), 2)
+        self.assertEqual(ChapaTransaction.objects.filter(status='success').count(), 2)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'scenarios': {'restock_approve': {'p95_ms': 10.0, 'queries_per_request': 12.0, 'errors': 0}}}
+        report = {'scenarios': {'restock_approve': {'p95_ms': 14.0, 'queries_per_request': 15.0, 'errors': 0}}}
+
+        regressions = compare(report, baseline)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(compare(report, baseline, tolerance=0.5)[0], 'restock_approve: queries/request 12.0 -> 15.0')
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 0.5), 3)
+        self.assertEqual(percentile([2, 1], 0.5), 1)
+        self.assertEqual(percentile(list(range(1, 21)), 0.95), 19)
+
+
+class ConcurrentCheckoutTest(TransactionTestCase):
+    """Tests for benchmarks.concurrency."""
+
+    def test_every_checkout_is_accounted_for(self):
+        data = generate('tiny')
+        sales = Transaction.objects.count()
+
+        result = run_concurrent_checkouts(data, workers=2, checkouts=4)
+
+        self.assertEqual(result['completed'] + result['errors'], 4)
+        self.assertEqual(Transaction.objects.count() - sales, result['completed'])
+        self.assertEqual(Receipt.objects.filter(customer_name='Benchmark').count(), result['completed'])
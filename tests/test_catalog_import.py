@@ -0,0 +1,160 @@
+"""
+Test cases for the bulk catalog import.
+
+This module tests:
+1. import_catalog upserts supplier products from CSV on (supplier, product_code)
+2. Rows are validated and deduped in memory and categories created in bulk
+3. Each chunk is written with a fixed number of queries
+4. Products are matched on name and variation from JSONL
+5. Updated products lose their cached landed cost
+6. Re-importing a deactivated product leaves it inactive
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from Inventory.catalog_import import CatalogImporter, generate_product_codes
+from Inventory.models import Product, ProductCategory, ProductCost, Supplier, SupplierProduct
+
+
+class CatalogImportTest(TestCase):
+    """Tests for CatalogImporter and the import_catalog command."""
+
+    def setUp(self):
+        self.supplier = Supplier.objects.create(name='Acme Supplies', email='acme@test.com')
+        self.other = Supplier.objects.create(name='Beta Tools', email='beta@test.com')
+
+    def _write(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', newline='') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _csv(self, rows):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+        return self._write('.csv', buffer.getvalue())
+
+    def _supplier_row(self, code, **overrides):
+        row = {
+            'supplier': 'Acme Supplies',
+            'product_code': code,
+            'product_name': f'Pipe {code}',
+            'category': 'Plumbing Supplies',
+            'unit_price': '12.50',
+            'stock_quantity': '40',
+        }
+        row.update(overrides)
+        return row
+
+    def test_command_upserts_supplier_products(self):
+        SupplierProduct.objects.create(
+            supplier=self.supplier, product_code='P-1', product_name='Old name', description='',
+            category='Old', unit_price=Decimal('1.00'), estimated_delivery_time='1 week'
+        )
+        path = self._csv([
+            self._supplier_row('P-1', product_name='New name'),
+            self._supplier_row('P-2', supplier=str(self.other.pk), category='Tools', stock_quantity='5'),
+            self._supplier_row('P-2', supplier=str(self.other.pk), category='Tools', stock_quantity='6'),
+            self._supplier_row('P-3', unit_price='0'),
+            self._supplier_row('P-4', supplier='Unknown'),
+        ])
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_catalog', path, stdout=out, stderr=err)
+
+        self.assertIn('Imported 2 of 5 rows (1 duplicates, 2 errors)', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+        self.assertIn("Row 5: unknown supplier 'Unknown'", err.getvalue())
+        updated = SupplierProduct.objects.get(supplier=self.supplier, product_code='P-1')
+        self.assertEqual((updated.product_name, updated.unit_price), ('New name', Decimal('12.50')))
+        created = SupplierProduct.objects.get(supplier=self.other, product_code='P-2')
+        self.assertEqual((created.stock_quantity, created.availability_status), (6, 'limited_stock'))
+        self.assertEqual(
+            set(ProductCategory.objects.values_list('name', flat=True)),
+            {'Plumbing Supplies', 'Tools'}
+        )
+
+    def test_chunk_query_count_is_fixed(self):
+        rows = [self._supplier_row(f'C-{i}') for i in range(80)]
+        # small enough for one INSERT under SQLite's 999 parameter limit
+        importer = CatalogImporter('supplier_products', chunk_size=40)
+
+        # per chunk: savepoint, supplier lookup, product upsert, release;
+        # the category is only inserted once
+        with self.assertNumQueries(9):
+            stats = importer.run(rows)
+
+        self.assertEqual(stats['imported'], 80)
+        self.assertEqual(SupplierProduct.objects.count(), 80)
+
+    def test_missing_codes_are_generated_without_collisions(self):
+        rows = [self._supplier_row('') for _ in range(3)]
+
+        CatalogImporter('supplier_products', supplier=self.supplier).run(rows)
+
+        codes = list(SupplierProduct.objects.values_list('product_code', flat=True))
+        self.assertEqual(len(set(codes)), 3)
+        self.assertNotIn(generate_product_codes(self.supplier, 1)[0], codes)
+
+    def test_command_imports_products_from_jsonl(self):
+        Product.objects.create(
+            name='Cement Bag', category='Cement', price=Decimal('5.00'), material='Cement', description=''
+        )
+        lines = [
+            {'name': 'Cement Bag', 'category': 'Cement', 'price': '7.25'},
+            {'name': 'Wire', 'variation': 'Red', 'category': 'Electrical Components', 'price': '3.00'},
+            {'name': 'Wire', 'variation': 'Blue', 'category': 'Electrical', 'price': '3.10'},
+            {'name': 'Bad', 'category': 'Toys', 'price': '1.00'},
+        ]
+        path = self._write('.jsonl', '\n'.join(json.dumps(line) for line in lines))
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command('import_catalog', path, kind='products', stdout=out, stderr=err)
+
+        self.assertIn('Imported 3 of 4 rows', out.getvalue())
+        self.assertEqual(Product.objects.get(name='Cement Bag').price, Decimal('7.25'))
+        self.assertEqual(
+            list(Product.objects.filter(name='Wire').order_by('variation').values_list('variation', 'category')),
+            [('Blue', 'Electrical'), ('Red', 'Electrical')]
+        )
+
+    def test_updated_products_drop_landed_cost(self):
+        updated = Product.objects.create(
+            name='Cement Bag', category='Cement', price=Decimal('5.00'), material='Cement', description=''
+        )
+        untouched = Product.objects.create(
+            name='Sand', category='Cement', price=Decimal('2.00'), material='Sand', description=''
+        )
+        for product in (updated, untouched):
+            ProductCost.objects.create(product=product, unit_cost=product.price * Decimal('0.7'), source='estimated')
+
+        CatalogImporter('products').run([{'name': 'Cement Bag', 'category': 'Cement', 'price': '7.25'}])
+
+        self.assertEqual(list(ProductCost.objects.values_list('product', flat=True)), [untouched.pk])
+
+    def test_reimport_keeps_deactivated_products_inactive(self):
+        Product.objects.create(
+            name='Cement Bag', category='Cement', price=Decimal('5.00'), material='Cement',
+            description='', is_active=False
+        )
+
+        CatalogImporter('products').run([
+            {'name': 'Cement Bag', 'category': 'Cement', 'price': '7.25'},
+            {'name': 'Sand', 'category': 'Cement', 'price': '2.00'},
+        ])
+
+        self.assertEqual(
+            list(Product.objects.order_by('name').values_list('name', 'price', 'is_active')),
+            [('Cement Bag', Decimal('7.25'), False), ('Sand', Decimal('2.00'), True)]
+        )
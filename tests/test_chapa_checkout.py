@@ -0,0 +1,167 @@
+"""
+Test cases for multi-supplier Chapa checkout.
+
+This module tests:
+1. Initialize calls for several suppliers run concurrently against a slow gateway
+2. Transactions and purchase order payments are written for every supplier
+3. Missing suppliers and gateway failures are reported without blocking the rest
+4. A failed database write fails the checkout instead of falling back to mock payments
+5. The batch shares one deadline, and checkouts still in flight at it are recorded as pending
+"""
+
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TransactionTestCase, override_settings
+
+from Inventory.models import Supplier
+from payments.models import ChapaTransaction, PurchaseOrderPayment
+from payments.services import ChapaPaymentService
+from users.models import CustomUser
+
+GATEWAY_DELAY = 0.3
+
+
+class MockChapaHandler(BaseHTTPRequestHandler):
+    """Answers /transaction/initialize after a fixed delay."""
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        time.sleep(GATEWAY_DELAY)
+        if payload['meta']['supplier_name'] == 'Failing Supplier':
+            status, body = 400, {'status': 'failed', 'message': 'Amount rejected'}
+        else:
+            status, body = 200, {
+                'status': 'success',
+                'message': 'Hosted Link',
+                'data': {'checkout_url': f"https://checkout.test/{payload['tx_ref']}"},
+            }
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MultiSupplierCheckoutTest(TransactionTestCase):
+    """Tests for ChapaPaymentService.create_payments_for_cart."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), MockChapaHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.head_manager = CustomUser.objects.create_user(
+            username='head_manager',
+            email='head@test.com',
+            password='testpass123',
+            role='head_manager',
+            first_name='Head',
+            last_name='Manager'
+        )
+        self.suppliers = [
+            Supplier.objects.create(name=f'Supplier {i}', email=f'supplier{i}@test.com')
+            for i in range(5)
+        ]
+
+    def _cart(self, suppliers):
+        return {
+            supplier.id: {
+                'supplier': supplier,
+                'items': [{'product_name': 'Cement', 'price': Decimal('25.50'), 'quantity': 2}],
+            }
+            for supplier in suppliers
+        }
+
+    def test_checkout_initializes_suppliers_concurrently(self):
+        with override_settings(CHAPA_BASE_URL=self.base_url):
+            service = ChapaPaymentService()
+            started = time.monotonic()
+            results = service.create_payments_for_cart(self.head_manager, self._cart(self.suppliers))
+            elapsed = time.monotonic() - started
+
+        self.assertTrue(results['success'], results['errors'])
+        self.assertLess(elapsed, GATEWAY_DELAY * len(self.suppliers))
+        self.assertEqual(
+            [payment['supplier'] for payment in results['payments']],
+            self.suppliers
+        )
+        self.assertEqual(results['total_amount'], Decimal('255.00'))
+        self.assertEqual(ChapaTransaction.objects.count(), 5)
+        self.assertEqual(PurchaseOrderPayment.objects.count(), 5)
+
+        payment = results['payments'][0]
+        self.assertEqual(payment['checkout_url'], f"https://checkout.test/{payment['tx_ref']}")
+        order_payment = PurchaseOrderPayment.objects.get(chapa_transaction__chapa_tx_ref=payment['tx_ref'])
+        self.assertEqual(order_payment.order_items[0]['price'], '25.50')
+
+    def test_failures_are_reported_per_supplier(self):
+        failing = Supplier.objects.create(name='Failing Supplier', email='failing@test.com')
+        cart = self._cart([self.suppliers[0], failing])
+        cart[999999] = {'items': []}
+
+        with override_settings(CHAPA_BASE_URL=self.base_url):
+            results = ChapaPaymentService().create_payments_for_cart(self.head_manager, cart)
+
+        self.assertFalse(results['success'])
+        self.assertEqual(len(results['payments']), 1)
+        self.assertEqual(results['errors'][0]['supplier_id'], 999999)
+        self.assertEqual(results['errors'][1]['supplier'], failing)
+        self.assertEqual(ChapaTransaction.objects.count(), 1)
+
+    def test_database_error_fails_checkout(self):
+        with override_settings(CHAPA_BASE_URL=self.base_url), \
+                mock.patch.object(PurchaseOrderPayment.objects, 'bulk_create', side_effect=IntegrityError('duplicate')):
+            results = ChapaPaymentService().create_payments_for_cart(self.head_manager, self._cart(self.suppliers[:2]))
+
+        self.assertFalse(results['success'])
+        self.assertEqual(results['payments'], [])
+        self.assertEqual([error['supplier'] for error in results['errors']], self.suppliers[:2])
+        self.assertEqual(ChapaTransaction.objects.count(), 0)
+
+    @override_settings(CHAPA_REQUEST_TIMEOUT=0.05, CHAPA_MAX_CONCURRENT_REQUESTS=1)
+    def test_timed_out_checkouts_are_recorded_as_pending(self):
+        fast, slow, queued = self.suppliers[:3]
+        service = ChapaPaymentService()
+
+        def initialize_payment(timeout, **kwargs):
+            if kwargs['meta']['supplier_id'] == slow.id:
+                time.sleep(0.6)
+            return {
+                'success': True,
+                'checkout_url': f"https://checkout.test/{kwargs['tx_ref']}",
+                'tx_ref': kwargs['tx_ref'],
+                'data': {},
+            }
+
+        with mock.patch.object(service.client, 'initialize_payment', side_effect=initialize_payment):
+            started = time.monotonic()
+            results = service.create_payments_for_cart(self.head_manager, self._cart([fast, slow, queued]))
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual([payment['supplier'] for payment in results['payments']], [fast])
+        self.assertEqual([error['supplier'] for error in results['errors']], [slow, queued])
+        pending = ChapaTransaction.objects.get(supplier=slow)
+        self.assertEqual((pending.status, pending.chapa_checkout_url), ('pending', None))
+        self.assertEqual(pending.chapa_response, {'initialize_timed_out': True})
+        self.assertTrue(PurchaseOrderPayment.objects.filter(chapa_transaction=pending).exists())
+        self.assertFalse(ChapaTransaction.objects.filter(supplier=queued).exists())
+        # Let the abandoned worker finish before the test database is flushed
+        time.sleep(0.6)
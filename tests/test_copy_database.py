@@ -0,0 +1,109 @@
+"""
+Test cases for the copy_database command.
+
+This module tests:
+1. Every table is copied with its primary keys and stored timestamps
+2. Copies refuse to overwrite a target that already holds data unless asked to
+3. Copied tables keep accepting new rows
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test import TestCase
+from django.utils import timezone
+
+from Inventory.models import Product
+from store.models import Store
+from transactions.models import Order, Transaction
+from users.models import CustomUser
+
+TARGET = 'copy_target'
+
+
+class CopyDatabaseTest(TestCase):
+    """Tests for manage.py copy_database between two SQLite databases."""
+
+    # Resolved in setUpClass, once the migrated target database is configured
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        settings = dict(connections.settings['default'])
+        settings['NAME'] = os.path.join(cls.directory, 'target.sqlite3')
+        connections.settings[TARGET] = settings
+        call_command('migrate', database=TARGET, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[TARGET].close()
+        del connections[TARGET]
+        del connections.settings[TARGET]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='manager', email='manager@test.com', password='testpass123', role='store_manager'
+        )
+        self.store = Store.objects.create(name='Main Store', address='Main Street', store_manager=self.user)
+        self.product = Product.objects.create(
+            name='Steel Pipe', category='pipes', description='Pipe', price=Decimal('100.00'), material='Steel'
+        )
+        self.sold_at = timezone.now() - timedelta(days=40)
+        for _ in range(5):
+            sale = Transaction.objects.create(
+                transaction_type='sale', quantity=1, total_amount=Decimal('100.00'), store=self.store
+            )
+            Order.objects.create(
+                transaction=sale, product=self.product, quantity=1, price_at_time_of_sale=Decimal('100.00')
+            )
+        Transaction.objects.update(timestamp=self.sold_at)
+
+    def _copy(self, *args):
+        out = StringIO()
+        call_command('copy_database', '--source', 'default', '--target', TARGET, '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_copies_rows_keys_and_timestamps(self):
+        output = self._copy('--exclude', 'sessions.Session')
+
+        self.assertIn('transactions.Transaction: 5 rows', output)
+        copied = Transaction.objects.using(TARGET).order_by('pk')
+        self.assertEqual(
+            list(copied.values_list('pk', flat=True)), list(Transaction.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertTrue(all(sale.timestamp == self.sold_at for sale in copied))
+        self.assertEqual(Store.objects.using(TARGET).get().store_manager.username, 'manager')
+        self.assertEqual(Order.objects.using(TARGET).filter(unit_cost__isnull=False).count(), 5)
+        self.assertEqual(
+            CustomUser.objects.using(TARGET).get().password, CustomUser.objects.get().password
+        )
+
+        # New rows continue after the copied keys
+        store = Store.objects.using(TARGET).create(name='Second Store', address='Second Street')
+        self.assertGreater(store.pk, self.store.pk)
+
+    def test_refuses_to_overwrite_without_truncate(self):
+        self._copy()
+        Transaction.objects.create(
+            transaction_type='sale', quantity=1, total_amount=Decimal('50.00'), store=self.store
+        )
+
+        with self.assertRaises(CommandError):
+            self._copy()
+        self._copy('--truncate')
+        self.assertEqual(Transaction.objects.using(TARGET).count(), 6)
+
+    def test_rejects_same_database(self):
+        with self.assertRaises(CommandError):
+            call_command('copy_database', '--source', 'default', '--target', 'default', stdout=StringIO())
@@ -0,0 +1,95 @@
+"""
+Test cases for cached dashboard KPI blocks.
+
+This module tests:
+1. Head manager and store manager KPIs are computed in a bounded number of queries,
+   with both pending request counts in one statement
+2. Cached KPIs are reused until a request or payment status changes
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from Inventory.models import Product, RestockRequest, Stock, StoreStockTransferRequest
+from store.models import Store
+from transactions.models import Transaction
+from users.dashboard_service import dashboard_kpi_service
+from users.models import CustomUser
+
+
+class DashboardKPIServiceTest(TestCase):
+    """Tests for DashboardKPIService."""
+
+    def setUp(self):
+        cache.clear()
+        self.store_manager = CustomUser.objects.create_user(
+            username='store_manager', email='sm@test.com', password='testpass123', role='store_manager'
+        )
+        self.store = Store.objects.create(name='Store 1', address='Address 1', store_manager=self.store_manager)
+        for i in range(5):
+            product = Product.objects.create(
+                name=f'Product {i}', category='Tools', price=Decimal('10.00'), material='Steel'
+            )
+            Stock.objects.create(product=product, store=self.store, quantity=i, selling_price=Decimal('12.00'))
+            Transaction.objects.create(
+                quantity=1, transaction_type='sale', store=self.store, total_amount=Decimal('12.00')
+            )
+        self.product = product
+
+    def test_store_kpis_use_bounded_queries(self):
+        # sales, stock and request counts, plus the daily trend
+        with self.assertNumQueries(4):
+            kpis = dashboard_kpi_service.get_store_manager_kpis(self.store, 30)
+
+        self.assertEqual(kpis['total_transactions'], 5)
+        self.assertEqual(kpis['total_revenue'], Decimal('60.00'))
+        self.assertEqual(kpis['total_sales_7_days']['total_transactions'], 5)
+        self.assertEqual(kpis['out_of_stock_count'], 1)
+        self.assertEqual(kpis['critical_stock_count'], 4)
+        self.assertEqual(kpis['daily_sales'][-1]['revenue'], 60.0)
+
+        with self.assertNumQueries(0):
+            dashboard_kpi_service.get_store_manager_kpis(self.store, 30)
+
+    def test_pending_requests_are_counted_in_one_query(self):
+        other_store = Store.objects.create(name='Store 2', address='Address 2')
+        for store in (self.store, self.store, other_store):
+            RestockRequest.objects.create(
+                store=store, product=self.product, requested_quantity=5, current_stock=4,
+                requested_by=self.store_manager,
+            )
+        StoreStockTransferRequest.objects.create(
+            product=self.product, from_store=other_store, to_store=self.store,
+            requested_quantity=2, requested_by=self.store_manager
+        )
+        StoreStockTransferRequest.objects.create(
+            product=self.product, from_store=other_store, to_store=self.store,
+            requested_quantity=2, requested_by=self.store_manager, status='approved'
+        )
+        cache.clear()
+
+        # payment totals and both request counts
+        with self.assertNumQueries(2):
+            kpis = dashboard_kpi_service.get_head_manager_kpis()
+        store_kpis = dashboard_kpi_service.get_store_manager_kpis(self.store, 30)
+
+        self.assertEqual((kpis['pending_restock_requests'], kpis['pending_transfer_requests']), (3, 1))
+        self.assertEqual((store_kpis['pending_restock_count'], store_kpis['pending_transfer_count']), (2, 1))
+
+    def test_request_status_change_invalidates_kpis(self):
+        kpis = dashboard_kpi_service.get_head_manager_kpis()
+        self.assertEqual(kpis['pending_restock_requests'], 0)
+
+        RestockRequest.objects.create(
+            store=self.store,
+            product=self.product,
+            requested_quantity=5,
+            current_stock=4,
+            requested_by=self.store_manager,
+        )
+
+        kpis = dashboard_kpi_service.get_head_manager_kpis()
+        self.assertEqual(kpis['pending_restock_requests'], 1)
+        self.assertEqual(kpis['payment_stats']['total_payment_amount'], 0)
@@ -0,0 +1,96 @@
+"""
+Test cases for portable date bucketing.
+
+This module tests:
+1. Day, month, hour and weekday buckets match Python's local time conversion
+2. Buckets follow the active time zone
+3. Bucketed range queries are planned on the timestamp indexes
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from store.models import Store
+from transactions.models import Transaction
+from users.date_buckets import bucket_totals, local_days, start_of_day
+
+
+class DateBucketTest(TestCase):
+    """Tests for users.date_buckets against the configured database backend."""
+
+    def setUp(self):
+        self.store = Store.objects.create(name='Main Store', address='Main Street')
+        base = datetime(2026, 3, 31, 22, 30, tzinfo=dt_timezone.utc)
+        self.moments = [base + timedelta(hours=hours) for hours in (0, 1, 2, 5, 26, 49)]
+        for index, moment in enumerate(self.moments):
+            sale = Transaction.objects.create(
+                transaction_type='sale', quantity=1, total_amount=Decimal(index + 1), store=self.store
+            )
+            Transaction.objects.filter(pk=sale.pk).update(timestamp=moment)
+        self.sales = Transaction.objects.filter(transaction_type='sale')
+
+    def _expected(self, key):
+        totals = {}
+        for index, moment in enumerate(self.moments):
+            local = timezone.localtime(moment)
+            totals[key(local)] = totals.get(key(local), Decimal('0')) + Decimal(index + 1)
+        return totals
+
+    def _check_buckets(self):
+        self.assertEqual(
+            bucket_totals(self.sales, 'timestamp', 'day', 'total_amount'),
+            self._expected(lambda local: local.date())
+        )
+        self.assertEqual(
+            bucket_totals(self.sales, 'timestamp', 'hour', 'total_amount'),
+            self._expected(lambda local: local.hour)
+        )
+        self.assertEqual(
+            bucket_totals(self.sales, 'timestamp', 'weekday', 'total_amount'),
+            self._expected(lambda local: local.isoweekday())
+        )
+        self.assertEqual(
+            {month.date(): total for month, total in bucket_totals(self.sales, 'timestamp', 'month', 'total_amount').items()},
+            self._expected(lambda local: local.date().replace(day=1))
+        )
+
+    def test_buckets_in_utc(self):
+        self._check_buckets()
+
+    def test_buckets_follow_active_time_zone(self):
+        with timezone.override('Africa/Addis_Ababa'):
+            self._check_buckets()
+            # 22:30 UTC on March 31 is already April 1 in Addis Ababa
+            days = bucket_totals(self.sales, 'timestamp', 'day', 'total_amount')
+            self.assertNotIn(datetime(2026, 3, 31).date(), days)
+
+    def test_range_bounds_and_local_days(self):
+        with timezone.override('Africa/Addis_Ababa'):
+            days = local_days(self.moments[0], self.moments[-1])
+            totals = bucket_totals(
+                self.sales, 'timestamp', 'day', 'total_amount', start=start_of_day(days[1]), end=self.moments[-1]
+            )
+
+        self.assertEqual([day.isoformat() for day in days], ['2026-04-01', '2026-04-02', '2026-04-03'])
+        self.assertEqual(totals, {days[1]: Decimal('5'), days[2]: Decimal('6')})
+
+    def test_unknown_bucket(self):
+        with self.assertRaises(ValueError):
+            bucket_totals(self.sales, 'timestamp', 'fortnight', 'total_amount')
+
+    def test_range_query_uses_timestamp_index(self):
+        since = self.moments[2]
+        query = self.sales.filter(store=self.store, timestamp__gte=since)
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            self.assertIn('Index', query.explain())
+        elif connection.vendor == 'sqlite':
+            self.assertIn('USING INDEX transaction_store_i_647f74_idx', query.explain())
+        else:
+            self.skipTest(f'No query plan check for {connection.vendor}')
@@ -0,0 +1,125 @@
+"""
+Test cases for the financial statement engine.
+
+This module tests:
+1. Per-store, daily and category totals of a statement
+2. A statement costs the same number of queries whatever the number of stores and sales
+3. The reports page, its PDF export and the analytics API share one cached statement
+4. Unknown periods fall back to 30 days
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from Inventory.models import Product
+from store.models import Store
+from transactions.models import FinancialRecord, Order, Transaction
+from users.financial_statements import financial_statement_service
+from users.models import CustomUser
+
+
+@override_settings(FINANCIAL_STATEMENT_CACHE_SECONDS=300)
+class FinancialStatementTest(TestCase):
+    """Tests for FinancialStatementService and the views built on it."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123',
+            role='head_manager', is_first_login=False
+        )
+        self.north = Store.objects.create(name='North Store', address='North Street')
+        self.south = Store.objects.create(name='South Store', address='South Street')
+        self.pipe = Product.objects.create(
+            name='Steel Pipe', category='pipes', description='Pipe', price=Decimal('100.00'), material='Steel'
+        )
+        self.paint = Product.objects.create(
+            name='Wall Paint', category='paint', description='Paint', price=Decimal('20.00'), material='Latex'
+        )
+        self.client = Client()
+        self.client.login(username='head', password='testpass123')
+
+    def _sell(self, store, product, quantity, days_ago=0):
+        total = product.price * quantity
+        sale = Transaction.objects.create(
+            transaction_type='sale', quantity=quantity, total_amount=total, store=store, payment_type='cash'
+        )
+        Order.objects.create(
+            transaction=sale, product=product, quantity=quantity, price_at_time_of_sale=product.price
+        )
+        if days_ago:
+            Transaction.objects.filter(pk=sale.pk).update(timestamp=timezone.now() - timedelta(days=days_ago))
+        return sale
+
+    def _expense(self, store, amount):
+        return FinancialRecord.objects.create(store=store, amount=Decimal(amount), record_type='expense')
+
+    def _statement(self, period='30'):
+        return financial_statement_service.compute(
+            timezone.now() - timedelta(days=int(period)), timezone.now() + timedelta(minutes=1)
+        )
+
+    def test_statement_totals(self):
+        self._sell(self.north, self.pipe, 2)
+        self._sell(self.north, self.paint, 5)
+        self._sell(self.south, self.paint, 1, days_ago=3)
+        self._sell(self.south, self.pipe, 1, days_ago=60)
+        self._expense(self.north, '50.00')
+
+        statement = self._statement()
+        north, south = statement['stores']
+
+        self.assertEqual(north['store'], self.north)
+        self.assertEqual(north['revenue'], Decimal('300.00'))
+        self.assertEqual(north['expenses'], Decimal('50.00'))
+        self.assertEqual(north['profit_loss'], Decimal('250.00'))
+        # No warehouse match: cost of goods assumes a 25% margin
+        self.assertEqual(north['net_profit'], Decimal('75.00'))
+        self.assertEqual(south['revenue'], Decimal('20.00'))
+        self.assertEqual(statement['totals']['total_revenue'], Decimal('320.00'))
+        self.assertEqual(statement['totals']['profitable_stores'], 2)
+        self.assertEqual(
+            statement['revenue_breakdown']['category_revenue'],
+            [{'category': 'paint', 'revenue': 120.0}, {'category': 'pipes', 'revenue': 200.0}]
+        )
+        self.assertEqual(sum(day['revenue'] for day in statement['daily']), 320.0)
+        self.assertEqual(statement['daily'][-1]['net_profit'], 75.0)
+
+    def test_statement_queries_are_constant(self):
+        def statement_queries():
+            with self.assertNumQueries(10):
+                self._statement()
+
+        self._sell(self.north, self.pipe, 1)
+        statement_queries()
+
+        for index in range(5):
+            store = Store.objects.create(name=f'Store {index}', address='Street')
+            self._sell(store, self.pipe, 1, days_ago=index)
+            self._sell(store, self.paint, 2, days_ago=index + 10)
+            self._expense(store, '10.00')
+        statement_queries()
+
+    def test_views_share_cached_statement(self):
+        self._sell(self.north, self.pipe, 2)
+
+        response = self.client.get(reverse('financial_reports'), {'period': '7'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['financial_metrics']['total_revenue'], Decimal('200.00'))
+
+        # The API reuses the page's statement: only session and user lookups run
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('analytics_api'), {'type': 'store_comparison', 'period': '7'})
+        self.assertEqual(response.json()['data'], [200.0, 0.0])
+
+    def test_unknown_period_falls_back_to_thirty_days(self):
+        self.assertEqual(financial_statement_service.normalize_period('bogus'), '30')
+        statement = financial_statement_service.get_statement('bogus')
+
+        self.assertEqual(statement['period'], '30')
+        self.assertEqual(statement['end_date'] - statement['start_date'], timedelta(days=30))
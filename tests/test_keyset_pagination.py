@@ -0,0 +1,179 @@
+"""
+Test cases for keyset pagination of the audit and payment history pages.
+
+This module tests:
+1. Cursors walk every row exactly once, forwards and backwards, across timestamp ties
+2. Malformed cursors fall back to the first page
+3. Login log and payment history pages cost the same at any depth and count with one aggregate
+4. Filtered cursor queries are planned on the composite indexes
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from Inventory.models import Supplier
+from payments.models import ChapaTransaction
+from users.keyset_pagination import paginate_keyset
+from users.models import CustomUser, LoginLog
+
+
+class KeysetPaginationTest(TestCase):
+    """Tests for users.keyset_pagination."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            username='admin', email='admin@test.com', password='testpass123', role='admin', is_first_login=False
+        )
+        now = timezone.now()
+        # Pairs of logs share a timestamp, so only the id breaks the tie
+        LoginLog.objects.bulk_create([
+            LoginLog(
+                user=self.admin if index % 3 else None,
+                username_attempted=f'user{index}',
+                login_timestamp=now - timedelta(minutes=index // 2),
+                login_status='success' if index % 4 else 'failed',
+                user_role='admin',
+            )
+            for index in range(57)
+        ])
+        self.ordering = ['-login_timestamp', '-id']
+        self.expected = list(LoginLog.objects.order_by(*self.ordering).values_list('id', flat=True))
+
+    def test_walks_forwards_and_backwards(self):
+        pages, cursor = [], None
+        while True:
+            page = paginate_keyset(LoginLog.objects.all(), self.ordering, cursor=cursor, per_page=10)
+            pages.append(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual([log.id for page in pages for log in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 10, 10, 10, 7])
+        self.assertFalse(pages[0].has_previous)
+
+        back = paginate_keyset(LoginLog.objects.all(), self.ordering, cursor=pages[2].previous_cursor, per_page=10)
+        self.assertEqual([log.id for log in back], [log.id for log in pages[1]])
+        first = paginate_keyset(LoginLog.objects.all(), self.ordering, cursor=pages[1].previous_cursor, per_page=10)
+        self.assertEqual([log.id for log in first], [log.id for log in pages[0]])
+        self.assertFalse(first.has_previous)
+        self.assertTrue(first.has_next)
+
+    def test_secondary_sort_field(self):
+        ordering = ['username_attempted', '-login_timestamp', '-id']
+        expected = list(LoginLog.objects.order_by(*ordering).values_list('id', flat=True))
+
+        seen, cursor = [], None
+        while True:
+            page = paginate_keyset(LoginLog.objects.all(), ordering, cursor=cursor, per_page=8)
+            seen += [log.id for log in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursor_starts_over(self):
+        for cursor in ('not-a-cursor', 'e30', 'eyJkIjoibmV4dCIsImsiOlsieCIsIjEiXX0'):
+            page = paginate_keyset(LoginLog.objects.all(), self.ordering, cursor=cursor, per_page=10)
+            self.assertEqual([log.id for log in page], self.expected[:10])
+
+    def test_ordering_must_end_with_unique_field(self):
+        with self.assertRaises(ValueError):
+            paginate_keyset(LoginLog.objects.all(), ['-login_timestamp'])
+
+    def test_login_logs_page(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin_login_logs')
+
+        with CaptureQueriesContext(connection) as first_page:
+            response = self.client.get(url, {'status': 'success'})
+        cursor = response.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as next_page:
+            deeper = self.client.get(url, {'status': 'success', 'cursor': cursor})
+
+        successful = LoginLog.objects.filter(login_status='success')
+        self.assertEqual(response.context['total_logs'], successful.count())
+        self.assertEqual(response.context['successful_logs'], successful.count())
+        self.assertEqual(response.context['failed_logs'], 0)
+        self.assertEqual(len(response.context['page_obj']), 25)
+        self.assertEqual(
+            [log.id for log in deeper.context['page_obj']],
+            list(successful.order_by('-login_timestamp', '-id').values_list('id', flat=True)[25:50])
+        )
+        self.assertEqual(len(next_page.captured_queries), len(first_page.captured_queries))
+
+    def test_login_logs_user_filter(self):
+        self.client.force_login(self.admin)
+
+        response = self.client.get(reverse('admin_login_logs'), {'user': self.admin.pk})
+
+        self.assertEqual(response.context['total_logs'], LoginLog.objects.filter(user=self.admin).count())
+
+    def test_filtered_cursor_query_uses_composite_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest(f'No query plan check for {connection.vendor}')
+        query = LoginLog.objects.filter(login_status='failed').order_by(*self.ordering)
+
+        self.assertIn('USING INDEX users_login_login_s_4b0794_idx', query.explain())
+
+
+class PaymentHistoryPaginationTest(TestCase):
+    """Tests for the keyset-paginated payments.views.payment_history."""
+
+    def setUp(self):
+        self.head_manager = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123', role='head_manager', is_first_login=False
+        )
+        self.supplier = Supplier.objects.create(name='Cement Supplier', email='cement@test.com')
+        statuses = ['success', 'pending', 'failed']
+        for index in range(40):
+            ChapaTransaction.objects.create(
+                chapa_tx_ref=f'EZM-HISTORY-{index}',
+                amount=Decimal('100.00') + index,
+                description='History test',
+                user=self.head_manager,
+                supplier=self.supplier,
+                status=statuses[index % 3],
+                webhook_data={'payment_method': 'telebirr' if index % 2 else 'cbebirr'},
+                customer_email='head@test.com',
+                customer_first_name='Head',
+                customer_last_name='Manager',
+            )
+        self.client.force_login(self.head_manager)
+
+    def test_statistics_and_pages(self):
+        url = reverse('payment_history')
+        response = self.client.get(url)
+        page = response.context['transactions']
+        second = self.client.get(url, {'cursor': page.next_cursor}).context['transactions']
+        third = self.client.get(url, {'cursor': second.next_cursor}).context['transactions']
+
+        successful = ChapaTransaction.objects.filter(status='success')
+        self.assertEqual(response.context['total_transactions'], 40)
+        self.assertEqual(response.context['successful_transactions'], successful.count())
+        self.assertEqual(response.context['pending_transactions'], ChapaTransaction.objects.filter(status='pending').count())
+        self.assertEqual(response.context['failed_transactions'], ChapaTransaction.objects.filter(status='failed').count())
+        self.assertEqual(response.context['total_amount'], sum(t.amount for t in successful))
+        self.assertEqual(response.context['payment_methods'], ['cbebirr', 'telebirr'])
+        self.assertEqual(
+            [t.pk for t in list(page) + list(second) + list(third)],
+            list(ChapaTransaction.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        )
+        self.assertFalse(third.has_next)
+
+    def test_status_and_date_filters(self):
+        today = timezone.localdate().isoformat()
+
+        response = self.client.get(
+            reverse('payment_history'), {'status': 'failed', 'date_from': today, 'date_to': today}
+        )
+
+        self.assertEqual(response.context['total_transactions'], ChapaTransaction.objects.filter(status='failed').count())
+        self.assertTrue(all(t.status == 'failed' for t in response.context['transactions']))
@@ -0,0 +1,61 @@
+"""
+Test cases for the set-based store low-stock alert sweep.
+
+This module tests:
+1. Alerts are created for every low-stock row in a constant number of queries
+2. Re-running the sweep does not duplicate alerts
+3. Alerts for recovered stock are deactivated
+"""
+
+from decimal import Decimal
+
+from django.test import TestCase
+
+from Inventory.models import Product, Stock, SystemNotification
+from store.models import Store
+from users.notifications import NotificationManager, NotificationTriggers
+
+
+class LowStockSweepTest(TestCase):
+    """Tests for NotificationTriggers.check_low_stock_alerts."""
+
+    def setUp(self):
+        NotificationManager.get_category('low_stock_alert')
+        self.stocks = []
+        for s in range(2):
+            store = Store.objects.create(name=f'Store {s}', address=f'Address {s}')
+            for p in range(6):
+                product, _ = Product.objects.get_or_create(
+                    name=f'Product {p}',
+                    defaults={'category': 'Tools', 'price': Decimal('10.00'), 'material': 'Steel'}
+                )
+                # Quantities 0..5 low (0 is out of stock and skipped), plus one healthy row
+                quantity = p if p < 5 else 50
+                self.stocks.append(Stock.objects.create(
+                    product=product, store=store, quantity=quantity, selling_price=Decimal('12.00')
+                ))
+
+    def _active_alert_ids(self):
+        return set(SystemNotification.objects.filter(
+            notification_type='low_stock_alert', is_active=True
+        ).values_list('related_object_id', flat=True))
+
+    def test_sweep_creates_alerts_in_constant_queries(self):
+        # select low-stock rows, category lookup, bulk insert, resolve update
+        with self.assertNumQueries(4):
+            summary = NotificationTriggers.check_low_stock_alerts()
+
+        expected = {stock.id for stock in self.stocks if 0 < stock.quantity <= 10}
+        self.assertEqual(summary['created'], len(expected))
+        self.assertEqual(self._active_alert_ids(), expected)
+
+    def test_sweep_is_idempotent_and_resolves_recovered_stock(self):
+        NotificationTriggers.check_low_stock_alerts()
+        recovered = self.stocks[1]
+        recovered.quantity = 100
+        recovered.save()
+
+        summary = NotificationTriggers.check_low_stock_alerts()
+
+        self.assertEqual(summary, {'created': 0, 'resolved': 1})
+        self.assertNotIn(recovered.id, self._active_alert_ids())
@@ -0,0 +1,122 @@
+"""
+Test cases for cost-of-goods snapshots on sale lines.
+
+This module tests:
+1. Sale lines freeze their unit cost at checkout with the original margin rules
+2. Store net profit is one aggregate whatever the number of lines
+3. Delivered purchase prices and warehouse price changes reach new sales only
+4. The backfill command freezes costs on historical lines
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from Inventory.models import (
+    Product, ProductCost, PurchaseOrder, PurchaseOrderItem, Supplier, WarehouseProduct
+)
+from store.models import Store
+from transactions.models import Order, Transaction
+from users.models import CustomUser
+from users.views import calculate_net_profit_for_store
+
+
+class OrderCostTest(TestCase):
+    """Tests for LandedCostService and calculate_net_profit_for_store."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123', role='head_manager'
+        )
+        self.store = Store.objects.create(name='Main Store', address='Main Street')
+        self.supplier = Supplier.objects.create(name='Acme Supplies', email='acme@test.com')
+        self.pipe = Product.objects.create(
+            name='Steel Pipe', category='pipes', description='Pipe', price=Decimal('100.00'), material='Steel'
+        )
+        self.valve = Product.objects.create(
+            name='Brass Valve', category='valves', description='Valve', price=Decimal('50.00'), material='Brass'
+        )
+        self.paint = Product.objects.create(
+            name='Wall Paint', category='paint', description='Paint', price=Decimal('20.00'), material='Latex'
+        )
+        self.pipe_listing = self._warehouse_product('Steel Pipe', '60.00')
+        self._warehouse_product('Brass Valve', '80.00')
+
+    def _warehouse_product(self, name, unit_price):
+        return WarehouseProduct.objects.create(
+            product_id=f'WH-{name}', sku=f'SKU-{name}', product_name=name, category='pipes',
+            quantity_in_stock=100, unit_price=Decimal(unit_price), supplier=self.supplier
+        )
+
+    def _sell(self, product, price, quantity=1):
+        sale = Transaction.objects.create(
+            transaction_type='sale', quantity=quantity, total_amount=Decimal(price) * quantity,
+            store=self.store, payment_type='cash'
+        )
+        return Order.objects.create(
+            transaction=sale, product=product, quantity=quantity, price_at_time_of_sale=Decimal(price)
+        )
+
+    def _profit(self):
+        now = timezone.now()
+        return calculate_net_profit_for_store(self.store, now - timedelta(days=1), now + timedelta(days=1))
+
+    def test_checkout_freezes_unit_cost(self):
+        pipe_line = self._sell(self.pipe, '100.00', quantity=2)
+        valve_line = self._sell(self.valve, '50.00')
+        paint_line = self._sell(self.paint, '20.00')
+
+        self.assertEqual(pipe_line.unit_cost, Decimal('60.00'))
+        # Warehouse cost above the sale price assumes a 30% margin
+        self.assertEqual(valve_line.unit_cost, Decimal('35.00'))
+        # No warehouse match assumes a 25% margin
+        self.assertEqual(paint_line.unit_cost, Decimal('15.00'))
+        self.assertEqual(self._profit(), Decimal('80.00') + Decimal('15.00') + Decimal('5.00'))
+
+    def test_profit_is_constant_in_queries(self):
+        for _ in range(10):
+            self._sell(self.pipe, '100.00')
+
+        # one check for unfrozen lines, one aggregate
+        with self.assertNumQueries(2):
+            self.assertEqual(self._profit(), Decimal('400.00'))
+
+    def test_price_changes_only_affect_new_sales(self):
+        first = self._sell(self.pipe, '100.00')
+
+        order = PurchaseOrder.objects.create(
+            order_number='PO-1', supplier=self.supplier, created_by=self.user
+        )
+        PurchaseOrderItem.objects.create(
+            purchase_order=order, warehouse_product=self.pipe_listing, quantity_ordered=10, unit_price=Decimal('70.00')
+        )
+        order.status = 'delivered'
+        order.save()
+        second = self._sell(self.pipe, '100.00')
+
+        self.pipe_listing.unit_price = Decimal('65.00')
+        self.pipe_listing.save()
+        third = self._sell(self.pipe, '100.00')
+
+        first.refresh_from_db()
+        self.assertEqual(first.unit_cost, Decimal('60.00'))
+        self.assertEqual(second.unit_cost, Decimal('70.00'))
+        # The delivered purchase price still wins over the warehouse price
+        self.assertEqual(third.unit_cost, Decimal('70.00'))
+        self.assertEqual(ProductCost.objects.get(product=self.pipe).source, 'purchase_order')
+
+    def test_backfill_command_freezes_history(self):
+        lines = [self._sell(self.pipe, '100.00') for _ in range(3)]
+        Order.objects.filter(pk__in=[line.pk for line in lines]).update(unit_cost=None)
+        ProductCost.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_order_costs', '--batch-size', '2', '--refresh-costs', stdout=out)
+
+        self.assertIn('Froze unit costs on 3 sale lines', out.getvalue())
+        self.assertFalse(Order.objects.filter(unit_cost__isnull=True).exists())
+        self.assertEqual(self._profit(), Decimal('120.00'))
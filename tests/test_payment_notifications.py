@@ -0,0 +1,111 @@
+"""
+Test cases for bulk supplier payment notifications.
+
+This module tests:
+1. Related rows are loaded up front instead of per transaction
+2. Every message is delivered through the locmem backend with per-item results
+3. Throughput figures are reported
+4. Render failures keep their input position and skipped items are not counted as sent
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+
+from Inventory.models import Supplier
+from payments.models import ChapaTransaction, PurchaseOrderPayment
+from payments.notification_service import SupplierNotificationService
+from users.models import CustomUser
+
+
+class BulkPaymentNotificationTest(TestCase):
+    """Tests for SupplierNotificationService.send_bulk_notification."""
+
+    def setUp(self):
+        self.head_manager = CustomUser.objects.create_user(
+            username='head_manager',
+            email='head@test.com',
+            password='testpass123',
+            role='head_manager',
+            first_name='Head',
+            last_name='Manager'
+        )
+        self.transactions = []
+        for i in range(5):
+            supplier = Supplier.objects.create(name=f'Supplier {i}', email=f'supplier{i}@test.com')
+            transaction = ChapaTransaction.objects.create(
+                chapa_tx_ref=f'EZM-BULK-{i}',
+                amount=Decimal('100.00') + i,
+                description=f'Payment {i}',
+                user=self.head_manager,
+                supplier=supplier,
+                status='success',
+                customer_email=self.head_manager.email,
+                customer_first_name='Head',
+                customer_last_name='Manager',
+            )
+            PurchaseOrderPayment.objects.create(
+                chapa_transaction=transaction,
+                supplier=supplier,
+                user=self.head_manager,
+                order_items=[{'product_name': f'Item {i}', 'quantity': 2, 'price': 50}],
+                subtotal=transaction.amount,
+                total_amount=transaction.amount,
+            )
+            self.transactions.append(transaction)
+        self.service = SupplierNotificationService()
+
+    def test_bulk_send_uses_single_prefetch_query(self):
+        ids = [transaction.pk for transaction in self.transactions]
+
+        with self.assertNumQueries(1):
+            results = self.service.send_bulk_notification(ids, max_workers=3)
+
+        self.assertEqual(results['sent'], 5)
+        self.assertEqual(results['failed'], 0)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_bulk_send_reports_per_item_results_in_order(self):
+        results = self.service.send_bulk_notification(self.transactions)
+
+        refs = [item['transaction_ref'] for item in results['results']]
+        self.assertEqual(refs, [transaction.chapa_tx_ref for transaction in self.transactions])
+        self.assertTrue(all(item['status'] == 'sent' for item in results['results']))
+        self.assertGreaterEqual(results['elapsed_seconds'], 0)
+        self.assertGreater(results['per_second'], 0)
+
+        recipients = sorted(message.to[0] for message in mail.outbox)
+        self.assertEqual(recipients, [f'supplier{i}@test.com' for i in range(5)])
+        self.assertIn('Item 0', next(m.body for m in mail.outbox if m.to == ['supplier0@test.com']))
+
+    def test_unknown_notification_type_fails_each_item(self):
+        results = self.service.send_bulk_notification(self.transactions, notification_type='bogus')
+
+        self.assertEqual(results['failed'], 5)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_failed_renders_keep_input_order(self):
+        build = self.service._build_payment_confirmation_message
+
+        def render(transaction, order_payment):
+            if transaction.chapa_tx_ref == 'EZM-BULK-3':
+                raise ValueError('template missing')
+            return build(transaction, order_payment)
+
+        with mock.patch.object(self.service, '_build_payment_confirmation_message', side_effect=render):
+            results = self.service.send_bulk_notification(self.transactions, max_workers=2)
+
+        self.assertEqual(
+            [(item['transaction_ref'], item['status']) for item in results['results']],
+            [(f'EZM-BULK-{i}', 'failed' if i == 3 else 'sent') for i in range(5)]
+        )
+        self.assertEqual((results['sent'], results['failed']), (4, 1))
+
+    def test_status_change_items_are_skipped_not_sent(self):
+        results = self.service.send_bulk_notification(self.transactions, notification_type='status_change')
+
+        self.assertEqual((results['sent'], results['failed'], results['skipped']), (0, 0, 5))
+        self.assertTrue(all(item['status'] == 'skipped' for item in results['results']))
+        self.assertEqual(len(mail.outbox), 0)
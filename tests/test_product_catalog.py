@@ -0,0 +1,138 @@
+"""
+Test cases for the in-process product catalog snapshot.
+
+This module tests:
+1. Lookups between catalog changes cost no queries
+2. Product saves and deletes move the version and refresh the snapshot
+3. Snapshots older than PRODUCT_CATALOG_MAX_AGE are rebuilt without a version change
+4. POS and webfront pages read product metadata from the snapshot
+5. Recording a POS sale reads the product from the database, not the snapshot
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from Inventory.models import Product, Stock
+from Inventory.product_catalog import CatalogProduct, product_catalog
+from store.models import Store
+from users.models import CustomUser
+
+
+class ProductCatalogTest(TestCase):
+    """Tests for ProductCatalogService."""
+
+    def setUp(self):
+        cache.clear()
+        self.cement = Product.objects.create(
+            name='Cement', category='building_materials', price=Decimal('450.00'), material='Concrete'
+        )
+        self.pipe = Product.objects.create(
+            name='Pipe', category='plumbing', price=Decimal('120.50'), material='PVC', is_active=False
+        )
+        Product.objects.create(name='Anchor', category='building_materials', price=Decimal('5.00'), material='Steel')
+
+    def test_lookups_cost_no_queries_after_build(self):
+        with self.assertNumQueries(1):
+            product_catalog.products()
+
+        with self.assertNumQueries(0):
+            cement = product_catalog.get(self.cement.pk)
+            names = [product.name for product in product_catalog.products()]
+            active = [product.name for product in product_catalog.products(active_only=True)]
+            categories = product_catalog.categories()
+            missing = product_catalog.get(999999)
+            invalid = product_catalog.get('abc')
+
+        self.assertIsInstance(cement, CatalogProduct)
+        self.assertEqual((cement.pk, cement.price, cement.is_active), (self.cement.pk, Decimal('450.00'), True))
+        self.assertEqual(names, ['Anchor', 'Cement', 'Pipe'])
+        self.assertEqual(active, ['Anchor', 'Cement'])
+        self.assertEqual(categories, ('building_materials', 'plumbing'))
+        self.assertIsNone(missing)
+        self.assertIsNone(invalid)
+        with self.assertRaises(AttributeError):
+            cement.description = 'Not part of the snapshot'
+
+    def test_save_and_delete_refresh_snapshot(self):
+        product_catalog.products()
+
+        self.cement.price = Decimal('475.00')
+        self.cement.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(product_catalog.get(self.cement.pk).price, Decimal('475.00'))
+
+        self.pipe.delete()
+        self.assertIsNone(product_catalog.get(self.pipe.pk))
+        self.assertEqual(product_catalog.count(), 2)
+
+    @override_settings(PRODUCT_CATALOG_MAX_AGE=60)
+    def test_snapshot_expires_after_max_age(self):
+        product_catalog.products()
+        # Another process with its own cache changed the price; the version here never moves
+        Product.objects.filter(pk=self.cement.pk).update(price=Decimal('500.00'))
+        built_at = product_catalog.snapshot().built_at
+
+        with mock.patch('Inventory.product_catalog.time.monotonic', return_value=built_at + 59):
+            with self.assertNumQueries(0):
+                self.assertEqual(product_catalog.get(self.cement.pk).price, Decimal('450.00'))
+        with mock.patch('Inventory.product_catalog.time.monotonic', return_value=built_at + 60):
+            with self.assertNumQueries(1):
+                self.assertEqual(product_catalog.get(self.cement.pk).price, Decimal('500.00'))
+
+
+class CatalogReadsTest(TestCase):
+    """Tests for the POS and webfront views reading the catalog snapshot."""
+
+    def setUp(self):
+        cache.clear()
+        self.store = Store.objects.create(name='Store 1', address='Address 1')
+        self.cashier = CustomUser.objects.create_user(
+            username='cashier', email='cashier@test.com', password='testpass123', role='cashier',
+            store=self.store, is_first_login=False
+        )
+        self.product = Product.objects.create(
+            name='Cement', category='building_materials', price=Decimal('450.00'), material='Concrete'
+        )
+
+    def test_product_price(self):
+        url = reverse('get_product_price', args=[self.product.pk])
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response.json(), {'price': '450.00'})
+        self.assertEqual(self.client.get(reverse('get_product_price', args=[999999])).status_code, 404)
+
+    def test_process_sale_lists_snapshot_products(self):
+        self.client.force_login(self.cashier)
+
+        response = self.client.get(reverse('process_sale'))
+
+        self.assertEqual([product.id for product in response.context['products']], [self.product.pk])
+        self.assertContains(response, 'Cement')
+
+    def test_process_sale_post_reads_product_from_database(self):
+        Stock.objects.create(product=self.product, store=self.store, quantity=3, selling_price=Decimal('500.00'))
+        self.client.force_login(self.cashier)
+        self.client.get(reverse('process_sale'))
+        # A queryset update skips save(), so the snapshot still has the old name
+        Product.objects.filter(pk=self.product.pk).update(name='Portland Cement')
+
+        response = self.client.post(reverse('process_sale'), {'product': [self.product.pk], 'quantity': ['5']})
+
+        self.assertEqual(response.context['error'], 'Not enough Portland Cement in stock.')
+        self.assertEqual(
+            self.client.post(reverse('process_sale'), {'product': [999999], 'quantity': ['1']}).status_code, 404
+        )
+
+    def test_webfront_counts_and_categories(self):
+        home = self.client.get(reverse('webfront:home'))
+        stocks = self.client.get(reverse('webfront:stock_list'))
+
+        self.assertEqual(home.context['total_products'], 1)
+        self.assertEqual(list(stocks.context['categories']), ['building_materials'])
@@ -0,0 +1,82 @@
+"""
+Test cases for the cached product picker.
+
+This module tests:
+1. The per-store index is cached and rebuilt after stock changes
+2. The product APIs return the cached index as {'products': [...]}
+3. Request forms offer only the products the store may pick
+"""
+
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.urls import reverse
+
+from Inventory.forms import RestockRequestForm, StoreStockTransferRequestForm
+from Inventory.models import Product, Stock
+from Inventory.product_picker import product_picker_service
+from store.models import Store
+from users.models import CustomUser
+
+
+class ProductPickerTest(TestCase):
+    """Tests for ProductPickerService and the picker-backed request forms."""
+
+    def setUp(self):
+        cache.clear()
+        self.manager = CustomUser.objects.create_user(
+            username='store_manager', email='sm@test.com', password='testpass123', role='store_manager',
+            is_first_login=False
+        )
+        self.store = Store.objects.create(name='Store 1', address='Address 1', store_manager=self.manager)
+        self.other_store = Store.objects.create(name='Store 2', address='Address 2')
+        self.products = [
+            Product.objects.create(
+                name=f'Cement {i:02d}', category='Cement', price=Decimal('10.00'), material='Concrete'
+            )
+            for i in range(12)
+        ]
+        for product in self.products[:10]:
+            Stock.objects.create(product=product, store=self.other_store, quantity=5, selling_price=Decimal('12.00'))
+        self.own_only = self.products[10]
+        Stock.objects.create(product=self.own_only, store=self.store, quantity=5, selling_price=Decimal('12.00'))
+
+    def test_index_is_cached_until_stock_changes(self):
+        product_picker_service.get_products('transfer', self.store)
+        with self.assertNumQueries(0):
+            rows = product_picker_service.get_products('transfer', self.store)
+        self.assertEqual(len(rows), 10)
+
+        Stock.objects.create(product=self.products[11], store=self.other_store, quantity=1, selling_price=Decimal('1'))
+
+        self.assertIn(
+            self.products[11].pk, [row['id'] for row in product_picker_service.get_products('transfer', self.store)]
+        )
+
+    def test_api_returns_cached_products(self):
+        self.client.login(username='store_manager', password='testpass123')
+        self.client.get(reverse('get_transfer_products'))
+
+        # session, user (loaded twice by the middleware) and store lookups;
+        # the index itself comes from the cache
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('get_transfer_products'))
+        data = json.loads(response.content)
+
+        self.assertEqual(list(data), ['products'])
+        self.assertEqual([p['name'] for p in data['products']], [f'Cement {i:02d}' for i in range(10)])
+        self.assertEqual(set(data['products'][0]), {'id', 'name', 'category', 'price'})
+
+    def test_forms_offer_only_pickable_products(self):
+        transfer_form = StoreStockTransferRequestForm(from_store=self.store)
+        restock_form = RestockRequestForm(store=self.store)
+
+        self.assertEqual(list(transfer_form.fields['product'].queryset), self.products[:10])
+        self.assertNotIn(self.own_only, restock_form.fields['product'].queryset)
+
+        # Stocked only in the requesting store, so not transferable to it
+        with self.assertRaises(ValidationError):
+            transfer_form.fields['product'].clean(str(self.own_only.pk))
@@ -0,0 +1,39 @@
+"""
+Test cases for endpoint query budgets.
+
+This module tests:
+1. Every endpoint in benchmarks/query_budgets.json stays within its budget
+2. Endpoint query counts do not grow when products, sales and tickets double
+3. The guard catches a query-per-row loop
+"""
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from benchmarks.data import add_tickets, generate, grow
+from benchmarks.query_budget import QueryBudgetMixin, role_clients
+from Inventory.models import Product
+
+
+# Statements are cached per period; recompute them so growth is measured
+@override_settings(FINANCIAL_STATEMENT_CACHE_SECONDS=0)
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Tests for benchmarks.query_budget against generated data."""
+
+    def setUp(self):
+        cache.clear()
+        self.data = generate('tiny')
+        add_tickets(self.data)
+
+    def test_endpoints_within_budget_at_two_scales(self):
+        self.assertEndpointBudgets(role_clients(self.data), lambda: grow(self.data))
+
+    def test_guard_detects_query_per_row(self):
+        def list_stock():
+            for product in Product.objects.all():
+                list(product.stock_levels.all())
+
+        with self.assertRaises(AssertionError):
+            self.assertQueriesDoNotGrow(list_stock, lambda: grow(self.data))
+        with self.assertRaises(AssertionError):
+            self.assertMaxQueries(5, list_stock)
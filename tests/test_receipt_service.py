@@ -0,0 +1,110 @@
+"""
+Test cases for cached payment receipt and invoice PDFs.
+
+This module tests:
+1. Completed payment receipts are rendered once and then served from disk
+2. Pending payments are never cached
+3. Pre-rendering stores both receipt and invoice
+4. The pre-render thread closes its database connection even with persistent connections
+"""
+
+import shutil
+import tempfile
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TestCase, override_settings
+
+from Inventory.models import Supplier
+from payments.models import ChapaTransaction, PurchaseOrderPayment
+from payments.receipt_service import PaymentReceiptService, get_receipt_styles
+from users.models import CustomUser
+
+
+class ReceiptArtifactCacheTest(TestCase):
+    """Tests for PaymentReceiptService artifact caching."""
+
+    def setUp(self):
+        self.artifact_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.artifact_dir, ignore_errors=True)
+        settings_override = override_settings(RECEIPT_ARTIFACT_DIR=self.artifact_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = CustomUser.objects.create_user(
+            username='head_manager', email='head@test.com', password='testpass123', role='head_manager'
+        )
+        supplier = Supplier.objects.create(name='Supplier', email='supplier@test.com')
+        self.transaction = ChapaTransaction.objects.create(
+            chapa_tx_ref='EZM-RECEIPT-1',
+            amount=Decimal('250.00'),
+            description='Receipt test',
+            user=user,
+            supplier=supplier,
+            status='success',
+            customer_email=user.email,
+            customer_first_name='Head',
+            customer_last_name='Manager',
+        )
+        self.order_payment = PurchaseOrderPayment.objects.create(
+            chapa_transaction=self.transaction,
+            supplier=supplier,
+            user=user,
+            status='payment_confirmed',
+            order_items=[{'product_name': 'Cement', 'quantity': 5, 'price': 50, 'total_price': 250}],
+            subtotal=Decimal('250.00'),
+            total_amount=Decimal('250.00'),
+        )
+        self.service = PaymentReceiptService()
+
+    def test_successful_receipt_is_rendered_once(self):
+        with mock.patch.object(self.service, 'render_payment_receipt',
+                               wraps=self.service.render_payment_receipt) as render:
+            first = b''.join(self.service.generate_payment_receipt_pdf(self.transaction).streaming_content)
+            second = b''.join(self.service.generate_payment_receipt_pdf(self.transaction).streaming_content)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertTrue(first.startswith(b'%PDF'))
+        self.assertEqual(first, second)
+
+    def test_pending_receipt_is_not_cached(self):
+        self.transaction.status = 'pending'
+        response = self.service.generate_payment_receipt_pdf(self.transaction)
+
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertIsNone(self.service.artifact_store.get('receipts', self.transaction.id, 'pending'))
+
+    def test_prerender_stores_receipt_and_invoice(self):
+        self.service.prerender_payment_artifacts(self.transaction.id)
+
+        self.assertIsNotNone(self.service.artifact_store.get('receipts', self.transaction.id, 'success'))
+        self.assertIsNotNone(self.service.artifact_store.get('invoices', self.order_payment.id, 'payment_confirmed'))
+
+    def test_styles_are_built_once_per_process(self):
+        self.assertIs(get_receipt_styles(), get_receipt_styles())
+
+    def test_prerender_thread_closes_connection(self):
+        threads, closed = [], []
+        start = threading.Thread.start
+        wrapper_class = type(connections[DEFAULT_DB_ALIAS])
+        close = wrapper_class.close
+
+        def record_start(thread):
+            threads.append(thread)
+            start(thread)
+
+        def record_close(wrapper):
+            closed.append(threading.current_thread())
+            close(wrapper)
+
+        with override_settings(CONN_MAX_AGE=60), \
+                mock.patch.object(threading.Thread, 'start', record_start), \
+                mock.patch.object(wrapper_class, 'close', record_close), \
+                mock.patch.object(self.service, 'prerender_payment_artifacts'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.service.schedule_prerender(self.transaction.id)
+            threads[0].join(5)
+
+        self.assertEqual(closed, threads)
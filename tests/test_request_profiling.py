@@ -0,0 +1,87 @@
+"""
+Test cases for the request profiling middleware.
+
+This module tests:
+1. SQL fingerprints collapse literals and IN lists
+2. Profiled responses carry a Server-Timing header and land in the ring buffer
+3. The slowest endpoints page is restricted to head managers
+4. The middleware stays out of the stack unless enabled
+"""
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from users.models import CustomUser
+from users.profiling import fingerprint, request_profiler
+
+
+class RequestProfilingTest(TestCase):
+    """Tests for RequestProfilingMiddleware and the request profiler."""
+
+    def setUp(self):
+        request_profiler.clear()
+        self.head_manager = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123',
+            role='head_manager', is_first_login=False
+        )
+        self.cashier = CustomUser.objects.create_user(
+            username='cashier', email='cashier@test.com', password='testpass123',
+            role='cashier', is_first_login=False
+        )
+
+    def tearDown(self):
+        request_profiler.clear()
+
+    def test_fingerprint_collapses_literals(self):
+        first = fingerprint('SELECT * FROM "stock" WHERE "id" IN (%s, %s, %s) AND "name" = \'a\'')
+        second = fingerprint('SELECT *  FROM "stock" WHERE "id" IN (%s) AND "name" = \'b\'')
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, 'SELECT * FROM "stock" WHERE "id" IN (...) AND "name" = ?')
+
+    @override_settings(REQUEST_PROFILING_ENABLED=True)
+    def test_profiled_request_is_recorded(self):
+        client = Client()
+        client.login(username='head', password='testpass123')
+
+        response = client.get(reverse('slowest_endpoints'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+        entry = request_profiler.recent()[-1]
+        self.assertEqual(entry['view'], 'slowest_endpoints')
+        self.assertGreater(entry['queries'], 0)
+        self.assertGreater(entry['template_ms'], 0)
+
+        response = client.get(reverse('slowest_endpoints'))
+        self.assertContains(response, '<code>slowest_endpoints</code>', html=False)
+
+    @override_settings(REQUEST_PROFILING_ENABLED=True, REQUEST_PROFILING_BUFFER_SIZE=2)
+    def test_ring_buffer_keeps_latest_requests(self):
+        client = Client()
+        for _ in range(3):
+            client.get(reverse('login'))
+
+        self.assertEqual(len(request_profiler.recent()), 2)
+        summary = request_profiler.slowest_endpoints()[0]
+        self.assertEqual(summary['view'], 'login')
+        self.assertEqual(summary['requests'], 2)
+
+    def test_slowest_endpoints_requires_head_manager(self):
+        client = Client()
+        client.login(username='cashier', password='testpass123')
+
+        response = client.get(reverse('slowest_endpoints'))
+
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+
+    def test_disabled_profiling_adds_nothing(self):
+        client = Client()
+        client.login(username='head', password='testpass123')
+
+        response = client.get(reverse('slowest_endpoints'))
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(request_profiler.recent(), [])
+        self.assertContains(response, 'Request profiling is disabled')
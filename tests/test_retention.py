@@ -0,0 +1,196 @@
+"""
+Test cases for log retention and archival.
+
+This module tests:
+1. archive_logs moves only rows past their retention period, in chunks, into monthly JSONL.gz files
+2. Archived rows read back exactly through the archive-aware manager, merged with live rows
+3. Monthly summaries keep totals that pages add back (movement history)
+4. Rows still in use (pending webhooks, visible notifications) stay live
+5. Order tracking reads only the archive months of the order's lifetime
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from Inventory.models import (
+    InventoryMovement, NotificationCategory, OrderStatusHistory, PurchaseOrder, Supplier, SystemNotification,
+    UserNotificationStatus, WarehouseProduct
+)
+from payments.models import PaymentWebhookLog
+from users.models import ArchiveSummary, CustomUser, LoginLog
+from users.retention import archive_path, log_archiver
+
+
+class LogRetentionTest(TestCase):
+    """Tests for users.retention and the archive_logs command."""
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        settings_override = override_settings(ARCHIVE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.now = timezone.now()
+        self.user = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123', role='head_manager', is_first_login=False
+        )
+
+    def _login_logs(self):
+        moments = [
+            datetime(2025, 1, 5, 8, 30, 12, 345678, tzinfo=dt_timezone.utc),
+            datetime(2025, 1, 20, 9, 0, tzinfo=dt_timezone.utc),
+            datetime(2025, 2, 3, 10, 0, tzinfo=dt_timezone.utc),
+            self.now - timedelta(days=10),
+        ]
+        return [
+            LoginLog.objects.create(
+                user=self.user, username_attempted='head', login_timestamp=moment,
+                login_status='failed' if index % 2 else 'success', user_role='head_manager',
+                ip_address='10.0.0.1', user_agent='pytest'
+            )
+            for index, moment in enumerate(moments)
+        ]
+
+    def test_archives_old_rows_into_monthly_files(self):
+        logs = self._login_logs()
+        out = StringIO()
+
+        call_command('archive_logs', model=['users.LoginLog'], days=180, chunk_size=2, stdout=out)
+
+        self.assertEqual(list(LoginLog.objects.values_list('pk', flat=True)), [logs[3].pk])
+        self.assertIn('users.LoginLog: 3 rows (2025-01, 2025-02)', out.getvalue())
+        january = archive_path('users.LoginLog', datetime(2025, 1, 1).date())
+        with gzip.open(january, 'rt', encoding='utf-8') as stream:
+            self.assertEqual(len(stream.read().splitlines()), 2)
+
+        archived = list(LoginLog.objects.archived())
+        self.assertEqual([log.pk for log in archived], [log.pk for log in logs[:3]])
+        self.assertEqual(archived[0].login_timestamp, logs[0].login_timestamp)
+        self.assertEqual(archived[0].user_id, self.user.pk)
+        self.assertEqual(archived[0].ip_address, '10.0.0.1')
+        self.assertEqual(
+            list(LoginLog.objects.archived(since=datetime(2025, 1, 10, tzinfo=dt_timezone.utc))),
+            archived[1:]
+        )
+
+        history = LoginLog.objects.history(user=self.user)
+        self.assertEqual([log.pk for log in history], [log.pk for log in reversed(logs)])
+
+        summaries = {
+            (summary.month.isoformat(), summary.group['status']): summary.rows
+            for summary in LoginLog.objects.archived_summaries()
+        }
+        self.assertEqual(summaries, {('2025-01-01', 'success'): 1, ('2025-01-01', 'failed'): 1, ('2025-02-01', 'success'): 1})
+
+    def test_rerun_and_dry_run(self):
+        self._login_logs()
+
+        self.assertEqual(log_archiver.archive('users.LoginLog', days=180, dry_run=True)['rows'], 3)
+        self.assertEqual(LoginLog.objects.count(), 4)
+        log_archiver.archive('users.LoginLog', days=180)
+        self.assertEqual(log_archiver.archive('users.LoginLog', days=180)['rows'], 0)
+        self.assertEqual(len(list(LoginLog.objects.archived())), 3)
+
+    def test_rows_in_use_stay_live(self):
+        old = self.now - timedelta(days=400)
+        for processed, error in ((True, None), (False, 'Transaction not found'), (False, None)):
+            log = PaymentWebhookLog.objects.create(webhook_data={'tx_ref': 'EZM-1'}, processed=processed, processing_error=error)
+            PaymentWebhookLog.objects.filter(pk=log.pk).update(created_at=old)
+
+        category = NotificationCategory.objects.create(name='system', display_name='System')
+        visible = SystemNotification.objects.create(
+            category=category, notification_type='system_alert', title='Visible', message='Still shown'
+        )
+        retired = SystemNotification.objects.create(
+            category=category, notification_type='system_alert', title='Retired', message='Gone', is_active=False
+        )
+        SystemNotification.objects.filter(pk__in=[visible.pk, retired.pk]).update(created_at=old)
+        UserNotificationStatus.objects.create(user=self.user, notification=visible, is_read=True)
+        UserNotificationStatus.objects.create(user=self.user, notification=retired, is_read=True)
+
+        call_command('archive_logs', stdout=StringIO())
+
+        pending = PaymentWebhookLog.objects.get()
+        self.assertFalse(pending.processed)
+        self.assertIsNone(pending.processing_error)
+        self.assertEqual(UserNotificationStatus.objects.get().notification, visible)
+        self.assertEqual(len(list(UserNotificationStatus.objects.archived())), 1)
+        outcomes = sorted(summary.group['outcome'] for summary in PaymentWebhookLog.objects.archived_summaries())
+        self.assertEqual(outcomes, ['failed', 'processed'])
+
+    def test_movement_totals_include_archived_summaries(self):
+        supplier = Supplier.objects.create(name='Pipe Supplier', email='pipes@test.com')
+        product = WarehouseProduct.objects.create(
+            product_id='WH-PIPE', sku='SKU-PIPE', product_name='Pipe', category='pipes',
+            quantity_in_stock=0, unit_price=Decimal('10.00'), supplier=supplier
+        )
+        for change in (50, -20, 30, -5):
+            product.update_stock(change, reason='Manual adjustment')
+        InventoryMovement.objects.filter(quantity_change__in=[50, -20]).update(
+            created_at=self.now - timedelta(days=800)
+        )
+
+        call_command('archive_logs', model=['Inventory.InventoryMovement'], stdout=StringIO())
+        self.client.force_login(self.user)
+        # The page template is not part of this tree; check the context handed to it
+        with mock.patch('Inventory.fifo_views.render', return_value=HttpResponse()) as render:
+            self.client.get(reverse('inventory_movement_history', args=[product.id]))
+        context = render.call_args.args[2]
+
+        self.assertEqual(InventoryMovement.objects.count(), 2)
+        self.assertEqual(context['total_received'], 80)
+        self.assertEqual(context['total_issued'], 25)
+        self.assertEqual(
+            sorted(summary.total for summary in ArchiveSummary.objects.filter(model_label='Inventory.InventoryMovement')),
+            [-20, 50]
+        )
+
+    def test_order_tracking_reads_lifetime_months(self):
+        supplier = Supplier.objects.create(name='Pipe Supplier', email='pipes@test.com')
+        orders = [
+            PurchaseOrder.objects.create(order_number=f'PO-{index}', supplier=supplier, created_by=self.user)
+            for index in range(2)
+        ]
+        changes = [
+            (orders[0], 'payment_confirmed', datetime(2025, 1, 10, 9, 0, tzinfo=dt_timezone.utc)),
+            (orders[0], 'delivered', datetime(2025, 1, 20, 9, 0, tzinfo=dt_timezone.utc)),
+            (orders[1], 'delivered', datetime(2025, 4, 2, 9, 0, tzinfo=dt_timezone.utc)),
+        ]
+        for order, status, moment in changes:
+            change = OrderStatusHistory.objects.create(purchase_order=order, new_status=status, changed_by=self.user)
+            OrderStatusHistory.objects.filter(pk=change.pk).update(changed_at=moment)
+        PurchaseOrder.objects.filter(pk=orders[0].pk).update(
+            status='delivered', order_date=datetime(2025, 1, 9, tzinfo=dt_timezone.utc),
+            updated_date=datetime(2025, 1, 20, 9, 0, tzinfo=dt_timezone.utc)
+        )
+        call_command('archive_logs', model=['Inventory.OrderStatusHistory'], days=180, stdout=StringIO())
+        self.client.force_login(self.user)
+
+        opened = []
+        real_open = gzip.open
+        with mock.patch('users.retention.gzip.open', side_effect=lambda path, *args, **kwargs: (
+            opened.append(os.path.basename(path)) or real_open(path, *args, **kwargs)
+        )), mock.patch('Inventory.order_tracking_views.render', return_value=HttpResponse()) as render:
+            self.client.get(reverse('order_tracking_detail', args=[orders[0].pk]))
+        context = render.call_args.args[2]
+
+        self.assertEqual([change.new_status for change in context['status_history']], ['delivered', 'payment_confirmed'])
+        self.assertEqual(opened, ['2025-01.jsonl.gz'])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            log_archiver.archive('users.CustomUser')
+        self.assertFalse(os.listdir(self.archive_dir))
@@ -0,0 +1,161 @@
+"""
+Test cases for the vectorized sales analytics layer.
+
+This module tests:
+1. Rolling averages, growth, bucketing, demand forecasts and stock cover on synthetic arrays
+2. Local day, hour and weekday bucketing of a sales series
+3. Store metrics match the sales they are built from, in a fixed number of queries
+4. The store manager dashboard renders the trend, growth, forecast and stock cover
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Inventory.models import Product, Stock
+from store.models import Store
+from transactions.models import Order, Transaction
+from users.models import CustomUser
+from users.sales_analytics import (
+    SalesSeries, bucket_totals, demand_rate, growth, peak, rolling_mean, stock_cover_days,
+    store_sales_analytics, week_over_week_growth
+)
+
+
+class SalesArrayTest(TestCase):
+    """Tests for the array functions of users.sales_analytics."""
+
+    def test_rolling_mean(self):
+        values = np.array([7, 7, 7, 14, 14, 14, 14, 0], dtype=float)
+
+        np.testing.assert_allclose(rolling_mean(values, window=3), [7, 7, 7, 28 / 3, 35 / 3, 14, 14, 28 / 3])
+        self.assertEqual(rolling_mean([], window=3).size, 0)
+
+    def test_growth(self):
+        np.testing.assert_allclose(growth([150, 50, 10], [100, 100, 0]), [50, -50, 0])
+        self.assertEqual(week_over_week_growth([10] * 7 + [15] * 7), 50.0)
+        self.assertEqual(week_over_week_growth([5] * 3), 0.0)
+
+    def test_bucket_totals_and_peak(self):
+        totals = bucket_totals([0, 2, 2, 5, -1], [1.5, 2, 3, 9, 4], 4)
+
+        np.testing.assert_allclose(totals, [1.5, 0, 5, 0])
+        self.assertEqual(peak(totals), 2)
+        self.assertIsNone(peak(np.zeros(4)))
+
+    def test_demand_forecast_and_stock_cover(self):
+        daily = np.array([
+            [0, 0, 0, 2, 4, 6],
+            [1, 1, 1, 1, 1, 1],
+            [0, 0, 0, 0, 0, 0],
+        ])
+        rates = demand_rate(daily, window=3)
+
+        np.testing.assert_allclose(rates, [4, 1, 0])
+        np.testing.assert_allclose(stock_cover_days([20, 3, 8], rates), [5, 3, np.inf])
+
+    def test_series_buckets(self):
+        start = datetime(2026, 3, 2, tzinfo=dt_timezone.utc)  # a Monday
+        epochs = [
+            (start + timedelta(hours=9)).timestamp(),
+            (start + timedelta(days=1, hours=14)).timestamp(),
+            (start + timedelta(days=1, hours=14, minutes=30)).timestamp(),
+            (start + timedelta(days=6, hours=23)).timestamp(),
+        ]
+        series = SalesSeries(start, epochs, [10, 20, 30, 40])
+
+        np.testing.assert_allclose(series.daily(3), [10, 50, 0])
+        self.assertEqual(peak(series.hourly()), 14)
+        np.testing.assert_allclose(series.by_weekday(), [10, 50, 0, 0, 0, 0, 40])
+
+        # Two hours east of UTC the last sale falls on the next local day
+        shifted = SalesSeries(start, epochs, [10, 20, 30, 40], offset=2 * 3600)
+        self.assertEqual(shifted.day.tolist(), [0, 1, 1, 7])
+        self.assertEqual(shifted.hour.tolist(), [11, 16, 16, 1])
+
+
+class StoreMetricsTest(TestCase):
+    """Tests for StoreSalesAnalytics.store_metrics."""
+
+    def setUp(self):
+        self.store = Store.objects.create(name='Main Store', address='Main Street')
+        self.pipe = Product.objects.create(
+            name='Steel Pipe', category='pipes', description='Pipe', price=Decimal('100.00'), material='Steel'
+        )
+        self.paint = Product.objects.create(
+            name='Wall Paint', category='paint', description='Paint', price=Decimal('20.00'), material='Latex'
+        )
+        Stock.objects.create(product=self.pipe, store=self.store, quantity=14, selling_price=Decimal('100.00'))
+        Stock.objects.create(product=self.paint, store=self.store, quantity=50, selling_price=Decimal('20.00'))
+        self.now = timezone.now().replace(hour=18, minute=0, second=0, microsecond=0)
+
+    def _sell(self, product, quantity, at, transaction_type='sale', payment_type='cash'):
+        sale = Transaction.objects.create(
+            transaction_type=transaction_type, quantity=quantity, total_amount=product.price * quantity,
+            store=self.store, payment_type=payment_type
+        )
+        Transaction.objects.filter(pk=sale.pk).update(timestamp=at)
+        if transaction_type == 'sale':
+            Order.objects.create(
+                transaction=sale, product=product, quantity=quantity, price_at_time_of_sale=product.price
+            )
+        return sale
+
+    def test_store_metrics(self):
+        for day in range(7):
+            self._sell(self.pipe, 2, self.now - timedelta(days=day, hours=4))
+        self._sell(self.paint, 1, self.now - timedelta(days=1, hours=8), payment_type='card')
+        self._sell(self.paint, 1, self.now - timedelta(hours=2), transaction_type='refund')
+
+        with self.assertNumQueries(3):
+            metrics = store_sales_analytics.store_metrics(self.store, self.now)
+
+        self.assertEqual(len(metrics['sales_trend_data']), 30)
+        self.assertEqual(sum(metrics['sales_trend_data']), 1420.0)
+        self.assertEqual(metrics['sales_trend_data'][-1], 200.0)
+        self.assertEqual(metrics['peak_hour'], '14:00')
+        self.assertEqual(metrics['payment_method_labels'], ['Card', 'Cash'])
+        self.assertEqual(metrics['payment_method_data'], [12.5, 87.5])
+        self.assertEqual(metrics['average_daily_revenue'], 1420.0 / 7)
+        self.assertEqual(metrics['return_value'], 20.0)
+
+        # Two pipes a day: 14 in stock last a week; paint barely sells
+        pipe_cover, paint_cover = metrics['stock_cover']
+        self.assertEqual(pipe_cover['name'], 'Steel Pipe')
+        self.assertEqual(pipe_cover['cover_days'], 7.0)
+        self.assertEqual(pipe_cover['forecast_demand'], 14.0)
+        self.assertEqual(paint_cover['cover_days'], 350.0)
+
+    def test_store_without_sales(self):
+        metrics = store_sales_analytics.store_metrics(self.store, self.now)
+
+        self.assertEqual(metrics['peak_hour'], 'N/A')
+        self.assertEqual(metrics['peak_day'], 'N/A')
+        self.assertEqual(metrics['revenue_trend'], 0.0)
+        self.assertEqual(metrics['payment_method_data'], [])
+        self.assertEqual(metrics['stock_cover'], [])
+
+    def test_store_manager_page_renders_forecast(self):
+        manager = CustomUser.objects.create_user(
+            username='manager', email='manager@test.com', password='testpass123',
+            role='store_manager', is_first_login=False
+        )
+        self.store.store_manager = manager
+        self.store.save()
+        today = timezone.localtime().replace(hour=0, minute=0, second=1, microsecond=0)
+        for day in range(7):
+            self._sell(self.pipe, 2, today - timedelta(days=day))
+        self.client.force_login(manager)
+
+        response = self.client.get(reverse('store_manager_page'))
+
+        analytics = response.context['analytics']
+        self.assertEqual(analytics['revenue_forecast'], 1400.0)
+        self.assertContains(response, 'ETB 1400.00')
+        self.assertContains(response, f"{analytics['week_over_week_growth']:.1f}% week over week")
+        self.assertContains(response, analytics['sales_trend_rolling_average'])
+        self.assertContains(response, '<div class="fw-semibold">Steel Pipe</div>', html=True)
@@ -0,0 +1,220 @@
+"""
+Test cases for the SQLite connection settings and busy retries.
+
+This module tests:
+1. New SQLite connections run in WAL mode with the tuned pragmas
+2. Locked writes are retried with backoff, other errors are not
+3. Readers in other processes keep going while checkout writers hold the lock
+4. A checkout whose commit finds the database locked is retried with the cart intact
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from Inventory.models import Product, Stock
+from store.models import Store
+from transactions.models import Order, Transaction
+from users.db_retry import is_database_busy, retry_on_busy
+from users.models import CustomUser
+
+STRESS_ALIAS = 'sqlite_stress'
+WRITE_HOLD_SECONDS = 0.2
+
+
+def _checkout_writer(checkouts, results):
+    connection = connections[STRESS_ALIAS]
+
+    @retry_on_busy(using=STRESS_ALIAS)
+    def checkout(number):
+        with transaction.atomic(using=STRESS_ALIAS), connection.cursor() as cursor:
+            cursor.execute('INSERT INTO checkout (number, step) VALUES (%s, 1)', [number])
+            time.sleep(WRITE_HOLD_SECONDS)  # stock, receipt and ledger writes of a real checkout
+            cursor.execute('INSERT INTO checkout (number, step) VALUES (%s, 2)', [number])
+
+    errors = 0
+    for number in range(checkouts):
+        try:
+            checkout(number)
+        except OperationalError:
+            errors += 1
+    connection.close()
+    results.put(('writer', errors, []))
+
+
+def _report_reader(stop, results):
+    connection = connections[STRESS_ALIAS]
+    latencies, errors = [], 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT COUNT(*), MAX(number) FROM checkout')
+                cursor.fetchone()
+        except OperationalError:
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+        time.sleep(0.005)
+    connection.close()
+    results.put(('reader', errors, latencies))
+
+
+@skipUnless(settings.DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3', 'SQLite deployments only')
+class SqliteConnectionTest(SimpleTestCase):
+    """Tests for the SQLite OPTIONS in core.settings."""
+
+    # Resolved in setUpClass, once the scratch database (deployed SQLite settings) is configured
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        database = {**settings.SQLITE_DATABASE, 'NAME': os.path.join(cls.directory, 'branch.sqlite3')}
+        connections.settings[STRESS_ALIAS] = ConnectionHandler({DEFAULT_DB_ALIAS: database}).settings[DEFAULT_DB_ALIAS]
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[STRESS_ALIAS].close()
+        del connections[STRESS_ALIAS]
+        del connections.settings[STRESS_ALIAS]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        self.connection = connections[STRESS_ALIAS]
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_pragmas(self):
+        options = settings.SQLITE_DATABASE['OPTIONS']
+
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), options['timeout'] * 1000)
+        self.assertLess(self.pragma('cache_size'), 0)
+        self.assertGreater(self.pragma('mmap_size'), 0)
+        self.assertEqual(self.connection.transaction_mode, 'IMMEDIATE')
+
+    @skipUnless('fork' in multiprocessing.get_all_start_methods(), 'needs fork')
+    def test_readers_do_not_stall_behind_checkout_writers(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('CREATE TABLE checkout (id INTEGER PRIMARY KEY, number INTEGER, step INTEGER)')
+        # Each forked process opens its own connection
+        self.connection.close()
+
+        context = multiprocessing.get_context('fork')
+        results, stop = context.Queue(), context.Event()
+        writers = [context.Process(target=_checkout_writer, args=(3, results)) for _ in range(3)]
+        readers = [context.Process(target=_report_reader, args=(stop, results)) for _ in range(3)]
+        for process in readers + writers:
+            process.start()
+        for process in writers:
+            process.join(60)
+        stop.set()
+        for process in readers:
+            process.join(60)
+        outcomes = [results.get(timeout=10) for _ in readers + writers]
+
+        write_errors = sum(errors for role, errors, _ in outcomes if role == 'writer')
+        read_errors = sum(errors for role, errors, _ in outcomes if role == 'reader')
+        read_latencies = [latency for role, _, latencies in outcomes if role == 'reader' for latency in latencies]
+        self.assertEqual((write_errors, read_errors), (0, 0))
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM checkout')
+            self.assertEqual(cursor.fetchone()[0], 3 * 3 * 2)
+        # 9 checkouts hold the write lock for 1.8s in total; no read waits for even one of them
+        self.assertGreater(len(read_latencies), 30)
+        self.assertLess(max(read_latencies), WRITE_HOLD_SECONDS)
+
+
+@override_settings(DB_BUSY_RETRY_ATTEMPTS=2, DB_BUSY_RETRY_DELAY=0)
+class RetryOnBusyTest(SimpleTestCase):
+    """Tests for users.db_retry."""
+
+    def test_retries_locked_writes(self):
+        write = mock.Mock(side_effect=[OperationalError('database is locked'), 'saved'], __name__='write')
+
+        self.assertEqual(retry_on_busy()(write)(), 'saved')
+        self.assertEqual(write.call_count, 2)
+
+    def test_gives_up_after_retries(self):
+        write = mock.Mock(side_effect=OperationalError('database is locked'), __name__='write')
+
+        with self.assertRaises(OperationalError):
+            retry_on_busy()(write)()
+        self.assertEqual(write.call_count, 3)
+
+    def test_other_errors_are_not_retried(self):
+        write = mock.Mock(side_effect=OperationalError('no such table: checkout'), __name__='write')
+
+        with self.assertRaises(OperationalError):
+            retry_on_busy()(write)()
+        self.assertEqual(write.call_count, 1)
+        self.assertTrue(is_database_busy(OperationalError('database table is locked')))
+        self.assertFalse(is_database_busy(ValueError('database is locked')))
+
+    def test_no_retry_inside_outer_transaction(self):
+        write = mock.Mock(side_effect=OperationalError('database is locked'), __name__='write')
+
+        with mock.patch.object(connections['default'], 'in_atomic_block', True):
+            with self.assertRaises(OperationalError):
+                retry_on_busy()(write)()
+        self.assertEqual(write.call_count, 1)
+
+
+@override_settings(DB_BUSY_RETRY_ATTEMPTS=2, DB_BUSY_RETRY_DELAY=0)
+class CheckoutRetryTest(TransactionTestCase):
+    """Tests for retrying the cashier checkout writes."""
+
+    def test_locked_commit_is_retried_with_cart_intact(self):
+        store = Store.objects.create(name='Main Store', address='Main Street')
+        cashier = CustomUser.objects.create_user(
+            username='cashier', email='cashier@test.com', password='testpass123', role='cashier',
+            store=store, is_first_login=False
+        )
+        product = Product.objects.create(
+            name='Steel Pipe', category='pipes', description='Pipe', price=Decimal('100.00'), material='Steel'
+        )
+        stock = Stock.objects.create(product=product, store=store, quantity=10, selling_price=Decimal('100.00'))
+        self.client.force_login(cashier)
+        session = self.client.session
+        session['cart'] = {'items': [{'product_id': product.pk, 'quantity': 2, 'price': 100.0, 'subtotal': 200.0}]}
+        session.save()
+
+        wrapper_class = type(connections[DEFAULT_DB_ALIAS])
+        real_commit = wrapper_class.commit
+        commits = []
+
+        def commit(connection):
+            commits.append(connection.alias)
+            if len(commits) == 1:
+                raise OperationalError('database is locked')
+            return real_commit(connection)
+
+        with mock.patch.object(wrapper_class, 'commit', commit):
+            response = self.client.post(
+                reverse('complete_order'), json.dumps({'payment_type': 'cash'}), content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(Transaction.objects.filter(transaction_type='sale').count(), 1)
+        self.assertEqual(Order.objects.get().quantity, 2)
+        stock.refresh_from_db()
+        self.assertEqual(stock.quantity, 8)
+        self.assertNotIn('cart', self.client.session)
@@ -0,0 +1,237 @@
+"""
+Test cases for the inter-store transfer engine.
+
+This module tests:
+1. Approval reserves source stock and sales cannot dip into the reservation
+2. Completion moves stock between both stores and releases the reservation
+3. Cancelling an approved request gives its reservation back
+4. Multi-product transfers are all-or-nothing
+5. Concurrent sales and transfers never oversell or lose stock
+6. Transfers release only their own reservation, never ticket holds
+"""
+
+import threading
+from decimal import Decimal
+
+from django.db import OperationalError, close_old_connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from Inventory.models import Product, Stock, StoreStockTransferRequest
+from Inventory.transfer_service import store_transfer_service
+from store.models import Store
+from users.models import CustomUser
+
+
+def create_stores_and_stock(product_count=1, quantity=100):
+    source = Store.objects.create(name='Source Store', address='Address 1')
+    destination = Store.objects.create(name='Destination Store', address='Address 2')
+    products = []
+    for p in range(product_count):
+        product = Product.objects.create(
+            name=f'Product {p}', category='Tools', price=Decimal('10.00'), material='Steel'
+        )
+        Stock.objects.create(product=product, store=source, quantity=quantity, selling_price=Decimal('12.00'))
+        products.append(product)
+    return source, destination, products
+
+
+class StoreTransferServiceTest(TestCase):
+    """Tests for StoreTransferService approve/complete/transfer_products."""
+
+    def setUp(self):
+        self.source, self.destination, self.products = create_stores_and_stock(product_count=3, quantity=20)
+        self.manager = CustomUser.objects.create_user(
+            username='manager', email='manager@test.com', password='testpass123', role='store_manager'
+        )
+        self.transfer_request = StoreStockTransferRequest.objects.create(
+            product=self.products[0],
+            from_store=self.source,
+            to_store=self.destination,
+            requested_quantity=15,
+            requested_by=self.manager
+        )
+
+    def _stock(self, store, product):
+        return Stock.objects.get(store=store, product=product)
+
+    def test_approve_reserves_source_stock(self):
+        store_transfer_service.approve(self.transfer_request, 15, reviewed_by=self.manager)
+
+        stock = self._stock(self.source, self.products[0])
+        self.assertEqual(stock.quantity, 20)
+        self.assertEqual(stock.reserved_quantity, 15)
+        self.assertEqual(stock.available_quantity, 5)
+
+        with self.assertRaisesMessage(ValueError, 'Available: 5'):
+            store_transfer_service.deduct_for_sale(stock, 6)
+        store_transfer_service.deduct_for_sale(stock, 5)
+        self.assertEqual(self._stock(self.source, self.products[0]).quantity, 15)
+
+    def test_approve_rejects_more_than_available(self):
+        with self.assertRaisesMessage(ValueError, 'Available: 20, Requested: 21'):
+            store_transfer_service.approve(self.transfer_request, 21, reviewed_by=self.manager)
+        self.transfer_request.refresh_from_db()
+        self.assertEqual(self.transfer_request.status, 'pending')
+
+    def test_complete_moves_stock_and_releases_reservation(self):
+        store_transfer_service.approve(self.transfer_request, 15, reviewed_by=self.manager)
+
+        # savepoint, lock request, lock source, destination lookup/insert/lock,
+        # one two-row stock UPDATE, request UPDATE, release
+        with self.assertNumQueries(9):
+            store_transfer_service.complete(self.transfer_request, 12)
+
+        source = self._stock(self.source, self.products[0])
+        self.assertEqual((source.quantity, source.reserved_quantity), (8, 0))
+        self.assertEqual(self._stock(self.destination, self.products[0]).quantity, 12)
+        self.transfer_request.refresh_from_db()
+        self.assertEqual(self.transfer_request.status, 'completed')
+        self.assertEqual(self.transfer_request.actual_quantity_transferred, 12)
+
+    def test_complete_rejects_quantity_above_approved(self):
+        store_transfer_service.approve(self.transfer_request, 10, reviewed_by=self.manager)
+
+        with self.assertRaisesMessage(ValueError, 'cannot exceed approved quantity'):
+            store_transfer_service.complete(self.transfer_request, 11)
+
+    def test_release_returns_reservation(self):
+        store_transfer_service.approve(self.transfer_request, 15, reviewed_by=self.manager)
+
+        store_transfer_service.release(self.transfer_request, cancelled_by=self.manager, reason='No longer needed')
+
+        stock = self._stock(self.source, self.products[0])
+        self.assertEqual((stock.quantity, stock.reserved_quantity), (20, 0))
+        self.transfer_request.refresh_from_db()
+        self.assertEqual(self.transfer_request.status, 'cancelled')
+        self.assertEqual(self.transfer_request.review_notes, 'No longer needed')
+        with self.assertRaisesMessage(ValueError, 'Only approved transfer requests can be cancelled'):
+            store_transfer_service.release(self.transfer_request)
+
+    def test_release_and_complete_leave_ticket_holds_alone(self):
+        # Six units held by a webfront ticket share the same reserved_quantity
+        Stock.objects.filter(store=self.source, product=self.products[0]).update(reserved_quantity=6)
+        store_transfer_service.approve(self.transfer_request, 10, reviewed_by=self.manager)
+        self.assertEqual(self._stock(self.source, self.products[0]).reserved_quantity, 16)
+
+        store_transfer_service.release(self.transfer_request, cancelled_by=self.manager)
+        self.assertEqual(self._stock(self.source, self.products[0]).reserved_quantity, 6)
+        self.transfer_request.refresh_from_db()
+        self.assertEqual(self.transfer_request.reserved_quantity, 0)
+
+        # Approved before reservations were recorded, so it holds nothing back
+        legacy = StoreStockTransferRequest.objects.create(
+            product=self.products[0], from_store=self.source, to_store=self.destination,
+            requested_quantity=4, approved_quantity=4, status='approved', requested_by=self.manager
+        )
+        store_transfer_service.complete(legacy, 4)
+
+        stock = self._stock(self.source, self.products[0])
+        self.assertEqual((stock.quantity, stock.reserved_quantity), (16, 6))
+        self.assertEqual(self._stock(self.destination, self.products[0]).quantity, 4)
+
+    def test_destination_manager_cancels_approved_request(self):
+        store_transfer_service.approve(self.transfer_request, 15, reviewed_by=self.manager)
+        destination_manager = CustomUser.objects.create_user(
+            username='destination', email='destination@test.com', password='testpass123', role='store_manager',
+            is_first_login=False
+        )
+        self.destination.store_manager = destination_manager
+        self.destination.save()
+        self.client.force_login(destination_manager)
+
+        response = self.client.post(
+            reverse('decline_store_transfer_request', args=[self.transfer_request.pk]),
+            {'reason': 'Received from the warehouse instead'}
+        )
+
+        self.assertRedirects(response, reverse('store_manager_transfer_requests'), fetch_redirect_response=False)
+        self.transfer_request.refresh_from_db()
+        self.assertEqual(self.transfer_request.status, 'cancelled')
+        self.assertEqual(self.transfer_request.reviewed_by, destination_manager)
+        self.assertEqual(self._stock(self.source, self.products[0]).available_quantity, 20)
+
+    def test_transfer_products_moves_every_product(self):
+        Stock.objects.create(
+            product=self.products[1], store=self.destination, quantity=4, selling_price=Decimal('12.00')
+        )
+
+        store_transfer_service.transfer_products(
+            self.source, self.destination, {product.pk: 5 for product in self.products}
+        )
+
+        for product in self.products:
+            self.assertEqual(self._stock(self.source, product).quantity, 15)
+        self.assertEqual(self._stock(self.destination, self.products[0]).quantity, 5)
+        self.assertEqual(self._stock(self.destination, self.products[1]).quantity, 9)
+
+    def test_transfer_products_is_all_or_nothing(self):
+        quantities = {self.products[0].pk: 5, self.products[1].pk: 25}
+
+        with self.assertRaisesMessage(ValueError, 'Insufficient stock in Source Store'):
+            store_transfer_service.transfer_products(self.source, self.destination, quantities)
+
+        self.assertEqual(self._stock(self.source, self.products[0]).quantity, 20)
+        self.assertFalse(Stock.objects.filter(store=self.destination).exists())
+
+
+class ConcurrentTransferStressTest(TransactionTestCase):
+    """Sales and transfers racing on the same stock rows."""
+
+    def test_parallel_sales_and_transfers_conserve_stock(self):
+        source, destination, products = create_stores_and_stock(product_count=2, quantity=60)
+        outcomes = {'sold': 0, 'transferred': 0}
+        lock = threading.Lock()
+
+        def retry(operation):
+            # SQLite serializes writers; retry when another thread holds the lock
+            for _ in range(50):
+                try:
+                    return operation()
+                except OperationalError:
+                    threading.Event().wait(0.01)
+            return None
+
+        def sell(product):
+            stock = Stock.objects.get(store=source, product=product)
+            try:
+                store_transfer_service.deduct_for_sale(stock, 3)
+            except ValueError:
+                return
+            with lock:
+                outcomes['sold'] += 3
+
+        def transfer():
+            try:
+                store_transfer_service.transfer_products(source, destination, {p.pk: 2 for p in products})
+            except ValueError:
+                return
+            with lock:
+                outcomes['transferred'] += 2
+
+        def worker(index):
+            try:
+                for i in range(15):
+                    if (index + i) % 2:
+                        retry(lambda: transfer())
+                    else:
+                        retry(lambda: sell(products[i % 2]))
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        source_total = sum(Stock.objects.filter(store=source).values_list('quantity', flat=True))
+        destination_total = sum(Stock.objects.filter(store=destination).values_list('quantity', flat=True))
+        self.assertEqual(destination_total, outcomes['transferred'] * len(products))
+        self.assertEqual(
+            source_total + destination_total + outcomes['sold'],
+            60 * len(products)
+        )
+        self.assertTrue(all(
+            stock.quantity >= stock.reserved_quantity for stock in Stock.objects.all()
+        ))
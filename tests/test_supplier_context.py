@@ -0,0 +1,73 @@
+"""
+Test cases for the supplier portal identity resolver.
+
+This module tests:
+1. Supplier, profile and account resolve in one query through CustomUser.supplier
+2. The resolution is cached on the request
+3. Users without a link are matched by email once and linked
+4. Supplier records created by the portal are linked to the user
+"""
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from Inventory.models import Supplier
+from transactions.models import SupplierAccount
+from users.models import CustomUser
+from users.supplier_context import get_supplier, get_supplier_account, resolve_supplier
+
+
+class SupplierContextTest(TestCase):
+    """Tests for resolve_supplier and its helpers."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.supplier = Supplier.objects.create(name='Acme Supplies', email='acme@test.com')
+        self.account = SupplierAccount.objects.create(supplier=self.supplier, account_number='SUP-0001')
+        self.user = CustomUser.objects.create_user(
+            username='acme', email='acme@test.com', password='testpass123', role='supplier'
+        )
+
+    def _request(self, user=None):
+        request = self.factory.get('/')
+        request.user = user or CustomUser.objects.get(pk=self.user.pk)
+        return request
+
+    def test_linked_user_resolves_in_one_query(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(supplier=self.supplier)
+        request = self._request()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(get_supplier(request), self.supplier)
+            self.assertEqual(get_supplier_account(request), self.account)
+            self.assertIsNone(getattr(request._supplier_identity, 'profile', None))
+
+    def test_unlinked_user_is_matched_by_email_and_linked(self):
+        self.assertEqual(get_supplier(self._request()), self.supplier)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.supplier_id, self.supplier.pk)
+
+    def test_missing_supplier_raises_does_not_exist(self):
+        other = CustomUser.objects.create_user(
+            username='other', email='other@test.com', password='testpass123', role='supplier'
+        )
+        request = self._request(other)
+
+        with self.assertRaises(Supplier.DoesNotExist):
+            get_supplier(request)
+        self.assertIsNone(resolve_supplier(self._request(AnonymousUser())))
+
+    def test_dashboard_links_created_supplier(self):
+        user = CustomUser.objects.create_user(
+            username='newcomer', email='newcomer@test.com', password='testpass123',
+            role='supplier', is_first_login=False
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('supplier_dashboard'))
+
+        self.assertRedirects(response, reverse('supplier_onboarding'), fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertEqual(user.supplier.email, 'newcomer@test.com')
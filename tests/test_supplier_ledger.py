@@ -0,0 +1,212 @@
+"""
+Test cases for the supplier ledger.
+
+This module tests:
+1. Saving supplier transactions keeps the running balance and monthly snapshot current
+2. Status changes and deletions move the ledger by the difference only
+3. Supplier payments are totalled in the snapshot
+4. Monthly closing balances and rebuilding from history
+5. Paid Chapa orders net to zero, and offset_supplier_payments converts old-sign balances and back
+6. The supplier account page shows available credit and twelve monthly rows
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Inventory.models import Supplier
+from payments.models import ChapaTransaction
+from payments.transaction_service import PaymentTransactionService
+from transactions.ledger import supplier_ledger_service
+from transactions.models import (
+    SupplierAccount, SupplierLedgerSnapshot, SupplierPayment, SupplierTransaction
+)
+from users.models import CustomUser
+
+
+class SupplierLedgerTest(TestCase):
+    """Tests for SupplierLedgerService and the supplier transaction save hooks."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123', role='head_manager'
+        )
+        supplier = self.supplier = Supplier.objects.create(name='Acme Supplies', email='acme@test.com')
+        self.account = SupplierAccount.objects.create(supplier=supplier, account_number='SUP-0001')
+        self.month = timezone.localdate().replace(day=1)
+
+    def _transaction(self, transaction_type, amount, status='completed'):
+        return SupplierTransaction.objects.create(
+            supplier_account=self.account,
+            transaction_type=transaction_type,
+            amount=Decimal(amount),
+            status=status,
+            description='Test',
+            created_by=self.user
+        )
+
+    def _snapshot(self):
+        return SupplierLedgerSnapshot.objects.get(supplier_account=self.account, month=self.month)
+
+    def test_transactions_update_balance_and_snapshot(self):
+        self._transaction('purchase', '500.00')
+        self._transaction('payment', '200.00')
+        self._transaction('payment', '50.00', status='pending')
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('300.00'))
+        snapshot = self._snapshot()
+        self.assertEqual(snapshot.transaction_count, 3)
+        self.assertEqual(snapshot.transaction_amount, Decimal('750.00'))
+        self.assertEqual(snapshot.payments_total, Decimal('200.00'))
+        self.assertEqual(snapshot.balance_change, Decimal('300.00'))
+
+    def test_status_change_and_delete_apply_difference(self):
+        pending = self._transaction('payment', '80.00', status='pending')
+
+        pending.status = 'completed'
+        pending.save()
+        pending.save()
+        self.assertEqual(self._snapshot().payments_total, Decimal('80.00'))
+
+        pending.delete()
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('0.00'))
+        self.assertEqual(self._snapshot().transaction_count, 0)
+
+    def test_supplier_payments_are_totalled(self):
+        payment_transaction = self._transaction('payment', '120.00')
+        payment = SupplierPayment.objects.create(
+            supplier_transaction=payment_transaction,
+            payment_method='bank_transfer',
+            amount_paid=Decimal('120.00'),
+            due_date=date.today(),
+            processed_by=self.user
+        )
+        self.assertEqual(self._snapshot().supplier_payments_total, Decimal('0.00'))
+
+        payment.status = 'completed'
+        payment.save()
+
+        totals = supplier_ledger_service.totals(self.account)
+        self.assertEqual(totals['supplier_payments_total'], Decimal('120.00'))
+        self.assertEqual(totals['payments_total'], Decimal('120.00'))
+
+    def test_monthly_snapshots_walk_back_closing_balances(self):
+        self._transaction('purchase', '400.00')
+        earlier = self.month - timedelta(days=1)
+        SupplierLedgerSnapshot.objects.create(
+            supplier_account=self.account,
+            month=earlier.replace(day=1),
+            transaction_count=1,
+            transaction_amount=Decimal('100.00'),
+            balance_change=Decimal('100.00')
+        )
+        self.account.refresh_from_db()
+
+        with self.assertNumQueries(1):
+            snapshots = supplier_ledger_service.monthly_snapshots(self.account)
+
+        self.assertEqual(
+            [snapshot.closing_balance for snapshot in snapshots],
+            [Decimal('400.00'), Decimal('0.00')]
+        )
+
+    def test_rebuild_matches_incremental_snapshots(self):
+        self._transaction('purchase', '500.00')
+        old = self._transaction('payment', '75.00')
+        SupplierTransaction.objects.filter(pk=old.pk).update(
+            transaction_date=timezone.make_aware(datetime(2024, 3, 15))
+        )
+
+        supplier_ledger_service.rebuild(self.account)
+
+        self.assertEqual(
+            list(self.account.ledger_snapshots.values_list('month', 'transaction_count', 'balance_change')),
+            [(self.month, 1, Decimal('500.00')), (date(2024, 3, 1), 1, Decimal('-75.00'))]
+        )
+
+    def test_paid_chapa_order_nets_to_zero(self):
+        chapa_transaction = ChapaTransaction.objects.create(
+            chapa_tx_ref='EZM-LEDGER-1',
+            amount=Decimal('250.00'),
+            description='Ledger test',
+            user=self.user,
+            supplier=self.supplier,
+            customer_email='head@test.com',
+            customer_first_name='Head',
+            customer_last_name='Manager',
+        )
+
+        PaymentTransactionService._create_supplier_transaction(chapa_transaction, None)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('0.00'))
+        self.assertEqual(
+            sorted(self.account.transactions.values_list('transaction_type', flat=True)), ['payment', 'purchase']
+        )
+        snapshot = self._snapshot()
+        self.assertEqual((snapshot.payments_total, snapshot.balance_change), (Decimal('250.00'), Decimal('0.00')))
+
+    def test_offset_command_converts_old_sign_balances(self):
+        payment = self._transaction('payment', '200.00')
+        # Balance and snapshot as left by the old "+= amount" and the 0005 backfill
+        SupplierAccount.objects.filter(pk=self.account.pk).update(current_balance=Decimal('700.00'))
+
+        call_command('offset_supplier_payments', dry_run=True, stdout=StringIO())
+        self.assertFalse(self.account.transactions.filter(transaction_type='purchase').exists())
+
+        output = StringIO()
+        call_command('offset_supplier_payments', stdout=output)
+        call_command('offset_supplier_payments', stdout=StringIO())
+
+        self.assertIn('Added 1 offsetting purchases totalling 200.00', output.getvalue())
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('500.00'))
+        offset = self.account.transactions.get(transaction_type='purchase')
+        self.assertEqual((offset.amount, offset.transaction_date), (payment.amount, payment.transaction_date))
+        snapshot = self._snapshot()
+        self.assertEqual((snapshot.transaction_count, snapshot.balance_change), (2, Decimal('0.00')))
+
+        call_command('offset_supplier_payments', reverse=True, stdout=StringIO())
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.current_balance, Decimal('700.00'))
+        self.assertFalse(self.account.transactions.filter(transaction_type='purchase').exists())
+        snapshot = self._snapshot()
+        self.assertEqual((snapshot.transaction_count, snapshot.balance_change), (1, Decimal('-200.00')))
+
+    def test_account_page_shows_monthly_ledger(self):
+        self.account.credit_limit = Decimal('1000.00')
+        self.account.save()
+        self._transaction('purchase', '400.00')
+        for months_back in range(1, 14):
+            SupplierLedgerSnapshot.objects.create(
+                supplier_account=self.account,
+                month=date(2020, 1, 1) + timedelta(days=31 * months_back),
+                transaction_count=1
+            )
+        supplier_user = CustomUser.objects.create_user(
+            username='acme', email='acme@test.com', password='testpass123', role='supplier',
+            supplier=self.supplier, is_first_login=False
+        )
+        self.client.force_login(supplier_user)
+
+        with mock.patch(
+            'users.supplier_views.get_supplier_profile',
+            return_value=SimpleNamespace(is_onboarding_complete=True)
+        ):
+            response = self.client.get(reverse('supplier_account'))
+
+        self.assertEqual(response.context['available_credit'], Decimal('600.00'))
+        self.assertEqual(len(response.context['ledger_snapshots']), 12)
+        self.assertContains(response, 'Monthly Ledger')
+        self.assertContains(response, self.month.strftime('%b %Y'))
+        self.assertContains(response, '$400.00', count=4)
@@ -0,0 +1,85 @@
+"""
+Test cases for the supplier low-stock digest.
+
+This module tests:
+1. All suppliers' low/critical/out-of-stock products are loaded in one query
+2. Each affected supplier receives one digest through the queued sender
+3. Stock decrements debounce per-product alerts once their transaction commits
+"""
+
+from decimal import Decimal
+
+from django.core import mail
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from Inventory.models import Supplier, SupplierProduct
+from Inventory.stock_notification_service import StockNotificationService
+
+
+@override_settings(NOTIFICATION_QUEUE_EAGER=True)
+class SupplierLowStockDigestTest(TestCase):
+    """Tests for StockNotificationService digests and debouncing."""
+
+    def setUp(self):
+        cache.clear()
+        self.products = []
+        for s in range(3):
+            supplier = Supplier.objects.create(name=f'Supplier {s}', email=f'supplier{s}@test.com')
+            for quantity in (0, 3, 8, 50):
+                self.products.append(SupplierProduct.objects.create(
+                    supplier=supplier,
+                    product_name=f'Product {s}-{quantity}',
+                    product_code=f'P{s}{quantity}',
+                    description='Test product',
+                    category='Tools',
+                    unit_price=Decimal('10.00'),
+                    estimated_delivery_time='1 week',
+                    stock_quantity=quantity,
+                ))
+        Supplier.objects.create(name='Healthy Supplier', email='healthy@test.com')
+
+    def test_digest_groups_all_suppliers_in_one_query(self):
+        # low-stock products with suppliers, active supplier count
+        with self.assertNumQueries(2):
+            result = StockNotificationService.check_and_send_low_stock_alerts()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['notifications_sent'], 3)
+        self.assertEqual(result['total_low_stock_products'], 9)
+        self.assertEqual(result['suppliers_checked'], 4)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox),
+                         ['supplier0@test.com', 'supplier1@test.com', 'supplier2@test.com'])
+
+    def test_decrease_stock_alert_is_debounced(self):
+        product = self.products[3]  # 50 units
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.decrease_stock(45, 'Sale')
+            product.increase_stock(45, 'Restock')
+            product.decrease_stock(45, 'Sale')
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['supplier0@test.com'])
+
+    def test_rolled_back_decrease_does_not_alert_or_debounce(self):
+        product = self.products[3]  # 50 units
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    product.decrease_stock(45, 'Sale')
+                    raise ValueError('Sale cancelled')
+            except ValueError:
+                pass
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIsNone(cache.get(f'stock_alert:supplier_product:{product.pk}'))
+
+        product.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.decrease_stock(45, 'Sale')
+
+        self.assertEqual(len(mail.outbox), 1)
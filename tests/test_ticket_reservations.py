@@ -0,0 +1,135 @@
+"""
+Test cases for webfront ticket stock reservations.
+
+This module tests:
+1. Creating a ticket holds its stock so other tickets cannot oversell it
+2. Cart validation loads every line in one query and reads available stock
+3. Closing a ticket releases its stock
+4. Expired pending tickets are cancelled and their stock released
+5. Confirmed tickets that are never completed expire after a grace period
+6. Deleting a ticket releases its stock
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from Inventory.models import Product, Stock
+from store.models import Store
+from webfront.cart import WebfrontCart
+from webfront.models import CustomerTicket, StockReservation
+from webfront.reservations import stock_reservation_service
+
+
+class TicketReservationTest(TestCase):
+    """Tests for StockReservationService and WebfrontCart.create_ticket."""
+
+    def setUp(self):
+        self.store = Store.objects.create(name='Store', address='Address')
+        self.stocks = []
+        for p in range(3):
+            product = Product.objects.create(
+                name=f'Product {p}', category='Tools', price=Decimal('10.00'), material='Steel'
+            )
+            self.stocks.append(Stock.objects.create(
+                product=product, store=self.store, quantity=10, selling_price=Decimal('12.00')
+            ))
+
+    def _cart(self, quantity, stocks=None):
+        return {'items': [
+            {'product_id': stock.product_id, 'quantity': quantity}
+            for stock in (stocks or self.stocks)
+        ]}
+
+    def _create_ticket(self, phone, quantity, stocks=None):
+        return WebfrontCart.create_ticket(self._cart(quantity, stocks), self.store.id, phone)
+
+    def test_ticket_reserves_stock(self):
+        result = self._create_ticket('0911000001', 7)
+
+        self.assertTrue(result['success'])
+        for stock in self.stocks:
+            stock.refresh_from_db()
+            self.assertEqual((stock.quantity, stock.reserved_quantity), (10, 7))
+        self.assertEqual(result['ticket'].reservations.count(), 3)
+
+        second = self._create_ticket('0911000002', 4, self.stocks[:1])
+        self.assertFalse(second['success'])
+        self.assertIn('Only 3 available', second['errors'][0])
+
+    def test_validation_uses_one_stock_query(self):
+        # store lookup + one stock query for all lines
+        with self.assertNumQueries(2):
+            validation = WebfrontCart.validate_cart_data(self._cart(2), self.store.id)
+        self.assertTrue(validation['success'])
+        self.assertEqual(validation['total_amount'], Decimal('72.00'))
+
+    def test_ticket_stock_counts_own_reservation(self):
+        ticket = self._create_ticket('0911000001', 7)['ticket']
+
+        with self.assertNumQueries(2):
+            ticket_stock = stock_reservation_service.ticket_stock(ticket, self.store)
+        self.assertEqual(ticket_stock[self.stocks[0].product_id].available_for_ticket, 10)
+
+    def test_release_ticket_frees_stock(self):
+        ticket = self._create_ticket('0911000001', 5)['ticket']
+
+        self.assertEqual(stock_reservation_service.release_ticket(ticket), 15)
+
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(
+            list(Stock.objects.values_list('reserved_quantity', flat=True)),
+            [0, 0, 0]
+        )
+
+    def test_release_expired_cancels_only_pending_tickets(self):
+        expired = self._create_ticket('0911000001', 2)['ticket']
+        confirmed = self._create_ticket('0911000002', 3)['ticket']
+        CustomerTicket.objects.filter(pk=confirmed.pk).update(status='confirmed')
+        fresh = self._create_ticket('0911000003', 1)['ticket']
+        StockReservation.objects.exclude(ticket=fresh).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        result = stock_reservation_service.release_expired()
+
+        self.assertEqual(result, {'tickets': 1, 'units': 6})
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, 'cancelled')
+        self.assertEqual(
+            list(Stock.objects.values_list('reserved_quantity', flat=True)),
+            [4, 4, 4]
+        )
+
+    @override_settings(WEBFRONT_CONFIRMED_RESERVATION_HOURS=2)
+    def test_release_expired_cancels_abandoned_confirmed_tickets(self):
+        abandoned = self._create_ticket('0911000001', 2)['ticket']
+        recent = self._create_ticket('0911000002', 3)['ticket']
+        CustomerTicket.objects.filter(pk__in=[abandoned.pk, recent.pk]).update(status='ready')
+        StockReservation.objects.filter(ticket=abandoned).update(expires_at=timezone.now() - timedelta(hours=3))
+        StockReservation.objects.filter(ticket=recent).update(expires_at=timezone.now() - timedelta(hours=1))
+
+        result = stock_reservation_service.release_expired()
+
+        self.assertEqual(result, {'tickets': 1, 'units': 6})
+        abandoned.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual((abandoned.status, recent.status), ('cancelled', 'ready'))
+        self.assertEqual(
+            list(Stock.objects.values_list('reserved_quantity', flat=True)),
+            [3, 3, 3]
+        )
+
+    def test_deleting_tickets_releases_stock(self):
+        ticket = self._create_ticket('0911000001', 4)['ticket']
+        self._create_ticket('0911000002', 1, self.stocks[:1])
+
+        ticket.delete()
+        self.assertEqual(
+            list(Stock.objects.values_list('reserved_quantity', flat=True)),
+            [1, 0, 0]
+        )
+
+        # Deleting the store cascades through its tickets
+        self.store.delete()
+        self.assertFalse(StockReservation.objects.exists())
@@ -0,0 +1,206 @@
+"""
+Test cases for webhook statistics, metrics and failed-webhook reprocessing.
+
+This module tests:
+1. Webhook statistics come from one conditional aggregate and are cached
+2. Ingest rate, latency percentiles, retries and backlog depth are reported
+3. Failed webhooks are reprocessed oldest first, counting retries
+4. Reprocessing runs in parallel on a bounded pool of worker threads, one per transaction reference
+5. The metrics endpoint is limited to head managers and admins
+"""
+
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from Inventory.models import Supplier
+from payments.models import ChapaTransaction, PaymentWebhookLog
+from payments.webhook_utils import WebhookProcessor, get_webhook_metrics, get_webhook_stats
+from users.models import CustomUser
+from users.profiling import percentile
+
+
+def create_transactions(count):
+    user = CustomUser.objects.create_user(
+        username='head', email='head@test.com', password='testpass123', role='head_manager', is_first_login=False
+    )
+    supplier = Supplier.objects.create(name='Cement Supplier', email='cement@test.com')
+    return [
+        ChapaTransaction.objects.create(
+            chapa_tx_ref=f'EZM-WEBHOOK-{index}',
+            amount=Decimal('100.00'),
+            description='Webhook test',
+            user=user,
+            supplier=supplier,
+            customer_email='head@test.com',
+            customer_first_name='Head',
+            customer_last_name='Manager',
+        )
+        for index in range(count)
+    ]
+
+
+class WebhookStatsTest(TestCase):
+    """Tests for get_webhook_stats and get_webhook_metrics."""
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        for index, latency in enumerate([100, 200, 300, 400, 5000]):
+            log = PaymentWebhookLog.objects.create(webhook_data={'tx_ref': f'EZM-{index}'}, processed=True)
+            created_at = self.now - timedelta(minutes=10)
+            PaymentWebhookLog.objects.filter(pk=log.pk).update(
+                created_at=created_at, processed_at=created_at + timedelta(milliseconds=latency)
+            )
+        failed = PaymentWebhookLog.objects.create(
+            webhook_data={'tx_ref': 'EZM-FAILED'}, processing_error='Transaction not found', retry_count=2
+        )
+        PaymentWebhookLog.objects.filter(pk=failed.pk).update(created_at=self.now - timedelta(hours=3))
+        PaymentWebhookLog.objects.create(webhook_data={'tx_ref': 'EZM-PENDING'})
+
+    def test_stats_single_aggregate_and_cached(self):
+        with self.assertNumQueries(1):
+            stats = get_webhook_stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_webhook_stats(), stats)
+
+        self.assertEqual(
+            {key: stats[key] for key in ('total', 'processed', 'failed', 'pending')},
+            {'total': 7, 'processed': 5, 'failed': 1, 'pending': 1}
+        )
+        self.assertAlmostEqual(stats['success_rate'], 5 / 7 * 100)
+
+    def test_metrics(self):
+        with self.assertNumQueries(2):
+            metrics = get_webhook_metrics(window_minutes=60)
+
+        self.assertEqual(metrics['received'], 6)
+        self.assertEqual(metrics['ingest_per_minute'], 0.1)
+        self.assertEqual(metrics['latency_ms'], {'p50': 300.0, 'p90': 5000.0, 'p99': 5000.0, 'max': 5000.0})
+        self.assertEqual(metrics['retried_webhooks'], 1)
+        self.assertEqual(metrics['retries'], 2)
+        self.assertEqual(metrics['backlog'], 2)
+        self.assertGreaterEqual(metrics['oldest_backlog_seconds'], 3 * 3600)
+        with self.assertNumQueries(0):
+            get_webhook_metrics(window_minutes=60)
+
+    def test_percentile_nearest_rank(self):
+        self.assertEqual(percentile([], 0.5), 0.0)
+        # fraction * n = 1.0 and 3.0 must not round half-to-even up a rank
+        self.assertEqual(percentile([200, 100], 0.50), 100)
+        self.assertEqual(percentile([40, 10, 30, 20, 60, 50], 0.50), 30)
+        self.assertEqual(percentile([100, 200, 300, 400], 0.75), 300)
+        self.assertEqual(percentile([100, 200, 300, 400], 0.99), 400)
+        self.assertEqual(percentile([100, 200, 300], 0), 100)
+
+    def test_metrics_endpoint(self):
+        cashier = CustomUser.objects.create_user(
+            username='cashier', email='cashier@test.com', password='testpass123', role='cashier', is_first_login=False
+        )
+        head = CustomUser.objects.create_user(
+            username='head', email='head@test.com', password='testpass123', role='head_manager', is_first_login=False
+        )
+        url = reverse('webhook_metrics')
+
+        self.client.force_login(cashier)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(head)
+        self.assertEqual(self.client.get(url, {'window': 'soon'}).status_code, 400)
+        data = self.client.get(url, {'window': 30}).json()
+
+        self.assertEqual(data['stats']['total'], 7)
+        self.assertEqual(data['metrics']['window_minutes'], 30)
+        self.assertEqual(data['metrics']['backlog'], 2)
+
+
+class WebhookReprocessingTest(TestCase):
+    """Tests for WebhookProcessor.reprocess_failed_webhooks."""
+
+    def test_reprocess_records_attempts(self):
+        transaction = create_transactions(1)[0]
+        ok = PaymentWebhookLog.objects.create(
+            webhook_data={'tx_ref': transaction.chapa_tx_ref, 'status': 'success'}, processing_error='Timeout'
+        )
+        missing = PaymentWebhookLog.objects.create(
+            webhook_data={'tx_ref': 'EZM-MISSING', 'status': 'success'}, processing_error='Timeout'
+        )
+        PaymentWebhookLog.objects.create(webhook_data={'tx_ref': 'EZM-PENDING'})
+
+        results = WebhookProcessor().reprocess_failed_webhooks(workers=1)
+
+        self.assertEqual(results['processed'], 1)
+        self.assertEqual(results['failed'], 1)
+        self.assertEqual(results['errors'], [f'Webhook {missing.pk}: Transaction not found: EZM-MISSING'])
+        ok.refresh_from_db()
+        missing.refresh_from_db()
+        self.assertTrue(ok.processed)
+        self.assertIsNone(ok.processing_error)
+        self.assertIsNotNone(ok.processed_at)
+        self.assertEqual(ok.retry_count, 1)
+        self.assertFalse(missing.processed)
+        self.assertEqual(missing.processing_error, 'Transaction not found: EZM-MISSING')
+        self.assertEqual(missing.retry_count, 1)
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+
+
+class ParallelWebhookReprocessingTest(TransactionTestCase):
+    """Tests for reprocessing failed webhooks on worker threads."""
+
+    def test_parallel_batch_is_bounded(self):
+        logs = [
+            PaymentWebhookLog.objects.create(webhook_data={'tx_ref': f'EZM-{index}'}, processing_error='Timeout')
+            for index in range(8)
+        ]
+        threads = set()
+
+        def process(processor, webhook_data):
+            threads.add(threading.get_ident())
+            time.sleep(0.05)
+            if webhook_data['tx_ref'] == 'EZM-1':
+                return {'success': False, 'error': 'Transaction not found: EZM-1'}
+            return {'success': True}
+
+        out = StringIO()
+        with mock.patch.object(WebhookProcessor, 'process_webhook_data', process):
+            call_command('reprocess_webhooks', limit=6, workers=3, stdout=out)
+
+        self.assertIn('Reprocessed 5 webhooks, 1 still failing', out.getvalue())
+        self.assertIn(f'Webhook {logs[1].pk}: Transaction not found: EZM-1', out.getvalue())
+        self.assertTrue(1 < len(threads) <= 3)
+        self.assertEqual(PaymentWebhookLog.objects.filter(processed=True, retry_count=1).count(), 5)
+        self.assertEqual(PaymentWebhookLog.objects.filter(processed=False, retry_count=0).count(), 2)
+
+    def test_duplicate_references_share_a_worker(self):
+        logs = [
+            PaymentWebhookLog.objects.create(
+                webhook_data={'tx_ref': f'EZM-{index % 3}', 'attempt': index}, processing_error='Timeout'
+            )
+            for index in range(9)
+        ]
+        seen = {}
+
+        def process(processor, webhook_data):
+            seen.setdefault(webhook_data['tx_ref'], []).append((threading.get_ident(), webhook_data['attempt']))
+            time.sleep(0.02)
+            return {'success': True}
+
+        with mock.patch.object(WebhookProcessor, 'process_webhook_data', process):
+            results = WebhookProcessor().reprocess_failed_webhooks(workers=3)
+
+        self.assertEqual(results['processed'], len(logs))
+        self.assertEqual(
+            {tx_ref: [attempt for _, attempt in calls] for tx_ref, calls in seen.items()},
+            {'EZM-0': [0, 3, 6], 'EZM-1': [1, 4, 7], 'EZM-2': [2, 5, 8]}
+        )
+        for calls in seen.values():
+            self.assertEqual(len({thread for thread, _ in calls}), 1)
@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     Transaction, FinancialRecord, Receipt, Order,
     SupplierAccount, SupplierTransaction, SupplierPayment,
-    SupplierCredit, SupplierInvoice
+    SupplierCredit, SupplierInvoice, SupplierLedgerSnapshot
 )
 
 # Register existing models
@@ -46,3 +46,10 @@ class SupplierInvoiceAdmin(admin.ModelAdmin):
     list_filter = ['status', 'invoice_date', 'due_date']
     search_fields = ['invoice_number', 'purchase_order__order_number']
     readonly_fields = ['received_date', 'total_amount']
+
+@admin.register(SupplierLedgerSnapshot)
+class SupplierLedgerSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['supplier_account', 'month', 'transaction_count', 'payments_total', 'balance_change']
+    list_filter = ['month']
+    search_fields = ['supplier_account__account_number', 'supplier_account__supplier__name']
+    readonly_fields = ['updated_date']
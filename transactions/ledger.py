@@ -0,0 +1,309 @@
+"""
+Supplier ledger for EZM Trade Management.
+Keeps SupplierAccount.current_balance and one SupplierLedgerSnapshot row per
+account and month up to date as supplier transactions and payments are saved,
+so dashboards and reports read a handful of monthly rows instead of
+re-aggregating the full transaction history.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+# Effect of a completed transaction on the outstanding balance
+# (positive balance = we owe the supplier)
+BALANCE_EFFECTS = {
+    'purchase': 1,
+    'debit': 1,
+    'adjustment': 1,
+    'refund': 1,
+    'payment': -1,
+    'credit': -1,
+}
+
+# Description prefix marking purchases written by offset_payments
+OFFSET_DESCRIPTION = 'Purchase offsetting '
+
+SNAPSHOT_FIELDS = (
+    'transaction_count',
+    'transaction_amount',
+    'payments_total',
+    'supplier_payments_total',
+    'balance_change',
+)
+
+
+def month_start(value):
+    """First day of the (local) month a timestamp falls in"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+class SupplierLedgerService:
+    """
+    Incremental running balance and monthly snapshots per supplier account.
+
+    Each entry is (account_id, month, {snapshot field: amount}); saving a
+    record applies the difference between its new and previous entry.
+    """
+
+    def transaction_entry(self, supplier_transaction):
+        """Ledger contribution of a SupplierTransaction"""
+        amount = supplier_transaction.amount
+        completed = supplier_transaction.status == 'completed'
+        is_payment = supplier_transaction.transaction_type == 'payment'
+        effect = BALANCE_EFFECTS.get(supplier_transaction.transaction_type, 0)
+        return (
+            supplier_transaction.supplier_account_id,
+            month_start(supplier_transaction.transaction_date),
+            {
+                'transaction_count': 1,
+                'transaction_amount': amount,
+                'payments_total': amount if completed and is_payment else ZERO,
+                'balance_change': amount * effect if completed else ZERO,
+            }
+        )
+
+    def payment_entry(self, supplier_payment, supplier_account_id):
+        """Ledger contribution of a SupplierPayment"""
+        completed = supplier_payment.status == 'completed'
+        return (
+            supplier_account_id,
+            month_start(supplier_payment.payment_date),
+            {'supplier_payments_total': supplier_payment.amount_paid if completed else ZERO}
+        )
+
+    def locked_entry(self, instance):
+        """
+        Entry of the stored row behind an instance, locked until the end of
+        the surrounding transaction; None for unsaved instances.
+        """
+        if instance.pk is None:
+            return None
+        previous = type(instance).objects.select_for_update().filter(pk=instance.pk).first()
+        if previous is None:
+            return None
+        return self.entry_for(previous)
+
+    def entry_for(self, instance):
+        """Ledger entry of a SupplierTransaction or SupplierPayment instance"""
+        from .models import SupplierTransaction
+
+        if isinstance(instance, SupplierTransaction):
+            return self.transaction_entry(instance)
+        return self.payment_entry(
+            instance,
+            SupplierTransaction.objects.filter(
+                pk=instance.supplier_transaction_id
+            ).values_list('supplier_account_id', flat=True).first()
+        )
+
+    def apply(self, previous=None, current=None):
+        """
+        Move the ledger from a record's previous entry to its current one.
+
+        Must run inside the transaction that saves or deletes the record.
+        """
+        from .models import SupplierAccount, SupplierLedgerSnapshot
+
+        deltas = defaultdict(lambda: defaultdict(int))
+        for entry, sign in ((current, 1), (previous, -1)):
+            if entry is None or entry[0] is None:
+                continue
+            account_id, month, values = entry
+            for field, value in values.items():
+                deltas[(account_id, month)][field] += value * sign
+
+        balance_changes = defaultdict(lambda: ZERO)
+        for (account_id, month), values in deltas.items():
+            changes = {field: F(field) + value for field, value in values.items() if value}
+            if not changes:
+                continue
+            SupplierLedgerSnapshot.objects.bulk_create(
+                [SupplierLedgerSnapshot(supplier_account_id=account_id, month=month)],
+                ignore_conflicts=True
+            )
+            SupplierLedgerSnapshot.objects.filter(
+                supplier_account_id=account_id, month=month
+            ).update(**changes)
+            balance_changes[account_id] += values.get('balance_change', ZERO)
+
+        for account_id, change in balance_changes.items():
+            if change:
+                SupplierAccount.objects.filter(pk=account_id).update(
+                    current_balance=F('current_balance') + change,
+                    updated_date=timezone.now()
+                )
+
+    def monthly_snapshots(self, supplier_account, months=12):
+        """
+        Most recent monthly snapshots, newest first, each with closing_balance.
+
+        Closing balances are walked back from the account's current balance,
+        so opening balances entered by hand are preserved.
+        """
+        snapshots = list(supplier_account.ledger_snapshots.order_by('-month'))
+        balance = supplier_account.current_balance
+        for snapshot in snapshots:
+            snapshot.closing_balance = balance
+            balance -= snapshot.balance_change
+        return snapshots[:months]
+
+    def totals(self, supplier_account):
+        """Lifetime totals for an account from its snapshots"""
+        totals = supplier_account.ledger_snapshots.aggregate(
+            **{field: Sum(field) for field in SNAPSHOT_FIELDS}
+        )
+        return {field: value or 0 for field, value in totals.items()}
+
+    def rebuild(self, supplier_account):
+        """
+        Recompute an account's snapshots from its full history.
+
+        Repairs drift after bulk queryset updates that bypass save();
+        current_balance is left as is.
+        """
+        from .models import SupplierLedgerSnapshot, SupplierPayment
+
+        months = defaultdict(lambda: defaultdict(int))
+        for supplier_transaction in supplier_account.transactions.all():
+            _, month, values = self.transaction_entry(supplier_transaction)
+            for field, value in values.items():
+                months[month][field] += value
+        payments = SupplierPayment.objects.filter(supplier_transaction__supplier_account=supplier_account)
+        for payment in payments:
+            _, month, values = self.payment_entry(payment, supplier_account.pk)
+            for field, value in values.items():
+                months[month][field] += value
+
+        with transaction.atomic():
+            supplier_account.ledger_snapshots.all().delete()
+            SupplierLedgerSnapshot.objects.bulk_create([
+                SupplierLedgerSnapshot(supplier_account=supplier_account, month=month, **values)
+                for month, values in months.items()
+            ])
+        logger.info(f"Rebuilt {len(months)} ledger snapshots for account {supplier_account.account_number}")
+        return len(months)
+
+    def payment_offsets(self):
+        """
+        Unsaved offsetting purchases for completed payments that have none.
+
+        Chapa payments used to be added to current_balance with no matching
+        purchase; each such payment gets a purchase for the same amount so a
+        prepaid order nets to zero.
+        """
+        from .models import SupplierTransaction
+
+        purchased = set(
+            SupplierTransaction.objects.filter(transaction_type='purchase').exclude(
+                reference_number=''
+            ).values_list('supplier_account_id', 'reference_number')
+        )
+        numbers = set(SupplierTransaction.objects.values_list('transaction_number', flat=True))
+
+        offsets = []
+        payments = SupplierTransaction.objects.filter(transaction_type='payment', status='completed')
+        for payment in payments.order_by('pk'):
+            number = f"ST-PO-{payment.reference_number or payment.transaction_number}"[:50]
+            if number in numbers or (payment.supplier_account_id, payment.reference_number) in purchased:
+                continue
+            numbers.add(number)
+            offsets.append(SupplierTransaction(
+                transaction_number=number,
+                supplier_account_id=payment.supplier_account_id,
+                transaction_type='purchase',
+                amount=payment.amount,
+                status='completed',
+                description=f"{OFFSET_DESCRIPTION}{payment.transaction_number}",
+                reference_number=payment.reference_number,
+                purchase_order_id=payment.purchase_order_id,
+                created_by_id=payment.created_by_id,
+                transaction_date=payment.transaction_date,
+            ))
+        return offsets
+
+    def _summary(self, offsets):
+        return {
+            'transactions': len(offsets),
+            'accounts': len({offset.supplier_account_id for offset in offsets}),
+            'amount': sum((offset.amount for offset in offsets), ZERO),
+        }
+
+    def _rebalance(self, offsets, sign):
+        """
+        Move balances by the offsets' totals and rebuild the touched accounts.
+
+        The offsets are written without save(), so the balance correction is
+        applied here: adding an offset takes its payment back off the balance
+        that the old code had wrongly raised.
+        """
+        from .models import SupplierAccount
+
+        totals = defaultdict(lambda: ZERO)
+        for offset in offsets:
+            totals[offset.supplier_account_id] += offset.amount
+        for account_id, total in totals.items():
+            SupplierAccount.objects.filter(pk=account_id).update(
+                current_balance=F('current_balance') - total * sign,
+                updated_date=timezone.now()
+            )
+        for account in SupplierAccount.objects.filter(pk__in=totals.keys()):
+            self.rebuild(account)
+
+    def offset_payments(self, dry_run=False):
+        """
+        Convert balances kept with the old payment sign to the documented one.
+
+        Returns:
+            dict: Offsets written (or that would be), accounts touched and total amount
+        """
+        from .models import SupplierTransaction
+
+        with transaction.atomic():
+            offsets = self.payment_offsets()
+            if offsets and not dry_run:
+                payment_dates = [offset.transaction_date for offset in offsets]
+                SupplierTransaction.objects.bulk_create(offsets)
+                # transaction_date is auto_now_add, so backdate each to its payment's
+                for offset, payment_date in zip(offsets, payment_dates):
+                    SupplierTransaction.objects.filter(pk=offset.pk).update(transaction_date=payment_date)
+                self._rebalance(offsets, 1)
+        summary = self._summary(offsets)
+        logger.info(f"Offset supplier payments: {summary} (dry run: {dry_run})")
+        return summary
+
+    def remove_payment_offsets(self, dry_run=False):
+        """
+        Undo offset_payments: delete its purchases and restore the balances.
+
+        Returns:
+            dict: Offsets removed (or that would be), accounts touched and total amount
+        """
+        from .models import SupplierTransaction
+
+        with transaction.atomic():
+            offsets = list(SupplierTransaction.objects.select_for_update().filter(
+                transaction_type='purchase',
+                transaction_number__startswith='ST-PO-',
+                description__startswith=OFFSET_DESCRIPTION
+            ))
+            if offsets and not dry_run:
+                SupplierTransaction.objects.filter(pk__in=[offset.pk for offset in offsets]).delete()
+                self._rebalance(offsets, -1)
+        summary = self._summary(offsets)
+        logger.info(f"Removed supplier payment offsets: {summary} (dry run: {dry_run})")
+        return summary
+
+
+# Global instance for easy access
+supplier_ledger_service = SupplierLedgerService()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from Inventory.costing import landed_cost_service
+
+
+class Command(BaseCommand):
+    help = 'Freeze the cost of goods on historical sale lines from the landed cost table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sale lines updated per batch')
+        parser.add_argument(
+            '--refresh-costs',
+            action='store_true',
+            help='Re-derive the landed cost table from warehouse and purchase prices first'
+        )
+
+    def handle(self, *args, **options):
+        if options['refresh_costs']:
+            products = landed_cost_service.rebuild()
+            self.stdout.write(f"Derived landed costs for {products} products")
+
+        lines = landed_cost_service.backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Froze unit costs on {lines} sale lines"))
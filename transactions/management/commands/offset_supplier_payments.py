@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from transactions.ledger import supplier_ledger_service
+
+
+class Command(BaseCommand):
+    help = (
+        'Add offsetting purchases for Chapa payments recorded with the old balance sign, '
+        'so prepaid orders net to zero'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them')
+        parser.add_argument(
+            '--reverse',
+            action='store_true',
+            help='Delete the offsetting purchases added earlier and restore the balances'
+        )
+
+    def handle(self, *args, **options):
+        if options['reverse']:
+            result = supplier_ledger_service.remove_payment_offsets(dry_run=options['dry_run'])
+            action = 'Would remove' if options['dry_run'] else 'Removed'
+        else:
+            result = supplier_ledger_service.offset_payments(dry_run=options['dry_run'])
+            action = 'Would add' if options['dry_run'] else 'Added'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {result['transactions']} offsetting purchases totalling {result['amount']} "
+            f"across {result['accounts']} supplier accounts"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from transactions.ledger import supplier_ledger_service
+from transactions.models import SupplierAccount
+
+
+class Command(BaseCommand):
+    help = 'Recompute supplier ledger snapshots from the full transaction history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', help='Only rebuild this account number')
+
+    def handle(self, *args, **options):
+        accounts = SupplierAccount.objects.all()
+        if options['account']:
+            accounts = accounts.filter(account_number=options['account'])
+
+        months = 0
+        for account in accounts:
+            months += supplier_ledger_service.rebuild(account)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {months} monthly snapshots for {accounts.count()} supplier accounts"
+        ))
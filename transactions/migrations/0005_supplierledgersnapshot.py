@@ -0,0 +1,89 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:17
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Case, Count, DecimalField, F, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+BALANCE_EFFECTS = {
+    'purchase': 1, 'debit': 1, 'adjustment': 1, 'refund': 1,
+    'payment': -1, 'credit': -1,
+}
+
+
+def build_snapshots(apps, schema_editor):
+    """Snapshot existing supplier history; current balances are kept as they are"""
+    SupplierTransaction = apps.get_model('transactions', 'SupplierTransaction')
+    SupplierPayment = apps.get_model('transactions', 'SupplierPayment')
+    SupplierLedgerSnapshot = apps.get_model('transactions', 'SupplierLedgerSnapshot')
+    money = DecimalField(max_digits=14, decimal_places=2)
+    db_alias = schema_editor.connection.alias
+
+    snapshots = {}
+    rows = SupplierTransaction.objects.using(db_alias).annotate(
+        month=TruncMonth('transaction_date')
+    ).values('supplier_account_id', 'month').annotate(
+        transaction_count=Count('id'),
+        transaction_amount=Sum('amount'),
+        payments_total=Sum(Case(
+            When(status='completed', transaction_type='payment', then=F('amount')),
+            default=Value(0), output_field=money
+        )),
+        balance_change=Sum(Case(
+            *[
+                When(status='completed', transaction_type=kind, then=F('amount') * effect)
+                for kind, effect in BALANCE_EFFECTS.items()
+            ],
+            default=Value(0), output_field=money
+        )),
+    ).order_by()
+    for row in rows:
+        key = (row.pop('supplier_account_id'), row.pop('month'))
+        snapshots[key] = SupplierLedgerSnapshot(supplier_account_id=key[0], month=key[1], **row)
+
+    payments = SupplierPayment.objects.using(db_alias).filter(status='completed').annotate(
+        month=TruncMonth('payment_date')
+    ).values('supplier_transaction__supplier_account_id', 'month').annotate(
+        total=Sum('amount_paid')
+    ).order_by()
+    for row in payments:
+        key = (row['supplier_transaction__supplier_account_id'], row['month'])
+        snapshot = snapshots.setdefault(
+            key, SupplierLedgerSnapshot(supplier_account_id=key[0], month=key[1])
+        )
+        snapshot.supplier_payments_total = row['total']
+
+    for snapshot in snapshots.values():
+        if hasattr(snapshot.month, 'date'):
+            snapshot.month = snapshot.month.date()
+    SupplierLedgerSnapshot.objects.using(db_alias).bulk_create(snapshots.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_financialrecord_cashier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierLedgerSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('transaction_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Amount of all supplier transactions recorded this month', max_digits=14)),
+                ('payments_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Completed payment transactions', max_digits=14)),
+                ('supplier_payments_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Completed supplier payments', max_digits=14)),
+                ('balance_change', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Net change in the outstanding balance this month', max_digits=14)),
+                ('updated_date', models.DateTimeField(auto_now=True)),
+                ('supplier_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_snapshots', to='transactions.supplieraccount')),
+            ],
+            options={
+                'ordering': ['-month'],
+                'unique_together': {('supplier_account', 'month')},
+            },
+        ),
+        migrations.RunPython(build_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0005_supplierledgersnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0002_initial'),
+        ('transactions', '0006_order_unit_cost'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='financialrecord',
+            index=models.Index(fields=['record_type', 'timestamp'], name='transaction_record__f918ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_type', 'timestamp'], name='transaction_transac_048ad1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['store', 'transaction_type', 'timestamp'], name='transaction_store_i_647f74_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 03:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Formerly rewrote supplier balances during migrate. The historical
+    correction is now the reversible offset_supplier_payments management
+    command (with --dry-run), so this migration no longer touches data.
+    """
+
+    dependencies = [
+        ('transactions', '0007_date_range_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, migrations.RunPython.noop),
+    ]
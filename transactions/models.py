@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from decimal import Decimal
 from django.core.validators import MinValueValidator
@@ -52,6 +52,13 @@ class Transaction(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00) # Add this line
     payment_type = models.CharField(max_length=20, choices=PAYMENT_TYPE_CHOICES, default='cash')
 
+    class Meta:
+        indexes = [
+            # Date-range analytics filter on the raw timestamp before bucketing
+            models.Index(fields=['transaction_type', 'timestamp']),
+            models.Index(fields=['store', 'transaction_type', 'timestamp']),
+        ]
+
     def __str__(self):
         # We use try-except blocks to avoid errors if related objects don't exist yet
         try:
@@ -77,6 +84,11 @@ class FinancialRecord(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     description = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['record_type', 'timestamp']),
+        ]
+
     def __str__(self):
         return f'{self.record_type} of {self.amount} at {self.store.name}'
 
@@ -121,12 +133,20 @@ class Order(models.Model):
     quantity = models.PositiveIntegerField()
     price_at_time_of_sale = models.DecimalField(max_digits=10, decimal_places=2)
     transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='orders', null=True, blank=True)
+    # Cost of goods frozen at checkout so profit reports never re-derive it
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=4, null=True, blank=True)
 
     def __str__(self):
         receipt_id = self.receipt.id if self.receipt else "unassigned"
         product_name = self.product.name if self.product else "Unknown Product"
         return f'{self.quantity} of {product_name} for receipt {receipt_id}'
 
+    def save(self, *args, **kwargs):
+        if self.unit_cost is None and self.product_id:
+            from Inventory.costing import landed_cost_service
+            self.unit_cost = landed_cost_service.line_unit_cost(self.product_id, self.price_at_time_of_sale)
+        super().save(*args, **kwargs)
+
 
 # ============================================================================
 # SUPPLIER TRANSACTION MODELS
@@ -270,9 +290,24 @@ class SupplierTransaction(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        from .ledger import supplier_ledger_service
+
         if not self.transaction_number:
             self.transaction_number = generate_transaction_number()
-        super().save(*args, **kwargs)
+        # Keep the account balance and monthly snapshot in step with this row
+        with transaction.atomic():
+            previous = supplier_ledger_service.locked_entry(self)
+            super().save(*args, **kwargs)
+            supplier_ledger_service.apply(previous, supplier_ledger_service.transaction_entry(self))
+
+    def delete(self, *args, **kwargs):
+        from .ledger import supplier_ledger_service
+
+        with transaction.atomic():
+            previous = supplier_ledger_service.locked_entry(self)
+            result = super().delete(*args, **kwargs)
+            supplier_ledger_service.apply(previous)
+        return result
 
     def __str__(self):
         return f"{self.transaction_number} - {self.transaction_type} - ${self.amount}"
@@ -346,9 +381,23 @@ class SupplierPayment(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        from .ledger import supplier_ledger_service
+
         if not self.payment_number:
             self.payment_number = generate_payment_number()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = supplier_ledger_service.locked_entry(self)
+            super().save(*args, **kwargs)
+            supplier_ledger_service.apply(previous, supplier_ledger_service.entry_for(self))
+
+    def delete(self, *args, **kwargs):
+        from .ledger import supplier_ledger_service
+
+        with transaction.atomic():
+            previous = supplier_ledger_service.locked_entry(self)
+            result = super().delete(*args, **kwargs)
+            supplier_ledger_service.apply(previous)
+        return result
 
     def __str__(self):
         return f"Payment {self.payment_number} - ${self.amount_paid}"
@@ -539,4 +588,50 @@ class SupplierInvoice(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"Invoice {self.invoice_number} - {self.purchase_order.supplier.name} - ${self.total_amount}"
\ No newline at end of file
+        return f"Invoice {self.invoice_number} - {self.purchase_order.supplier.name} - ${self.total_amount}"
+
+
+class SupplierLedgerSnapshot(models.Model):
+    """
+    Monthly totals and net balance change for a supplier account, maintained
+    incrementally as supplier transactions and payments are saved.
+    """
+    supplier_account = models.ForeignKey(
+        SupplierAccount,
+        on_delete=models.CASCADE,
+        related_name='ledger_snapshots'
+    )
+    month = models.DateField(help_text="First day of the month")
+    transaction_count = models.PositiveIntegerField(default=0)
+    transaction_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Amount of all supplier transactions recorded this month"
+    )
+    payments_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Completed payment transactions"
+    )
+    supplier_payments_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Completed supplier payments"
+    )
+    balance_change = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Net change in the outstanding balance this month"
+    )
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-month']
+        unique_together = ['supplier_account', 'month']
+
+    def __str__(self):
+        return f"{self.supplier_account.account_number} - {self.month:%Y-%m}"
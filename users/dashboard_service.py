@@ -0,0 +1,202 @@
+"""
+Dashboard KPI service for EZM Trade Management.
+Computes the counters shown on the head manager and store manager dashboards
+with a small, fixed number of conditional-aggregate queries and caches them
+briefly per role/store.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .date_buckets import bucket_totals, local_days, start_of_day
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'dashboard_kpis:version'
+
+
+def _pending_request_counts(restock_requests, transfer_requests):
+    """
+    Pending restock and transfer request counts in one UNION ALL statement.
+
+    Returns:
+        tuple: (pending restock count, pending transfer count)
+    """
+    def counted(queryset, kind):
+        return queryset.filter(status='pending').order_by().annotate(
+            kind=Value(kind, output_field=CharField())
+        ).values('kind').annotate(total=Count('id'))
+
+    rows = counted(restock_requests, 'restock').union(counted(transfer_requests, 'transfer'), all=True)
+    counts = {row['kind']: row['total'] for row in rows}
+    return counts.get('restock', 0), counts.get('transfer', 0)
+
+
+def _sum(field, condition=None):
+    """Conditional SUM that returns 0 instead of NULL"""
+    return Coalesce(
+        Sum(field, filter=condition),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=14, decimal_places=2)
+    )
+
+
+class DashboardKPIService:
+    """
+    Cached dashboard counters, invalidated whenever a request or payment
+    status changes.
+    """
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'DASHBOARD_KPI_CACHE_SECONDS', 10)
+
+    def _version(self):
+        version = cache.get(VERSION_CACHE_KEY)
+        if version is None:
+            version = int(time.time() * 1000)
+            cache.add(VERSION_CACHE_KEY, version, None)
+        return version
+
+    def _cache_key(self, *parts):
+        return ':'.join(['dashboard_kpis', str(self._version())] + [str(part) for part in parts])
+
+    def invalidate(self):
+        """
+        Drop every cached dashboard KPI block
+        """
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, int(time.time() * 1000), None)
+
+    def get_head_manager_kpis(self):
+        """
+        Request and payment counters for the head manager dashboard.
+        """
+        key = self._cache_key('head_manager')
+        kpis = cache.get(key)
+        if kpis is None:
+            kpis = self._compute_head_manager_kpis()
+            cache.set(key, kpis, self.timeout)
+        return kpis
+
+    def _compute_head_manager_kpis(self):
+        from Inventory.models import RestockRequest, StoreStockTransferRequest
+        from payments.models import ChapaTransaction
+
+        this_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        monthly = Q(paid_at__gte=this_month)
+
+        payments = ChapaTransaction.objects.filter(status='success').aggregate(
+            total_payments=Count('id'),
+            monthly_payments=Count('id', filter=monthly),
+            total_payment_amount=_sum('amount'),
+            monthly_payment_amount=_sum('amount', monthly),
+        )
+
+        pending_restock, pending_transfer = _pending_request_counts(
+            RestockRequest.objects.all(), StoreStockTransferRequest.objects.all()
+        )
+
+        return {
+            'pending_restock_requests': pending_restock,
+            'pending_transfer_requests': pending_transfer,
+            'payment_stats': payments,
+        }
+
+    def get_store_manager_kpis(self, store, period_days=30):
+        """
+        Sales, stock and request counters for a store manager dashboard.
+
+        Args:
+            store: Store instance
+            period_days: Length of the selected analytics period in days
+        """
+        key = self._cache_key('store', store.pk, period_days)
+        kpis = cache.get(key)
+        if kpis is None:
+            kpis = self._compute_store_manager_kpis(store, period_days)
+            cache.set(key, kpis, self.timeout)
+        return kpis
+
+    def _compute_store_manager_kpis(self, store, period_days):
+        from Inventory.models import RestockRequest, Stock, StoreStockTransferRequest
+        from transactions.models import Transaction
+
+        now = timezone.now()
+        today = now.date()
+        start_date = now - timedelta(days=period_days)
+        previous_start = start_date - (now - start_date)
+        last_30_days = today - timedelta(days=30)
+        last_7_days = today - timedelta(days=7)
+
+        sale_30 = Q(transaction_type='sale', timestamp__date__gte=last_30_days)
+        sale_7 = Q(transaction_type='sale', timestamp__date__gte=last_7_days)
+        in_period = Q(timestamp__gte=start_date)
+        in_previous = Q(timestamp__gte=previous_start, timestamp__lt=start_date)
+
+        sales = Transaction.objects.filter(store=store).aggregate(
+            sales_30_amount=Sum('total_amount', filter=sale_30),
+            sales_30_count=Count('id', filter=sale_30),
+            sales_7_amount=Sum('total_amount', filter=sale_7),
+            sales_7_count=Count('id', filter=sale_7),
+            total_revenue=_sum('total_amount', in_period),
+            total_transactions=Count('id', filter=in_period),
+            previous_revenue=_sum('total_amount', in_previous),
+        )
+
+        stock = Stock.objects.filter(store=store).aggregate(
+            total_products=Count('id'),
+            total_stock_value=Sum(F('quantity') * F('selling_price')),
+            out_of_stock_count=Count('id', filter=Q(quantity=0)),
+            critical_stock_count=Count('id', filter=Q(quantity__lte=5, quantity__gt=0)),
+        )
+
+        pending_restock, pending_transfer = _pending_request_counts(
+            RestockRequest.objects.filter(store=store),
+            StoreStockTransferRequest.objects.filter(Q(from_store=store) | Q(to_store=store))
+        )
+
+        # Daily sales trend (last 7 days for chart), grouped in the database
+        days = local_days(now - timedelta(days=6), now)
+        revenue_by_day = bucket_totals(
+            Transaction.objects.filter(store=store), 'timestamp', 'day', 'total_amount', start=start_of_day(days[0])
+        )
+        daily_sales = [
+            {'date': day.strftime('%Y-%m-%d'), 'revenue': float(revenue_by_day.get(day) or 0)}
+            for day in days
+        ]
+
+        return {
+            'total_sales_30_days': {
+                'total_amount': sales['sales_30_amount'],
+                'total_transactions': sales['sales_30_count'],
+            },
+            'total_sales_7_days': {
+                'total_amount': sales['sales_7_amount'],
+                'total_transactions': sales['sales_7_count'],
+            },
+            'total_revenue': sales['total_revenue'],
+            'total_transactions': sales['total_transactions'],
+            'previous_revenue': sales['previous_revenue'],
+            'total_products': stock['total_products'],
+            'total_stock_value': stock['total_stock_value'] or 0,
+            'out_of_stock_count': stock['out_of_stock_count'],
+            'critical_stock_count': stock['critical_stock_count'],
+            'pending_restock_count': pending_restock,
+            'pending_transfer_count': pending_transfer,
+            'daily_sales': daily_sales,
+        }
+
+
+# Global instance for easy access
+dashboard_kpi_service = DashboardKPIService()
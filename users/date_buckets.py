@@ -0,0 +1,70 @@
+"""
+Portable date bucketing for EZM Trade Management analytics.
+Groups rows by local day, month, hour or weekday in the database with
+Django's Trunc*/Extract* functions, which SQLite and PostgreSQL both
+translate natively, and filters on the raw timestamp range so timestamp
+indexes stay usable (unlike __date lookups or strftime() selects).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Sum
+from django.db.models.aggregates import Aggregate
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate, TruncMonth
+from django.utils import timezone
+
+BUCKETS = {
+    'day': TruncDate,
+    'month': TruncMonth,
+    'hour': ExtractHour,
+    'weekday': ExtractIsoWeekDay,  # 1 = Monday ... 7 = Sunday
+}
+
+
+def bucket(field, kind, tzinfo=None):
+    """Expression for the local-time bucket of a datetime field"""
+    if kind not in BUCKETS:
+        raise ValueError(f"Unknown date bucket: {kind}")
+    return BUCKETS[kind](field, tzinfo=tzinfo or timezone.get_current_timezone())
+
+
+def bucket_totals(queryset, field, kind, value, start=None, end=None, tzinfo=None):
+    """
+    Total of value per bucket of field, grouped in the database.
+
+    Args:
+        queryset: Rows to bucket
+        field: Datetime field (may span relations, e.g. 'transaction__timestamp')
+        kind: 'day', 'month', 'hour' or 'weekday'
+        value: Field name or expression to sum, or an aggregate to use as is
+        start, end: Inclusive bounds on the raw field
+
+    Returns:
+        dict: bucket -> total; empty buckets are absent
+    """
+    if start is not None:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{field}__lte': end})
+    total = value if isinstance(value, Aggregate) else Sum(value)
+    return dict(
+        queryset.annotate(bucket=bucket(field, kind, tzinfo)).values('bucket').annotate(
+            total=total
+        ).values_list('bucket', 'total').order_by()
+    )
+
+
+def local_days(start, end):
+    """Local dates from start to end, inclusive"""
+    day = timezone.localtime(start).date()
+    last = timezone.localtime(end).date()
+    days = []
+    while day <= last:
+        days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def start_of_day(day):
+    """Aware local midnight of a date"""
+    return timezone.make_aware(datetime.combine(day, time.min))
@@ -0,0 +1,53 @@
+"""
+Retry writes that lose the race for SQLite's database lock.
+
+SQLite has one writer at a time. A checkout that waits longer than the
+busy timeout fails with "database is locked"; since its transaction was
+rolled back, running it again is safe. Errors raised inside an outer
+transaction are not retried, because that transaction is already lost.
+"""
+
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGES = ('database is locked', 'database table is locked', 'database is busy')
+
+
+def is_database_busy(error):
+    """Whether an error means another connection held the lock"""
+    return isinstance(error, OperationalError) and any(message in str(error).lower() for message in BUSY_MESSAGES)
+
+
+def retry_on_busy(retries=None, delay=None, using=DEFAULT_DB_ALIAS):
+    """
+    Decorator that reruns a write when the database is locked.
+
+    Args:
+        retries: Extra attempts (default: settings.DB_BUSY_RETRY_ATTEMPTS)
+        delay: Seconds before the first retry, doubled each time with
+            jitter (default: settings.DB_BUSY_RETRY_DELAY)
+        using: Database alias the write runs on
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            max_retries = settings.DB_BUSY_RETRY_ATTEMPTS if retries is None else retries
+            wait = settings.DB_BUSY_RETRY_DELAY if delay is None else delay
+            for attempt in range(max_retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as e:
+                    if attempt == max_retries or not is_database_busy(e) or connections[using].in_atomic_block:
+                        raise
+                    pause = wait * (2 ** attempt) * random.uniform(1, 1.5)
+                    logger.warning(f"{func.__name__}: {e}; retry {attempt + 1}/{max_retries} in {pause:.2f}s")
+                    time.sleep(pause)
+        return wrapper
+    return decorator
@@ -6,8 +6,10 @@ logging, and template management for user-related emails.
 """
 
 import logging
+import queue
 import socket
-from django.core.mail import send_mail, EmailMultiAlternatives
+import threading
+from django.core.mail import send_mail, EmailMultiAlternatives, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
@@ -613,5 +615,89 @@ Best regards,
             return False, error_msg
 
 
+class QueuedEmailSender:
+    """
+    Background worker that takes notification work off the request path
+
+    Jobs (callables) and ready-made messages are processed by a single daemon
+    thread. Messages queued together are delivered over one backend
+    connection. With NOTIFICATION_QUEUE_EAGER enabled everything runs inline,
+    which is what tests and short-lived management commands want.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def eager(self):
+        return getattr(settings, 'NOTIFICATION_QUEUE_EAGER', False)
+
+    def send(self, message):
+        """Queue an EmailMessage for delivery"""
+        self._put(('message', message))
+
+    def submit(self, job, *args, **kwargs):
+        """Queue a callable that prepares and sends notifications"""
+        self._put(('job', (job, args, kwargs)))
+
+    def flush(self):
+        """Block until everything queued so far has been processed"""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _put(self, item):
+        if self.eager:
+            self._process([item])
+            return
+        self._ensure_worker()
+        self._queue.put(item)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='queued-email-sender', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._process(batch)
+            finally:
+                close_old_connections()
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _process(self, batch):
+        messages = []
+        for kind, payload in batch:
+            if kind == 'job':
+                job, args, kwargs = payload
+                try:
+                    job(*args, **kwargs)
+                except Exception as e:
+                    logger.error(f"Queued notification job {getattr(job, '__name__', job)} failed: {str(e)}")
+            else:
+                messages.append(payload)
+
+        if messages:
+            try:
+                connection = get_connection(fail_silently=False)
+                sent = connection.send_messages(messages)
+                logger.info(f"Queued email sender delivered {sent} of {len(messages)} messages")
+            except Exception as e:
+                logger.error(f"Queued email sender failed to deliver {len(messages)} messages: {str(e)}")
+
+
 # Global instance for easy access
 email_service = EZMEmailService()
+queued_email_sender = QueuedEmailSender()
@@ -0,0 +1,233 @@
+"""
+Financial statements for EZM Trade Management.
+Computes revenue, expenses, cost of goods, net profit and purchase costs for
+every store, month, day and product category of a reporting period in a
+fixed number of grouped queries. Statements are cached per period and
+cache window so the financial reports page, its PDF export and the analytics API share
+one computation.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import DecimalField, F, Sum
+from django.utils import timezone
+
+from .date_buckets import bucket_totals, start_of_day
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+
+PERIOD_DAYS = {'7': 7, '30': 30, '90': 90, '365': 365}
+DEFAULT_PERIOD = '30'
+
+
+def _margin(amount, revenue):
+    return (amount / revenue * 100) if revenue > 0 else 0
+
+
+def _month_start(value):
+    return value.replace(day=1)
+
+
+class FinancialStatementService:
+    """
+    Per-period financial statements for the head manager reports.
+
+    Statements are keyed by period and FINANCIAL_STATEMENT_CACHE_SECONDS
+    window, so every request in a window reads the statement computed by
+    the first one.
+    """
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'FINANCIAL_STATEMENT_CACHE_SECONDS', 300)
+
+    def normalize_period(self, period):
+        return period if period in PERIOD_DAYS else DEFAULT_PERIOD
+
+    def get_statement(self, period=DEFAULT_PERIOD, now=None):
+        """
+        Cached statement for a period ('7', '30', '90' or '365' days) ending now.
+
+        Returns:
+            dict: period, start_date, end_date, stores (one row per store in
+            store order), totals, monthly_trend, daily and revenue_breakdown
+        """
+        period = self.normalize_period(period)
+        now = now or timezone.now()
+        window = int(now.timestamp()) // max(1, self.timeout)
+        key = f"financial_statement:{period}:{window}"
+        statement = cache.get(key)
+        if statement is None:
+            statement = self.compute(now - timedelta(days=PERIOD_DAYS[period]), now)
+            statement['period'] = period
+            if self.timeout:
+                cache.set(key, statement, self.timeout)
+        return statement
+
+    def compute(self, start_date, end_date):
+        """Statement for an arbitrary range, uncached"""
+        from Inventory.costing import landed_cost_service, line_profit
+        from Inventory.models import PurchaseOrder
+        from store.models import Store
+        from transactions.models import FinancialRecord, Order, Transaction
+
+        sales = Transaction.objects.filter(transaction_type='sale')
+        expenses = FinancialRecord.objects.filter(record_type='expense')
+        sale_lines = Order.objects.filter(transaction__transaction_type='sale')
+        in_period = {'timestamp__gte': start_date, 'timestamp__lte': end_date}
+        lines_in_period = sale_lines.filter(
+            transaction__timestamp__gte=start_date, transaction__timestamp__lte=end_date
+        )
+
+        # Lines sold before cost snapshots existed
+        landed_cost_service.freeze_pending(lines_in_period)
+
+        revenue_by_store = dict(
+            sales.filter(**in_period).values('store_id').annotate(total=Sum('total_amount')).values_list(
+                'store_id', 'total'
+            ).order_by()
+        )
+        expenses_by_store = dict(
+            expenses.filter(**in_period).values('store_id').annotate(total=Sum('amount')).values_list(
+                'store_id', 'total'
+            ).order_by()
+        )
+        profit_by_store = {
+            row['transaction__store_id']: row
+            for row in lines_in_period.filter(unit_cost__isnull=False).values('transaction__store_id').annotate(
+                net_profit=line_profit(),
+                cost_of_goods=Sum(
+                    F('unit_cost') * F('quantity'), output_field=DecimalField(max_digits=16, decimal_places=4)
+                )
+            ).order_by()
+        }
+        purchase_costs = PurchaseOrder.objects.filter(
+            status='delivered', created_date__gte=start_date, created_date__lte=end_date
+        ).aggregate(total=Sum('total_amount'))['total'] or ZERO
+
+        stores = []
+        for store in Store.objects.all():
+            revenue = revenue_by_store.get(store.pk) or ZERO
+            expense_records = expenses_by_store.get(store.pk) or ZERO
+            profit = profit_by_store.get(store.pk, {})
+            net_profit = profit.get('net_profit') or ZERO
+            # Purchase orders are not per store; each store carries the period's total as before
+            total_expenses = expense_records + purchase_costs
+            profit_loss = revenue - total_expenses
+            stores.append({
+                'store': store,
+                'revenue': revenue,
+                'expenses': total_expenses,
+                'expense_records': expense_records,
+                'purchase_costs': purchase_costs,
+                'cost_of_goods': profit.get('cost_of_goods') or ZERO,
+                'profit_loss': profit_loss,
+                'profit_margin': _margin(profit_loss, revenue),
+                'net_profit': net_profit,
+                'net_profit_margin': _margin(net_profit, revenue),
+            })
+
+        total_revenue = sum((row['revenue'] for row in stores), ZERO)
+        total_expenses = sum((row['expenses'] for row in stores), ZERO)
+        total_net_profit = sum((row['net_profit'] for row in stores), ZERO)
+        total_profit = total_revenue - total_expenses
+        totals = {
+            'total_revenue': total_revenue,
+            'total_expenses': total_expenses,
+            'total_profit': total_profit,
+            'total_net_profit': total_net_profit,
+            'total_cost_of_goods': sum((row['cost_of_goods'] for row in stores), ZERO),
+            'purchase_costs': purchase_costs,
+            'overall_margin': _margin(total_profit, total_revenue),
+            'overall_net_margin': _margin(total_net_profit, total_revenue),
+            'stores_count': len(stores),
+            'profitable_stores': len([row for row in stores if row['profit_loss'] > 0]),
+        }
+
+        daily, monthly_trend = self._series(sales, expenses, sale_lines, start_date, end_date)
+
+        category_revenue = [
+            {'category': row['product__category'], 'revenue': float(row['revenue'])}
+            for row in lines_in_period.exclude(product__category__isnull=True).exclude(
+                product__category=''
+            ).values('product__category').annotate(
+                revenue=Sum(F('quantity') * F('price_at_time_of_sale'))
+            ).order_by('product__category')
+            if row['revenue'] and row['revenue'] > 0
+        ]
+        store_revenue = [
+            {'store': row['store'].name, 'revenue': float(row['revenue'])}
+            for row in stores if row['revenue'] > 0
+        ]
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'stores': stores,
+            'totals': totals,
+            'monthly_trend': monthly_trend,
+            'daily': daily,
+            'revenue_breakdown': {
+                'category_revenue': category_revenue,
+                'store_revenue': store_revenue,
+            },
+        }
+
+    def _series(self, sales, expenses, sale_lines, start_date, end_date):
+        """
+        Daily revenue, expenses and net profit for every calendar day of the
+        period, and monthly revenue and expenses from the first month's start.
+        """
+        from Inventory.costing import line_profit
+
+        first_day = _month_start(timezone.localtime(start_date).date())
+        last_day = timezone.localtime(end_date).date()
+        since = start_of_day(first_day)
+        period_start = timezone.localtime(start_date).date()
+
+        revenue = defaultdict(lambda: ZERO, bucket_totals(sales, 'timestamp', 'day', 'total_amount', since, end_date))
+        spent = defaultdict(lambda: ZERO, bucket_totals(expenses, 'timestamp', 'day', 'amount', since, end_date))
+        profit = defaultdict(lambda: ZERO, bucket_totals(
+            sale_lines.filter(unit_cost__isnull=False), 'transaction__timestamp', 'day', line_profit(),
+            start_of_day(period_start), end_date
+        ))
+
+        daily = []
+        months = {}
+        day = first_day
+        while day <= last_day:
+            day_revenue = revenue[day] or ZERO
+            day_expenses = spent[day] or ZERO
+            month = months.setdefault(day.strftime('%Y-%m'), {'revenue': ZERO, 'expenses': ZERO})
+            month['revenue'] += day_revenue
+            month['expenses'] += day_expenses
+            if day >= period_start:
+                daily.append({
+                    'date': day.strftime('%Y-%m-%d'),
+                    'revenue': float(day_revenue),
+                    'expenses': float(day_expenses),
+                    'net_profit': float(profit[day] or ZERO),
+                })
+            day += timedelta(days=1)
+
+        monthly_trend = [
+            {
+                'month': month,
+                'revenue': float(totals['revenue']),
+                'expenses': float(totals['expenses']),
+                'profit': float(totals['revenue'] - totals['expenses']),
+            }
+            for month, totals in months.items()
+        ]
+        return daily, monthly_trend
+
+
+# Global instance for easy access
+financial_statement_service = FinancialStatementService()
@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) pagination for EZM Trade Management list pages.
+Each page continues from the sort key of the last row shown instead of
+skipping OFFSET rows, so a deep page costs the same as the first one when
+an index matches the ordering. Cursors are opaque URL-safe tokens.
+"""
+
+import base64
+import binascii
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of rows plus cursors to its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _key_fields(model, ordering):
+    """(field, descending) pairs for an ordering such as ['-login_timestamp', '-id']"""
+    keys = []
+    for name in ordering:
+        descending = name.startswith('-')
+        field = model._meta.get_field(name.lstrip('-'))
+        if field.is_relation:
+            raise ValueError(f"Keyset ordering must use local columns, not {name}")
+        keys.append((field, descending))
+    if not keys or not (keys[-1][0].primary_key or keys[-1][0].unique):
+        raise ValueError("Keyset ordering must end with a unique field")
+    return keys
+
+
+def encode_cursor(keys, row, direction):
+    # value_to_string keeps full precision (microseconds included), unlike JSON encoders
+    values = [field.value_to_string(row) for field, _ in keys]
+    payload = json.dumps({'d': direction, 'k': values}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(keys, cursor):
+    """(direction, key values) of a cursor, or None if it is malformed or stale"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if payload['d'] not in ('next', 'previous') or len(payload['k']) != len(keys):
+            return None
+        return payload['d'], [field.to_python(value) for (field, _), value in zip(keys, payload['k'])]
+    except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+        return None
+
+
+def _beyond(keys, values, forward):
+    """Rows that sort after the key (or before it, going backwards)"""
+    clauses, equal = [], {}
+    for (field, descending), value in zip(keys, values):
+        lookup = 'lt' if descending == forward else 'gt'
+        clauses.append(Q(**equal, **{f'{field.name}__{lookup}': value}))
+        equal[field.name] = value
+    return reduce(or_, clauses)
+
+
+def paginate_keyset(queryset, ordering, cursor=None, per_page=25):
+    """
+    One page of queryset in ordering, starting at cursor.
+
+    Args:
+        queryset: Filtered rows to page through
+        ordering: Field names ('-' for descending) ending in a unique field,
+            e.g. ['-created_at', '-id']
+        cursor: Token from a previous page's next_cursor or previous_cursor;
+            missing or malformed cursors start at the first page
+        per_page: Rows per page
+
+    Returns:
+        KeysetPage
+    """
+    keys = _key_fields(queryset.model, ordering)
+    position = decode_cursor(keys, cursor) if cursor else None
+    forward = position is None or position[0] == 'next'
+
+    if forward:
+        rows = queryset.order_by(*ordering)
+    else:
+        rows = queryset.order_by(*[name[1:] if name.startswith('-') else f'-{name}' for name in ordering])
+    if position:
+        rows = rows.filter(_beyond(keys, position[1], forward))
+
+    rows = list(rows[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+    if not rows:
+        return KeysetPage([])
+
+    # Going forward there is a previous page whenever a cursor was followed, and vice versa
+    has_next = more if forward else True
+    has_previous = position is not None if forward else more
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor(keys, rows[-1], 'next') if has_next else None,
+        previous_cursor=encode_cursor(keys, rows[0], 'previous') if has_previous else None,
+    )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.retention import POLICIES, log_archiver
+
+
+class Command(BaseCommand):
+    help = 'Move log rows older than their retention period (settings.RETENTION_DAYS) into monthly JSONL.gz archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=sorted(POLICIES),
+            help='Archive only this table (repeatable); all policies by default'
+        )
+        parser.add_argument('--days', type=int, help='Override the retention period for the selected tables')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows archived per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be archived')
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        total = 0
+        for label in options['model'] or POLICIES:
+            result = log_archiver.archive(
+                label, days=options['days'], chunk_size=options['chunk_size'], dry_run=options['dry_run']
+            )
+            total += result['rows']
+            months = ', '.join(f'{month:%Y-%m}' for month in result['months'])
+            self.stdout.write(f"{label}: {result['rows']} rows" + (f" ({months})" if months else ''))
+
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} rows"))
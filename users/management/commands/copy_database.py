@@ -0,0 +1,90 @@
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+
+# Rows migrate creates on its own; they are replaced by the source's rows
+MIGRATE_CREATED = (ContentType, Permission)
+
+
+class Command(BaseCommand):
+    help = 'Copy every table from one database (e.g. SQLite) into another migrated one (e.g. PostgreSQL) in bulk chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default='sqlite', help='Database alias to copy from (default: sqlite)')
+        parser.add_argument('--target', default='default', help='Migrated database alias to copy into (default: default)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows read and inserted per chunk')
+        parser.add_argument(
+            '--exclude',
+            action='append',
+            default=[],
+            metavar='APP_LABEL.MODEL',
+            help='Skip this model (repeatable), e.g. sessions.Session'
+        )
+        parser.add_argument('--truncate', action='store_true', help='Empty the target tables first if they hold data')
+
+    def handle(self, *args, **options):
+        source, target = options['source'], options['target']
+        for alias in (source, target):
+            if alias not in connections:
+                raise CommandError(f"Unknown database alias: {alias}")
+        if source == target:
+            raise CommandError('Source and target must be different databases')
+
+        excluded = {label.lower() for label in options['exclude']}
+        models = [
+            model for model in apps.get_models(include_auto_created=True)
+            if model._meta.managed and not model._meta.proxy
+            and model._meta.label_lower not in excluded
+            and router.allow_migrate_model(target, model)
+        ]
+
+        if not options['truncate']:
+            filled = [
+                model._meta.label for model in models
+                if not issubclass(model, MIGRATE_CREATED) and model._base_manager.using(target).exists()
+            ]
+            if filled:
+                raise CommandError(
+                    f"Target database already holds data in {', '.join(filled)}; use --truncate to replace it"
+                )
+
+        connection = connections[target]
+        copied = 0
+        # Foreign keys are checked at commit, so tables can be filled in any order
+        with transaction.atomic(using=target):
+            connection.ops.execute_sql_flush(
+                connection.ops.sql_flush(no_style(), [model._meta.db_table for model in models], allow_cascade=True)
+            )
+            for model in models:
+                rows = self.copy_model(model, source, target, options['chunk_size'])
+                copied += rows
+                if rows:
+                    self.stdout.write(f"{model._meta.label}: {rows} rows")
+
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS(f"Copied {copied} rows in {len(models)} tables from {source} to {target}"))
+
+    def copy_model(self, model, source, target, chunk_size):
+        """Copy one table in primary-key order; returns rows copied"""
+        rows = model._base_manager.using(source).order_by('pk')
+        fields = list(model._meta.concrete_fields)
+        copied = 0
+        last_pk = None
+        while True:
+            chunk = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:chunk_size])
+            if not chunk:
+                return copied
+            # raw inserts keep stored values (auto_now timestamps are not refreshed)
+            batch_size = connections[target].ops.bulk_batch_size(fields, chunk) or len(chunk)
+            for start in range(0, len(chunk), batch_size):
+                model._base_manager.using(target)._insert(
+                    chunk[start:start + batch_size], fields=fields, using=target, raw=True
+                )
+            copied += len(chunk)
+            last_pk = chunk[-1].pk
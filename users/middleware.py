@@ -1,7 +1,14 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib import messages
 
+from .profiling import install_template_timer, request_profiler
+
 
 class FirstLoginPasswordChangeMiddleware:
     """
@@ -46,3 +53,39 @@ class FirstLoginPasswordChangeMiddleware:
         
         response = self.get_response(request)
         return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Middleware recording query count, duplicate SQL, DB, template and total
+    time per request when REQUEST_PROFILING_ENABLED is set.
+
+    Results are sent back in a Server-Timing header and kept in the
+    request profiler's ring buffer for the slowest endpoints page.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        if request.path.startswith('/static/') or request.path.startswith('/media/'):
+            return self.get_response(request)
+
+        profile = request_profiler.start(request)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(request_profiler.query_wrapper))
+                response = self.get_response(request)
+        except Exception:
+            request_profiler.stop(profile, 500)
+            raise
+
+        if request.resolver_match:
+            profile.view = request.resolver_match.view_name
+        request_profiler.stop(profile, response.status_code)
+        response['Server-Timing'] = profile.server_timing()
+        return response
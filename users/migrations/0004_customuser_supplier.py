@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def link_suppliers_by_email(apps, schema_editor):
+    """Point existing supplier users at the Supplier sharing their email"""
+    CustomUser = apps.get_model('users', 'CustomUser')
+    Supplier = apps.get_model('Inventory', 'Supplier')
+    db_alias = schema_editor.connection.alias
+    CustomUser.objects.using(db_alias).filter(role='supplier', supplier__isnull=True).update(
+        supplier=Subquery(
+            Supplier.objects.filter(email=OuterRef('email')).order_by('pk').values('pk')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0016_stock_reserved_quantity'),
+        ('users', '0003_loginlog_accountreset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='supplier',
+            field=models.ForeignKey(blank=True, help_text='Supplier company this supplier-role user belongs to', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='Inventory.supplier'),
+        ),
+        migrations.RunPython(link_suppliers_by_email, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_customuser_supplier'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['login_timestamp', 'id'], name='users_login_login_t_770bc5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['login_status', 'login_timestamp', 'id'], name='users_login_login_s_4b0794_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loginlog',
+            index=models.Index(fields=['user', 'login_timestamp', 'id'], name='users_login_user_id_cf95a1_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-19 01:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='Archived model, e.g. users.LoginLog', max_length=100)),
+                ('month', models.DateField(help_text='First day of the (local) month the rows belong to')),
+                ('group_key', models.CharField(help_text='Canonical JSON of group, for uniqueness', max_length=255)),
+                ('group', models.JSONField(default=dict, help_text='Values the rows were grouped by, e.g. {"status": "failed"}')),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('total', models.BigIntegerField(default=0, help_text="Sum of the policy's total, e.g. quantity changed")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Archive summaries',
+                'ordering': ['model_label', 'month'],
+                'unique_together': {('model_label', 'month', 'group_key')},
+            },
+        ),
+    ]
@@ -2,6 +2,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
+from .retention import ArchiveAwareManager
 
 class CustomUser(AbstractUser):
     ROLE_CHOICES = [
@@ -16,6 +17,14 @@ class CustomUser(AbstractUser):
     is_first_login = models.BooleanField(default=True)
     phone_number = models.CharField(max_length=20, blank=True)
     email = models.EmailField(unique=True)  # Make email unique
+    supplier = models.ForeignKey(
+        'Inventory.Supplier',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='users',
+        help_text="Supplier company this supplier-role user belongs to"
+    )
 
 
 class LoginLog(models.Model):
@@ -36,10 +45,19 @@ class LoginLog(models.Model):
     user_role = models.CharField(max_length=20, blank=True, help_text="User role at time of login")
     failure_reason = models.CharField(max_length=100, blank=True, help_text="Reason for failed login")
 
+    # Live rows; .archived() and .history() also read the retention archives
+    objects = ArchiveAwareManager()
+
     class Meta:
         ordering = ['-login_timestamp']
         verbose_name = "Login Log"
         verbose_name_plural = "Login Logs"
+        # Match the audit page's cursor ordering, alone and behind its filters
+        indexes = [
+            models.Index(fields=['login_timestamp', 'id']),
+            models.Index(fields=['login_status', 'login_timestamp', 'id']),
+            models.Index(fields=['user', 'login_timestamp', 'id']),
+        ]
 
     def __str__(self):
         status_icon = "✓" if self.login_status == 'success' else "✗"
@@ -64,3 +82,23 @@ class AccountReset(models.Model):
 
     def __str__(self):
         return f"Reset: {self.user.username} by {self.reset_by.username} - {self.reset_timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+class ArchiveSummary(models.Model):
+    """Monthly totals of log rows moved out of their live table by archive_logs"""
+
+    model_label = models.CharField(max_length=100, help_text="Archived model, e.g. users.LoginLog")
+    month = models.DateField(help_text="First day of the (local) month the rows belong to")
+    group_key = models.CharField(max_length=255, help_text="Canonical JSON of group, for uniqueness")
+    group = models.JSONField(default=dict, help_text="Values the rows were grouped by, e.g. {\"status\": \"failed\"}")
+    rows = models.PositiveIntegerField(default=0)
+    total = models.BigIntegerField(default=0, help_text="Sum of the policy's total, e.g. quantity changed")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['model_label', 'month']
+        unique_together = ['model_label', 'month', 'group_key']
+        verbose_name_plural = "Archive summaries"
+
+    def __str__(self):
+        return f"{self.model_label} {self.month:%Y-%m} {self.group}: {self.rows} rows"
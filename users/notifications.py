@@ -35,30 +35,10 @@ class NotificationManager:
         """
         Create a new system notification.
         """
-        from Inventory.models import SystemNotification, NotificationCategory
+        from Inventory.models import SystemNotification
         
         try:
-            # Get or create category
-            category_map = {
-                'unassigned_store_manager': 'user_management',
-                'pending_restock_request': 'requests',
-                'pending_transfer_request': 'requests',
-                'new_supplier_registration': 'suppliers',
-                'request_approved': 'requests',
-                'request_rejected': 'requests',
-                'low_stock_alert': 'inventory',
-                'system_announcement': 'system',
-            }
-            
-            category_name = category_map.get(notification_type, 'general')
-            category, created = NotificationCategory.objects.get_or_create(
-                name=category_name,
-                defaults={
-                    'display_name': category_name.replace('_', ' ').title(),
-                    'icon': 'bi-bell',
-                    'priority': 1
-                }
-            )
+            category = NotificationManager.get_category(notification_type)
             
             # Calculate expiration
             expires_at = None
@@ -92,6 +72,35 @@ class NotificationManager:
             logger.error(f"Error creating notification: {e}")
             return None
     
+    @staticmethod
+    def get_category(notification_type: str):
+        """
+        Get or create the category a notification type belongs to.
+        """
+        from Inventory.models import NotificationCategory
+
+        category_map = {
+            'unassigned_store_manager': 'user_management',
+            'pending_restock_request': 'requests',
+            'pending_transfer_request': 'requests',
+            'new_supplier_registration': 'suppliers',
+            'request_approved': 'requests',
+            'request_rejected': 'requests',
+            'low_stock_alert': 'inventory',
+            'system_announcement': 'system',
+        }
+
+        category_name = category_map.get(notification_type, 'general')
+        category, created = NotificationCategory.objects.get_or_create(
+            name=category_name,
+            defaults={
+                'display_name': category_name.replace('_', ' ').title(),
+                'icon': 'bi-bell',
+                'priority': 1
+            }
+        )
+        return category
+
     @staticmethod
     def get_user_notifications(user, include_read=False, limit=50):
         """
@@ -304,54 +313,77 @@ class NotificationTriggers:
             logger.error(f"Error checking empty stores: {e}")
 
     @staticmethod
-    def check_low_stock_alerts():
+    def check_low_stock_alerts(batch_size=500):
         """
         Check for products with low stock across all stores and create notifications.
+
+        Runs as a set-based sweep: one query finds every low-stock row without
+        an active alert, new alerts are bulk created and alerts whose stock
+        has recovered are deactivated in a single update.
+
+        Returns:
+            dict with the number of 'created' and 'resolved' alerts
         """
-        from Inventory.models import Stock, Product
-        from store.models import Store
+        from Inventory.models import Stock, SystemNotification
+        from django.db.models import Exists, OuterRef
+
+        summary = {'created': 0, 'resolved': 0}
 
         try:
             # Define low stock threshold (can be made configurable)
             LOW_STOCK_THRESHOLD = 10
 
-            # Get all stores
-            active_stores = Store.objects.all()
-
-            for store in active_stores:
-                # Find products with low stock in this store
-                low_stock_items = Stock.objects.filter(
-                    store=store,
-                    quantity__lte=LOW_STOCK_THRESHOLD,
-                    quantity__gt=0  # Exclude completely out of stock
-                ).select_related('product')
-
-                for stock_item in low_stock_items:
-                    # Check if notification already exists for this product/store combination
-                    from Inventory.models import SystemNotification
-                    existing = SystemNotification.objects.filter(
-                        notification_type='low_stock_alert',
-                        related_object_type='stock',
-                        related_object_id=stock_item.id,
-                        is_active=True
-                    ).exists()
-
-                    if not existing:
-                        NotificationManager.create_notification(
-                            notification_type='low_stock_alert',
-                            title=f'Low Stock Alert: {stock_item.product.name}',
-                            message=f'{stock_item.product.name} is running low in {store.name}. Current stock: {stock_item.quantity} units.',
-                            target_roles=['head_manager', 'store_manager'],
-                            priority='medium' if stock_item.quantity > 5 else 'high',
-                            action_url=f'/inventory/',
-                            action_text='Manage Inventory',
-                            related_object_type='stock',
-                            related_object_id=stock_item.id,
-                            expires_hours=48  # 2 days
-                        )
+            active_alerts = SystemNotification.objects.filter(
+                notification_type='low_stock_alert',
+                related_object_type='stock',
+                is_active=True
+            )
+
+            # Low stock rows (excluding completely out of stock) with no active alert yet
+            low_stock_items = Stock.objects.filter(
+                quantity__lte=LOW_STOCK_THRESHOLD,
+                quantity__gt=0
+            ).exclude(
+                Exists(active_alerts.filter(related_object_id=OuterRef('pk')))
+            ).select_related('product', 'store').order_by()
+
+            category = None
+            expires_at = timezone.now() + timezone.timedelta(hours=48)  # 2 days
+            new_alerts = []
+            for stock_item in low_stock_items.iterator(chunk_size=batch_size):
+                if category is None:
+                    category = NotificationManager.get_category('low_stock_alert')
+                new_alerts.append(SystemNotification(
+                    notification_type='low_stock_alert',
+                    category=category,
+                    title=f'Low Stock Alert: {stock_item.product.name}',
+                    message=f'{stock_item.product.name} is running low in {stock_item.store.name}. Current stock: {stock_item.quantity} units.',
+                    priority='medium' if stock_item.quantity > 5 else 'high',
+                    target_roles=['head_manager', 'store_manager'],
+                    action_url=f'/inventory/',
+                    action_text='Manage Inventory',
+                    related_object_type='stock',
+                    related_object_id=stock_item.id,
+                    expires_at=expires_at
+                ))
+
+            if new_alerts:
+                SystemNotification.objects.bulk_create(new_alerts, batch_size=batch_size)
+                summary['created'] = len(new_alerts)
+
+            # Deactivate alerts whose stock has recovered (or no longer exists)
+            summary['resolved'] = active_alerts.exclude(
+                related_object_id__in=Stock.objects.filter(
+                    quantity__lte=LOW_STOCK_THRESHOLD
+                ).values('pk')
+            ).update(is_active=False)
+
+            logger.info(f"Low stock sweep: {summary['created']} alerts created, {summary['resolved']} resolved")
 
         except Exception as e:
             logger.error(f"Error checking low stock alerts: {e}")
+
+        return summary
     
     @staticmethod
     def notify_pending_restock_request(restock_request):
@@ -0,0 +1,206 @@
+"""
+Request profiling for EZM Trade Management.
+Collects per-request query counts, duplicate SQL fingerprints, DB, template
+and total time for RequestProfilingMiddleware, and keeps the most recent
+profiles in an in-process ring buffer for the slowest endpoints page.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+
+_state = threading.local()
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def fingerprint(sql):
+    """SQL with literals and IN lists collapsed, so repeated shapes compare equal"""
+    sql = _LITERALS.sub('?', sql)
+    sql = _IN_LISTS.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestProfile:
+    """Measurements for one request"""
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.view = ''
+        self.status = None
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.fingerprints = Counter()
+
+    @property
+    def query_count(self):
+        return sum(self.fingerprints.values())
+
+    def duplicates(self):
+        """[(fingerprint, count)] for SQL shapes issued more than once, most repeated first"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    def record_query(self, sql, duration):
+        self.fingerprints[fingerprint(sql)] += 1
+        self.db_ms += duration * 1000
+
+    def finish(self, status):
+        self.status = status
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        """Server-Timing header value"""
+        return ', '.join([
+            f'db;dur={self.db_ms:.1f};desc="{self.query_count} queries"',
+            f'dup;desc="{len(self.duplicates())} duplicated"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+    def as_dict(self):
+        duplicates = self.duplicates()
+        return {
+            'method': self.method,
+            'path': self.path,
+            'view': self.view or self.path,
+            'status': self.status,
+            'total_ms': round(self.total_ms, 2),
+            'db_ms': round(self.db_ms, 2),
+            'template_ms': round(self.template_ms, 2),
+            'queries': self.query_count,
+            'duplicate_queries': sum(count - 1 for _, count in duplicates),
+            'worst_duplicate': duplicates[0] if duplicates else None,
+        }
+
+
+class RequestProfiler:
+    """
+    Ring buffer of recent request profiles with per-view summaries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=self.buffer_size)
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'REQUEST_PROFILING_ENABLED', False)
+
+    @property
+    def buffer_size(self):
+        return getattr(settings, 'REQUEST_PROFILING_BUFFER_SIZE', 500)
+
+    def current(self):
+        """Profile of the request running on this thread, if any"""
+        return getattr(_state, 'profile', None)
+
+    def start(self, request):
+        profile = RequestProfile(request.method, request.path)
+        _state.profile = profile
+        return profile
+
+    def stop(self, profile, status):
+        profile.finish(status)
+        _state.profile = None
+        with self._lock:
+            if self._entries.maxlen != self.buffer_size:
+                self._entries = deque(self._entries, maxlen=self.buffer_size)
+            self._entries.append(profile.as_dict())
+
+    def query_wrapper(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook timing each query of the current request"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            profile = self.current()
+            if profile is not None:
+                profile.record_query(sql, time.perf_counter() - started)
+
+    def recent(self):
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def slowest_endpoints(self, limit=20):
+        """
+        Per-view summary of the buffered requests, slowest average first.
+
+        Returns:
+            list: dicts with view, requests, avg/max total ms, avg db and
+            template ms, avg/max queries, duplicate queries and worst duplicate
+        """
+        grouped = {}
+        for entry in self.recent():
+            grouped.setdefault(entry['view'], []).append(entry)
+
+        summaries = []
+        for view, entries in grouped.items():
+            count = len(entries)
+            worst = max(entries, key=lambda entry: entry['duplicate_queries'])
+            summaries.append({
+                'view': view,
+                'requests': count,
+                'avg_ms': round(sum(entry['total_ms'] for entry in entries) / count, 2),
+                'max_ms': max(entry['total_ms'] for entry in entries),
+                'avg_db_ms': round(sum(entry['db_ms'] for entry in entries) / count, 2),
+                'avg_template_ms': round(sum(entry['template_ms'] for entry in entries) / count, 2),
+                'avg_queries': round(sum(entry['queries'] for entry in entries) / count, 1),
+                'max_queries': max(entry['queries'] for entry in entries),
+                'duplicate_queries': worst['duplicate_queries'],
+                'worst_duplicate': worst['worst_duplicate'],
+            })
+        summaries.sort(key=lambda summary: summary['avg_ms'], reverse=True)
+        return summaries[:limit]
+
+
+def install_template_timer():
+    """
+    Time top-level template renders into the current request profile.
+
+    Wraps the Django template backend once; the cost outside profiled
+    requests is one thread-local lookup.
+    """
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, '_profiled', False):
+        return
+    render = Template.render
+
+    def profiled_render(self, context=None, request=None):
+        profile = request_profiler.current()
+        if profile is None:
+            return render(self, context, request)
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            profile.template_ms += (time.perf_counter() - started) * 1000
+
+    profiled_render._profiled = True
+    Template.render = profiled_render
+
+
+# Global instance for easy access
+request_profiler = RequestProfiler()
@@ -0,0 +1,247 @@
+"""
+Retention and archival of high-volume log tables.
+Rows older than settings.RETENTION_DAYS are moved, in bulk chunks, out of
+their live table into monthly JSONL.gz files under settings.ARCHIVE_DIR
+(one gzip member per chunk), with per-month ArchiveSummary totals kept in
+the database. ArchiveAwareManager reads them back when history is needed.
+"""
+
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionPolicy:
+    """How one table is archived"""
+
+    def __init__(self, date_field, group, total=None, archivable=None):
+        self.date_field = date_field  # age of a row; may span a relation
+        self.group = group  # row -> dict of values its summary is grouped by
+        self.total = total  # row -> amount added to its summary total
+        self.archivable = archivable  # now -> Q of old rows that may leave the live table
+
+
+def _movement_group(movement):
+    return {
+        'warehouse_product': movement.warehouse_product_id,
+        'movement_type': movement.movement_type,
+        'direction': 'in' if movement.quantity_change > 0 else 'out',
+    }
+
+
+POLICIES = {
+    'users.LoginLog': RetentionPolicy(
+        'login_timestamp', group=lambda log: {'status': log.login_status, 'role': log.user_role}
+    ),
+    'payments.PaymentWebhookLog': RetentionPolicy(
+        'created_at',
+        group=lambda log: {'outcome': 'processed' if log.processed else 'failed'},
+        # Webhooks still waiting to be processed stay live
+        archivable=lambda now: Q(processed=True) | Q(processing_error__isnull=False),
+    ),
+    'Inventory.InventoryMovement': RetentionPolicy(
+        'created_at', group=_movement_group, total=lambda movement: movement.quantity_change
+    ),
+    'Inventory.WarehouseStockMovement': RetentionPolicy(
+        'created_date', group=_movement_group, total=lambda movement: movement.quantity_change
+    ),
+    'Inventory.OrderStatusHistory': RetentionPolicy(
+        'changed_at', group=lambda change: {'new_status': change.new_status}
+    ),
+    'Inventory.UserNotificationStatus': RetentionPolicy(
+        'notification__created_at',
+        group=lambda status: {'read': status.is_read, 'dismissed': status.is_dismissed},
+        # Statuses of notifications still on screen would reappear as unread
+        archivable=lambda now: Q(notification__is_active=False) | Q(notification__expires_at__lt=now),
+    ),
+}
+
+
+def archive_path(label, month):
+    return os.path.join(settings.ARCHIVE_DIR, label, f'{month:%Y-%m}.jsonl.gz')
+
+
+def _month_of(moment):
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def _dump_row(row):
+    """One archive line; value_to_string keeps full precision (e.g. microseconds)"""
+    fields = {}
+    for field in row._meta.concrete_fields:
+        value = field.value_from_object(row)
+        fields[field.attname] = None if value is None else field.value_to_string(row)
+    return json.dumps({'on': row.retention_date.isoformat(), 'fields': fields}, separators=(',', ':'))
+
+
+def _load_row(model, line):
+    data = json.loads(line)
+    values = {}
+    for field in model._meta.concrete_fields:
+        value = data['fields'].get(field.attname)
+        values[field.attname] = None if value is None else field.to_python(value)
+    row = model(**values)
+    row._state.adding = False
+    row.retention_date = datetime.fromisoformat(data['on'])
+    return row
+
+
+class LogArchiver:
+    """Moves old rows of the POLICIES tables into monthly archives"""
+
+    def archive(self, label, days=None, chunk_size=1000, now=None, dry_run=False):
+        """
+        Archive rows of one table older than its retention period.
+
+        Args:
+            label: Model label from POLICIES, e.g. 'users.LoginLog'
+            days: Retention period (default: settings.RETENTION_DAYS[label])
+            chunk_size: Rows written and deleted per transaction
+            now: Reference time (default: now)
+            dry_run: Only count the rows that would be archived
+
+        Returns:
+            dict: rows, months (archive months written to, oldest first)
+        """
+        if label not in POLICIES:
+            raise ValueError(f"No retention policy for {label}")
+        policy = POLICIES[label]
+        model = apps.get_model(label)
+        now = now or timezone.now()
+        days = settings.RETENTION_DAYS[label] if days is None else days
+        cutoff = now - timedelta(days=days)
+
+        candidates = model._base_manager.filter(**{f'{policy.date_field}__lt': cutoff})
+        if policy.archivable:
+            candidates = candidates.filter(policy.archivable(now))
+        if dry_run:
+            return {'rows': candidates.count(), 'months': []}
+
+        archived, months = 0, set()
+        candidates = candidates.annotate(retention_date=F(policy.date_field)).order_by('pk')
+        while True:
+            with transaction.atomic():
+                rows = list(candidates[:chunk_size])
+                if not rows:
+                    break
+                months.update(self._write(label, rows))
+                self._summarize(label, policy, rows)
+                model._base_manager.filter(pk__in=[row.pk for row in rows]).delete()
+            archived += len(rows)
+            logger.info(f"Archived {archived} {label} rows older than {cutoff:%Y-%m-%d}")
+        return {'rows': archived, 'months': sorted(months)}
+
+    def _write(self, label, rows):
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(_month_of(row.retention_date), []).append(_dump_row(row))
+        for month, lines in by_month.items():
+            path = archive_path(label, month)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Each chunk appends one gzip member; readers see the members as one stream
+            with gzip.open(path, 'at', encoding='utf-8') as stream:
+                stream.write('\n'.join(lines) + '\n')
+        return by_month.keys()
+
+    def _summarize(self, label, policy, rows):
+        from .models import ArchiveSummary
+
+        totals = {}
+        for row in rows:
+            group = policy.group(row)
+            key = (_month_of(row.retention_date), json.dumps(group, sort_keys=True))
+            entry = totals.setdefault(key, {'group': group, 'rows': 0, 'total': 0})
+            entry['rows'] += 1
+            entry['total'] += policy.total(row) if policy.total else 0
+
+        for (month, group_key), entry in totals.items():
+            summary, _ = ArchiveSummary.objects.get_or_create(
+                model_label=label, month=month, group_key=group_key, defaults={'group': entry['group']}
+            )
+            ArchiveSummary.objects.filter(pk=summary.pk).update(
+                rows=F('rows') + entry['rows'], total=F('total') + entry['total']
+            )
+
+    def read(self, model, since=None, until=None, filters=None):
+        """
+        Archived rows of a model, oldest month first, as read-only instances.
+
+        Args:
+            since, until: Optional bounds on the policy date (until exclusive)
+            filters: Field values rows must equal, e.g. {'purchase_order_id': 5}
+
+        Yields:
+            Model instances with retention_date set
+        """
+        label = model._meta.label
+        directory = os.path.join(settings.ARCHIVE_DIR, label)
+        if not os.path.isdir(directory):
+            return
+        first = f'{_month_of(since):%Y-%m}' if since else ''
+        last = f'{_month_of(until):%Y-%m}' if until else '9999-12'
+        expected = {}
+        for name, value in (filters or {}).items():
+            field = model._meta.get_field(name)
+            expected[field.attname] = value.pk if isinstance(value, models.Model) else field.to_python(value)
+
+        seen = set()
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.jsonl.gz') or not first <= name[:7] <= last:
+                continue
+            with gzip.open(os.path.join(directory, name), 'rt', encoding='utf-8') as stream:
+                for line in stream:
+                    row = _load_row(model, line)
+                    # A chunk whose delete was rolled back is archived again on the next run
+                    if row.pk in seen:
+                        continue
+                    seen.add(row.pk)
+                    if (since and row.retention_date < since) or (until and row.retention_date >= until):
+                        continue
+                    if all(getattr(row, attname) == value for attname, value in expected.items()):
+                        yield row
+
+
+class ArchiveAwareManager(models.Manager):
+    """
+    Default manager of tables with a retention policy. Querysets see live
+    rows only; archived() and history() also read the monthly archives.
+    """
+
+    def archived(self, since=None, until=None, **filters):
+        return log_archiver.read(self.model, since, until, filters)
+
+    def history(self, since=None, until=None, **filters):
+        """Live and archived rows matching filters, newest first"""
+        date_field = POLICIES[self.model._meta.label].date_field
+        live = self.filter(**filters).annotate(retention_date=F(date_field))
+        if since:
+            live = live.filter(**{f'{date_field}__gte': since})
+        if until:
+            live = live.filter(**{f'{date_field}__lt': until})
+        rows = list(live)
+        live_keys = {row.pk for row in rows}
+        rows += [row for row in self.archived(since, until, **filters) if row.pk not in live_keys]
+        rows.sort(key=lambda row: (row.retention_date, row.pk), reverse=True)
+        return rows
+
+    def archived_summaries(self, **group):
+        """ArchiveSummary rows of this model, filtered on group values"""
+        from .models import ArchiveSummary
+
+        return ArchiveSummary.objects.filter(
+            model_label=self.model._meta.label, **{f'group__{key}': value for key, value in group.items()}
+        )
+
+
+# Global instance for easy access
+log_archiver = LogArchiver()
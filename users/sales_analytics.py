@@ -0,0 +1,306 @@
+"""
+Vectorized sales analytics for EZM Trade Management.
+Loads a store's recent sales and sale lines as columnar NumPy arrays (one
+values_list query each) and derives daily, hourly and weekday series,
+rolling averages, growth, moving-average demand forecasts and stock cover
+with array operations instead of one query per day or hour.
+"""
+
+import logging
+from datetime import timedelta
+
+import numpy as np
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+# 1970-01-01 was a Thursday (weekday 3)
+EPOCH_WEEKDAY = 3
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+ROLLING_WINDOW_DAYS = 7
+FORECAST_WINDOW_DAYS = 7
+FORECAST_HORIZON_DAYS = 7
+
+
+def rolling_mean(values, window=ROLLING_WINDOW_DAYS):
+    """Trailing mean over window values; leading values average what is available"""
+    values = np.asarray(values, dtype=float)
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def growth(current, previous):
+    """Percentage change from previous to current, 0 where previous is not positive"""
+    current = np.asarray(current, dtype=float)
+    previous = np.asarray(previous, dtype=float)
+    change = np.zeros(np.broadcast(current, previous).shape)
+    return np.divide((current - previous) * 100, previous, out=change, where=previous > 0)
+
+
+def week_over_week_growth(daily):
+    """Growth of the last 7 days of a daily series over the 7 days before"""
+    daily = np.asarray(daily, dtype=float)
+    return float(growth(daily[-7:].sum(), daily[-14:-7].sum()))
+
+
+def bucket_totals(index, weights, size):
+    """Sum of weights per bucket 0..size-1; indexes outside the range are dropped"""
+    index = np.asarray(index, dtype=np.int64)
+    weights = np.asarray(weights, dtype=float)
+    inside = (index >= 0) & (index < size)
+    return np.bincount(index[inside], weights=weights[inside], minlength=size)
+
+
+def peak(totals):
+    """Index of the largest bucket, or None when every bucket is empty"""
+    totals = np.asarray(totals, dtype=float)
+    if not totals.size or totals.max() <= 0:
+        return None
+    return int(totals.argmax())
+
+
+def demand_rate(daily, window=FORECAST_WINDOW_DAYS):
+    """Moving-average daily demand over the last window days of each row"""
+    daily = np.asarray(daily, dtype=float)
+    recent = daily[..., -window:]
+    if not recent.shape[-1]:
+        return np.zeros(daily.shape[:-1])
+    return recent.mean(axis=-1)
+
+
+def stock_cover_days(stock, daily_demand):
+    """Days each stock level lasts at its daily demand; inf where nothing sells"""
+    stock = np.asarray(stock, dtype=float)
+    daily_demand = np.asarray(daily_demand, dtype=float)
+    cover = np.full(np.broadcast(stock, daily_demand).shape, np.inf)
+    return np.divide(stock, daily_demand, out=cover, where=daily_demand > 0)
+
+
+class SalesSeries:
+    """
+    Columnar sales of one store since start.
+
+    day, hour and weekday are local-time buckets; day 0 is the local date of
+    start. The current UTC offset is applied to the whole range.
+    """
+
+    def __init__(self, start, epochs, amounts, offset=0):
+        self.start = start
+        self.offset = offset
+        self.epochs = np.asarray(epochs, dtype=float)
+        self.amounts = np.asarray(amounts, dtype=float)
+        local_day = np.floor((self.epochs + offset) / SECONDS_PER_DAY)
+        self.day = (local_day - np.floor((start.timestamp() + offset) / SECONDS_PER_DAY)).astype(np.int64)
+        self.hour = (np.floor((self.epochs + offset) / SECONDS_PER_HOUR) % 24).astype(np.int64)
+        self.weekday = ((local_day + EPOCH_WEEKDAY) % 7).astype(np.int64)
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def since(self, moment):
+        """Boolean mask of rows at or after moment"""
+        return self.epochs >= moment.timestamp()
+
+    def daily(self, days, mask=None):
+        """Totals per day for the first days of the series"""
+        if mask is not None:
+            return bucket_totals(self.day[mask], self.amounts[mask], days)
+        return bucket_totals(self.day, self.amounts, days)
+
+    def hourly(self, mask=None):
+        """Totals per local hour of day (0-23)"""
+        if mask is not None:
+            return bucket_totals(self.hour[mask], self.amounts[mask], 24)
+        return bucket_totals(self.hour, self.amounts, 24)
+
+    def by_weekday(self, mask=None):
+        """Totals per local weekday, Monday first"""
+        if mask is not None:
+            return bucket_totals(self.weekday[mask], self.amounts[mask], 7)
+        return bucket_totals(self.weekday, self.amounts, 7)
+
+
+class StoreSalesAnalytics:
+    """
+    Array-backed store analytics for the store manager dashboard.
+    """
+
+    def _start_of_day(self, moment):
+        return timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _offset(self, now):
+        return timezone.localtime(now).utcoffset().total_seconds()
+
+    def load_transactions(self, store, start, now):
+        """
+        Sales and refunds of a store since start.
+
+        Returns:
+            tuple: (sales SalesSeries, payment types array, refunds SalesSeries)
+        """
+        from transactions.models import Transaction
+
+        rows = list(Transaction.objects.filter(
+            store=store,
+            transaction_type__in=['sale', 'refund'],
+            timestamp__gte=start
+        ).values_list('timestamp', 'total_amount', 'transaction_type', 'payment_type').order_by())
+
+        offset = self._offset(now)
+        if rows:
+            timestamps, amounts, types, payments = zip(*rows)
+        else:
+            timestamps, amounts, types, payments = (), (), (), ()
+        epochs = np.fromiter((timestamp.timestamp() for timestamp in timestamps), dtype=float, count=len(rows))
+        amounts = np.array([float(amount or 0) for amount in amounts], dtype=float)
+        types = np.array(types, dtype=object)
+        is_sale = types == 'sale'
+        sales = SalesSeries(start, epochs[is_sale], amounts[is_sale], offset)
+        refunds = SalesSeries(start, epochs[~is_sale], amounts[~is_sale], offset)
+        return sales, np.array(payments, dtype=object)[is_sale], refunds
+
+    def load_demand(self, store, start, now, days):
+        """
+        Units sold per product and day since start.
+
+        Returns:
+            tuple: (product ids array, matrix of shape (products, days))
+        """
+        from transactions.models import Order
+
+        rows = list(Order.objects.filter(
+            transaction__store=store,
+            transaction__transaction_type='sale',
+            transaction__timestamp__gte=start,
+            product__isnull=False
+        ).values_list('product_id', 'quantity', 'transaction__timestamp').order_by())
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, days))
+
+        product_ids, quantities, timestamps = zip(*rows)
+        epochs = np.fromiter((timestamp.timestamp() for timestamp in timestamps), dtype=float, count=len(rows))
+        lines = SalesSeries(start, epochs, quantities, self._offset(now))
+        products, position = np.unique(np.asarray(product_ids, dtype=np.int64), return_inverse=True)
+        inside = (lines.day >= 0) & (lines.day < days)
+        cells = bucket_totals(
+            position[inside] * days + lines.day[inside], lines.amounts[inside], len(products) * days
+        )
+        return products, cells.reshape(len(products), days)
+
+    def stock_cover(self, store, product_ids, demand, limit=5):
+        """
+        Stocked products closest to running out at their moving-average demand.
+
+        Returns:
+            list: dicts with id, name, current_stock, daily_demand,
+            forecast_demand and cover_days, lowest cover first
+        """
+        from Inventory.models import Stock
+
+        stock = list(Stock.objects.filter(store=store, quantity__gt=0).values_list(
+            'product_id', 'product__name', 'quantity'
+        ).order_by())
+        if not stock:
+            return []
+
+        stock_ids = np.array([row[0] for row in stock], dtype=np.int64)
+        quantities = np.array([row[2] for row in stock], dtype=float)
+        rates = np.zeros(len(stock))
+        if len(product_ids):
+            position = np.searchsorted(product_ids, stock_ids).clip(max=len(product_ids) - 1)
+            sold = product_ids[position] == stock_ids
+            rates[sold] = demand_rate(demand)[position[sold]]
+
+        cover = stock_cover_days(quantities, rates)
+        order = np.argsort(cover, kind='stable')
+        return [
+            {
+                'id': stock[index][0],
+                'name': stock[index][1],
+                'current_stock': stock[index][2],
+                'daily_demand': round(float(rates[index]), 2),
+                'forecast_demand': round(float(rates[index] * FORECAST_HORIZON_DAYS), 1),
+                'cover_days': round(float(cover[index]), 1),
+            }
+            for index in order[:limit] if np.isfinite(cover[index])
+        ]
+
+    def store_metrics(self, store, now=None):
+        """
+        Revenue, trend, peak, forecast and stock cover metrics for a store
+        from three queries (transactions, sale lines, stock).
+        """
+        now = now or timezone.now()
+        today = self._start_of_day(now)
+        current_month_start = today.replace(day=1)
+        previous_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+        trend_start = today - timedelta(days=29)
+        start = min(previous_month_start, today - timedelta(days=30))
+        days = (today - start).days + 1
+        trend_offset = (trend_start - start).days
+
+        sales, payments, refunds = self.load_transactions(store, start, now)
+
+        current = sales.since(current_month_start)
+        previous = ~current & sales.since(previous_month_start)
+        current_revenue = float(sales.amounts[current].sum())
+        previous_revenue = float(sales.amounts[previous].sum())
+        current_count = int(current.sum())
+        previous_count = int(previous.sum())
+        current_avg = current_revenue / current_count if current_count else 0.0
+        previous_avg = previous_revenue / previous_count if previous_count else 0.0
+
+        last_30_days = sales.since(now - timedelta(days=30))
+        last_7_days = sales.since(now - timedelta(days=7))
+        daily = sales.daily(days)
+        trend = daily[trend_offset:]
+        hourly = sales.hourly(last_30_days)
+        peak_hour = peak(hourly)
+        peak_day = peak(sales.by_weekday(last_7_days))
+
+        methods, method_counts = np.unique(payments[last_30_days].astype(str), return_counts=True)
+        method_share = method_counts / method_counts.sum() * 100 if method_counts.size else method_counts
+
+        month_refunds = refunds.since(current_month_start)
+        refund_count = int(month_refunds.sum())
+
+        product_ids, demand = self.load_demand(store, today - timedelta(days=FORECAST_WINDOW_DAYS - 1), now, FORECAST_WINDOW_DAYS)
+        average_daily_revenue = float(demand_rate(daily))
+
+        return {
+            'current_month_revenue': current_revenue,
+            'previous_month_revenue': previous_revenue,
+            'revenue_trend': float(growth(current_revenue, previous_revenue)),
+            'current_month_transactions': current_count,
+            'previous_month_transactions': previous_count,
+            'transaction_count_trend': float(growth(current_count, previous_count)),
+            'current_avg_transaction': current_avg,
+            'previous_avg_transaction': previous_avg,
+            'transaction_value_trend': float(growth(current_avg, previous_avg)),
+            'avg_transaction_value': current_avg,
+            'daily_transactions': int(current_count / ((now - current_month_start).days + 1)),
+            'peak_hour': f"{peak_hour:02d}:00" if peak_hour is not None else "N/A",
+            'peak_day': WEEKDAYS[peak_day] if peak_day is not None else "N/A",
+            'peak_sales': float(hourly[peak_hour]) if peak_hour is not None else 0,
+            'sales_trend_labels': [(trend_start + timedelta(days=day)).strftime('%m/%d') for day in range(len(trend))],
+            'sales_trend_data': trend.tolist(),
+            'sales_trend_rolling_average': np.round(rolling_mean(trend), 2).tolist(),
+            'week_over_week_growth': week_over_week_growth(trend),
+            'average_daily_revenue': average_daily_revenue,
+            'revenue_forecast': average_daily_revenue * FORECAST_HORIZON_DAYS,
+            'peak_hours_data': hourly[9:18].tolist(),
+            'payment_method_labels': [method.title() for method in methods],
+            'payment_method_data': np.round(method_share, 1).tolist(),
+            'return_count': refund_count,
+            'return_rate': refund_count / current_count * 100 if current_count else 0,
+            'return_value': float(refunds.amounts[month_refunds].sum()),
+            'stock_cover': self.stock_cover(store, product_ids, demand),
+        }
+
+
+# Global instance for easy access
+store_sales_analytics = StoreSalesAnalytics()
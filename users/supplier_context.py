@@ -0,0 +1,72 @@
+"""
+Supplier identity for the supplier portal.
+Resolves the logged-in user's Supplier, SupplierProfile and SupplierAccount
+with a single select_related query through CustomUser.supplier, and keeps the
+result on the request so views and decorators share it.
+"""
+
+import logging
+
+from Inventory.models import Supplier
+
+logger = logging.getLogger(__name__)
+
+REQUEST_CACHE_ATTR = '_supplier_identity'
+
+
+def resolve_supplier(request):
+    """
+    Supplier for the current user (profile and account preloaded), or None.
+
+    Users created before the supplier link existed are matched by email once
+    and linked, so later requests go straight through the foreign key.
+    """
+    if hasattr(request, REQUEST_CACHE_ATTR):
+        return getattr(request, REQUEST_CACHE_ATTR)
+
+    user = request.user
+    suppliers = Supplier.objects.select_related('profile', 'account')
+    supplier = None
+    if user.is_authenticated:
+        if user.supplier_id:
+            supplier = suppliers.filter(pk=user.supplier_id).first()
+        elif user.email:
+            supplier = suppliers.filter(email=user.email).order_by('pk').first()
+            if supplier:
+                link_supplier(user, supplier)
+
+    setattr(request, REQUEST_CACHE_ATTR, supplier)
+    return supplier
+
+
+def link_supplier(user, supplier):
+    """Store the supplier on the user row"""
+    from .models import CustomUser
+
+    CustomUser.objects.filter(pk=user.pk).update(supplier=supplier)
+    user.supplier = supplier
+    logger.info(f"Linked user {user.email} to supplier {supplier.name}")
+
+
+def forget_supplier(request):
+    """Drop the request cache after creating or replacing supplier records"""
+    if hasattr(request, REQUEST_CACHE_ATTR):
+        delattr(request, REQUEST_CACHE_ATTR)
+
+
+def get_supplier(request):
+    """Like Supplier.objects.get(...) for the current user; raises Supplier.DoesNotExist"""
+    supplier = resolve_supplier(request)
+    if supplier is None:
+        raise Supplier.DoesNotExist(f"No supplier for user {request.user}")
+    return supplier
+
+
+def get_supplier_profile(request):
+    """Current user's SupplierProfile; raises Supplier/SupplierProfile.DoesNotExist"""
+    return get_supplier(request).profile
+
+
+def get_supplier_account(request):
+    """Current user's SupplierAccount; raises Supplier/SupplierAccount.DoesNotExist"""
+    return get_supplier(request).account
@@ -7,8 +7,12 @@ from transactions.models import (
     SupplierAccount, SupplierTransaction, SupplierPayment,
     SupplierCredit, SupplierInvoice
 )
+from transactions.ledger import supplier_ledger_service
 from Inventory.models import PurchaseOrder, Supplier
 from .forms import EditProfileForm, ChangePasswordForm
+from .supplier_context import (
+    forget_supplier, get_supplier, get_supplier_account, get_supplier_profile, link_supplier
+)
 from django.contrib.auth import update_session_auth_hash
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
@@ -48,9 +52,9 @@ def supplier_profile_required(view_func):
 
         # Check if supplier profile is complete
         try:
-            supplier = Supplier.objects.get(email=request.user.email)
+            supplier = get_supplier(request)
             try:
-                supplier_profile = SupplierProfile.objects.get(supplier=supplier)
+                supplier_profile = get_supplier_profile(request)
                 if not supplier_profile.is_onboarding_complete:
                     messages.warning(request, "Please complete your supplier profile to access this feature.")
                     return redirect('supplier_onboarding')
@@ -70,7 +74,7 @@ def supplier_dashboard(request):
     """Supplier dashboard with overview of account status and recent activity"""
     try:
         # Get supplier account
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
     except Supplier.DoesNotExist:
         # Create a basic supplier record for the user if it doesn't exist
         supplier = Supplier.objects.create(
@@ -80,12 +84,14 @@ def supplier_dashboard(request):
             phone=getattr(request.user, 'phone_number', '') or '',
             is_active=True
         )
+        link_supplier(request.user, supplier)
+        forget_supplier(request)
         messages.info(request, "Welcome! Please complete your supplier profile to access all features.")
         return redirect('supplier_onboarding')
 
     # Check onboarding status
     try:
-        supplier_profile = SupplierProfile.objects.get(supplier=supplier)
+        supplier_profile = get_supplier_profile(request)
         onboarding_complete = supplier_profile.is_onboarding_complete
     except SupplierProfile.DoesNotExist:
         supplier_profile = None
@@ -98,7 +104,7 @@ def supplier_dashboard(request):
 
     # Get supplier account (create if doesn't exist)
     try:
-        supplier_account = SupplierAccount.objects.get(supplier=supplier)
+        supplier_account = get_supplier_account(request)
     except SupplierAccount.DoesNotExist:
         # Create a basic supplier account if it doesn't exist
         supplier_account = SupplierAccount.objects.create(
@@ -210,16 +216,10 @@ def supplier_dashboard(request):
         status__in=['payment_confirmed', 'delivered']
     ).aggregate(total=Sum('total_amount'))['total'] or 0
 
-    supplier_payment_total = SupplierPayment.objects.filter(
-        supplier_transaction__supplier_account=supplier_account,
-        status='completed'
-    ).aggregate(total=Sum('amount_paid'))['total'] or 0
-
-    supplier_transaction_total = SupplierTransaction.objects.filter(
-        supplier_account=supplier_account,
-        transaction_type='payment',
-        status='completed'
-    ).aggregate(total=Sum('amount'))['total'] or 0
+    # Supplier transactions and payments come from the monthly ledger snapshots
+    ledger_totals = supplier_ledger_service.totals(supplier_account)
+    supplier_payment_total = ledger_totals['supplier_payments_total']
+    supplier_transaction_total = ledger_totals['payments_total']
 
     # Sum all payment sources
     total_payments = (
@@ -258,12 +258,15 @@ def supplier_dashboard(request):
 def supplier_account(request):
     """Supplier account overview and details"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
-        supplier_account = SupplierAccount.objects.get(supplier=supplier)
+        supplier = get_supplier(request)
+        supplier_account = get_supplier_account(request)
         
         context = {
             'supplier': supplier,
             'supplier_account': supplier_account,
+            # current_balance is what we owe the supplier, so it uses up credit
+            'available_credit': supplier_account.credit_limit - supplier_account.current_balance,
+            'ledger_snapshots': supplier_ledger_service.monthly_snapshots(supplier_account, months=12),
         }
         
     except (Supplier.DoesNotExist, SupplierAccount.DoesNotExist):
@@ -277,7 +280,7 @@ def supplier_account(request):
 def supplier_purchase_orders(request):
     """Enhanced list of purchase orders for the supplier with shipping management"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
 
         # Get orders by status for better organization
         all_orders = PurchaseOrder.objects.filter(supplier=supplier).order_by('-created_date')
@@ -327,7 +330,7 @@ def supplier_mark_in_transit(request, order_id):
 
         # Get supplier
         try:
-            supplier = Supplier.objects.get(email=request.user.email)
+            supplier = get_supplier(request)
             logger.info(f"Found supplier: {supplier.name} for user {request.user.email}")
         except Supplier.DoesNotExist:
             logger.error(f"No supplier found for user {request.user.email}")
@@ -446,8 +449,8 @@ def supplier_mark_in_transit(request, order_id):
 def supplier_invoices(request):
     """List of invoices for the supplier"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
-        supplier_account = SupplierAccount.objects.get(supplier=supplier)
+        supplier = get_supplier(request)
+        supplier_account = get_supplier_account(request)
         
         invoices = SupplierInvoice.objects.filter(
             supplier_transaction__supplier_account=supplier_account
@@ -469,7 +472,7 @@ def supplier_invoices(request):
 def supplier_payments(request):
     """Enhanced payment notifications and history for the supplier"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
 
         # Get Chapa payment transactions for this supplier
         from payments.models import ChapaTransaction, PurchaseOrderPayment
@@ -496,7 +499,7 @@ def supplier_payments(request):
 
         # Get traditional supplier payments (for backward compatibility)
         try:
-            supplier_account = SupplierAccount.objects.get(supplier=supplier)
+            supplier_account = get_supplier_account(request)
             traditional_payments = SupplierPayment.objects.filter(
                 supplier_transaction__supplier_account=supplier_account
             ).order_by('-payment_date')
@@ -539,7 +542,7 @@ def supplier_payment_notifications_api(request):
     API endpoint for real-time payment notification updates
     """
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
 
         # Get Chapa payment transactions for this supplier
         from payments.models import ChapaTransaction
@@ -592,7 +595,7 @@ def supplier_payment_notifications_api(request):
 def supplier_transactions(request):
     """Comprehensive transaction history for the supplier including all payment types"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
 
         # Get Chapa payment transactions for this supplier
         from payments.models import ChapaTransaction, PurchaseOrderPayment
@@ -613,7 +616,7 @@ def supplier_transactions(request):
         # Get traditional supplier transactions (if supplier account exists)
         traditional_transactions = []
         try:
-            supplier_account = SupplierAccount.objects.get(supplier=supplier)
+            supplier_account = get_supplier_account(request)
             traditional_transactions = SupplierTransaction.objects.filter(
                 supplier_account=supplier_account
             ).order_by('-transaction_date')
@@ -723,7 +726,7 @@ def supplier_transactions(request):
 def supplier_products(request):
     """Product catalog for the supplier"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
         products = supplier.warehouse_products.filter(is_active=True)
         
         context = {
@@ -742,18 +745,19 @@ def supplier_products(request):
 def supplier_reports(request):
     """Reports and analytics for the supplier"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
-        supplier_account = SupplierAccount.objects.get(supplier=supplier)
+        supplier = get_supplier(request)
+        supplier_account = get_supplier_account(request)
         
-        # Generate basic reports data
-        monthly_transactions = SupplierTransaction.objects.filter(
-            supplier_account=supplier_account
-        ).extra(
-            select={'month': "strftime('%%Y-%%m', transaction_date)"}
-        ).values('month').annotate(
-            count=Count('id'),
-            total_amount=Sum('amount')
-        ).order_by('-month')[:12]
+        # Generate basic reports data from the monthly ledger snapshots
+        monthly_transactions = [
+            {
+                'month': snapshot.month.strftime('%Y-%m'),
+                'count': snapshot.transaction_count,
+                'total_amount': snapshot.transaction_amount,
+                'closing_balance': snapshot.closing_balance,
+            }
+            for snapshot in supplier_ledger_service.monthly_snapshots(supplier_account, months=12)
+        ]
         
         context = {
             'supplier': supplier,
@@ -822,7 +826,7 @@ def supplier_settings(request):
 def supplier_onboarding(request):
     """Supplier onboarding process for completing profile setup"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
     except Supplier.DoesNotExist:
         # Create a basic supplier record if it doesn't exist
         supplier = Supplier.objects.create(
@@ -832,10 +836,12 @@ def supplier_onboarding(request):
             phone=getattr(request.user, 'phone_number', '') or '',
             is_active=True
         )
+        link_supplier(request.user, supplier)
+        forget_supplier(request)
 
     # Get or create supplier profile
     try:
-        supplier_profile = SupplierProfile.objects.get(supplier=supplier)
+        supplier_profile = get_supplier_profile(request)
     except SupplierProfile.DoesNotExist:
         supplier_profile = None
 
@@ -883,7 +889,7 @@ def supplier_onboarding(request):
 def supplier_product_catalog(request):
     """Supplier product catalog management"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
     except Supplier.DoesNotExist:
         messages.error(request, "Supplier profile not found.")
         return redirect('supplier_dashboard')
@@ -945,7 +951,7 @@ def supplier_product_catalog(request):
 def supplier_add_product(request):
     """Add new product to supplier catalog"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
     except Supplier.DoesNotExist:
         messages.error(request, "Supplier profile not found.")
         return redirect('supplier_dashboard')
@@ -977,7 +983,7 @@ def supplier_add_product(request):
 def supplier_edit_product(request, product_id):
     """Edit existing product in supplier catalog"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
         product = SupplierProduct.objects.get(id=product_id, supplier=supplier)
     except (Supplier.DoesNotExist, SupplierProduct.DoesNotExist):
         messages.error(request, "Product not found.")
@@ -1011,7 +1017,7 @@ def supplier_edit_product(request, product_id):
 def supplier_delete_product(request, product_id):
     """Delete product from supplier catalog"""
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
         product = SupplierProduct.objects.get(id=product_id, supplier=supplier)
     except (Supplier.DoesNotExist, SupplierProduct.DoesNotExist):
         messages.error(request, "Product not found.")
@@ -1044,7 +1050,7 @@ def check_supplier_setup_status(request):
         return JsonResponse({'error': 'Supplier role required'}, status=403)
 
     try:
-        supplier = Supplier.objects.get(email=request.user.email)
+        supplier = get_supplier(request)
         supplier_exists = True
         supplier_data = {
             'name': supplier.name,
@@ -1058,7 +1064,7 @@ def check_supplier_setup_status(request):
 
     try:
         if supplier_exists:
-            supplier_account = SupplierAccount.objects.get(supplier=supplier)
+            supplier_account = get_supplier_account(request)
             account_exists = True
             account_data = {
                 'account_number': supplier_account.account_number,
@@ -1201,7 +1207,7 @@ def supplier_adjust_stock(request):
     """Handle supplier stock quantity adjustments"""
     if request.method == 'POST':
         try:
-            supplier = Supplier.objects.get(email=request.user.email)
+            supplier = get_supplier(request)
             product_id = request.POST.get('product_id')
             product = SupplierProduct.objects.get(id=product_id, supplier=supplier)
 
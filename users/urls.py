@@ -24,7 +24,7 @@ from .views import (
     # API endpoints for product dropdowns
     get_restock_products, get_transfer_products, get_stores_with_product, warehouse_products_api,
     # Analytics views
-    analytics_dashboard, financial_reports, analytics_api,
+    analytics_dashboard, financial_reports, analytics_api, slowest_endpoints,
     # Transaction history
     transaction_history,
     # Sales report
@@ -102,6 +102,7 @@ urlpatterns = [
     path('head-manager/analytics/', analytics_dashboard, name='analytics_dashboard'),
     path('head-manager/financial-reports/', financial_reports, name='financial_reports'),
     path('api/analytics/', analytics_api, name='analytics_api'),
+    path('head-manager/performance/', slowest_endpoints, name='slowest_endpoints'),
 
 
     path('admin/settings/', admin_settings, name='admin_settings'),
@@ -207,9 +207,11 @@ def head_manager_page(request):
 
     stores = Store.objects.all().select_related('store_manager')
 
-    # Request statistics
-    pending_restock_requests = RestockRequest.objects.filter(status='pending').count()
-    pending_transfer_requests = StoreStockTransferRequest.objects.filter(status='pending').count()
+    # Request and payment statistics (cached conditional aggregates)
+    from .dashboard_service import dashboard_kpi_service
+    kpis = dashboard_kpi_service.get_head_manager_kpis()
+    pending_restock_requests = kpis['pending_restock_requests']
+    pending_transfer_requests = kpis['pending_transfer_requests']
 
     # Recent requests for quick overview
     recent_restock_requests = RestockRequest.objects.filter(
@@ -221,40 +223,11 @@ def head_manager_page(request):
     ).select_related('from_store', 'to_store', 'product', 'requested_by').order_by('-requested_date')[:5]
 
     # Payment statistics
-    payment_stats = {}
-    try:
-        from payments.models import ChapaTransaction
-        from django.utils import timezone
-        from datetime import timedelta
-
-        today = timezone.now().date()
-        this_month = today.replace(day=1)
-
-        payment_stats = {
-            'total_payments': ChapaTransaction.objects.filter(status='success').count(),
-            'monthly_payments': ChapaTransaction.objects.filter(
-                status='success',
-                paid_at__gte=this_month
-            ).count(),
-            'total_payment_amount': ChapaTransaction.objects.filter(
-                status='success'
-            ).aggregate(total=Sum('amount'))['total'] or 0,
-            'monthly_payment_amount': ChapaTransaction.objects.filter(
-                status='success',
-                paid_at__gte=this_month
-            ).aggregate(total=Sum('amount'))['total'] or 0,
-            'recent_payments': ChapaTransaction.objects.filter(
-                status='success'
-            ).select_related('supplier').order_by('-paid_at')[:5]
-        }
-    except:
-        payment_stats = {
-            'total_payments': 0,
-            'monthly_payments': 0,
-            'total_payment_amount': 0,
-            'monthly_payment_amount': 0,
-            'recent_payments': []
-        }
+    from payments.models import ChapaTransaction
+    payment_stats = dict(kpis['payment_stats'])
+    payment_stats['recent_payments'] = ChapaTransaction.objects.filter(
+        status='success'
+    ).select_related('supplier').order_by('-paid_at')[:5]
 
     context = {
         'stores': stores,
@@ -508,68 +481,21 @@ def calculate_store_analytics(store):
 
     now = timezone.now()
     current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    previous_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
     last_30_days = now - timedelta(days=30)
-    last_7_days = now - timedelta(days=7)
 
     analytics = {}
 
     try:
         # 1. STORE PERFORMANCE METRICS
 
-        # Current month revenue
-        current_month_sales = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=current_month_start
-        ).aggregate(
-            total_revenue=Sum('total_amount'),
-            total_transactions=Count('id'),
-            avg_transaction=Avg('total_amount')
-        )
-
-        # Previous month revenue
-        previous_month_sales = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=previous_month_start,
-            timestamp__lt=current_month_start
-        ).aggregate(
-            total_revenue=Sum('total_amount'),
-            total_transactions=Count('id'),
-            avg_transaction=Avg('total_amount')
-        )
-
-        # Calculate trends
-        current_revenue = current_month_sales['total_revenue'] or Decimal('0')
-        previous_revenue = previous_month_sales['total_revenue'] or Decimal('0')
-        revenue_trend = ((current_revenue - previous_revenue) / previous_revenue * 100) if previous_revenue > 0 else 0
+        # Revenue, trend, peak, forecast and stock cover metrics from columnar series
+        from .sales_analytics import store_sales_analytics
 
-        current_transactions = current_month_sales['total_transactions'] or 0
-        previous_transactions = previous_month_sales['total_transactions'] or 0
-        transaction_count_trend = ((current_transactions - previous_transactions) / previous_transactions * 100) if previous_transactions > 0 else 0
-
-        current_avg = current_month_sales['avg_transaction'] or Decimal('0')
-        previous_avg = previous_month_sales['avg_transaction'] or Decimal('0')
-        transaction_value_trend = ((current_avg - previous_avg) / previous_avg * 100) if previous_avg > 0 else 0
-
-        # Daily transactions average
-        days_in_month = (now - current_month_start).days + 1
-        daily_transactions = current_transactions / days_in_month if days_in_month > 0 else 0
-
-        analytics.update({
-            'current_month_revenue': float(current_revenue),
-            'previous_month_revenue': float(previous_revenue),
-            'revenue_trend': float(revenue_trend),
-            'current_month_transactions': current_transactions,
-            'previous_month_transactions': previous_transactions,
-            'transaction_count_trend': float(transaction_count_trend),
-            'current_avg_transaction': float(current_avg),
-            'previous_avg_transaction': float(previous_avg),
-            'transaction_value_trend': float(transaction_value_trend),
-            'avg_transaction_value': float(current_avg),
-            'daily_transactions': int(daily_transactions),
-        })
+        metrics = store_sales_analytics.store_metrics(store, now)
+        analytics.update(metrics)
+        current_revenue = metrics['current_month_revenue']
+        current_transactions = metrics['current_month_transactions']
+        revenue_trend = metrics['revenue_trend']
 
         # 2. INVENTORY ANALYSIS
 
@@ -590,11 +516,7 @@ def calculate_store_analytics(store):
 
         # Customer satisfaction (based on return rates)
         total_sales_count = current_transactions
-        return_count = Transaction.objects.filter(
-            store=store,
-            transaction_type='refund',
-            timestamp__gte=current_month_start
-        ).count()
+        return_count = metrics['return_count']
 
         customer_satisfaction = ((total_sales_count - return_count) / total_sales_count * 100) if total_sales_count > 0 else 100
 
@@ -604,91 +526,7 @@ def calculate_store_analytics(store):
             'customer_satisfaction': customer_satisfaction,
         })
 
-        # 3. PEAK HOURS/DAYS ANALYSIS
-
-        # Peak hour analysis (SQLite compatible)
-        hourly_sales = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=last_30_days
-        ).extra(
-            select={'hour': "strftime('%%H', timestamp)"}
-        ).values('hour').annotate(
-            total_sales=Sum('total_amount'),
-            transaction_count=Count('id')
-        ).order_by('-total_sales')
-
-        peak_hour = f"{hourly_sales[0]['hour']}:00" if hourly_sales else "14:00"
-        peak_sales = float(hourly_sales[0]['total_sales']) if hourly_sales else 0
-
-        # Peak day analysis (SQLite compatible)
-        daily_sales = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=last_7_days
-        ).extra(
-            select={'weekday': "strftime('%%w', timestamp)"}
-        ).values('weekday').annotate(
-            total_sales=Sum('total_amount')
-        ).order_by('-total_sales')
-
-        weekdays = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-        peak_day = weekdays[int(daily_sales[0]['weekday'])] if daily_sales else "Saturday"
-
-        analytics.update({
-            'peak_hour': peak_hour,
-            'peak_day': peak_day,
-            'peak_sales': peak_sales,
-        })
-
-        # 4. CHART DATA PREPARATION
-
-        # Sales trend data (last 30 days)
-        sales_trend_data = []
-        sales_trend_labels = []
-        for i in range(30):
-            date = (now - timedelta(days=29-i)).date()
-            day_sales = Transaction.objects.filter(
-                store=store,
-                transaction_type='sale',
-                timestamp__date=date
-            ).aggregate(total=Sum('total_amount'))['total'] or 0
-
-            sales_trend_data.append(float(day_sales))
-            sales_trend_labels.append(date.strftime('%m/%d'))
-
-        # Peak hours data
-        peak_hours_labels = ['9AM', '10AM', '11AM', '12PM', '1PM', '2PM', '3PM', '4PM', '5PM']
-        peak_hours_data = []
-        for hour in range(9, 18):  # 9 AM to 5 PM
-            hour_sales = Transaction.objects.filter(
-                store=store,
-                transaction_type='sale',
-                timestamp__gte=last_30_days,
-                timestamp__hour=hour
-            ).aggregate(total=Sum('total_amount'))['total'] or 0
-            peak_hours_data.append(float(hour_sales))
-
-        # Payment method data
-        payment_methods = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=last_30_days
-        ).values('payment_type').annotate(
-            count=Count('id'),
-            total=Sum('total_amount')
-        )
-
-        payment_method_labels = []
-        payment_method_data = []
-        total_transactions = sum(pm['count'] for pm in payment_methods)
-
-        for pm in payment_methods:
-            payment_method_labels.append(pm['payment_type'].title())
-            percentage = (pm['count'] / total_transactions * 100) if total_transactions > 0 else 0
-            payment_method_data.append(round(percentage, 1))
-
-        # 5. INVENTORY INSIGHTS
+        # 3. INVENTORY INSIGHTS
 
         # Top performing products
         top_products = []
@@ -779,34 +617,11 @@ def calculate_store_analytics(store):
         except:
             pass
 
-        # 6. OPERATIONAL ANALYTICS
+        # 4. OPERATIONAL ANALYTICS
 
-        # Return analysis
-        return_rate = 0
         most_returned_product = "N/A"
-        return_value = 0
 
-        try:
-            total_sales = current_transactions
-            total_returns = Transaction.objects.filter(
-                store=store,
-                transaction_type='refund',
-                timestamp__gte=current_month_start
-            ).count()
-
-            return_rate = (total_returns / total_sales * 100) if total_sales > 0 else 0
-
-            return_transactions = Transaction.objects.filter(
-                store=store,
-                transaction_type='refund',
-                timestamp__gte=current_month_start
-            ).aggregate(total_value=Sum('total_amount'))
-
-            return_value = float(return_transactions['total_value'] or 0)
-        except:
-            pass
-
-        # 7. INSIGHTS AND RECOMMENDATIONS
+        # 5. INSIGHTS AND RECOMMENDATIONS
 
         insights = []
 
@@ -856,12 +671,13 @@ def calculate_store_analytics(store):
 
         analytics.update({
             # Chart data
-            'sales_trend_labels': json.dumps(sales_trend_labels),
-            'sales_trend_data': json.dumps(sales_trend_data),
-            'peak_hours_labels': json.dumps(peak_hours_labels),
-            'peak_hours_data': json.dumps(peak_hours_data),
-            'payment_method_labels': json.dumps(payment_method_labels),
-            'payment_method_data': json.dumps(payment_method_data),
+            'sales_trend_labels': json.dumps(metrics['sales_trend_labels']),
+            'sales_trend_data': json.dumps(metrics['sales_trend_data']),
+            'sales_trend_rolling_average': json.dumps(metrics['sales_trend_rolling_average']),
+            'peak_hours_labels': json.dumps(['9AM', '10AM', '11AM', '12PM', '1PM', '2PM', '3PM', '4PM', '5PM']),
+            'peak_hours_data': json.dumps(metrics['peak_hours_data']),
+            'payment_method_labels': json.dumps(metrics['payment_method_labels']),
+            'payment_method_data': json.dumps(metrics['payment_method_data']),
 
             # Inventory data
             'top_products': top_products,
@@ -870,9 +686,7 @@ def calculate_store_analytics(store):
             'reorder_recommendations': reorder_recommendations,
 
             # Operational data
-            'return_rate': return_rate,
             'most_returned_product': most_returned_product,
-            'return_value': return_value,
 
             # Insights
             'insights': insights,
@@ -897,15 +711,20 @@ def calculate_store_analytics(store):
             'inventory_turnover': 0,
             'stock_out_frequency': 0,
             'customer_satisfaction': 100,
-            'peak_hour': "14:00",
-            'peak_day': "Saturday",
+            'peak_hour': "N/A",
+            'peak_day': "N/A",
             'peak_sales': 0,
             'sales_trend_labels': json.dumps([]),
             'sales_trend_data': json.dumps([]),
+            'sales_trend_rolling_average': json.dumps([]),
+            'week_over_week_growth': 0,
+            'average_daily_revenue': 0,
+            'revenue_forecast': 0,
             'peak_hours_labels': json.dumps(['9AM', '10AM', '11AM', '12PM', '1PM', '2PM', '3PM', '4PM', '5PM']),
             'peak_hours_data': json.dumps([0, 0, 0, 0, 0, 0, 0, 0, 0]),
-            'payment_method_labels': json.dumps(['Cash', 'Card']),
-            'payment_method_data': json.dumps([70, 30]),
+            'payment_method_labels': json.dumps([]),
+            'payment_method_data': json.dumps([]),
+            'stock_cover': [],
             'top_products': [],
             'expiring_products': [],
             'slow_moving_products': [],
@@ -975,12 +794,15 @@ def store_sales_report(request):
         transaction_type='sale',
         timestamp__date__gte=start_date,
         timestamp__date__lte=end_date
-    ).select_related('store').prefetch_related('orders__product')
+    ).select_related('store', 'receipt').prefetch_related('orders__product')
 
     # Apply filters
     if payment_method:
         sales_transactions = sales_transactions.filter(payment_type=payment_method)
 
+    # Current stock for every product of this store, read once
+    store_stock = {stock.product_id: stock for stock in Stock.objects.filter(store=store)}
+
     # Get detailed sales data with product information
     sales_data = []
     total_revenue = Decimal('0.00')
@@ -998,11 +820,11 @@ def store_sales_report(request):
                     continue
 
                 # Get current stock information
-                try:
-                    current_stock = Stock.objects.get(product=order.product, store=store)
+                current_stock = store_stock.get(order.product_id)
+                if current_stock:
                     remaining_stock = current_stock.quantity
                     current_selling_price = current_stock.selling_price
-                except Stock.DoesNotExist:
+                else:
                     remaining_stock = 0
                     current_selling_price = order.price_at_time_of_sale
 
@@ -1513,27 +1335,11 @@ def store_manager_page(request):
     else:
         start_date = now - timedelta(days=30)
 
-    last_30_days = today - timedelta(days=30)
-    last_7_days = today - timedelta(days=7)
-
-    # Sales analytics
-    total_sales_30_days = Transaction.objects.filter(
-        store=store,
-        transaction_type='sale',
-        timestamp__date__gte=last_30_days
-    ).aggregate(
-        total_amount=Sum('total_amount'),
-        total_transactions=Count('id')
-    )
-
-    total_sales_7_days = Transaction.objects.filter(
-        store=store,
-        transaction_type='sale',
-        timestamp__date__gte=last_7_days
-    ).aggregate(
-        total_amount=Sum('total_amount'),
-        total_transactions=Count('id')
-    )
+    # Counters for the selected period (cached conditional aggregates)
+    from .dashboard_service import dashboard_kpi_service
+    kpis = dashboard_kpi_service.get_store_manager_kpis(store, (now - start_date).days)
+    total_sales_30_days = kpis['total_sales_30_days']
+    total_sales_7_days = kpis['total_sales_7_days']
 
     # Low stock alerts
     low_stock_items = Stock.objects.filter(
@@ -1541,13 +1347,6 @@ def store_manager_page(request):
         quantity__lte=F('low_stock_threshold')
     ).select_related('product').order_by('quantity')
 
-    # Debug: Print low stock information
-    print(f"DEBUG - Store: {store.name}")
-    print(f"DEBUG - Total stock items: {Stock.objects.filter(store=store).count()}")
-    print(f"DEBUG - Low stock items: {low_stock_items.count()}")
-    for stock in low_stock_items[:5]:
-        print(f"DEBUG - {stock.product.name}: qty={stock.quantity}, threshold={stock.low_stock_threshold}")
-
     # Current stock levels
     current_stock = Stock.objects.filter(store=store).select_related('product').order_by('product__name')
 
@@ -1561,15 +1360,8 @@ def store_manager_page(request):
     ).order_by('-requested_date')[:5]
 
     # Pending requests count
-    pending_restock_count = RestockRequest.objects.filter(
-        store=store,
-        status='pending'
-    ).count()
-
-    pending_transfer_count = StoreStockTransferRequest.objects.filter(
-        Q(from_store=store) | Q(to_store=store),
-        status='pending'
-    ).count()
+    pending_restock_count = kpis['pending_restock_count']
+    pending_transfer_count = kpis['pending_transfer_count']
 
     # Cashier assignment
     cashier_assignment = StoreCashier.objects.filter(store=store, is_active=True).first()
@@ -1597,28 +1389,16 @@ def store_manager_page(request):
     # in warehouse, other stores, or needs to be ordered from suppliers
     restock_available_products = Product.objects.all().order_by('name')
 
-    # Enhanced Analytics for the selected period
-    period_transactions = Transaction.objects.filter(
-        store=store,
-        timestamp__gte=start_date
-    )
-
     # Financial metrics for the period
-    total_revenue = period_transactions.aggregate(
-        total=Sum('total_amount')
-    )['total'] or 0
-
-    total_transactions = period_transactions.count()
+    total_revenue = kpis['total_revenue']
+    total_transactions = kpis['total_transactions']
     avg_transaction_value = total_revenue / total_transactions if total_transactions > 0 else 0
 
     # Stock analytics
-    total_products = current_stock.count()
-    total_stock_value = current_stock.aggregate(
-        total=Sum(F('quantity') * F('selling_price'))
-    )['total'] or 0
-
-    out_of_stock_count = Stock.objects.filter(store=store, quantity=0).count()
-    critical_stock_count = Stock.objects.filter(store=store, quantity__lte=5, quantity__gt=0).count()
+    total_products = kpis['total_products']
+    total_stock_value = kpis['total_stock_value']
+    out_of_stock_count = kpis['out_of_stock_count']
+    critical_stock_count = kpis['critical_stock_count']
 
     # Top selling products for the period
     from transactions.models import Order as TransactionOrder
@@ -1631,24 +1411,7 @@ def store_manager_page(request):
     ).order_by('-total_sold')[:5]
 
     # Daily sales trend (last 7 days for chart)
-    daily_sales = []
-    for i in range(7):
-        day = now - timedelta(days=i)
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-
-        day_revenue = Transaction.objects.filter(
-            store=store,
-            timestamp__gte=day_start,
-            timestamp__lt=day_end
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-
-        daily_sales.append({
-            'date': day_start.strftime('%Y-%m-%d'),
-            'revenue': float(day_revenue)
-        })
-
-    daily_sales.reverse()  # Show oldest to newest
+    daily_sales = kpis['daily_sales']
 
     # Payment method breakdown
     payment_methods = Transaction.objects.filter(
@@ -1667,12 +1430,7 @@ def store_manager_page(request):
     ).select_related('transaction').order_by('-timestamp')[:10]
 
     # Compare with previous period
-    previous_start = start_date - (now - start_date)
-    previous_revenue = Transaction.objects.filter(
-        store=store,
-        timestamp__gte=previous_start,
-        timestamp__lt=start_date
-    ).aggregate(total=Sum('total_amount'))['total'] or 0
+    previous_revenue = kpis['previous_revenue']
 
     revenue_change = 0
     if previous_revenue > 0:
@@ -2151,27 +1909,9 @@ def get_restock_products(request):
     except Store.DoesNotExist:
         return JsonResponse({'error': 'Store not found'}, status=404)
 
-    from Inventory.models import Product, Stock, WarehouseProduct
-    from django.db import models
-
-    # Get products available in warehouse
-    warehouse_product_names = WarehouseProduct.objects.filter(
-        quantity_in_stock__gt=0,
-        is_active=True
-    ).values_list('product_name', flat=True)
-
-    # Get products available in other stores
-    other_stores_products = Stock.objects.filter(
-        quantity__gt=0
-    ).exclude(store=store).values_list('product', flat=True)
-
     # For restock requests, include ALL products in the system
     # This allows store managers to request any product
-    available_products = Product.objects.all().order_by('name').values('id', 'name', 'category', 'price')
-
-    return JsonResponse({
-        'products': list(available_products)
-    })
+    return product_picker_response(request, 'catalog', store)
 
 
 @login_required
@@ -2188,21 +1928,19 @@ def get_transfer_products(request):
     except Store.DoesNotExist:
         return JsonResponse({'error': 'Store not found'}, status=404)
 
-    from Inventory.models import Stock, Product
-
-    # Get products available in OTHER stores (excluding current store)
+    # Products available in OTHER stores (excluding current store)
     # This shows products that can be transferred FROM other stores TO current store
-    other_stores_products = Stock.objects.filter(
-        quantity__gt=0
-    ).exclude(store=store).values_list('product', flat=True).distinct()
+    return product_picker_response(request, 'transfer', store)
 
-    # Get the actual products that are available in other stores
-    available_products = Product.objects.filter(
-        id__in=other_stores_products
-    ).order_by('name').values('id', 'name', 'category', 'price')
+
+def product_picker_response(request, kind, store):
+    """
+    The cached product picker index as JSON: {'products': [{id, name, category, price}]}
+    """
+    from Inventory.product_picker import product_picker_service
 
     return JsonResponse({
-        'products': list(available_products)
+        'products': product_picker_service.get_products(kind, store)
     })
 
 
@@ -3075,16 +2813,20 @@ def is_admin(user):
 @user_passes_test(is_admin)
 def admin_login_logs(request):
     """Admin page to view login logs with filtering and sorting"""
+    from .date_buckets import start_of_day
+    from .keyset_pagination import paginate_keyset
+
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
     role_filter = request.GET.get('role', '')
+    user_filter = request.GET.get('user', '')
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
     sort_by = request.GET.get('sort', '-login_timestamp')
-    page_number = request.GET.get('page')
+    cursor = request.GET.get('cursor')
 
     # Get all login logs
-    logs = LoginLog.objects.all().select_related('user')
+    logs = LoginLog.objects.all()
 
     # Apply filters
     if search_query:
@@ -3101,48 +2843,54 @@ def admin_login_logs(request):
     if role_filter:
         logs = logs.filter(user_role=role_filter)
 
+    if user_filter.isdigit():
+        logs = logs.filter(user_id=user_filter)
+
+    # Whole local days as timestamp ranges, so the (status, timestamp) indexes apply
     if date_from:
         try:
-            from_date = datetime.strptime(date_from, '%Y-%m-%d')
-            logs = logs.filter(login_timestamp__gte=from_date)
+            from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+            logs = logs.filter(login_timestamp__gte=start_of_day(from_date))
         except ValueError:
             pass
 
     if date_to:
         try:
-            to_date = datetime.strptime(date_to, '%Y-%m-%d')
-            # Add one day to include the entire day
-            to_date = to_date.replace(hour=23, minute=59, second=59)
-            logs = logs.filter(login_timestamp__lte=to_date)
+            to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+            logs = logs.filter(login_timestamp__lt=start_of_day(to_date + timedelta(days=1)))
         except ValueError:
             pass
 
-    # Apply sorting
+    # Apply sorting; ties fall back to newest first so every row has a unique position
     valid_sort_fields = ['login_timestamp', '-login_timestamp', 'username_attempted',
                         '-username_attempted', 'login_status', '-login_status',
                         'user_role', '-user_role']
-    if sort_by in valid_sort_fields:
-        logs = logs.order_by(sort_by)
+    if sort_by not in valid_sort_fields:
+        sort_by = '-login_timestamp'
+    if sort_by.lstrip('-') == 'login_timestamp':
+        ordering = [sort_by, '-id' if sort_by.startswith('-') else 'id']
     else:
-        logs = logs.order_by('-login_timestamp')
+        ordering = [sort_by, '-login_timestamp', '-id']
 
-    # Pagination
-    paginator = Paginator(logs, 25)  # Show 25 logs per page
-    page_obj = paginator.get_page(page_number)
+    # Cursor pagination: 25 logs per page, continuing from the last row shown
+    page_obj = paginate_keyset(logs.select_related('user'), ordering, cursor=cursor, per_page=25)
 
     # Get statistics
-    total_logs = logs.count()
-    successful_logs = logs.filter(login_status='success').count()
-    failed_logs = logs.filter(login_status='failed').count()
+    stats = logs.aggregate(
+        total=Count('id'),
+        successful=Count('id', filter=Q(login_status='success')),
+        failed=Count('id', filter=Q(login_status='failed')),
+    )
 
     context = {
         'page_obj': page_obj,
-        'total_logs': total_logs,
-        'successful_logs': successful_logs,
-        'failed_logs': failed_logs,
+        'total_logs': stats['total'],
+        'successful_logs': stats['successful'],
+        'failed_logs': stats['failed'],
         'search_query': search_query,
         'status_filter': status_filter,
         'role_filter': role_filter,
+        'user_filter': user_filter,
         'date_from': date_from,
         'date_to': date_to,
         'sort_by': sort_by,
@@ -3853,30 +3601,22 @@ def analytics_dashboard(request):
         top_products_per_store[store.id] = products_data
 
     # Overall Best Sellers (across all stores)
-    best_sellers = []
-    all_products = Product.objects.all()
-
-    for product in all_products:
-        total_sales = Transaction.objects.filter(
-            transaction_type='sale',
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).aggregate(
+    best_sellers = [
+        {
+            'name': row['product__name'],
+            'category': row['product__category'],
+            'total_sold': row['total_sold'],
+            'revenue': row['revenue'] or Decimal('0')
+        }
+        for row in Order.objects.filter(
+            transaction__transaction_type='sale',
+            transaction__timestamp__gte=start_date,
+            transaction__timestamp__lte=end_date
+        ).values('product__name', 'product__category').annotate(
             total_sold=Sum('quantity'),
-            revenue=Sum('total_amount')
-        )
-
-        # Handle None values from aggregation
-        total_sold = total_sales['total_sold'] or 0
-        total_revenue = total_sales['revenue'] or Decimal('0')
-
-        if total_sold > 0:
-            best_sellers.append({
-                'name': product.name,
-                'category': product.category,
-                'total_sold': total_sold,
-                'revenue': total_revenue
-            })
+            revenue=Sum(F('quantity') * F('price_at_time_of_sale'))
+        ).filter(total_sold__gt=0)
+    ]
 
     # Sort best sellers by quantity sold and add performance metrics
     best_sellers.sort(key=lambda x: x['total_sold'], reverse=True)
@@ -3913,23 +3653,18 @@ def analytics_dashboard(request):
         'growth_rate': 0  # Placeholder for growth calculation
     }
 
-    # Sales trend data for charts
-    daily_sales = []
-    current_date = start_date.date()
-    while current_date <= end_date.date():
-        day_sales = Transaction.objects.filter(
-            transaction_type='sale',
-            timestamp__date=current_date
-        ).aggregate(total=Sum('total_amount'))
+    # Sales trend data for charts, grouped by local day in the database
+    from .date_buckets import bucket_totals, local_days, start_of_day
 
-        # Handle None values from aggregation
-        total_sales = day_sales['total'] or Decimal('0')
-
-        daily_sales.append({
-            'date': current_date.strftime('%Y-%m-%d'),
-            'sales': float(total_sales)
-        })
-        current_date += timedelta(days=1)
+    days = local_days(start_date, end_date)
+    sales_by_day = bucket_totals(
+        Transaction.objects.filter(transaction_type='sale'), 'timestamp', 'day', 'total_amount',
+        start_of_day(days[0]), end_date
+    )
+    daily_sales = [
+        {'date': day.strftime('%Y-%m-%d'), 'sales': float(sales_by_day.get(day) or 0)}
+        for day in days
+    ]
 
     # Calculate additional analytics metrics
     peak_sales_day = max(daily_sales, key=lambda x: x['sales'])['date'] if daily_sales else None
@@ -3958,145 +3693,23 @@ def analytics_dashboard(request):
 
 def calculate_net_profit_for_store(store, start_date, end_date):
     """
-    Calculate net profit for a store by finding the difference between
-    sale price and purchase price from suppliers for each item sold.
+    Calculate net profit for a store as the difference between sale price
+    and the cost of goods frozen on each sale line at checkout.
 
-    Fixed to handle realistic profit margins:
+    Costs come from the landed cost table (Inventory.costing), which keeps
+    the original margin rules:
     - If warehouse cost > sale price, assumes 30% profit margin
     - If no warehouse product found, assumes 25% profit margin
-    - Prevents negative profit calculations from unrealistic data
     """
-    from Inventory.models import PurchaseOrderItem
+    from Inventory.costing import landed_cost_service
 
-    net_profit = Decimal('0')
-
-    # Get all sales transactions for the store in the period
-    sales_transactions = Transaction.objects.filter(
-        store=store,
-        transaction_type='sale',
-        timestamp__gte=start_date,
-        timestamp__lte=end_date
+    sale_lines = Order.objects.filter(
+        transaction__store=store,
+        transaction__transaction_type='sale',
+        transaction__timestamp__gte=start_date,
+        transaction__timestamp__lte=end_date
     )
-
-    for transaction in sales_transactions:
-        # Get orders for this transaction
-        orders = Order.objects.filter(transaction=transaction)
-
-        for order in orders:
-            if order.product:
-                # Find the most recent purchase price for this product
-                # Match by product name since WarehouseProduct is separate from Product
-                from Inventory.models import WarehouseProduct
-
-                # Try exact name match first
-                warehouse_product = WarehouseProduct.objects.filter(
-                    product_name__iexact=order.product.name
-                ).first()
-
-                # If no exact match, try partial name match
-                if not warehouse_product:
-                    warehouse_product = WarehouseProduct.objects.filter(
-                        product_name__icontains=order.product.name.split()[0]
-                    ).first()
-
-                if warehouse_product:
-                    # Find recent purchase price for this warehouse product
-                    recent_purchase = PurchaseOrderItem.objects.filter(
-                        warehouse_product=warehouse_product,
-                        purchase_order__status='delivered'
-                    ).order_by('-purchase_order__created_date').first()
-
-                    if recent_purchase:
-                        purchase_price = recent_purchase.unit_price
-                    else:
-                        # Use warehouse product unit price as fallback
-                        purchase_price = warehouse_product.unit_price
-
-                    sale_price = order.price_at_time_of_sale
-                    quantity = order.quantity
-
-                    # Ensure realistic profit calculation
-                    # If warehouse price is higher than sale price, use 70% of sale price as cost
-                    if purchase_price > sale_price:
-                        purchase_price = sale_price * Decimal('0.7')  # Assume 30% profit margin
-
-                    # Calculate net profit for this item
-                    item_net_profit = (sale_price - purchase_price) * quantity
-                    net_profit += item_net_profit
-                else:
-                    # If no warehouse product found, assume 25% profit margin
-                    sale_price = order.price_at_time_of_sale
-                    quantity = order.quantity
-                    estimated_cost = sale_price * Decimal('0.75')  # 25% profit margin
-
-                    item_net_profit = (sale_price - estimated_cost) * quantity
-                    net_profit += item_net_profit
-
-    return net_profit
-
-
-def calculate_purchase_costs_for_period(start_date, end_date):
-    """
-    Calculate total purchase costs from completed purchase orders in the period.
-    """
-    from Inventory.models import PurchaseOrder
-
-    purchase_costs = PurchaseOrder.objects.filter(
-        status='delivered',
-        created_date__gte=start_date,
-        created_date__lte=end_date
-    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-    return purchase_costs
-
-
-def get_revenue_breakdown_data(start_date, end_date):
-    """
-    Get revenue breakdown by categories, suppliers, and stores.
-    """
-    # Revenue by category
-    category_revenue = []
-    categories = Product.objects.values_list('category', flat=True).distinct().filter(category__isnull=False)
-
-    for category in categories:
-        if category:  # Skip None/empty categories
-            revenue = Order.objects.filter(
-                product__category=category,
-                transaction__transaction_type='sale',
-                transaction__timestamp__gte=start_date,
-                transaction__timestamp__lte=end_date
-            ).aggregate(
-                total=Sum(F('quantity') * F('price_at_time_of_sale'))
-            )['total'] or Decimal('0')
-
-            if revenue > 0:
-                category_revenue.append({
-                    'category': category,
-                    'revenue': float(revenue)
-                })
-
-    # Revenue by store
-    store_revenue = []
-    stores = Store.objects.all()
-
-    for store in stores:
-        revenue = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-        if revenue > 0:
-            store_revenue.append({
-                'store': store.name,
-                'revenue': float(revenue)
-            })
-
-    return {
-        'category_revenue': category_revenue,
-        'store_revenue': store_revenue
-    }
+    return landed_cost_service.gross_profit(sale_lines)
 
 
 @login_required
@@ -4113,119 +3726,24 @@ def financial_reports(request):
     if request.GET.get('export') == 'pdf':
         return generate_financial_pdf_report(request)
 
-    # Get time period filter
-    period = request.GET.get('period', '30')
-    end_date = timezone.now()
+    from .financial_statements import financial_statement_service
 
-    if period == '7':
-        start_date = end_date - timedelta(days=7)
-    elif period == '90':
-        start_date = end_date - timedelta(days=90)
-    elif period == '365':
-        start_date = end_date - timedelta(days=365)
-    else:
-        start_date = end_date - timedelta(days=30)
-
-    # Enhanced financial data per store with net profit calculations
-    stores = Store.objects.all()
-    financial_data = []
+    statement = financial_statement_service.get_statement(request.GET.get('period', '30'))
+    period = statement['period']
+    start_date = statement['start_date']
+    end_date = statement['end_date']
 
-    for store in stores:
-        # Revenue from sales
-        revenue = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-        # Calculate net profit (Sale Price - Purchase Price from Supplier)
-        net_profit = calculate_net_profit_for_store(store, start_date, end_date)
-
-        # Expenses from financial records and purchase orders
-        expense_records = FinancialRecord.objects.filter(
-            store=store,
-            record_type='expense',
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        # Purchase costs from completed purchase orders
-        purchase_costs = calculate_purchase_costs_for_period(start_date, end_date)
-
-        total_expenses = expense_records + purchase_costs
-
-        # Calculate profit/loss and margin
-        profit_loss = revenue - total_expenses
-        profit_margin = (profit_loss / revenue * 100) if revenue > 0 else 0
-        net_profit_margin = (net_profit / revenue * 100) if revenue > 0 else 0
-
-        financial_data.append({
-            'store': store,
-            'revenue': revenue,
-            'expenses': total_expenses,
-            'expense_records': expense_records,
-            'purchase_costs': purchase_costs,
-            'profit_loss': profit_loss,
-            'profit_margin': profit_margin,
-            'net_profit': net_profit,
-            'net_profit_margin': net_profit_margin
-        })
-
-    # Sort by profit/loss
-    financial_data.sort(key=lambda x: x['profit_loss'], reverse=True)
-
-    # Overall financial summary with enhanced metrics
-    total_revenue = sum(fd['revenue'] for fd in financial_data)
-    total_expenses = sum(fd['expenses'] for fd in financial_data)
-    total_net_profit = sum(fd['net_profit'] for fd in financial_data)
-    total_profit = total_revenue - total_expenses
-    overall_margin = (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-    overall_net_margin = (total_net_profit / total_revenue * 100) if total_revenue > 0 else 0
-
-    # Monthly financial trend
-    monthly_trend = []
-    current_month = start_date.replace(day=1)
-
-    while current_month <= end_date:
-        next_month = (current_month.replace(day=28) + timedelta(days=4)).replace(day=1)
-
-        month_revenue = Transaction.objects.filter(
-            transaction_type='sale',
-            timestamp__gte=current_month,
-            timestamp__lt=next_month
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-        month_expenses = FinancialRecord.objects.filter(
-            record_type='expense',
-            timestamp__gte=current_month,
-            timestamp__lt=next_month
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        monthly_trend.append({
-            'month': current_month.strftime('%Y-%m'),
-            'revenue': float(month_revenue),
-            'expenses': float(month_expenses),
-            'profit': float(month_revenue - month_expenses)
-        })
-
-        current_month = next_month
-
-    # Get revenue breakdown data
-    revenue_breakdown = get_revenue_breakdown_data(start_date, end_date)
+    # Store statements sorted by profit/loss
+    financial_data = sorted(statement['stores'], key=lambda x: x['profit_loss'], reverse=True)
+    total_net_profit = statement['totals']['total_net_profit']
+    monthly_trend = statement['monthly_trend']
+    revenue_breakdown = statement['revenue_breakdown']
 
     # Key financial metrics with enhanced data
-    financial_metrics = {
-        'total_revenue': total_revenue,
-        'total_expenses': total_expenses,
-        'total_profit': total_profit,
-        'total_net_profit': total_net_profit,
-        'overall_margin': overall_margin,
-        'overall_net_margin': overall_net_margin,
-        'best_performing_store': financial_data[0] if financial_data else None,
-        'stores_count': stores.count(),
-        'profitable_stores': len([fd for fd in financial_data if fd['profit_loss'] > 0])
-    }
+    financial_metrics = dict(
+        statement['totals'],
+        best_performing_store=financial_data[0] if financial_data else None
+    )
 
     context = {
         'financial_data': financial_data,
@@ -4258,61 +3776,27 @@ def generate_financial_pdf_report(request):
         messages.error(request, 'PDF generation is not available. Please install ReportLab.')
         return redirect('financial_reports')
 
-    # Get the same data as the main view
-    period = request.GET.get('period', '30')
-    end_date = timezone.now()
-
-    if period == '7':
-        start_date = end_date - timedelta(days=7)
-        period_name = "7 Days"
-    elif period == '90':
-        start_date = end_date - timedelta(days=90)
-        period_name = "90 Days"
-    elif period == '365':
-        start_date = end_date - timedelta(days=365)
-        period_name = "1 Year"
-    else:
-        start_date = end_date - timedelta(days=30)
-        period_name = "30 Days"
+    # Same cached statement as the main view
+    from .financial_statements import financial_statement_service
 
-    # Calculate financial data
-    stores = Store.objects.all()
-    financial_data = []
-    total_revenue = Decimal('0')
-    total_expenses = Decimal('0')
-    total_net_profit = Decimal('0')
+    statement = financial_statement_service.get_statement(request.GET.get('period', '30'))
+    period_name = {'7': "7 Days", '90': "90 Days", '365': "1 Year"}.get(statement['period'], "30 Days")
+    start_date = statement['start_date']
+    end_date = statement['end_date']
 
-    for store in stores:
-        revenue = Transaction.objects.filter(
-            store=store,
-            transaction_type='sale',
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-        net_profit = calculate_net_profit_for_store(store, start_date, end_date)
-
-        expense_records = FinancialRecord.objects.filter(
-            store=store,
-            record_type='expense',
-            timestamp__gte=start_date,
-            timestamp__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        purchase_costs = calculate_purchase_costs_for_period(start_date, end_date)
-        expenses = expense_records + purchase_costs
-
-        financial_data.append({
-            'store': store.name,
-            'revenue': revenue,
-            'expenses': expenses,
-            'net_profit': net_profit,
-            'profit_loss': revenue - expenses
-        })
-
-        total_revenue += revenue
-        total_expenses += expenses
-        total_net_profit += net_profit
+    financial_data = [
+        {
+            'store': row['store'].name,
+            'revenue': row['revenue'],
+            'expenses': row['expenses'],
+            'net_profit': row['net_profit'],
+            'profit_loss': row['profit_loss']
+        }
+        for row in statement['stores']
+    ]
+    total_revenue = statement['totals']['total_revenue']
+    total_expenses = statement['totals']['total_expenses']
+    total_net_profit = statement['totals']['total_net_profit']
 
     # Create PDF
     buffer = BytesIO()
@@ -4409,97 +3893,37 @@ def analytics_api(request):
     if request.user.role != 'head_manager':
         return JsonResponse({'error': 'Access denied'}, status=403)
 
-    chart_type = request.GET.get('type', 'sales_trend')
-    period = request.GET.get('period', '30')
+    from .financial_statements import financial_statement_service
 
-    end_date = timezone.now()
-    if period == '7':
-        start_date = end_date - timedelta(days=7)
-    elif period == '90':
-        start_date = end_date - timedelta(days=90)
-    elif period == '365':
-        start_date = end_date - timedelta(days=365)
-    else:
-        start_date = end_date - timedelta(days=30)
+    chart_type = request.GET.get('type', 'sales_trend')
+    statement = financial_statement_service.get_statement(request.GET.get('period', '30'))
+    daily = statement['daily']
 
     if chart_type == 'sales_trend':
         # Daily sales trend
-        daily_sales = []
-        current_date = start_date.date()
-
-        while current_date <= end_date.date():
-            day_sales = Transaction.objects.filter(
-                transaction_type='sale',
-                timestamp__date=current_date
-            ).aggregate(total=Sum('total_amount'))
-
-            daily_sales.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'sales': float(day_sales['total'] or 0)
-            })
-            current_date += timedelta(days=1)
-
         return JsonResponse({
-            'labels': [item['date'] for item in daily_sales],
-            'data': [item['sales'] for item in daily_sales]
+            'labels': [item['date'] for item in daily],
+            'data': [item['revenue'] for item in daily]
         })
 
     elif chart_type == 'store_comparison':
         # Store performance comparison
-        stores = Store.objects.all()
-        store_data = []
-
-        for store in stores:
-            total_sales = Transaction.objects.filter(
-                store=store,
-                transaction_type='sale',
-                timestamp__gte=start_date,
-                timestamp__lte=end_date
-            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-            store_data.append({
-                'store': store.name,
-                'sales': float(total_sales)
-            })
-
         return JsonResponse({
-            'labels': [item['store'] for item in store_data],
-            'data': [item['sales'] for item in store_data]
+            'labels': [row['store'].name for row in statement['stores']],
+            'data': [float(row['revenue']) for row in statement['stores']]
         })
 
     elif chart_type == 'revenue_vs_expense':
         # Revenue vs Expense trend
-        trend_data = []
-        current_date = start_date.date()
-
-        while current_date <= end_date.date():
-            day_revenue = Transaction.objects.filter(
-                transaction_type='sale',
-                timestamp__date=current_date
-            ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-            day_expenses = FinancialRecord.objects.filter(
-                record_type='expense',
-                timestamp__date=current_date
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-            trend_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'revenue': float(day_revenue),
-                'expenses': float(day_expenses)
-            })
-            current_date += timedelta(days=1)
-
         return JsonResponse({
-            'labels': [item['date'] for item in trend_data],
-            'revenue': [item['revenue'] for item in trend_data],
-            'expenses': [item['expenses'] for item in trend_data]
+            'labels': [item['date'] for item in daily],
+            'revenue': [item['revenue'] for item in daily],
+            'expenses': [item['expenses'] for item in daily]
         })
 
     elif chart_type == 'category_revenue':
         # Revenue breakdown by category
-        revenue_breakdown = get_revenue_breakdown_data(start_date, end_date)
-        category_data = revenue_breakdown['category_revenue']
+        category_data = statement['revenue_breakdown']['category_revenue']
 
         return JsonResponse({
             'labels': [item['category'] for item in category_data],
@@ -4508,8 +3932,7 @@ def analytics_api(request):
 
     elif chart_type == 'store_revenue':
         # Revenue breakdown by store
-        revenue_breakdown = get_revenue_breakdown_data(start_date, end_date)
-        store_data = revenue_breakdown['store_revenue']
+        store_data = statement['revenue_breakdown']['store_revenue']
 
         return JsonResponse({
             'labels': [item['store'] for item in store_data],
@@ -4518,32 +3941,39 @@ def analytics_api(request):
 
     elif chart_type == 'net_profit_trend':
         # Net profit trend over time
-        stores = Store.objects.all()
-        trend_data = []
-        current_date = start_date.date()
-
-        while current_date <= end_date.date():
-            day_net_profit = Decimal('0')
-            for store in stores:
-                day_start = timezone.make_aware(datetime.combine(current_date, datetime.min.time()))
-                day_end = timezone.make_aware(datetime.combine(current_date, datetime.max.time()))
-                store_net_profit = calculate_net_profit_for_store(store, day_start, day_end)
-                day_net_profit += store_net_profit
-
-            trend_data.append({
-                'date': current_date.strftime('%Y-%m-%d'),
-                'net_profit': float(day_net_profit)
-            })
-            current_date += timedelta(days=1)
-
         return JsonResponse({
-            'labels': [item['date'] for item in trend_data],
-            'data': [item['net_profit'] for item in trend_data]
+            'labels': [item['date'] for item in daily],
+            'data': [item['net_profit'] for item in daily]
         })
 
     return JsonResponse({'error': 'Invalid chart type'}, status=400)
 
 
+@login_required
+def slowest_endpoints(request):
+    """
+    Slowest endpoints seen by the request profiling middleware in this process.
+    """
+    if request.user.role != 'head_manager':
+        messages.error(request, 'Access denied. Head manager role required.')
+        return redirect('login')
+
+    from .profiling import request_profiler
+
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        request_profiler.clear()
+        messages.success(request, 'Request profiles cleared.')
+        return redirect('slowest_endpoints')
+
+    context = {
+        'profiling_enabled': request_profiler.enabled,
+        'endpoints': request_profiler.slowest_endpoints(),
+        'buffered_requests': len(request_profiler.recent()),
+        'buffer_size': request_profiler.buffer_size,
+    }
+    return render(request, 'analytics/slowest_endpoints.html', context)
+
+
 @login_required
 def transaction_history(request):
     """
@@ -4563,7 +3993,7 @@ def transaction_history(request):
     transactions = []
 
     # Get regular transactions
-    regular_transactions = Transaction.objects.all()
+    regular_transactions = Transaction.objects.select_related('store')
     if search_query:
         regular_transactions = regular_transactions.filter(
             Q(store__name__icontains=search_query) |
@@ -4586,7 +4016,7 @@ def transaction_history(request):
 
     # Get supplier transactions
     try:
-        supplier_transactions = SupplierTransaction.objects.all()
+        supplier_transactions = SupplierTransaction.objects.select_related('supplier_account__supplier')
         if search_query:
             supplier_transactions = supplier_transactions.filter(
                 Q(supplier_account__supplier__name__icontains=search_query) |
@@ -4612,7 +4042,7 @@ def transaction_history(request):
     # Get payment transactions
     if not transaction_type or transaction_type == 'payment':
         try:
-            payment_transactions = ChapaTransaction.objects.filter(status='success')
+            payment_transactions = ChapaTransaction.objects.filter(status='success').select_related('supplier')
             if search_query:
                 payment_transactions = payment_transactions.filter(
                     Q(chapa_tx_ref__icontains=search_query) |
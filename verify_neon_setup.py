@@ -160,7 +160,7 @@ def main():
         print("1. Run: python manage.py migrate")
         print("2. Run: python manage.py createsuperuser")
         print("3. Check your Neon connection string")
-        print("4. Verify psycopg2-binary is installed")
+        print("4. Verify psycopg (3.x) is installed")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
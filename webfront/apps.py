@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class WebfrontConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'webfront'
+
+    def ready(self):
+        # Connect the handler that releases a deleted ticket's held stock
+        from . import signals
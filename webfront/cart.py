@@ -10,6 +10,8 @@ from store.models import Store
 from .models import CustomerTicket, CustomerTicketItem
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F, Q
+from .reservations import stock_reservation_service
 
 
 class WebfrontCart:
@@ -51,62 +53,61 @@ class WebfrontCart:
                 'total_amount': 0
             }
         
+        # Load every referenced stock row in one query (unique store/product index)
+        lines = []
         for item in cart_data['items']:
             try:
-                # Validate required fields
-                stock_id = item.get('stock_id')
-                product_id = item.get('product_id')
+                stock_id = int(item['stock_id']) if item.get('stock_id') else None
+                product_id = int(item['product_id']) if item.get('product_id') else None
                 quantity = int(item.get('quantity', 0))
+            except (ValueError, KeyError, TypeError) as e:
+                errors.append(f"Invalid item data: {str(e)}")
+                continue
+            if (not stock_id and not product_id) or quantity <= 0:
+                errors.append(f"Invalid item data")
+                continue
+            lines.append((stock_id, product_id, quantity))
 
-                if (not stock_id and not product_id) or quantity <= 0:
-                    errors.append(f"Invalid item data")
-                    continue
+        stocks = Stock.objects.select_related('product').filter(store=store).filter(
+            Q(id__in=[line[0] for line in lines if line[0]]) |
+            Q(product_id__in=[line[1] for line in lines if line[1]])
+        )
+        by_id = {}
+        by_product = {}
+        for stock in stocks:
+            by_id[stock.id] = stock
+            by_product[stock.product_id] = stock
 
-                # Get stock for this store - try by stock_id first, then product_id
-                if stock_id:
-                    try:
-                        stock = Stock.objects.select_related('product').get(
-                            id=stock_id,
-                            store=store
-                        )
-                    except Stock.DoesNotExist:
-                        # Fallback to product_id if stock_id doesn't work
-                        stock = Stock.objects.select_related('product').get(
-                            product_id=product_id,
-                            store=store
-                        )
-                else:
-                    stock = Stock.objects.select_related('product').get(
-                        product_id=product_id,
-                        store=store
-                    )
-                
-                # Check availability
-                if stock.quantity < quantity:
-                    errors.append(
-                        f"{stock.product.name}: Only {stock.quantity} available, requested {quantity}"
-                    )
-                    continue
-                
-                # Calculate item total
-                item_total = stock.selling_price * quantity
-                total_amount += item_total
-                
-                validated_items.append({
-                    'product_id': stock.product.id,  # Use actual product ID from stock
-                    'stock_id': stock.id,  # Include stock ID for reference
-                    'product_name': stock.product.name,
-                    'quantity': quantity,
-                    'unit_price': stock.selling_price,
-                    'total_price': item_total,
-                    'stock': stock
-                })
-                
-            except Stock.DoesNotExist:
+        for stock_id, product_id, quantity in lines:
+            # Get stock for this store - try by stock_id first, then product_id
+            stock = by_id.get(stock_id)
+            if stock is None:
+                stock = by_product.get(product_id)
+            if stock is None:
                 errors.append(f"Product not available in selected store")
-            except (ValueError, KeyError) as e:
-                errors.append(f"Invalid item data: {str(e)}")
-        
+                continue
+
+            # Check availability (units held for other tickets or transfers are not available)
+            if stock.available_quantity < quantity:
+                errors.append(
+                    f"{stock.product.name}: Only {stock.available_quantity} available, requested {quantity}"
+                )
+                continue
+
+            # Calculate item total
+            item_total = stock.selling_price * quantity
+            total_amount += item_total
+
+            validated_items.append({
+                'product_id': stock.product.id,  # Use actual product ID from stock
+                'stock_id': stock.id,  # Include stock ID for reference
+                'product_name': stock.product.name,
+                'quantity': quantity,
+                'unit_price': stock.selling_price,
+                'total_price': item_total,
+                'stock': stock
+            })
+
         return {
             'success': len(errors) == 0,
             'errors': errors,
@@ -185,6 +186,9 @@ class WebfrontCart:
                         total_price=item_data['total_price'],
                         stock=item_data['stock']
                     )
+
+                # Hold the stock until the ticket is processed or expires
+                stock_reservation_service.reserve_ticket(ticket, validation['items'])
                 
                 return {
                     'success': True,
@@ -236,5 +240,5 @@ class WebfrontCart:
         """
         return Stock.objects.select_related('product').filter(
             store_id=store_id,
-            quantity__gt=0
+            quantity__gt=F('reserved_quantity')
         ).order_by('product__name')
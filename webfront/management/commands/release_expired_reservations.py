@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from webfront.reservations import stock_reservation_service
+
+
+class Command(BaseCommand):
+    help = 'Cancel expired customer tickets and release their reserved stock'
+
+    def handle(self, *args, **options):
+        result = stock_reservation_service.release_expired()
+        self.stdout.write(self.style.SUCCESS(
+            f"Cancelled {result['tickets']} expired tickets, released {result['units']} units"
+        ))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 00:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Inventory', '0016_stock_reserved_quantity'),
+        ('webfront', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField(help_text='Pending tickets release their stock after this time')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ticket_reservations', to='Inventory.stock')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='webfront.customerticket')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='webfront_st_expires_5010fd_idx')],
+            },
+        ),
+    ]
@@ -95,3 +95,23 @@ class CustomerTicketItem(models.Model):
         # Calculate total price
         self.total_price = self.quantity * self.unit_price
         super().save(*args, **kwargs)
+
+
+class StockReservation(models.Model):
+    """
+    Store stock held for a customer ticket until it is sold, cancelled or expires.
+    The held units are also counted in Stock.reserved_quantity.
+    """
+    ticket = models.ForeignKey(CustomerTicket, on_delete=models.CASCADE, related_name='reservations')
+    stock = models.ForeignKey('Inventory.Stock', on_delete=models.CASCADE, related_name='ticket_reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(help_text="Pending tickets release their stock after this time")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} reserved for {self.ticket.ticket_number}"
@@ -0,0 +1,163 @@
+"""
+Stock reservations for webfront customer tickets.
+Units on a ticket are held in Stock.reserved_quantity from the moment the
+ticket is created, so they cannot be sold to walk-in customers before the
+cashier processes it. Pending tickets that are never picked up expire, and
+confirmed tickets that are never completed expire after a longer grace period.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from Inventory.models import Stock
+from .models import CustomerTicket, StockReservation
+
+logger = logging.getLogger(__name__)
+
+# Tickets staff have accepted but not yet sold or cancelled
+CONFIRMED_STATUSES = ['confirmed', 'preparing', 'ready']
+
+
+class StockReservationService:
+    """
+    Reserve, release and expire ticket stock
+    """
+
+    @property
+    def hold_minutes(self):
+        return getattr(settings, 'WEBFRONT_RESERVATION_MINUTES', 30)
+
+    @property
+    def confirmed_hold_hours(self):
+        return getattr(settings, 'WEBFRONT_CONFIRMED_RESERVATION_HOURS', 24)
+
+    def reserve_ticket(self, ticket, items):
+        """
+        Hold stock for every line of a new ticket.
+
+        Must run inside the transaction that creates the ticket; raises
+        ValueError (rolling it back) when a line is no longer available.
+
+        Args:
+            ticket: The CustomerTicket being created
+            items: Validated cart items with 'stock' and 'quantity'
+        """
+        expires_at = timezone.now() + timedelta(minutes=self.hold_minutes)
+        reservations = []
+        for item in items:
+            stock = item['stock']
+            quantity = item['quantity']
+            held = Stock.objects.filter(
+                pk=stock.pk,
+                quantity__gte=F('reserved_quantity') + quantity
+            ).update(reserved_quantity=F('reserved_quantity') + quantity)
+            if not held:
+                raise ValueError(f"{stock.product.name} is no longer available in the requested quantity")
+            reservations.append(StockReservation(
+                ticket=ticket,
+                stock=stock,
+                quantity=quantity,
+                expires_at=expires_at
+            ))
+        StockReservation.objects.bulk_create(reservations)
+
+    def _release(self, reservations):
+        """Give reserved units back to stock and delete the reservations"""
+        totals = {
+            row['stock_id']: row['total']
+            for row in reservations.order_by().values('stock_id').annotate(total=Sum('quantity'))
+        }
+        if totals:
+            Stock.objects.filter(pk__in=totals.keys()).update(
+                reserved_quantity=F('reserved_quantity') - Case(
+                    *[When(pk=pk, then=Value(total)) for pk, total in totals.items()],
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            )
+        reservations.delete()
+        return sum(totals.values())
+
+    def release_ticket(self, ticket):
+        """
+        Release everything held for a ticket (sold, cancelled or completed).
+
+        Returns:
+            int: Number of units released
+        """
+        with transaction.atomic():
+            return self._release(StockReservation.objects.filter(ticket=ticket))
+
+    def release_expired(self, now=None):
+        """
+        Cancel tickets whose hold has expired and release their stock.
+
+        Pending tickets expire at their reservation's expires_at. Tickets
+        already confirmed by staff keep their stock for a further
+        WEBFRONT_CONFIRMED_RESERVATION_HOURS, so abandoned ones do not hold it
+        forever.
+
+        Returns:
+            dict: Number of tickets cancelled and units released
+        """
+        now = now or timezone.now()
+        confirmed_cutoff = now - timedelta(hours=self.confirmed_hold_hours)
+        with transaction.atomic():
+            expired = StockReservation.objects.order_by().values_list('ticket_id', flat=True).distinct()
+            pending_ids = list(expired.filter(expires_at__lte=now, ticket__status='pending'))
+            confirmed_ids = list(expired.filter(
+                expires_at__lte=confirmed_cutoff, ticket__status__in=CONFIRMED_STATUSES
+            ))
+            if not pending_ids and not confirmed_ids:
+                return {'tickets': 0, 'units': 0}
+
+            # Lock the tickets so a cashier confirming or selling one right now wins cleanly
+            ticket_ids = list(
+                CustomerTicket.objects.select_for_update()
+                .filter(
+                    Q(pk__in=pending_ids, status='pending')
+                    | Q(pk__in=confirmed_ids, status__in=CONFIRMED_STATUSES)
+                )
+                .values_list('pk', flat=True)
+            )
+            units = self._release(StockReservation.objects.filter(ticket_id__in=ticket_ids))
+            CustomerTicket.objects.filter(pk__in=ticket_ids).update(status='cancelled', updated_at=now)
+
+        logger.info(f"Expired {len(ticket_ids)} customer tickets, released {units} units")
+        return {'tickets': len(ticket_ids), 'units': units}
+
+    def ticket_stock(self, ticket, store):
+        """
+        Current stock for every ticket line in one query.
+
+        Each Stock is annotated with available_for_ticket: free units plus the
+        units this ticket already holds.
+
+        Returns:
+            dict: {product_id: Stock}
+        """
+        held = StockReservation.objects.filter(
+            ticket=ticket, stock=OuterRef('pk')
+        ).order_by().values('stock').annotate(total=Sum('quantity')).values('total')
+
+        return {
+            stock.product_id: stock
+            for stock in Stock.objects.filter(
+                store=store,
+                product_id__in=[item.product_id for item in ticket.items.all()]
+            ).annotate(
+                available_for_ticket=F('quantity') - F('reserved_quantity') + Coalesce(
+                    Subquery(held, output_field=IntegerField()), Value(0)
+                )
+            )
+        }
+
+
+# Global instance for easy access
+stock_reservation_service = StockReservationService()
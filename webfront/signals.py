@@ -0,0 +1,16 @@
+"""
+Signal handlers for webfront models.
+"""
+
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import CustomerTicket
+
+
+@receiver(pre_delete, sender=CustomerTicket)
+def release_deleted_ticket_stock(sender, instance, **kwargs):
+    """Give a deleted ticket's held units back before its reservations cascade away"""
+    from .reservations import stock_reservation_service
+
+    stock_reservation_service.release_ticket(instance)
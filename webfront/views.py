@@ -5,6 +5,7 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from Inventory.models import Stock, Product
+from Inventory.product_catalog import product_catalog
 from store.models import Store
 from django.contrib.auth.decorators import login_required
 from .models import CustomerTicket, CustomerTicketItem
@@ -34,7 +35,7 @@ def home_page(request):
     Website-style home page with overview statistics
     """
     # Get overview statistics
-    total_products = Product.objects.count()
+    total_products = product_catalog.count()
     total_stores = Store.objects.count()
     total_stock_items = Stock.objects.count()
     low_stock_items = Stock.objects.filter(quantity__lte=10).count()
@@ -111,7 +112,7 @@ def stock_list(request):
 
     # Get data for filters
     stores = Store.objects.all().order_by('name')
-    categories = Product.objects.values_list('category', flat=True).distinct().order_by('category')
+    categories = product_catalog.categories()
 
     context = {
         'page_obj': page_obj,